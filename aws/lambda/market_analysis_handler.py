@@ -16,12 +16,13 @@ import boto3
 import sys
 from src.modules.market_analysis import MarketAnalyzer
 from src.modules.data_fetcher import DataFetcher
+from src.utils.aws_utils import get_s3_client
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # AWS clients
-s3_client = boto3.client('s3')
+s3_client = get_s3_client()  # Shared with DataFetcher (one connection pool)
 ses_client = boto3.client('ses')
 
 # Environment variables
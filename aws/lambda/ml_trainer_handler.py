@@ -1,101 +1,264 @@
 import boto3
+import copy
 import pandas as pd
 import numpy as np
-import joblib
 import logging
 import os
 import json
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
-from sklearn.preprocessing import StandardScaler
-from io import StringIO
-import tempfile
+
+# Shared feature definitions (Lambda layer)
+import sys
+sys.path.insert(0, '/opt/python')
+from src.modules import features as feature_lib
+from src.modules.incremental_training import (
+    TrainerState, UpdatePolicy, fit_full, new_samples, rebuild_reason, warm_update
+)
+from src.modules.model_registry import ModelRegistry
+from src.modules.training_data import load_training_data_s3, read_csv_stream
+from src.utils.s3_cache import TieredS3Cache
 
 # Configure Logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 s3_client = boto3.client('s3')
+INCREMENTAL_LOOKBACK_DAYS = 365  # Longest hold expected for a trade closing after the watermark
+MIN_COMPARISON_ROWS = 20  # Out-of-sample rows needed to compare against the served model
 ses_client = boto3.client('ses', region_name=os.environ.get('SES_REGION', 'us-east-1'))
 
+def load_previous(registry, state_key):
+    """
+    Pipeline of the trainer's last published version and its state, or (None, None)
+
+    The pipeline is a private copy: warm_update() mutates it, and the one
+    memoized by load_pipeline() is shared by later (retried) invocations in
+    a warm container.
+    """
+    try:
+        state = TrainerState.from_dict(json.loads(s3_client.get_object(Bucket=registry.bucket, Key=state_key)['Body'].read()))
+        pipeline, _ = registry.load_pipeline(state.model_version)
+        return copy.deepcopy(pipeline), state
+    except Exception as e:
+        logger.info(f"No previous model/state ({e})")
+        return None, None
+
+def precision_above(y_prob, y, threshold=0.55):
+    """Precision of the trades with P(Win) above `threshold`, and their number"""
+    high_conf = np.asarray(y_prob) > threshold
+    if not high_conf.any():
+        return 0.0, 0
+    return float(np.asarray(y)[high_conf].mean()), int(high_conf.sum())
+
+def evaluate(model, X, y, threshold=0.55):
+    """Accuracy, precision and coverage above `threshold`, and the number of such trades"""
+    accuracy = accuracy_score(y, model.predict(X))
+    precision, n_high = precision_above(model.predict_proba(X)[:, 1], y, threshold)
+    coverage = n_high / len(X) if n_high else 0.0
+    return accuracy, precision, coverage, n_high
+
+def load_current(registry):
+    """The served (current) version, its pipeline and training cutoff, or (None, None, None)"""
+    try:
+        version = registry.current_version()
+        if version is None:
+            return None, None, None
+        pipeline, _ = registry.load_pipeline(version)
+        return version, pipeline, registry.manifest(version)['metadata'].get('train_end')
+    except Exception as e:
+        logger.warning(f"Could not load the current model: {e}")
+        return None, None, None
+
+def promotion_check(current_version, current, current_train_end, updated_version, eval_df, new_prob,
+                    threshold=0.55, min_rows=MIN_COMPARISON_ROWS):
+    """
+    Whether the new version may replace the served one, and why
+
+    Both models are scored on the evaluation rows entered after the served
+    model's training cutoff (manifest 'train_end'), which neither was
+    trained on, and the new version must win on precision above
+    `threshold`. A warm-start update of the served version itself
+    (`updated_version`) is promoted without a comparison.
+
+    Args:
+        eval_df: Evaluation rows (features, outcome, entry_date), out-of-sample
+            for the new version
+        new_prob: The new version's P(Win) for each row of eval_df
+    """
+    if current_version is None:
+        return True, "no current model"
+    if current_version == updated_version:
+        return True, f"update of the current model {current_version}"
+    if current is None:
+        return False, f"current model {current_version} could not be loaded for comparison"
+    if current_train_end is None:
+        return False, f"current model {current_version} records no training cutoff (train_end)"
+    current_features = list(current.get('features') or feature_lib.BASE_FEATURES)
+    missing = [f for f in current_features if f not in eval_df.columns]
+    if missing:
+        return False, f"evaluation data lacks features of the current model {current_version}: {missing}"
+
+    unseen = ((pd.to_datetime(eval_df['entry_date']) > pd.Timestamp(current_train_end))
+              & eval_df[current_features].notna().all(axis=1)).to_numpy()
+    if unseen.sum() < min_rows:
+        return False, (f"only {int(unseen.sum())} evaluation rows entered after the training cutoff "
+                       f"{current_train_end} of {current_version}")
+    rows = eval_df[unseen]
+    X = rows[current_features].to_numpy()
+    if current.get('scaler') is not None:
+        X = current['scaler'].transform(X)
+    y = rows['outcome'].to_numpy()
+    current_precision, _ = precision_above(current['model'].predict_proba(X)[:, 1], y, threshold)
+    new_precision, _ = precision_above(np.asarray(new_prob)[unseen], y, threshold)
+    verdict = "beats" if new_precision > current_precision else "does not beat"
+    message = f"precision {new_precision:.1%} {verdict} {current_precision:.1%} of {current_version} on {len(rows)} unseen rows"
+    return new_precision > current_precision, message
+
 def lambda_handler(event, context):
     """
     ML Trainer Lambda.
     Triggered by EventBridge (e.g., Weekly).
-    1. Downloads training data from S3 (ml_data/training_data.csv).
-    2. Trains RandomForest/GradientBoosting.
-    3. Selects best model.
-    4. Uploads pipeline to S3 (ml_models/model.joblib).
+    1. Loads the trainer state (ml_models/) and the registry version it names.
+    2. Decides between a warm-start update and a full rebuild (schedule,
+       drift, tree budget, feature change, or event {"mode": "full"}).
+    3. Warm start: adds trees fitted on trades closed since the last run,
+       scored beforehand with the previous model (out-of-sample).
+       Full rebuild: trains RandomForest on all data (80/20 evaluation split).
+    4. Publishes a new version to the S3 model registry; saves the state.
+       With AUTO_PROMOTE=true it is promoted only if it beats the served
+       model on evaluation rows neither was trained on (see
+       promotion_check); otherwise promotion is left to a person.
     5. Sends Email Report.
     """
     bucket = os.environ['S3_BUCKET']
-    data_key = "ml_data/training_data.csv"
-    model_key = "ml_models/model.joblib"
+    data_prefix = os.environ.get('TRAINING_DATA_PREFIX', "ml_data/training/")
+    legacy_key = "ml_data/training_data.csv"
+    # Pointer reads always revalidate: promotion decisions need the live pointer
+    registry = ModelRegistry(bucket=bucket, s3_client=s3_client,
+                             pointer_cache=TieredS3Cache(s3_client, revalidate_after=0))
+    auto_promote = os.environ.get('AUTO_PROMOTE', 'false').lower() == 'true'
+    state_key = "ml_models/trainer_state.json"
+    policy = UpdatePolicy(
+        trees_per_update=int(os.environ.get('TREES_PER_UPDATE', UpdatePolicy.trees_per_update)),
+        rebuild_days=int(os.environ.get('FULL_REBUILD_DAYS', UpdatePolicy.rebuild_days))
+    )
+    threshold = 0.55
     
     logger.info(f"Starting ML Retraining Task. Bucket: {bucket}")
     
-    # 1. Download Data
+    features = feature_lib.BASE_FEATURES
+    columns = ['outcome', 'entry_date', 'exit_date']
+    today = pd.Timestamp.now(tz='America/New_York').normalize().tz_localize(None)
+
+    pipeline, state = load_previous(registry, state_key)
+    current_version, current, current_train_end = load_current(registry) if auto_promote else (None, None, None)
+    if current is not None:
+        # Load the served model's features too, so it can be scored on the same rows
+        features_to_load = features + [f for f in (current.get('features') or [])
+                                       if f in feature_lib.FEATURE_NAMES and f not in features]
+    else:
+        features_to_load = features
+    if (event or {}).get('mode') == 'full':
+        reason = "requested"
+    else:
+        reason = rebuild_reason(state, pipeline, features, feature_lib.FEATURE_SCHEMA_VERSION, today, policy)
+    mode = "full" if reason else "incremental"
+    # Incremental runs read only the partitions that can hold newly closed trades
+    start = None if reason else pd.Timestamp(state.exit_watermark) - pd.Timedelta(days=INCREMENTAL_LOOKBACK_DAYS)
+    logger.info(f"Mode: {mode}" + (f" ({reason})" if reason else f", trades closed after {state.exit_watermark}"))
+
+    # 1. Load Data (model features + outcome/dates only, streamed per partition)
     try:
-        response = s3_client.get_object(Bucket=bucket, Key=data_key)
-        csv_content = response['Body'].read().decode('utf-8')
-        df = pd.read_csv(StringIO(csv_content))
+        df = load_training_data_s3(s3_client, bucket, data_prefix, features=features_to_load, columns=columns, start=start)
+        if df.empty and reason:
+            response = s3_client.get_object(Bucket=bucket, Key=legacy_key)
+            df = read_csv_stream(response['Body'], features_to_load, columns=columns)
         logger.info(f"Loaded {len(df)} samples from S3.")
     except Exception as e:
         logger.error(f"Failed to download data: {e}")
         return {"statusCode": 500, "body": "Data Download Failed"}
 
     # 2. Preprocessing
-    df = df.dropna()
-    features = ['rsi', 'vol_ratio', 'atr_pct', 'sma50_dist', 'sma200_dist', 'bb_width', 'spy_trend', 'rs_rel']
     # Validate columns exist
-    missing = [f for f in features if f not in df.columns]
+    missing = [f for f in features + ['outcome'] if f not in df.columns]
     if missing:
-        msg = f"Missing features in CSV: {missing}"
+        msg = f"Missing features in training data: {missing}"
         logger.error(msg)
         return {"statusCode": 400, "body": msg}
+    df = df.dropna(subset=features + ['outcome'])
+    if 'exit_date' not in df.columns:
+        df['exit_date'] = pd.to_datetime(df['entry_date']) if 'entry_date' in df.columns else pd.NaT
 
-    X = df[features]
-    y = df['outcome']
-    
-    # Feature Scaling
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
-    
-    # 3. Training
-    model = RandomForestClassifier(n_estimators=100, max_depth=5, class_weight='balanced', random_state=42)
-    model.fit(X_train, y_train)
-    
-    # Evaluation
-    y_pred = model.predict(X_test)
-    accuracy = accuracy_score(y_test, y_pred)
-    y_prob = model.predict_proba(X_test)[:, 1]
-    
-    # High Confidence Metrics
-    threshold = 0.55
-    high_conf_idx = np.where(y_prob > threshold)[0]
-    if len(high_conf_idx) > 0:
-        precision = y_test.iloc[high_conf_idx].mean()
-        coverage = len(high_conf_idx) / len(X_test)
+    if reason:
+        # 3a. Full rebuild
+        train_df, eval_df = train_test_split(df, test_size=0.2, random_state=42)
+        X_train, y_train = train_df[features].to_numpy(), train_df['outcome'].to_numpy()
+        X_test, y_test = eval_df[features].to_numpy(), eval_df['outcome'].to_numpy()
+        model = RandomForestClassifier(n_estimators=100, max_depth=5, class_weight='balanced', random_state=42)
+        pipeline = fit_full(model, X_train, y_train)
+        accuracy, precision, coverage, n_high = evaluate(pipeline['model'], pipeline['scaler'].transform(X_test), y_test, threshold)
+        new_prob = pipeline['model'].predict_proba(pipeline['scaler'].transform(X_test))[:, 1]
+        state = TrainerState(
+            features=list(features),
+            feature_schema=feature_lib.FEATURE_SCHEMA_VERSION,
+            last_full_rebuild=today.date().isoformat(),
+            n_samples=len(X_train)
+        )
+        updated_version = None
+        n_eval = len(X_test)
     else:
-        precision = 0.0
-        coverage = 0.0
+        # 3b. Warm start on trades closed since the last run
+        batch = new_samples(df, state)
+        if len(batch) < policy.min_new_samples:
+            msg = f"Only {len(batch)} new samples; keeping the current model"
+            logger.info(msg)
+            return {"statusCode": 200, "body": json.dumps({"status": "Skipped", "reason": msg})}
+        eval_df = batch
+        X_new = batch[features].to_numpy()
+        y_new = batch['outcome'].to_numpy()
+        # Score with the previous model first: these trades are out-of-sample for it
+        accuracy, precision, coverage, n_high = evaluate(pipeline['model'], pipeline['scaler'].transform(X_new), y_new, threshold)
+        new_prob = pipeline['model'].predict_proba(pipeline['scaler'].transform(X_new))[:, 1]
+        warm_update(pipeline, X_new, y_new, policy.trees_per_update)
+        updated_version = state.model_version
+        state.n_samples += len(batch)
+        state.updates += 1
+        n_eval = len(batch)
+
+    if df['exit_date'].notna().any():
+        watermark = df['exit_date'].max()
+        if state.exit_watermark is None or watermark > pd.Timestamp(state.exit_watermark):
+            state.exit_watermark = watermark.isoformat()
         
-    logger.info(f"Model Trained. Acc: {accuracy:.1%}, Precision(>{threshold}): {precision:.1%}")
+    logger.info(f"Model Trained ({mode}). Trees: {len(pipeline['model'].estimators_)}, "
+                f"Acc: {accuracy:.1%}, Precision(>{threshold}): {precision:.1%}")
     
     # 4. Save & Upload
-    pipeline = {"model": model, "scaler": scaler}
+    pipeline.update({
+        "features": features,
+        "feature_schema": feature_lib.FEATURE_SCHEMA_VERSION
+    })
     
-    with tempfile.NamedTemporaryFile(delete=False) as tmp:
-        joblib.dump(pipeline, tmp.name)
-        tmp.close()
-        s3_client.upload_file(tmp.name, bucket, model_key)
-        os.unlink(tmp.name)
+    # Every trade trained on closed by the exit watermark, so none entered after it
+    state.model_version = registry.publish_pipeline(pipeline, {
+        "trainer": "ml_trainer_handler", "mode": mode, "precision": precision, "n_samples": state.n_samples
+    }, train_end=state.exit_watermark)
+    promoted, promotion = False, "AUTO_PROMOTE is off"
+    if auto_promote:
+        promoted, promotion = promotion_check(current_version, current, current_train_end, updated_version,
+                                              eval_df, new_prob, threshold)
+    if promoted:
+        registry.promote(state.model_version)
+    s3_client.put_object(Bucket=bucket, Key=state_key, Body=json.dumps(state.to_dict()).encode())
         
-    logger.info(f"Model uploaded to s3://{bucket}/{model_key}")
+    logger.info(f"Model version {state.model_version} published to {registry.location}; "
+                + ("promoted" if promoted else "not promoted") + f" ({promotion})")
     
     # 5. Notify
+    mode_label = f"{mode} ({reason})" if reason else mode
+    promotion_label = ("promoted: " if promoted else "not promoted: ") + promotion
     html_message = f"""
     <html>
     <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
@@ -103,10 +266,12 @@ def lambda_handler(event, context):
             <h2 style="color: #2c3e50; border-bottom: 2px solid #eee; padding-bottom: 10px;">ML Model Retraining Report</h2>
             <div style="background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin-bottom: 20px;">
                 <ul style="list-style-type: none; padding-left: 0;">
-                    <li style="padding: 5px 0; border-bottom: 1px solid #eee;">Samples: <strong>{len(df)}</strong></li>
+                    <li style="padding: 5px 0; border-bottom: 1px solid #eee;">Mode: <strong>{mode_label}</strong></li>
+                    <li style="padding: 5px 0; border-bottom: 1px solid #eee;">Version: <strong>{state.model_version}</strong> ({promotion_label})</li>
+                    <li style="padding: 5px 0; border-bottom: 1px solid #eee;">Samples: <strong>{n_eval}</strong> evaluated, {state.n_samples} trained</li>
                     <li style="padding: 5px 0; border-bottom: 1px solid #eee;">Accuracy: <strong>{accuracy:.1%}</strong></li>
                     <li style="padding: 5px 0; border-bottom: 1px solid #eee;">Precision (&gt; {threshold}): <strong style="color: #28a745;">{precision:.1%}</strong></li>
-                    <li style="padding: 5px 0; border-bottom: 1px solid #eee;">High Conf Coverage: <strong>{coverage:.1%}</strong> ({len(high_conf_idx)} trades)</li>
+                    <li style="padding: 5px 0; border-bottom: 1px solid #eee;">High Conf Coverage: <strong>{coverage:.1%}</strong> ({n_high} trades)</li>
                 </ul>
             </div>
             <p style="font-size: 0.8em; color: #999; text-align: center; margin-top: 30px;">
@@ -119,10 +284,12 @@ def lambda_handler(event, context):
 
     message = (
         f"ML Model Retrained Successfully.\n\n"
-        f"Samples: {len(df)}\n"
+        f"Mode: {mode_label}\n"
+        f"Version: {state.model_version} ({promotion_label})\n"
+        f"Samples: {n_eval} evaluated, {state.n_samples} trained\n"
         f"Accuracy: {accuracy:.1%}\n"
         f"Precision (> {threshold}): {precision:.1%}\n"
-        f"High Confidence Trades: {len(high_conf_idx)} (Coverage: {coverage:.1%})"
+        f"High Confidence Trades: {n_high} (Coverage: {coverage:.1%})"
     )
     
     try:
@@ -142,5 +309,6 @@ def lambda_handler(event, context):
 
     return {
         "statusCode": 200,
-        "body": json.dumps({"status": "Success", "precision": precision})
+        "body": json.dumps({"status": "Success", "mode": mode, "version": state.model_version,
+                            "promoted": promoted, "promotion": promotion, "precision": precision})
     }
@@ -16,6 +16,7 @@ from dataclasses import asdict
 # Import core module
 sys.path.insert(0, '/opt/python')
 from src.modules.position_sizer import PositionSizer, PositionInput
+from src.modules.ml_scores import ScoreStore
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -90,6 +91,16 @@ def lambda_handler(event, context):
         result['timestamp'] = datetime.utcnow().isoformat() + 'Z'
         result['account_size'] = account_size
 
+        # ML P(Win) from the daily universe score table (written by the screener)
+        ml_score = None
+        try:
+            ml_score = ScoreStore(s3_client, bucket=S3_BUCKET).lookup([symbol]).get(symbol)
+        except Exception as e:
+            logger.warning(f"ML score lookup failed for {symbol}: {e}")
+        result['ml_probability'] = round(ml_score['probability'], 4) if ml_score else None
+        result['ml_model_version'] = ml_score['model_version'] if ml_score else None
+        result['ml_score_date'] = ml_score['date'] if ml_score else None
+
         # Save to S3 for audit trail
         s3_key = f"position_sizing/{datetime.utcnow().strftime('%Y/%m/%d')}/{symbol}_{datetime.utcnow().strftime('%H%M%S')}.json"
 
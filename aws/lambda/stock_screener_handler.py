@@ -10,6 +10,7 @@ from datetime import datetime
 import io
 from io import BytesIO
 import boto3
+import numpy as np
 import pandas as pd
 # Removed yfinance import
 try:
@@ -25,12 +26,18 @@ import sys
 sys.path.insert(0, '/opt/python')
 from src.modules.stock_screener import CANSLIMScreener
 from src.modules.data_fetcher import DataFetcher
+from src.modules import features as feature_lib
+from src.modules.ml_scores import ScoreStore, score_universe
+from src.modules.model_registry import COMPILED_BASE, ModelRegistry
+from src.modules.tree_inference import CompiledEnsemble
+from src.utils.s3_cache import TieredS3Cache
+from src.utils.aws_utils import get_s3_client
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # AWS clients
-s3_client = boto3.client('s3')
+s3_client = get_s3_client()  # Shared with DataFetcher (one connection pool)
 ses_client = boto3.client('ses')
 
 # Environment variables
@@ -61,14 +68,6 @@ def lambda_handler(event, context):
         # Load ML Model
         ml_model, scaler = load_ml_model()
         
-        # Fetch SPY Context for ML
-        spy_df = None
-        try:
-            # Use DataFetcher instead of yfinance
-            spy_df = fetcher.fetch_price_history("SPY", days=400)
-        except Exception as e:
-            logger.warning(f"Could not fetch SPY history for ML: {e}")
-        
         # STAGE 1: Broad Scan (Technical Focus)
         # Batch Fetch Data (Technicals + RS Rating, empty Fundamentals)
         logger.info("Stage 1: Broad Scan (Technical Focus)...")
@@ -77,24 +76,14 @@ def lambda_handler(event, context):
         
         logger.info(f"Successfully fetched partial data for {len(batch_data)} stocks")
 
-        # Preliminary Screen
+        # Preliminary Screen (vectorized; breakdowns are built for the final picks only)
         candidates = []
-        for symbol, (fund_data, tech_data) in batch_data.items():
-            try:
-                if not tech_data:
-                    continue
-                
-                # Screen with partial data
-                score = screener.screen_stock(fund_data, tech_data)
-                
-                if score:
-                    # We value Technical Score + RS Rating for the broad scan
-                    # RS Rating (0-100) normalized to 0-3 approx: rs / 33.3
-                    sort_metric = score.technical_score + (tech_data.rs_rating / 33.3)
-                    candidates.append((symbol, score, fund_data, tech_data, sort_metric))
-                    
-            except Exception as e:
-                logger.warning(f"Failed to pre-screen {symbol}: {str(e)}")
+        stage1 = [(fund_data, tech_data) for fund_data, tech_data in batch_data.values() if fund_data and tech_data]
+        for (fund_data, tech_data), score in zip(stage1, screener.batch_screen(stage1)):
+            # We value Technical Score + RS Rating for the broad scan
+            # RS Rating (0-100) normalized to 0-3 approx: rs / 33.3
+            sort_metric = score.technical_score + (tech_data.rs_rating / 33.3)
+            candidates.append((tech_data.symbol, score, fund_data, tech_data, sort_metric))
 
         # Sort by technical strength and take Top 50
         candidates.sort(key=lambda x: x[4], reverse=True)
@@ -106,6 +95,25 @@ def lambda_handler(event, context):
         final_results = []
         logger.info("Stage 2: Deep Dive (Fetching Fundamentals)...")
         
+        # Candidate and SPY histories come from the bars loaded in Stage 1
+        # (fetcher.bar_cache); only symbols missing there are requested
+        histories = {}
+        try:
+            histories = fetcher.fetch_price_histories([c[0] for c in top_candidates] + ["SPY"], days=400)
+        except Exception as e:
+            logger.warning(f"Candidate history prefetch failed: {e}")
+        spy_df = histories.pop("SPY", None)
+        if spy_df is None:
+            logger.warning("Could not load SPY history for ML")
+        
+        # [ML Integration] P(Win) from today's score table for the whole
+        # universe (scored in one batch on the first run of the day)
+        ml_probs = {}
+        if ml_model:
+            ml_probs = universe_scores(ml_model, scaler, fetcher.bar_cache, spy_df)
+            if not ml_probs:
+                ml_probs = score_ml_candidates(ml_model, scaler, histories, spy_df, universe=fetcher.bar_cache)
+        
         for idx, (symbol, score, fund_partial, tech_full, _) in enumerate(top_candidates):
             try:
                 # Fetch full fundamentals
@@ -116,27 +124,8 @@ def lambda_handler(event, context):
                     final_score = screener.screen_stock(fund_full, tech_full)
                     
                     if final_score:
-                        # [ML Integration]
-                        ml_prob = 0.0
-                        if ml_model:
-                            try:
-                                # Fetch History for ML Features
-                                hist = fetcher.fetch_price_history(symbol, days=400)
-                                if not hist.empty:
-                                    features = calculate_ml_features(hist, spy_df)
-                                    if features:
-                                        # Predict
-                                        X_pred = pd.DataFrame([features])
-                                        cols = ['rsi', 'vol_ratio', 'atr_pct', 'sma50_dist', 'sma200_dist', 'bb_width', 'spy_trend', 'rs_rel']
-                                        X_pred = X_pred[cols]
-                                        
-                                        if scaler:
-                                            try: X_pred = scaler.transform(X_pred)
-                                            except: pass
-                                            
-                                        ml_prob = ml_model.predict_proba(X_pred)[0][1]
-                            except Exception as e:
-                                logger.warning(f"ML Inference failed for {symbol}: {e}")
+                        ml_prob = float(ml_probs.get(symbol, 0.0))
+                        hist = histories.get(symbol, pd.DataFrame())
 
                         score_dict = {
                             'symbol': final_score.symbol,
@@ -153,11 +142,9 @@ def lambda_handler(event, context):
                         
                         # Calculate Trade Parameters
                         try:
-                             # Re-Use history logic or fetch if missing (already fetched above)
-                             if ml_model and 'hist' in locals() and not hist.empty:
+                             # ATR and 20-day high from the in-memory history
+                             if not hist.empty:
                                  # Calculate ATR and Highs (Lowecase keys)
-                                 # hist columns already normalized to lowercase in calculate_ml_features if called, 
-                                 # but let's ensure we are safe if that didn't run or modified inplace
                                  hist.columns = [c.lower() for c in hist.columns]
                                  close = hist['close']
                                  current_price = close.iloc[-1]
@@ -211,7 +198,7 @@ def lambda_handler(event, context):
                         'fundamental_score': score.fundamental_score,
                         'technical_score': score.technical_score,
                         'rs_rating': tech_full.rs_rating,
-                        'breakdown': score.breakdown
+                        'breakdown': screener.explain(fund_partial, tech_full)
                     }
                     final_results.append(score_dict)
 
@@ -281,34 +268,96 @@ def lambda_handler(event, context):
 
 ML_MODEL = None
 SCALER = None
+ML_FEATURES = None  # Model input columns (feature_lib names)
+ML_VERSION = None   # Registry version currently loaded
+MODEL_BUCKET = os.getenv('MODEL_BUCKET', "trading-automation-data-904583676284")  # Confirmed Bucket
+COMPILED_MODEL_KEY = "models/breakout_classifier"  # Legacy, pre-registry
+
+def _use_pipeline(pipeline):
+    """Set the globals from a joblib pipeline (dict) or a bare model"""
+    global ML_MODEL, SCALER, ML_FEATURES
+    # Handle Pipeline vs Dict
+    if isinstance(pipeline, dict):
+        check_feature_schema(pipeline.get('feature_schema'))
+        ML_MODEL = pipeline.get('model')
+        SCALER = pipeline.get('scaler')
+        ML_FEATURES = pipeline.get('features') or feature_lib.BASE_FEATURES
+    else:
+        ML_MODEL = pipeline
+        SCALER = None # Pipeline likely includes scaling
+        ML_FEATURES = feature_lib.BASE_FEATURES
+
+def _use_compiled(nodes, meta):
+    global ML_MODEL, SCALER, ML_FEATURES
+    check_feature_schema(meta.get('feature_schema'))
+    ML_MODEL = CompiledEnsemble(nodes, meta)
+    SCALER = ML_MODEL.scaler
+    ML_FEATURES = meta.get('features') or feature_lib.BASE_FEATURES
+    logger.info(f"Compiled ML model loaded ({meta['model']}, {len(nodes)} nodes)")
 
 def load_ml_model():
-    """Load ML Model from S3 (Cached)"""
-    global ML_MODEL, SCALER
+    """
+    Load the current ML model from the S3 model registry
+
+    The registry pointer (current.json) is read through the tiered S3 cache;
+    artifacts are downloaded to /tmp only when it names a version not cached
+    there, and a warm container keeps the loaded version in memory. Prefers
+    the compiled NumPy export (no sklearn import, memory-mapped), falling back
+    to the joblib pipeline. Buckets without a registry use the legacy
+    models/breakout_classifier.* objects.
+    """
+    global ML_VERSION
+    
+    bucket = MODEL_BUCKET
+    cache = TieredS3Cache(s3_client)
+    registry = ModelRegistry(bucket=bucket, s3_client=s3_client, pointer_cache=cache)
+    
+    try:
+        version = registry.current_version()
+    except Exception as e:
+        logger.warning(f"Model registry unavailable: {e}")
+        version = None
+    
+    if version is not None:
+        if version == ML_VERSION and ML_MODEL is not None:
+            return ML_MODEL, SCALER
+        try:
+            directory, manifest = registry.fetch(version)
+            if COMPILED_BASE + ".json" in manifest['files']:
+                with open(directory / (COMPILED_BASE + ".json")) as f:
+                    meta = json.load(f)
+                _use_compiled(np.load(directory / (COMPILED_BASE + ".npy"), mmap_mode='r'), meta)
+            elif ML_AVAILABLE:
+                pipeline, _ = registry.load_pipeline(version)
+                _use_pipeline(pipeline)
+            else:
+                raise ValueError("version has no compiled export and joblib is not installed")
+            ML_VERSION = version
+            logger.info(f"ML model version {version} loaded")
+            return ML_MODEL, SCALER
+        except Exception as e:
+            logger.warning(f"Could not load ML model version {version}: {e}")
+            return None, None
+    
+    try:
+        meta = cache.get_json(bucket, COMPILED_MODEL_KEY + ".json")
+        nodes = np.load(cache.get_path(bucket, COMPILED_MODEL_KEY + ".npy"), mmap_mode='r')
+        _use_compiled(nodes, meta)
+        return ML_MODEL, SCALER
+    except Exception as e:
+        logger.info(f"Compiled ML model not available, trying joblib: {e}")
     
     if not ML_AVAILABLE:
         return None, None
         
-    if ML_MODEL:
-        return ML_MODEL, SCALER
-        
     try:
-        bucket = "trading-automation-data-904583676284" # Confirmed Bucket
         key = "models/breakout_classifier.joblib"
         
-        logger.info(f"Downloading ML model from s3://{bucket}/{key}")
-        obj = s3_client.get_object(Bucket=bucket, Key=key)
-        
-        with BytesIO(obj['Body'].read()) as f:
-            pipeline = joblib.load(f)
-            
-        # Handle Pipeline vs Dict
-        if isinstance(pipeline, dict):
-            ML_MODEL = pipeline.get('model')
-            SCALER = pipeline.get('scaler')
-        else:
-            ML_MODEL = pipeline
-            SCALER = None # Pipeline likely includes scaling
+        logger.info(f"Loading ML model from s3://{bucket}/{key}")
+        pipeline = cache.get_decoded(
+            bucket, key, 'joblib', lambda body: joblib.load(BytesIO(body))
+        )
+        _use_pipeline(pipeline)
             
         logger.info("ML Model Loaded Successfully")
         return ML_MODEL, SCALER
@@ -316,97 +365,78 @@ def load_ml_model():
         logger.warning(f"Could not load ML Model: {e}")
         return None, None
 
-def calculate_ml_features(df, spy_df):
+def check_feature_schema(version):
+    """Reject models trained on another feature schema (None = legacy, unversioned)"""
+    if version is not None and version != feature_lib.FEATURE_SCHEMA_VERSION:
+        raise ValueError(
+            f"Model feature schema v{version} does not match v{feature_lib.FEATURE_SCHEMA_VERSION}"
+        )
+
+
+def universe_scores(model, scaler, bars, spy_df):
     """
-    Generate Advanced ML Features from Price History.
-    Must match training schema: 
-    ['rsi', 'vol_ratio', 'atr_pct', 'sma50_dist', 'sma200_dist', 'bb_width', 'spy_trend', 'rs_rel']
+    P(Win) for every symbol in the Stage 1 universe, via the daily score table
+
+    Today's table is reused when the loaded model version wrote it;
+    otherwise all of `bars` is scored in one batch and the table rewritten.
+
+    Returns:
+        dict: symbol -> probability (empty on failure, so the caller can
+        fall back to scoring the candidates)
     """
+    version = ML_VERSION or "legacy"
+    store = ScoreStore(s3_client, bucket=S3_BUCKET)
     try:
-        if df.empty: return None
-        
-        # Normalize columns to lowercase
-        df.columns = [c.lower() for c in df.columns]
-        
-        row = df.iloc[-1]
-        
-        # 1. Technical Indicators
-        close = df['close']
-        window = 50
-        sma50 = close.rolling(50).mean()
-        sma200 = close.rolling(200).mean()
-        
-        # RSI
-        delta = close.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        # ATR
-        high_low = df['high'] - df['low']
-        high_close = (df['high'] - df['close'].shift()).abs()
-        low_close = (df['low'] - df['close'].shift()).abs()
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = ranges.max(axis=1)
-        atr = true_range.rolling(14).mean()
-        
-        # BB Width
-        std = close.rolling(20).std()
-        bb_upper = close.rolling(20).mean() + (std * 2)
-        bb_lower = close.rolling(20).mean() - (std * 2)
-        bb_width = (bb_upper - bb_lower) / close.rolling(20).mean()
-        
-        # Volume Ratio
-        avg_vol = df['volume'].rolling(50).mean()
-        
-        # Get Latest Values
-        curr_rsi = rsi.iloc[-1]
-        curr_vol = df['volume'].iloc[-1]
-        curr_avg_vol = avg_vol.iloc[-1]
-        curr_atr = atr.iloc[-1]
-        curr_close = close.iloc[-1]
-        
-        # SPY Trend & RS Rel
-        spy_trend = 1
-        rs_rel = 0
-        if spy_df is not None and not spy_df.empty:
-            # Ensure spy_df is lowercase
-            spy_df.columns = [c.lower() for c in spy_df.columns]
-            spy_close = spy_df['close']
-            spy_sma50 = spy_close.rolling(50).mean()
-            if spy_close.iloc[-1] < spy_sma50.iloc[-1]:
-                spy_trend = 0
-            
-            # RS Rel (3 Month performance vs SPY)
-            # Look back ~63 days
-            start_idx = -63 if len(df) > 63 else 0
-            spy_start_idx = -63 if len(spy_df) > 63 else 0
-            
-            stock_ret = (curr_close / df['close'].iloc[start_idx]) - 1
-            spy_ret = (spy_close.iloc[-1] / spy_close.iloc[spy_start_idx]) - 1
-            rs_rel = stock_ret - spy_ret
-            
-        features = {
-            "rsi": curr_rsi,
-            "vol_ratio": curr_vol / curr_avg_vol if curr_avg_vol > 0 else 1.0,
-            "atr_pct": (curr_atr / curr_close) * 100 if curr_close > 0 else 0,
-            "sma50_dist": (curr_close - sma50.iloc[-1]) / sma50.iloc[-1] * 100 if sma50.iloc[-1] > 0 else 0,
-            "sma200_dist": (curr_close - sma200.iloc[-1]) / sma200.iloc[-1] * 100 if sma200.iloc[-1] > 0 else 0,
-            "bb_width": bb_width.iloc[-1],
-            "spy_trend": spy_trend,
-            "rs_rel": rs_rel
-        }
-        
-        # NaN safe
-        for k, v in features.items():
-            if pd.isna(v): features[k] = 0.0
-            
-        return features
-        
+        table = store.read()
+        if table is not None and (table['model_version'] == version).all():
+            logger.info(f"Using today's ML scores for {len(table)} symbols (model {version})")
+            return table['probability'].astype(float).to_dict()
+    except Exception as e:
+        logger.warning(f"Could not read ML score table: {e}")
+
+    if bars is None:
+        return {}
+    try:
+        scores = score_universe(model, bars, spy_df, features=ML_FEATURES, scaler=scaler)
+    except Exception as e:
+        logger.warning(f"Universe ML inference failed: {e}")
+        return {}
+    try:
+        store.write(scores, version)
+    except Exception as e:
+        logger.warning(f"Could not write ML score table: {e}")
+    return scores.astype(float).to_dict()
+
+def score_ml_candidates(model, scaler, histories, spy_df, universe=None):
+    """
+    P(Win) for each candidate from its latest bar (fallback when the
+    universe score table is unavailable).
+
+    Features come from the shared feature library (the definitions the
+    model was trained on in the Backtester). Breadth features, if the model
+    uses them, are computed over `universe` (the Stage 1 bars); VIX is not
+    loaded here and takes the library default.
+
+    Returns:
+        dict: symbol -> probability (candidates without history are omitted)
+    """
+    try:
+        if not histories:
+            return {}
+        features = ML_FEATURES or feature_lib.BASE_FEATURES
+        X = feature_lib.latest_features(histories, spy_df, features=features, universe=universe)
+        if X.empty:
+            return {}
+        X = X.fillna(0.0)  # NaN safe (short histories)
+        X_pred = X
+        if scaler:
+            try: X_pred = scaler.transform(X)
+            except: pass
+        probs = model.predict_proba(X_pred)[:, 1]
+        return dict(zip(X.index, probs))
     except Exception as e:
-        logger.warning(f"Error calculating ML features: {e}")
-        return None
+        logger.warning(f"ML Inference failed: {e}")
+        return {}
 
 def load_stock_universe():
     """Legacy: Load stock universe (Now handled by fetcher.fetch_sp500_tickers)"""
@@ -1,64 +1,41 @@
 
 import sys
 import os
-import boto3
-import pandas as pd
 import logging
 from pathlib import Path
-import concurrent.futures
 
 # Add project root
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.modules.backtester import Backtester
+from src.modules.data_lake import DataLake, OHLCV_COLUMNS
+from src.modules.lake_stream import LakeStreamLoader
 
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger("backtest_runner")
 
 S3_BUCKET = os.environ.get("S3_BUCKET", "trading-automation-data-904583676284")
+BACKTEST_START = "2016-01-01"
+MIN_HISTORY_ROWS = 250
 
-import threading
-
-thread_local = threading.local()
-
-def get_s3_client():
-    if not hasattr(thread_local, "s3_client"):
-        thread_local.s3_client = boto3.client('s3')
-    return thread_local.s3_client
-
-def load_data(symbol: str) -> tuple:
-    """Load data from S3 Data Lake"""
+def get_all_symbols_from_s3(lake: DataLake) -> list:
+    """List all symbols in the S3 data lake"""
     try:
-        s3 = get_s3_client()
-        key = f"historical_data/{symbol}.csv"
-        obj = s3.get_object(Bucket=S3_BUCKET, Key=key)
-        df = pd.read_csv(obj['Body'], index_col=0, parse_dates=True)
-        return symbol, df
-    except Exception as e:
-        # logger.error(f"Failed to load {symbol}: {e}")
-        return symbol, pd.DataFrame()
-
-def get_all_symbols_from_s3() -> list:
-    """List all stock CSVs in the S3 bucket"""
-    s3 = boto3.client('s3')
-    symbols = []
-    try:
-        paginator = s3.get_paginator('list_objects_v2')
-        pages = paginator.paginate(Bucket=S3_BUCKET, Prefix='historical_data/')
-        for page in pages:
-            if 'Contents' not in page: continue
-            for obj in page['Contents']:
-                if obj['Key'].endswith('.csv'):
-                    symbol = obj['Key'].split('/')[-1].replace('.csv', '')
-                    symbols.append(symbol)
-        return symbols
+        return lake.list_symbols()
     except Exception as e:
         logger.error(f"Failed to list S3 objects: {e}")
         return []
 
 import json
 
-def get_tickers_from_manifest():
+def get_tickers_from_manifest(lake: DataLake) -> list:
+    """Symbols with enough history that is still current at the backtest start"""
+    try:
+        manifest = lake.open_manifest()
+        if len(manifest):
+            return manifest.select(min_rows=MIN_HISTORY_ROWS, end=BACKTEST_START)
+    except Exception as e:
+        logger.warning(f"Lake manifest unavailable: {e}")
     try:
         with open("data/tickers.json", "r") as f:
             return json.load(f)
@@ -68,11 +45,12 @@ def get_tickers_from_manifest():
 def run_portfolio_backtest():
     """Evaluate Strategy on Full Universe with Portfolio Constraints"""
     logger.info("1. Discovery: Loading Ticker Manifest...")
-    tickers = get_tickers_from_manifest()
+    lake = DataLake(bucket=S3_BUCKET, max_workers=20)
+    tickers = get_tickers_from_manifest(lake)
     
     if not tickers:
         logger.info("Manifest not found. Fallback to S3 Listing...")
-        tickers = get_all_symbols_from_s3()
+        tickers = get_all_symbols_from_s3(lake)
 
     if not tickers:
         logger.warning("No data found. Exiting.")
@@ -81,27 +59,26 @@ def run_portfolio_backtest():
     # Ensure SPY is present
     if 'SPY' not in tickers: tickers.append('SPY')
 
-    logger.info(f"2. Loading Data for {len(tickers)} symbols (Parallel)...")
-    data_dict = {}
+    logger.info(f"2. Loading Data for {len(tickers)} symbols (Streaming)...")
     
     # Pre-fetch 'SPY' specifically to ensure we have market data
     spy_symbol = 'SPY'
     if spy_symbol not in tickers: tickers.append(spy_symbol)
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-        results = executor.map(load_data, tickers)
-        for symbol, df in results:
-            if not df.empty:
-                data_dict[symbol] = df
+    engine = Backtester(initial_capital=100000.0)
+
+    # Indicators are computed as each frame arrives, overlapping the downloads
+    data_dict = {}
+    for symbol, df in LakeStreamLoader(lake, fetch_concurrency=20).iter_frames(tickers, columns=OHLCV_COLUMNS):
+        data_dict[symbol] = engine.calculate_indicators(df) if len(df) > 50 else df
     
     logger.info(f"Loaded {len(data_dict)} DataFrames.")
     
     # 3. Execution
     logger.info("3. Running Portfolio Backtest (2016-2025 Out-of-Sample)...")
-    engine = Backtester(initial_capital=100000.0)
     
     # Run from 2016-01-01 to test the model trained on < 2016
-    engine.run_backtest(data_dict, start_date="2016-01-01")
+    engine.run_backtest(data_dict, start_date=BACKTEST_START)
     
     # Results are printed by analyze_results_simple inside run_backtest
 
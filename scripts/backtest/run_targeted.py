@@ -1,7 +1,6 @@
 
 import sys
 import os
-import boto3
 import pandas as pd
 import logging
 from pathlib import Path
@@ -10,22 +9,20 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.modules.backtester import Backtester
+from src.modules.data_lake import DataLake, OHLCV_COLUMNS
 
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger("backtest_sample")
 
 S3_BUCKET = os.environ.get("S3_BUCKET", "trading-automation-data-904583676284")
 
+LAKE = DataLake(bucket=S3_BUCKET)  # Shared pooled client for every load
+
 def load_data(symbol: str) -> pd.DataFrame:
-    try:
-        s3 = boto3.client('s3')
-        key = f"historical_data/{symbol}.csv"
-        obj = s3.get_object(Bucket=S3_BUCKET, Key=key)
-        df = pd.read_csv(obj['Body'], index_col=0, parse_dates=True)
-        return df
-    except Exception as e:
-        logger.warning(f"Could not load {symbol}: {e}")
-        return pd.DataFrame()
+    df = LAKE.read(symbol, columns=OHLCV_COLUMNS)
+    if df.empty:
+        logger.warning(f"Could not load {symbol}")
+    return df
 
 def run_comparison():
     tickers = ['AAPL', 'MSFT', 'AMZN', 'GOOGL', 'NVDA', 'TSLA', 'NFLX', 'AMD', 'META', 'CRM']
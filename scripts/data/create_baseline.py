@@ -40,58 +40,22 @@ def create_baseline():
     
     # 2. Fetch History (Bulk)
     logger.info("Fetching 2 years of historical data (this may take a while)...")
-    # Using fetch_bulk_history which we assume handles chunking and multi-threading
-    # We might need to ensure DataFetcher has a robust bulk method.
-    # checking src/modules/data_fetcher.py... it does have fetch_bulk_history.
+    # fetch_bulk_history chunks the request and runs chunks concurrently under the Alpaca quota
     
     try:
-        df = fetcher.fetch_bulk_history(tickers, period="2y")
+        panel = fetcher.fetch_bulk_history(tickers, period="2y")
     except Exception as e:
         logger.error(f"Failed to fetch bulk history: {e}")
         return
 
-    if df.empty:
+    if panel.empty:
         logger.error("No data fetched. Exiting.")
         return
 
-    logger.info(f"Fetched DataFrame Shape: {df.shape}")
-    
     # 3. Format for Parquet
-    # DataFetcher.fetch_bulk_history returns a MultiIndex (Ticker, Date) or (PriceType, Ticker)?
-    # Let's verify standard yfinance/alpaca structure.
-    # In data_fetcher.py: fetch_bulk_history returns pd.concat(all_dfs, keys=tickers)
-    # The index will be MultiIndex: (Ticker, Timestamp)
-    # Columns: Open, High, Low, Close, Volume...
-    
-    # Flatten for easier storage if needed, or keep MultiIndex. 
-    # Parquet handles MultiIndex reasonably well, but resetting index is safer for broad compatibility.
-    
-    # Flatten to Long Format (Date, Symbol, Open, High, Low, Close, Volume)
-    # df columns are MultiIndex: (Symbol, Field)
-    # df index is Date
-    logger.info("Flattening to Long Format...")
-    
-    # Ensure column levels are named
-    df.columns.names = ['Symbol', 'Field']
-    
-    # Stack 'Symbol' level from columns to index -> (Date, Symbol) index
-    df_stacked = df.stack(level='Symbol', future_stack=True)
-    
-    # Reset index to make Date and Symbol columns
-    df_reset = df_stacked.reset_index()
-    
-    # Ensure Date is renamed if needed (it might be 'timestamp' or 'Date')
-    # If index didn't have a name, reset_index names it 'level_0'
-    if 'level_0' in df_reset.columns:
-        df_reset.rename(columns={'level_0': 'Date'}, inplace=True)
-    elif 'index' in df_reset.columns:
-        df_reset.rename(columns={'index': 'Date'}, inplace=True)
-
-    # Reorder columns for clarity
-    cols = ['Date', 'Symbol', 'Open', 'High', 'Low', 'Close', 'Volume']
-    # Filter only existing columns
-    cols = [c for c in cols if c in df_reset.columns]
-    df_reset = df_reset[cols]
+    # The panel is already long (Date, Symbol, Open, High, Low, Close, Volume): no stack needed
+    df_reset = panel.to_long()
+    logger.info(f"Fetched {len(panel)} symbols, {len(df_reset)} rows")
 
     logger.info("Sample Data:")
     logger.info(df_reset.head())
@@ -101,11 +65,7 @@ def create_baseline():
     
     logger.info(f"Uploading to s3://{S3_BUCKET}/{CACHE_KEY}...")
     
-    # Use partial file to avoid large memory buffer if possible, or just to_parquet(buffer)
     try:
-        out_buffer = pd.DataFrame.to_parquet(df_reset, engine='pyarrow', index=False)
-        # to_parquet returns bytes if path is None? No, it takes a path or file-like object.
-        # Use io.BytesIO
         from io import BytesIO
         buffer = BytesIO()
         df_reset.to_parquet(buffer, engine='pyarrow', index=False)
@@ -7,13 +7,13 @@ import pandas as pd
 import yfinance as yf
 import boto3
 from pathlib import Path
-from io import StringIO
 from botocore.exceptions import ClientError
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.modules.data_fetcher import DataFetcher
+from src.modules.data_lake import DataLake
 
 # Setup logging
 logging.basicConfig(
@@ -28,19 +28,10 @@ HISTORY_PERIOD = "20y"
 BATCH_SIZE = 50
 SLEEP_BETWEEN_BATCHES = 5  # Seconds
 
-def upload_to_s3(df: pd.DataFrame, symbol: str, s3_client):
-    """Upload DataFrame to S3 as CSV"""
+def upload_to_s3(df: pd.DataFrame, symbol: str, lake: DataLake):
+    """Upload DataFrame to the S3 lake as typed Parquet"""
     try:
-        csv_buffer = StringIO()
-        df.to_csv(csv_buffer)
-        
-        key = f"historical_data/{symbol}.csv"
-        
-        s3_client.put_object(
-            Bucket=S3_BUCKET,
-            Key=key,
-            Body=csv_buffer.getvalue()
-        )
+        lake.write(symbol, df)
         return True
     except Exception as e:
         logger.error(f"Failed to upload {symbol} to S3: {e}")
@@ -58,6 +49,9 @@ def initialize_data_lake():
         logger.error(f"Could not connect to S3 Bucket {S3_BUCKET}: {e}")
         return
 
+    lake = DataLake(s3_client=s3_client, bucket=S3_BUCKET)
+    manifest = lake.open_manifest()
+
     # 2. Fetch Universe
     fetcher = DataFetcher()
     universe = fetcher.fetch_full_universe()
@@ -90,7 +84,7 @@ def initialize_data_lake():
                     hist.columns = hist.columns.get_level_values(0)
 
                 # Upload
-                if upload_to_s3(hist, symbol, s3_client):
+                if upload_to_s3(hist, symbol, lake):
                     total_processed += 1
                 else:
                     total_failed += 1
@@ -99,6 +93,8 @@ def initialize_data_lake():
                 logger.error(f"Error processing {symbol}: {e}")
                 total_failed += 1
                 
+        manifest.save()
+
         # Rate limit protection
         logger.info(f"Batch complete. Sleeping {SLEEP_BETWEEN_BATCHES}s...")
         time.sleep(SLEEP_BETWEEN_BATCHES)
@@ -0,0 +1,94 @@
+"""
+Convert the CSV data lake (historical_data/*.csv) to typed Parquet (lake/daily/*.parquet).
+
+Usage:
+    python scripts/data/migrate_lake_to_parquet.py            # all symbols
+    python scripts/data/migrate_lake_to_parquet.py AAPL MSFT  # subset
+
+Set DRY_RUN=true to convert and verify without uploading.
+"""
+import os
+import sys
+import logging
+import concurrent.futures
+import pandas as pd
+from io import BytesIO
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.modules.data_lake import DataLake, CSV_PREFIX, normalize_history, frame_to_parquet_bytes
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("lake_migration")
+
+S3_BUCKET = os.environ.get("S3_BUCKET", "trading-automation-data-904583676284")
+NUM_WORKERS = int(os.environ.get("MIGRATE_WORKERS", "16"))
+DRY_RUN = os.environ.get("DRY_RUN", "false").lower() == "true"
+
+
+def list_csv_symbols(lake: DataLake) -> list:
+    symbols = []
+    paginator = lake.s3_client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=lake.bucket, Prefix=CSV_PREFIX):
+        for obj in page.get('Contents', []):
+            if obj['Key'].endswith('.csv'):
+                symbols.append(obj['Key'][len(CSV_PREFIX):-len('.csv')])
+    return symbols
+
+
+def migrate_symbol(lake: DataLake, symbol: str) -> tuple:
+    """Convert one CSV; returns (symbol, csv_bytes, parquet_bytes) or raises"""
+    obj = lake.s3_client.get_object(Bucket=lake.bucket, Key=f"{CSV_PREFIX}{symbol}.csv")
+    raw = obj['Body'].read()
+    df = normalize_history(pd.read_csv(BytesIO(raw), index_col=0, parse_dates=True))
+    if df.empty:
+        raise ValueError("empty CSV")
+
+    body = frame_to_parquet_bytes(df)
+    if not DRY_RUN:
+        lake.s3_client.put_object(Bucket=lake.bucket, Key=lake.key(symbol), Body=body)
+        lake.manifest.record(symbol, df, nbytes=len(body))
+    return symbol, len(raw), len(body)
+
+
+def migrate(symbols: list = None):
+    lake = DataLake(bucket=S3_BUCKET, max_workers=NUM_WORKERS)
+    lake.open_manifest()
+    symbols = symbols or list_csv_symbols(lake)
+    logger.info(f"🚀 Migrating {len(symbols)} symbols to s3://{S3_BUCKET}/{lake.prefix} "
+                f"({NUM_WORKERS} workers{', dry run' if DRY_RUN else ''})")
+
+    csv_total = parquet_total = done = 0
+    failed = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=NUM_WORKERS) as executor:
+        futures = {executor.submit(migrate_symbol, lake, s): s for s in symbols}
+        for future in concurrent.futures.as_completed(futures):
+            symbol = futures[future]
+            try:
+                _, csv_bytes, parquet_bytes = future.result()
+                csv_total += csv_bytes
+                parquet_total += parquet_bytes
+                done += 1
+                if done % 100 == 0:
+                    logger.info(f"Migrated {done}/{len(symbols)}...")
+            except Exception as e:
+                logger.error(f"Failed {symbol}: {e}")
+                failed.append(symbol)
+
+    if not DRY_RUN:
+        lake.manifest.save()
+
+    logger.info("=" * 50)
+    logger.info(f"✅ Migrated {done} symbols, {len(failed)} failed")
+    if csv_total:
+        logger.info(f"Size: {csv_total / 1e6:.1f} MB CSV -> {parquet_total / 1e6:.1f} MB Parquet "
+                    f"({parquet_total / csv_total:.0%})")
+    if failed:
+        logger.info(f"Failed: {', '.join(sorted(failed))}")
+    logger.info("=" * 50)
+
+
+if __name__ == "__main__":
+    migrate(sys.argv[1:] or None)
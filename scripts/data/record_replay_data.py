@@ -0,0 +1,74 @@
+"""
+Record live market data into a replay directory for offline runs.
+
+Captures the full universe (index lists), daily bars, the static sector map
+and the latest VIX reading through the live DataFetcher. Point
+DATA_PROVIDER=replay and REPLAY_DATA_DIR at the output to run handlers and
+benchmarks without network access.
+
+Env:
+    REPLAY_DATA_DIR   Output directory (default: data/replay)
+    RECORD_PERIOD     History to record (default: 2y)
+    RECORD_LIMIT      Record only the first N universe symbols (default: all)
+"""
+import os
+import sys
+import logging
+from pathlib import Path
+
+# Add project root
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.config import settings
+from src.modules.data_fetcher import DataFetcher
+from src.modules.data_providers import record_replay
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("record_replay")
+
+OUTPUT_DIR = Path(os.environ.get("REPLAY_DATA_DIR", str(settings.REPLAY_DATA_DIR)))
+PERIOD = os.environ.get("RECORD_PERIOD", "2y")
+LIMIT = int(os.environ.get("RECORD_LIMIT", "0"))
+
+
+def record():
+    fetcher = DataFetcher()
+    if fetcher.provider is not None:
+        logger.error("DATA_PROVIDER must be 'live' when recording")
+        return False
+
+    universe = {
+        'sp500': fetcher.fetch_sp500_tickers(),
+        'nasdaq100': fetcher.fetch_nasdaq100_tickers(),
+    }
+    symbols = fetcher.fetch_full_universe()
+    if LIMIT:
+        keep = set(symbols[:LIMIT])
+        symbols = symbols[:LIMIT]
+        universe = {name: [s for s in tickers if s in keep] for name, tickers in universe.items()}
+    for extra in (fetcher.market_index, 'SPY'):
+        if extra not in symbols:
+            symbols.append(extra)
+
+    logger.info(f"Recording {PERIOD} of bars for {len(symbols)} symbols...")
+    panel = fetcher.fetch_bulk_history(symbols, period=PERIOD)
+
+    try:
+        vix = fetcher.s3_cache.get_json(settings.S3_BUCKET, "min_data/vix_latest.json")
+    except Exception as e:
+        logger.warning(f"VIX not recorded: {e}")
+        vix = None
+
+    record_replay(
+        OUTPUT_DIR,
+        dict(panel.items()),
+        universe=universe,
+        sectors={s: fetcher.sector_cache[s] for s in symbols if s in fetcher.sector_cache},
+        vix=vix
+    )
+    logger.info(f"Replay data written to {OUTPUT_DIR} ({len(panel.symbols)} symbols with bars)")
+    return True
+
+
+if __name__ == "__main__":
+    record()
@@ -0,0 +1,70 @@
+"""
+Incrementally refresh the Parquet data lake.
+
+Only symbols whose last stored bar is behind are fetched, and only from a
+short overlap window onward. History is rewritten only when the overlap shows
+that the provider re-adjusted prices. Watermarks live in lake/manifest.json.
+
+Symbols that joined an index since the last run are queued first (they need a
+full-history download). Symbols that left stay in the manifest and keep being
+updated, so backtests over past memberships still have their bars.
+
+Usage:
+    python scripts/data/update_data_lake.py            # universe + manifest symbols
+    python scripts/data/update_data_lake.py AAPL MSFT  # subset
+"""
+import os
+import sys
+import logging
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.modules.data_fetcher import DataFetcher
+from src.modules.data_lake import DataLake
+from src.modules.lake_updater import LakeUpdater
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("lake_update")
+
+S3_BUCKET = os.environ.get("S3_BUCKET", "trading-automation-data-904583676284")
+NUM_WORKERS = int(os.environ.get("UPDATE_WORKERS", "8"))
+OVERLAP_BARS = int(os.environ.get("OVERLAP_BARS", "5"))
+
+
+def last_checked(manifest):
+    """Most recent date the updater checked any symbol (None for a new lake)"""
+    dates = [entry['checked_at'] for entry in manifest.entries.values() if entry.get('checked_at')]
+    return max(dates) if dates else None
+
+
+def update(symbols: list = None):
+    lake = DataLake(bucket=S3_BUCKET, max_workers=NUM_WORKERS)
+    manifest = lake.open_manifest()
+
+    if not symbols:
+        universe = DataFetcher().universe
+        added = []
+        since = last_checked(manifest)
+        if since:
+            changes = universe.changes_since(since)
+            added = changes['added']
+            logger.info(f"Universe since {since}: +{len(added)} / -{len(changes['removed'])}")
+            if changes['removed']:
+                logger.info(f"Left the universe (still updated): {', '.join(changes['removed'])}")
+        symbols = list(dict.fromkeys(added + universe.symbols() + manifest.symbols))
+    logger.info(f"🚀 Updating {len(symbols)} symbols in s3://{S3_BUCKET}/{lake.prefix} ({NUM_WORKERS} workers)")
+
+    report = LakeUpdater(lake, max_workers=NUM_WORKERS, overlap=OVERLAP_BARS).run(symbols)
+
+    logger.info("=" * 50)
+    for outcome, count in report.summary().items():
+        logger.info(f"{outcome:>10}: {count}")
+    if report.failed:
+        logger.info(f"Failed: {', '.join(sorted(report.failed))}")
+    logger.info("=" * 50)
+
+
+if __name__ == "__main__":
+    update(sys.argv[1:] or None)
@@ -6,12 +6,13 @@ import pandas as pd
 import yfinance as yf
 import boto3
 from pathlib import Path
-from io import StringIO
 from botocore.exceptions import ClientError
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from src.modules.data_lake import DataLake
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("verify_data_lake")
@@ -24,6 +25,7 @@ def verify_data_lake_subset():
     
     # 1. Initialize AWS S3 Client
     s3_client = boto3.client('s3')
+    lake = DataLake(s3_client=s3_client, bucket=S3_BUCKET)
     
     # 2. Test Subset
     test_tickers = ['AAPL', 'MSFT', 'GOOGL']
@@ -54,17 +56,12 @@ def verify_data_lake_subset():
                 hist.columns = hist.columns.get_level_values(0)
 
             # Upload to S3
-            csv_buffer = StringIO()
-            hist.to_csv(csv_buffer)
-            key = f"historical_data/{symbol}.csv"  
-            
-            s3_client.put_object(Bucket=S3_BUCKET, Key=key, Body=csv_buffer.getvalue())
-            logger.info(f"✅ Uploaded to s3://{S3_BUCKET}/{key}")
+            lake.write(symbol, hist)
+            logger.info(f"✅ Uploaded to s3://{S3_BUCKET}/{lake.key(symbol)}")
             
             # Verify Read Back
-            obj = s3_client.get_object(Bucket=S3_BUCKET, Key=key)
-            df_read = pd.read_csv(obj['Body'], index_col=0)
-            logger.info(f"Verified Read: {len(df_read)} rows recovered.")
+            df_read = lake.read(symbol)
+            logger.info(f"Verified Read: {len(df_read)} rows recovered. Dtypes: {dict(df_read.dtypes)}")
             
         except Exception as e:
             logger.error(f"Failed {symbol}: {e}")
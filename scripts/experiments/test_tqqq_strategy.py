@@ -1,7 +1,6 @@
 
 import sys
 import os
-import boto3
 import pandas as pd
 import yfinance as yf
 import logging
@@ -11,6 +10,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.modules.backtester import Backtester
+from src.modules.data_lake import DataLake, OHLCV_COLUMNS
 
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger("tqqq_test")
@@ -20,15 +20,11 @@ S3_BUCKET = os.environ.get("S3_BUCKET", "trading-automation-data-904583676284")
 def get_data(symbol: str) -> pd.DataFrame:
     """Try S3, then fallback to YFinance"""
     # 1. Try S3
-    try:
-        s3 = boto3.client('s3')
-        key = f"historical_data/{symbol}.csv"
-        obj = s3.get_object(Bucket=S3_BUCKET, Key=key)
-        df = pd.read_csv(obj['Body'], index_col=0, parse_dates=True)
+    df = DataLake(bucket=S3_BUCKET, max_workers=1).read(symbol, columns=OHLCV_COLUMNS)
+    if not df.empty:
         logger.info(f"Loaded {symbol} from S3.")
         return df
-    except:
-        logger.info(f"{symbol} not in S3, downloading from YFinance...")
+    logger.info(f"{symbol} not in S3, downloading from YFinance...")
         
     # 2. Fallback YFinance
     try:
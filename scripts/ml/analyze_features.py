@@ -1,127 +1,69 @@
 """
 Feature Analysis Script
-Analyzes the 22 Phase 2A features to identify top performers for model optimization.
+Ranks the shared library features by permutation and drop-column importance
+over purged walk-forward folds, and writes the top ones as a versioned
+feature set (scripts/ml/feature_sets/current.json) for train_ensemble.py.
 """
+import os
 import sys
 import pandas as pd
-import numpy as np
 from pathlib import Path
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.feature_selection import mutual_info_classif
-from sklearn.preprocessing import StandardScaler
 
 # Add project root
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-def analyze_features():
+from src.config import settings
+from src.modules import features as feature_lib
+from src.modules.feature_selection import DEFAULT_TOP_K, importance_table, select_features, write_feature_set
+from src.modules.training_data import read_training_data
+
+N_JOBS = int(os.environ.get("IMPORTANCE_JOBS", "-1"))  # joblib workers (-1 = all cores)
+MIN_FEATURES = int(os.environ.get("MIN_FEATURES", "5"))  # Fewer selected keeps the current set
+
+def analyze_features(top_k: int = DEFAULT_TOP_K):
     print("="*60)
     print("FEATURE IMPORTANCE ANALYSIS")
     print("="*60)
     
-    # Load data
-    df = pd.read_csv("scripts/ml/training_data.csv")
+    # Load data (feature columns + outcome and trade dates only)
+    features = feature_lib.FEATURE_NAMES
+    df = read_training_data(settings.TRAINING_DATA_DIR, features=features,
+                            columns=['outcome', 'entry_date', 'exit_date'])
     print(f"\nLoaded {len(df)} samples")
-    
-    # Separate features and target
-    features = [col for col in df.columns if col not in ['outcome', 'entry_date']]
     print(f"Total features: {len(features)}")
-    print(f"\nFeatures: {features}")
+    print(f"Win rate: {df['outcome'].mean()*100:.1f}%")
     
     X = df[features].fillna(0)
-    y = df['outcome']
-    
-    # Split train/test
-    split_idx = int(len(df) * 0.6)
-    X_train, X_test = X[:split_idx], X[split_idx:]
-    y_train, y_test = y[:split_idx], y[split_idx:]
-    
-    print(f"\nTrain samples: {len(X_train)}, Test samples: {len(X_test)}")
-    print(f"Win rate: {y.mean()*100:.1f}%")
-    
-    # 1. Random Forest Feature Importance
-    print("\n" + "="*60)
-    print("1. RANDOM FOREST FEATURE IMPORTANCE")
-    print("="*60)
-    
-    rf = RandomForestClassifier(n_estimators=200, max_depth=8, random_state=42, n_jobs=-1)
-    rf.fit(X_train, y_train)
-    
-    rf_importance = pd.DataFrame({
-        'feature': features,
-        'importance': rf.feature_importances_
-    }).sort_values('importance', ascending=False)
-    
-    print(rf_importance.to_string(index=False))
-    print(f"\nTop 15 features account for: {rf_importance.head(15)['importance'].sum()*100:.1f}% of total importance")
-    
-    # 2. Mutual Information
-    print("\n" + "="*60)
-    print("2. MUTUAL INFORMATION SCORES")
-    print("="*60)
     
-    mi_scores = mutual_info_classif(X_train, y_train, random_state=42)
-    mi_df = pd.DataFrame({
-        'feature': features,
-        'mutual_info': mi_scores
-    }).sort_values('mutual_info', ascending=False)
-    
-    print(mi_df.to_string(index=False))
-    
-    # 3. Gradient Boosting Feature Importance
-    print("\n" + "="*60)
-    print("3. GRADIENT BOOSTING FEATURE IMPORTANCE")
-    print("="*60)
-    
-    gbm = GradientBoostingClassifier(n_estimators=150, max_depth=4, learning_rate=0.05, random_state=42)
-    gbm.fit(X_train, y_train)
-    
-    gbm_importance = pd.DataFrame({
-        'feature': features,
-        'importance': gbm.feature_importances_
-    }).sort_values('importance', ascending=False)
-    
-    print(gbm_importance.to_string(index=False))
-    
-    # 4. Combined Ranking
+    # 1. Permutation + drop-column importance (parallel over folds x features, cached)
     print("\n" + "="*60)
-    print("4. COMBINED FEATURE RANKING")
+    print("1. PERMUTATION / DROP-COLUMN IMPORTANCE (ROC AUC drop)")
     print("="*60)
     
-    combined = rf_importance.merge(mi_df, on='feature').merge(gbm_importance, on='feature', suffixes=('_rf', '_gbm'))
-    
-    # Normalize scores to 0-1 range
-    combined['rf_norm'] = combined['importance_rf'] / combined['importance_rf'].max()
-    combined['mi_norm'] = combined['mutual_info'] / combined['mutual_info'].max()
-    combined['gbm_norm'] = combined['importance_gbm'] / combined['importance_gbm'].max()
-    
-    # Combined score (average of normalized scores)
-    combined['combined_score'] = (combined['rf_norm'] + combined['mi_norm'] + combined['gbm_norm']) / 3
-    combined = combined.sort_values('combined_score', ascending=False)
-    
-    print(combined[['feature', 'combined_score', 'rf_norm', 'mi_norm', 'gbm_norm']].to_string(index=False))
+    table = importance_table(X.to_numpy(), df['outcome'].to_numpy(), df['entry_date'], features,
+                             exit_dates=df['exit_date'], n_jobs=N_JOBS)
+    with pd.option_context('display.float_format', '{:.4f}'.format):
+        print(table.to_string())
     
-    # 5. Recommendations
+    # 2. Recommendations
     print("\n" + "="*60)
-    print("5. RECOMMENDATIONS")
+    print("2. RECOMMENDATIONS")
     print("="*60)
     
-    top_15 = combined.head(15)['feature'].tolist()
-    print(f"\n✅ TOP 15 FEATURES (Recommended for ensemble model):")
-    for i, feat in enumerate(top_15, 1):
+    selected = select_features(table, top_k=top_k)
+    print(f"\n✅ TOP {len(selected)} FEATURES (Recommended for ensemble model):")
+    for i, feat in enumerate(selected, 1):
         print(f"  {i:2d}. {feat}")
     
-    print(f"\n📊 PERFORMANCE ESTIMATE:")
-    print(f"  - Current (22 features):  ~24% precision")
-    print(f"  - With top 15 features:   ~28-32% precision (estimated)")
-    print(f"  - Expected win rate improvement: +5-8%")
-    
     # Save recommendations
-    with open("scripts/ml/selected_features.txt", "w") as f:
-        f.write("\n".join(top_15))
-    
-    print(f"\n✅ Saved top 15 features to: scripts/ml/selected_features.txt")
-    
-    return top_15
+    try:
+        feature_set = write_feature_set(selected, table, metadata={'samples': len(df), 'top_k': top_k},
+                                        min_features=MIN_FEATURES)
+        print(f"\n✅ Saved feature set {feature_set['version']} to: {settings.FEATURE_SETS_DIR}")
+    except ValueError as e:
+        print(f"\n⚠️  {e}; keeping the current feature set")
+    
+    return selected
 
 if __name__ == "__main__":
     analyze_features()
@@ -0,0 +1,68 @@
+import sys
+import os
+import logging
+import pandas as pd
+from pathlib import Path
+
+# Add project root
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.config import settings
+from src.modules.data_lake import DataLake, OHLCV_COLUMNS
+from src.modules.lake_stream import LakeStreamLoader
+from src.modules.ml_scores import ScoreStore, score_universe
+from src.modules.model_registry import ModelRegistry
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger("ml_batch_scoring")
+
+# Configuration
+S3_BUCKET = os.environ.get("S3_BUCKET", settings.S3_BUCKET)
+MODEL_SOURCE = os.environ.get("MODEL_SOURCE", "local")  # "local" or "s3" registry
+SCORE_DATE = os.environ.get("SCORE_DATE")               # Default: today (UTC)
+HISTORY_DAYS = 400      # Same window the screener scores on
+MIN_HISTORY_ROWS = 200  # Symbols need the 200-day indicators
+
+
+def score_lake_universe():
+    """Score every lake symbol with the current model and write the day's table"""
+    registry = ModelRegistry(bucket=S3_BUCKET) if MODEL_SOURCE == "s3" else ModelRegistry()
+    pipeline, version = registry.load_pipeline()
+    logger.info(f"Model version {version} from {registry.location}")
+
+    lake = DataLake(bucket=S3_BUCKET)
+    day = pd.Timestamp(SCORE_DATE) if SCORE_DATE else pd.Timestamp.utcnow().tz_localize(None).normalize()
+    start = day - pd.Timedelta(days=HISTORY_DAYS)
+
+    try:
+        symbols = lake.open_manifest().select(min_rows=MIN_HISTORY_ROWS)
+    except Exception as e:
+        logger.warning(f"Lake manifest unavailable: {e}")
+        symbols = []
+    if not symbols:
+        symbols = lake.list_symbols()
+
+    bars = LakeStreamLoader(lake).load(symbols, columns=OHLCV_COLUMNS, start=start, end=day)
+    market_df = bars.get("SPY")
+    if market_df is None:
+        market_df = lake.read("SPY", columns=OHLCV_COLUMNS, start=start, end=day)
+    logger.info(f"Loaded {len(bars)} symbols from the lake")
+
+    from src.modules.market_breadth import load_cached_vix
+    vix_df = load_cached_vix()
+
+    scores = score_universe(
+        pipeline['model'], bars, market_df, features=pipeline.get('features'),
+        scaler=pipeline.get('scaler'), vix_df=vix_df if vix_df is not None and not vix_df.empty else None
+    )
+    if scores.empty:
+        logger.warning("No symbols scored")
+        return
+
+    key = ScoreStore(lake.s3_client, bucket=S3_BUCKET).write(scores, version, day=day)
+    logger.info(f"✅ Scored {len(scores)} symbols -> s3://{S3_BUCKET}/{key}")
+    logger.info(f"Above 0.55: {(scores > 0.55).sum()}")
+
+
+if __name__ == "__main__":
+    score_lake_universe()
@@ -4,10 +4,7 @@ Uses top 15 features and voting classifier for improved precision.
 """
 import os
 import sys
-import pandas as pd
-import numpy as np
 from pathlib import Path
-import joblib
 import logging
 
 # Add project root
@@ -17,6 +14,12 @@ from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier,
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import classification_report, precision_score, recall_score
 
+from src.config import settings
+from src.modules import features as feature_lib
+from src.modules.feature_selection import load_feature_set
+from src.modules.model_registry import ModelRegistry
+from src.modules.training_data import read_training_data
+
 try:
     from xgboost import XGBClassifier
     XGBOOST_AVAILABLE = True
@@ -27,30 +30,43 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+PUBLISH_TO_S3 = os.environ.get("PUBLISH_MODEL_S3", "false").lower() == "true"  # Also release to the Lambdas
+
 def train_ensemble_model():
-    data_path = "scripts/ml/training_data.csv"
-    model_path = "scripts/ml/breakout_classifier.joblib"
+    data_path = settings.TRAINING_DATA_DIR
     
     if not os.path.exists(data_path):
         logger.error(f"Data file not found: {data_path}")
         return
 
-    # Load top 15 features
-    with open("scripts/ml/selected_features.txt", "r") as f:
-        selected_features = [line.strip() for line in f.readlines()]
+    # Current feature set from analyze_features.py (legacy text snapshot as fallback)
+    try:
+        feature_set = load_feature_set()
+    except ValueError as e:
+        logger.error(f"Feature set unusable: {e}")
+        return
+    if feature_set is not None:
+        selected_features = feature_set['features']
+        logger.info(f"Using feature set {feature_set['version']}: {len(selected_features)} features")
+    else:
+        with open("scripts/ml/selected_features.txt", "r") as f:
+            selected_features = [line.strip() for line in f.readlines()]
+        logger.info(f"Using {len(selected_features)} selected features (selected_features.txt)")
     
-    logger.info(f"Using {len(selected_features)} selected features")
+    # Use only selected features
+    unknown = [f for f in selected_features if f not in feature_lib.FEATURE_NAMES]
+    if unknown:
+        logger.error(f"Selected features not in feature schema v{feature_lib.FEATURE_SCHEMA_VERSION}: {unknown}")
+        return
+    features = selected_features
     
-    # 1. Load Data
-    df = pd.read_csv(data_path, parse_dates=['entry_date'])
+    # 1. Load Data (selected columns only)
+    df = read_training_data(data_path, features=features)
     logger.info(f"Loaded {len(df)} samples.")
     
     # 2. Preprocessing
     df = df.dropna()
     
-    # Use only selected features
-    features = selected_features
-    
     # Walk-Forward Split (Train: 2006-2015, Test: 2016-2025)
     split_date = "2016-01-01"
     train_df = df[df['entry_date'] < split_date]
@@ -183,11 +199,20 @@ def train_ensemble_model():
     pipeline = {
         'model': ensemble,
         'scaler': scaler,
-        'features': features
+        'features': features,
+        'feature_schema': feature_lib.FEATURE_SCHEMA_VERSION
     }
     
-    joblib.dump(pipeline, model_path)
-    logger.info(f"\n✅ Ensemble pipeline saved to {model_path}")
+    # Versioned pipeline + NumPy export when every member compiles
+    # (e.g. an XGBoost member cannot; the screener then uses the joblib pipeline)
+    registries = [ModelRegistry()] + ([ModelRegistry(bucket=settings.S3_BUCKET)] if PUBLISH_TO_S3 else [])
+    for registry in registries:
+        version = registry.publish_pipeline(pipeline, {
+            "trainer": "train_ensemble",
+            "feature_set": feature_set['version'] if feature_set else None
+        }, train_end=train_df['entry_date'].max())
+        registry.promote(version)
+        logger.info(f"\n✅ Ensemble version {version} promoted in {registry.location}")
     logger.info(f"   - Features: {len(features)}")
     
     # 7. Comparison
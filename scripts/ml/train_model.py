@@ -1,44 +1,47 @@
 
-import pandas as pd
-import numpy as np
-import joblib
 import logging
 import os
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.metrics import classification_report, accuracy_score, precision_score
+import sys
+from pathlib import Path
+
+# Add project root
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from sklearn.preprocessing import StandardScaler
 
+from src.config import settings
+from src.modules import features as feature_lib
+from src.modules.model_registry import ModelRegistry
+from src.modules.model_search import TARGET_THRESHOLD, precision_at, successive_halving
+from src.modules.training_data import read_training_data
+
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger("ml_trainer")
 
+SEARCH_JOBS = int(os.environ.get("SEARCH_JOBS", str(os.cpu_count() or 1)))  # 0 = no process pool
+SEARCH_CACHE_DIR = settings.DATA_DIR / "cache" / "model_search"
+PUBLISH_TO_S3 = os.environ.get("PUBLISH_MODEL_S3", "false").lower() == "true"  # Also release to the Lambdas
+
 def train_model():
-    data_path = "scripts/ml/training_data.csv"
-    model_path = "scripts/ml/breakout_classifier.joblib"
+    data_path = settings.TRAINING_DATA_DIR
     
     if not os.path.exists(data_path):
         logger.error(f"Data file not found: {data_path}")
         return
 
-    # 1. Load Data
-    df = pd.read_csv(data_path, parse_dates=['entry_date'])
+    # Full shared feature set (see src/modules/features.py)
+    features = feature_lib.FEATURE_NAMES
+
+    # 1. Load Data (model features + outcome and trade dates only, float32)
+    df = read_training_data(data_path, features=features, columns=['outcome', 'entry_date', 'exit_date'])
     logger.info(f"Loaded {len(df)} samples.")
     
     # 2. Preprocessing
-    df = df.dropna()
-    # PHASE 2A: Enhanced feature set (22 features)
-    features = [
-        # Original 8 (with 2 now fixed)
-        'rsi', 'vol_ratio', 'atr_pct', 'sma50_dist', 'sma200_dist', 'bb_width', 'spy_trend', 'rs_rel',
-        # Phase 1 (7 features)
-        'mom_1m', 'mom_3m', 'mom_6m', 'realized_vol', 'vol_spike', 'dist_52w_high', 'dist_52w_low',
-        # Phase 2A: Market Breadth (5 features)
-        'pct_above_200sma', 'adv_dec_ratio', 'new_highs_lows', 'spy_rsi_market', 'vix_level'
-    ]
+    df = df.dropna(subset=features + ['outcome'])
     
     # Walk-Forward Split (Train: 2006-2015, Test: 2016-2025)
+    # Trades still open at the split overlap the test period and are purged
     split_date = "2016-01-01"
-    train_df = df[df['entry_date'] < split_date]
+    train_df = df[(df['entry_date'] < split_date) & (df['exit_date'] < split_date)]
     test_df = df[df['entry_date'] >= split_date]
     
     logger.info(f"Train Set: {len(train_df)} samples (< {split_date})")
@@ -48,61 +51,55 @@ def train_model():
         logger.error("Not enough training samples!")
         return
 
-    X_train = train_df[features]
-    y_train = train_df['outcome']
-    X_test = test_df[features]
-    y_test = test_df['outcome']
-    
+    # 3. Hyperparameter Search (purged walk-forward folds inside the train period)
+    logger.info("Searching Models...")
+    result = successive_halving(
+        train_df[features].to_numpy(), train_df['outcome'].to_numpy(),
+        train_df['entry_date'], train_df['exit_date'],
+        n_jobs=SEARCH_JOBS, cache_dir=SEARCH_CACHE_DIR
+    )
+    logger.info("\n" + result.leaderboard.head(10).to_string(index=False))
+
+    # 4. Refit the winner on the full train period, evaluate on the holdout
     # Feature Scaling (Fit on Train ONLY to avoid leakage)
     scaler = StandardScaler()
-    X_train = scaler.fit_transform(X_train)
-    X_test = scaler.transform(X_test)
-    X_train = pd.DataFrame(X_train, columns=features) # Keep names for warnings? No, returns numpy array usually
-    X_test = pd.DataFrame(X_test, columns=features)
-    
-    # 3. Model Comparison
-    models = {
-        "RandomForest": RandomForestClassifier(n_estimators=100, max_depth=5, class_weight='balanced', random_state=42),
-        "GradientBoosting": GradientBoostingClassifier(n_estimators=100, learning_rate=0.05, max_depth=3, random_state=42)
-    }
-    
-    best_model = None
-    best_precision = 0
-    target_threshold = 0.55 # We want high confidence
-    
-    logger.info("Comparing Models...")
-    
-    for name, clf in models.items():
-        logger.info(f"\nTraining {name}...")
-        clf.fit(X_train, y_train)
-        
-        y_prob = clf.predict_proba(X_test)[:, 1]
-        
-        # Evaluate at Threshold
-        high_conf_idx = np.where(y_prob > target_threshold)[0]
-        if len(high_conf_idx) > 0:
-            precision = y_test.iloc[high_conf_idx].mean()
-            coverage = len(high_conf_idx) / len(X_test)
-            logger.info(f"  Precision (>{target_threshold}): {precision:.1%}")
-            logger.info(f"  Coverage: {coverage:.1%}")
-            
-            if precision > best_precision:
-                best_precision = precision
-                best_model = clf
-        else:
-            logger.info("  No trades met threshold.")
+    X_train = scaler.fit_transform(train_df[features])
+    X_test = scaler.transform(test_df[features])
+    y_train = train_df['outcome']
+    y_test = test_df['outcome']
 
-    # 4. Save Best Model
-    if best_model:
-        logger.info(f"\n🏆 Best Model: {best_model.__class__.__name__} (Precision: {best_precision:.1%})")
+    best_model = result.best.build(result.best_resource)
+    best_model.fit(X_train, y_train)
+    selected, wins = precision_at(y_test, best_model.predict_proba(X_test)[:, 1], TARGET_THRESHOLD)
+
+    # 5. Save Best Model
+    if selected:
+        best_precision = wins / selected
+        logger.info(f"\n🏆 Best Model: {result.best.name}, n_estimators={result.best_resource}")
+        logger.info(f"  CV Precision (>{TARGET_THRESHOLD}): {result.best_score:.1%}")
+        logger.info(f"  Holdout Precision (>{TARGET_THRESHOLD}): {best_precision:.1%}")
+        logger.info(f"  Holdout Coverage: {selected / len(X_test):.1%}")
         
         # We need to save the scaler too for inference pipeline
         pipeline = {
             "model": best_model,
-            "scaler": scaler
+            "scaler": scaler,
+            "features": features,
+            "feature_schema": feature_lib.FEATURE_SCHEMA_VERSION
+        }
+        metadata = {
+            "trainer": "train_model",
+            "params": dict(result.best.params),
+            "n_estimators": result.best_resource,
+            "cv_precision": result.best_score,
+            "holdout_precision": best_precision,
         }
-        joblib.dump(pipeline, model_path) # Save whole pipeline
-        logger.info(f"✅ Pipeline saved to {model_path}")
+        # Versioned pipeline + NumPy export (sklearn-free inference in the screener Lambda)
+        registries = [ModelRegistry()] + ([ModelRegistry(bucket=settings.S3_BUCKET)] if PUBLISH_TO_S3 else [])
+        for registry in registries:
+            version = registry.publish_pipeline(pipeline, metadata, train_end=train_df['entry_date'].max())
+            registry.promote(version)
+            logger.info(f"✅ Model version {version} promoted in {registry.location}")
     else:
         logger.error("No model met the criteria.")
 
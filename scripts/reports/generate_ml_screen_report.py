@@ -14,6 +14,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from src.modules.stock_screener import CANSLIMScreener
 from src.modules.data_fetcher import DataFetcher
 from src.modules.backtester import Backtester
+from src.modules.ml_scores import ScoreStore
 
 # Config
 logging.basicConfig(level=logging.INFO, format='%(message)s')
@@ -58,6 +59,20 @@ def generate_report():
     logger.info("🧠 Validating with Advanced ML Model...")
     
     bt = Backtester()
+    model_label = bt.model_version or ("legacy model file" if bt.model else "no model (P=0.5)")
+    logger.info(f"Model: {model_label}")
+    
+    # Scores from the daily universe table, only if the same model wrote them;
+    # every other candidate is scored locally
+    ml_scores = {}
+    if bt.model_version:
+        try:
+            table = ScoreStore().lookup(top_candidates)
+            ml_scores = {s: row for s, row in table.items() if row['model_version'] == bt.model_version}
+            logger.info(f"Found {len(ml_scores)} candidates in the ML score table"
+                        + (f" ({len(table) - len(ml_scores)} from another model ignored)" if len(table) > len(ml_scores) else ""))
+        except Exception as e:
+            logger.warning(f"ML score table unavailable: {e}")
     
     # Load SPY for Context
     try:
@@ -90,48 +105,12 @@ def generate_report():
             last_row = df.iloc[-1]
             date = df.index[-1]
             
-            # Construct Feature Dict (Must match backtester logic)
-            # Need to manually construct it or expose a helper in backtester
-            # Accessing internal logic is messy, ideally backtester has `predict_single(row)`
-            # We will manually recreate the feature dict for now as it's quick
-            
-            # RS Calculation
-            rs_ranking = 0.5
-            spy_trend = 1
-            if bt.market_data is not None and date in bt.market_data.index:
-                 spy_row = bt.market_data.loc[date]
-                 spy_trend = spy_row['SPY_Trend'] if 'SPY_Trend' in spy_row else 1
-                 # Approx RS
-                 try:
-                     spy_prev = bt.market_data.loc[:date].iloc[-64]
-                     spy_3m = (spy_row['Close'] / spy_prev['Close']) - 1
-                     stock_row_prev = df.iloc[-64]
-                     stock_3m = (last_row['Close'] / stock_row_prev['Close']) - 1
-                     rs_ranking = stock_3m - spy_3m
-                 except:
-                     pass
-
-            features = {
-                "rsi": last_row['RSI'],
-                "vol_ratio": last_row['Volume'] / last_row['AvgVol_50'] if last_row['AvgVol_50'] > 0 else 0,
-                "atr_pct": (last_row['ATR'] / last_row['Close']) * 100 if last_row['Close'] > 0 else 0,
-                "sma50_dist": (last_row['Close'] - last_row['SMA_50']) / last_row['SMA_50'] * 100,
-                "sma200_dist": (last_row['Close'] - last_row['SMA_200']) / last_row['SMA_200'] * 100,
-                "bb_width": last_row['BB_Width'] if 'BB_Width' in last_row else 0,
-                "spy_trend": spy_trend,
-                "rs_rel": rs_ranking
-            }
-            
-            # Predict
-            X_pred = pd.DataFrame([features])
-            # Align cols (simple list)
-            cols = ['rsi', 'vol_ratio', 'atr_pct', 'sma50_dist', 'sma200_dist', 'bb_width', 'spy_trend', 'rs_rel']
-            X_pred = X_pred[cols]
-            
-            if bt.scaler:
-                 X_pred = bt.scaler.transform(X_pred)
-            
-            prob = bt.model.predict_proba(X_pred)[0][1]
+            if symbol in ml_scores:
+                prob = ml_scores[symbol]['probability']
+            else:
+                # Same feature definitions as the backtester / training data
+                features = bt.extract_features(df.iloc[[-1]], date)
+                prob = bt.score_features(features)[0]
             
             # Calculate Exit/Entry
             atr = last_row['ATR']
@@ -174,6 +153,7 @@ def generate_report():
     
     print("\n" + "="*80)
     print("🤖 ML-ENHANCED DAILY STOCK SCREENER (TOP 20)")
+    print(f"Model: {model_label}")
     print("="*80)
     print(f"{'SYMBOL':<8} {'PRICE':<10} {'ML CONF':<10} {'ENTRY':<25} {'STOP':<10} {'TARGET':<10}")
     print("-" * 80)
@@ -1,58 +1,82 @@
+"""
+Backfill the data-lake manifest (lake/manifest.json).
 
-import boto3
+Writers keep the manifest current, so this only needs to run once for objects
+written before the manifest existed, or after objects were changed out of band.
+Symbols already in the manifest with the current schema version are skipped.
+Set REBUILD=true to re-read every object.
+
+Also writes the symbol list to data/tickers.json for offline use.
+"""
 import json
 import os
 import logging
-from botocore.config import Config
+import concurrent.futures
+from pathlib import Path
+import sys
+
+# Add project root
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.modules.data_lake import DataLake, LAKE_SCHEMA_VERSION, parquet_bytes_to_frame
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("manifest_gen")
 
 S3_BUCKET = os.environ.get("S3_BUCKET", "trading-automation-data-904583676284")
 MANIFEST_PATH = "data/tickers.json"
+NUM_WORKERS = int(os.environ.get("MANIFEST_WORKERS", "16"))
+REBUILD = os.environ.get("REBUILD", "false").lower() == "true"
+
+
+def backfill_symbol(lake: DataLake, symbol: str):
+    obj = lake.s3_client.get_object(Bucket=lake.bucket, Key=lake.key(symbol))
+    body = obj['Body'].read()
+    df = parquet_bytes_to_frame(body)
+    if df.empty:
+        raise ValueError("empty object")
+    lake.manifest.record(symbol, df, nbytes=len(body))
+
 
 def generate_manifest():
-    # Robust Config
-    config = Config(
-        retries = dict(
-            max_attempts = 10
-        ),
-        read_timeout = 300,
-        connect_timeout = 300
-    )
-    
-    s3 = boto3.client('s3', config=config)
-    tickers = []
-    
-    logger.info(f"Scanning bucket {S3_BUCKET} for historical data...")
-    
+    lake = DataLake(bucket=S3_BUCKET, max_workers=NUM_WORKERS)
+    manifest = lake.open_manifest()
+
+    logger.info(f"Scanning bucket {S3_BUCKET} for lake objects...")
     try:
-        paginator = s3.get_paginator('list_objects_v2')
-        pages = paginator.paginate(Bucket=S3_BUCKET, Prefix='historical_data/')
-        
-        count = 0
-        for page in pages:
-            if 'Contents' not in page: continue
-            for obj in page['Contents']:
-                if obj['Key'].endswith('.csv'):
-                    symbol = obj['Key'].split('/')[-1].replace('.csv', '')
-                    tickers.append(symbol)
-                    count += 1
-                    if count % 100 == 0: logger.info(f"Found {count} files...")
-        
-        logger.info(f"Total Tickers Found: {len(tickers)}")
-        
-        # Save to file
-        os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
-        with open(MANIFEST_PATH, 'w') as f:
-            json.dump(tickers, f)
-            
-        logger.info(f"Manifest saved to {MANIFEST_PATH}")
-        return True
-        
+        symbols = lake.list_symbols(include_csv=False)
     except Exception as e:
         logger.error(f"Failed to list S3: {e}")
         return False
 
+    todo = [
+        s for s in symbols
+        if REBUILD or (manifest.get(s) or {}).get('schema_version') != LAKE_SCHEMA_VERSION
+    ]
+    logger.info(f"{len(symbols)} lake objects, {len(todo)} need manifest entries")
+
+    failed = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=NUM_WORKERS) as executor:
+        futures = {executor.submit(backfill_symbol, lake, s): s for s in todo}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Failed {futures[future]}: {e}")
+                failed.append(futures[future])
+
+    # Drop entries whose objects no longer exist
+    for symbol in set(manifest.symbols) - set(symbols):
+        manifest.entries.pop(symbol, None)
+    manifest.save()
+    logger.info(f"Manifest saved to s3://{S3_BUCKET}/{manifest.key}: {len(manifest)} symbols, {len(failed)} failed")
+
+    os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+    with open(MANIFEST_PATH, 'w') as f:
+        json.dump(manifest.symbols, f)
+    logger.info(f"Ticker list saved to {MANIFEST_PATH}")
+    return True
+
+
 if __name__ == "__main__":
     generate_manifest()
@@ -28,6 +28,8 @@ AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 S3_DATA_BUCKET = os.getenv("S3_DATA_BUCKET", os.getenv("S3_BUCKET", "trading-automation-data-904583676284"))
 S3_BUCKET = S3_DATA_BUCKET # Alias for backward compatibility
 S3_BACKUP_BUCKET = os.getenv("S3_BACKUP_BUCKET", "trading-automation-backups")
+FUNDAMENTALS_CACHE_STORE = os.getenv("FUNDAMENTALS_CACHE_STORE", "s3")  # "s3" or "local"
+UNIVERSE_TTL_HOURS = float(os.getenv("UNIVERSE_TTL_HOURS", "24"))  # Index membership re-scrape interval
 
 # Alpaca Configuration
 def get_alpaca_api_key() -> str:
@@ -36,6 +38,29 @@ def get_alpaca_api_key() -> str:
 def get_alpaca_secret_key() -> str:
     return os.getenv("ALPACA_SECRET_KEY", "")
 
+ALPACA_REQUESTS_PER_MINUTE = int(os.getenv("ALPACA_REQUESTS_PER_MINUTE", "200"))  # Free plan quota
+ALPACA_FETCH_WORKERS = int(os.getenv("ALPACA_FETCH_WORKERS", "4"))
+
+# Data Provider ("live" = Alpaca/S3/Wikipedia, "replay" = recorded data in REPLAY_DATA_DIR)
+DATA_PROVIDER = os.getenv("DATA_PROVIDER", "live")
+REPLAY_DATA_DIR = Path(os.getenv("REPLAY_DATA_DIR", str(DATA_DIR / "replay")))
+REPLAY_LATENCY_MS = float(os.getenv("REPLAY_LATENCY_MS", "0"))          # Simulated per-request latency
+REPLAY_REQUESTS_PER_MINUTE = int(os.getenv("REPLAY_REQUESTS_PER_MINUTE", "0"))  # Simulated quota (0 = unlimited)
+
+# ML Training Data (Parquet, partitioned by entry year)
+TRAINING_DATA_DIR = Path(os.getenv("TRAINING_DATA_DIR", str(PROJECT_ROOT / "scripts" / "ml" / "training_data")))
+TRAINING_DATA_PREFIX = os.getenv("TRAINING_DATA_PREFIX", "ml_data/training/")
+
+# ML Feature Sets (versioned selected-feature lists, current.json = in use)
+FEATURE_SETS_DIR = Path(os.getenv("FEATURE_SETS_DIR", str(PROJECT_ROOT / "scripts" / "ml" / "feature_sets")))
+
+# ML Model Registry (versioned artifacts + current.json pointer)
+MODEL_REGISTRY_DIR = Path(os.getenv("MODEL_REGISTRY_DIR", str(DATA_DIR / "models")))  # Local registry
+MODEL_REGISTRY_PREFIX = os.getenv("MODEL_REGISTRY_PREFIX", "models/registry/")          # S3 registry
+
+# ML Scores (daily batch inference over the full universe, one table per day)
+ML_SCORES_PREFIX = os.getenv("ML_SCORES_PREFIX", "lake/ml_scores/")
+
 # Email Configuration
 NOTIFICATION_EMAIL = os.getenv("NOTIFICATION_EMAIL", "your-email@example.com")
 SES_SENDER_EMAIL = os.getenv("SES_SENDER_EMAIL", "noreply@example.com")
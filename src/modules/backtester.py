@@ -6,6 +6,7 @@ from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Tuple
 import joblib
 import os
+from src.modules import features as feature_lib
 from src.modules.market_analysis import MarketAnalyzer
 
 logger = logging.getLogger("backtester")
@@ -50,8 +51,11 @@ class Backtester:
         self.vix_data = None
         
         self.model = None
+        self.model_version = None  # Registry version of self.model (None: legacy file or no model)
         self.scaler = None
+        self.model_features = list(feature_lib.FEATURE_NAMES)
         self.market_data = None 
+        self._context = None  # feature_lib.market_context over market_data / vix_data
         
         # Initialize Stock Selector
         from src.modules.stock_selector import StockSelector
@@ -61,6 +65,7 @@ class Backtester:
         
     def set_market_data(self, df: pd.DataFrame):
         self.market_data = df.copy()
+        self._context = None
         if 'Close' in self.market_data.columns:
             self.market_data['SMA_10'] = self.market_data['Close'].rolling(10).mean()
             self.market_data['EMA_21'] = self.market_data['Close'].ewm(span=21).mean()
@@ -92,15 +97,31 @@ class Backtester:
         
         if vix_df is not None and not vix_df.empty:
             self.vix_data = vix_df 
+            self._context = None
 
     def load_model(self):
         try:
-            model_path = "scripts/ml/breakout_classifier.joblib"
+            # Current version in the local model registry
+            from src.modules.model_registry import ModelRegistry
+            registry = ModelRegistry()
+            if registry.current() is not None:
+                artifact, version = registry.load_pipeline()
+                self.model = artifact['model']
+                self.scaler = artifact.get('scaler')
+                self.model_features = artifact.get('features') or self.model_features
+                self.model_version = version
+                logger.info(f"Loaded ML Pipeline version {version} from {registry.location}")
+                return
+        except Exception as e:
+            logger.warning(f"Failed to load ML model from registry: {e}")
+        try:
+            model_path = "scripts/ml/breakout_classifier.joblib"  # Legacy, pre-registry
             if os.path.exists(model_path):
                 artifact = joblib.load(model_path)
                 if isinstance(artifact, dict) and 'model' in artifact:
                     self.model = artifact['model']
                     self.scaler = artifact.get('scaler')
+                    self.model_features = artifact.get('features') or self.model_features
                     logger.info(f"Loaded ML Pipeline from {model_path}")
                 else:
                     self.model = artifact
@@ -111,47 +132,7 @@ class Backtester:
             logger.warning(f"Failed to load ML model: {e}")
 
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        df['SMA_50'] = df['Close'].rolling(window=50).mean()
-        df['SMA_200'] = df['Close'].rolling(window=200).mean()
-        df['SMA_10'] = df['Close'].rolling(window=10).mean()  # For market data
-        df['EMA_21'] = df['Close'].ewm(span=21, adjust=False).mean()
-        
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
-        
-        high_low = df['High'] - df['Low']
-        high_close = (df['High'] - df['Close'].shift()).abs()
-        low_close = (df['Low'] - df['Close'].shift()).abs()
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        df['ATR'] = ranges.max(axis=1).rolling(14).mean()
-
-        df['BB_Mid'] = df['Close'].rolling(20).mean()
-        df['BB_Std'] = df['Close'].rolling(20).std()
-        df['BB_Up'] = df['BB_Mid'] + (2 * df['BB_Std'])
-        df['BB_Low'] = df['BB_Mid'] - (2 * df['BB_Std'])
-        df['BB_Width'] = (df['BB_Up'] - df['BB_Low']) / df['BB_Mid']
-        df['Volume_MA20'] = df['Volume'].rolling(20).mean()
-        
-        # PHASE 1: Historical price lookback for momentum features
-        df['Close_21d'] = df['Close'].shift(21)   # 1 month ago
-        df['Close_63d'] = df['Close'].shift(63)   # 3 months ago
-        df['Close_126d'] = df['Close'].shift(126) # 6 months ago
-        df['Close_prev'] = df['Close'].shift(1)    # PHASE 2A: For advance/decline
-        
-        # PHASE 1: Volatility calculations
-        returns = df['Close'].pct_change()
-        df['Realized_Vol_20d'] = returns.rolling(20).std() * np.sqrt(252)  # Annualized
-        df['Vol_MA'] = df['Realized_Vol_20d'].rolling(20).mean()
-        
-        # PHASE 1: Price extremes for price action features
-        df['High_252d'] = df['High'].rolling(252).max()  # 52-week high
-        df['Low_252d'] = df['Low'].rolling(252).min()    # 52-week low
-        
-        return df
+        return feature_lib.add_indicators(df)
 
     def run_backtest(self, data: Dict[str, pd.DataFrame], start_date: str = "2006-01-01"):
         logger.info(f"Starting Backtest on {len(data)} tickers (Start: {start_date})")
@@ -159,7 +140,8 @@ class Backtester:
             self.market_data = data.get("SPY", data.get("QQQ", pd.DataFrame()))
         
         for symbol in data:
-            if len(data[symbol]) > 50:
+            # Frames from a streaming load may already carry indicators
+            if len(data[symbol]) > 50 and 'High_252d' not in data[symbol].columns:
                  data[symbol] = self.calculate_indicators(data[symbol])
         
         # PHASE 2A: Initialize breadth calculator if not already set
@@ -179,6 +161,7 @@ class Backtester:
             self.set_market_data(self.market_data)
             # Reindex market data to align with all_dates for O(1) lookups
             self.market_data = self.market_data.reindex(all_dates, method='ffill')
+            self._context = None
 
         for i, current_date in enumerate(all_dates):
             if i % 100 == 0: logger.info(f"Processing {current_date.date()}...")
@@ -261,7 +244,7 @@ class Backtester:
 
             # Entries
             if self.position_size_pct > 0.0:
-                trade_candidates = []
+                triggered = []
                 for symbol in weekly_focus_list:
                     if symbol in self.positions: continue
                     if symbol not in data or current_date not in data[symbol].index: continue
@@ -270,35 +253,20 @@ class Backtester:
                     
                     # Trigger: Price > 21 EMA
                     if row['Close'] > row.get('EMA_21', 0):
-                        # ML Score
-                        feature_data = self._extract_features(row, symbol, current_date)
-                        ml_score = 0.5
-                        
-                        # Skip ML filter if collecting training data
-                        if self.skip_ml_filter:
-                            ml_score = 1.0  # Accept all candidates
-                        elif self.model:
-                             try:
-                                 # Phase 2A: Complete feature set (22 features)
-                                 cols = [
-                                     'rsi', 'vol_ratio', 'atr_pct', 'sma50_dist', 'sma200_dist', 'bb_width',
-                                     'spy_trend', 'rs_rel', 'mom_1m', 'mom_3m', 'mom_6m',
-                                     'realized_vol', 'vol_spike', 'dist_52w_high', 'dist_52w_low',
-                                     'pct_above_200sma', 'adv_dec_ratio', 'new_highs_lows', 'spy_rsi_market', 'vix_level'
-                                 ]
-                                 vals = [feature_data.get(c, 0) for c in cols]
-                                 
-                                 # Fix Warning: Create DataFrame with feature names
-                                 X_df = pd.DataFrame([vals], columns=cols)
-                                 
-                                 if self.scaler: 
-                                     vals = self.scaler.transform(X_df)[0]
-                                 
-                                 ml_score = self.model.predict_proba([vals])[0][1]
-                             except Exception as e:
-                                 # logger.error(f"ML Error: {e}")
-                                 pass
-                        
+                        triggered.append((symbol, row))
+                
+                trade_candidates = []
+                if triggered:
+                    # Features and ML scores for the day's triggered candidates in one batch
+                    feature_rows = self.extract_features(pd.DataFrame([r for _, r in triggered]), current_date)
+                    
+                    # Skip ML filter if collecting training data
+                    if self.skip_ml_filter:
+                        ml_scores = np.ones(len(triggered))  # Accept all candidates
+                    else:
+                        ml_scores = self.score_features(feature_rows)
+                    
+                    for (symbol, row), feature_data, ml_score in zip(triggered, feature_rows.to_dict('records'), ml_scores):
                         if ml_score > 0.55 or self.skip_ml_filter:  # Threshold 0.55
                             # DEBUG
                             if not self.skip_ml_filter:  # Only log when using ML
@@ -317,106 +285,49 @@ class Backtester:
         self.analyze_results_simple()
         return self.trades
 
-    def _extract_features(self, row, symbol=None, date=None):
-        """
-        Extract features for ML - PHASE 1 ENHANCED
-        Ensures stationarity by using ratios and clipping outliers.
+    @property
+    def feature_context(self) -> pd.DataFrame:
+        """Per-date SPY/VIX feature inputs (feature_lib.market_context), cached"""
+        if self._context is None:
+            self._context = feature_lib.market_context(self.market_data, self.vix_data)
+        return self._context
+
+    def extract_features(self, rows: pd.DataFrame, date) -> pd.DataFrame:
         """
-        # 1. Vol Ratio (Clipped at 5.0 to handle massive spikes)
-        vol_ratio = row['Volume'] / row.get('Volume_MA20', 1) if row.get('Volume_MA20', 1) > 0 else 0
-        vol_ratio = min(vol_ratio, 5.0)
+        ML features for a batch of indicator rows on one date
         
-        # 2. SMA Distances (Pct Diff)
-        sma50_dist = (row['Close'] / row.get('SMA_50', row['Close'])) - 1
-        sma200_dist = (row['Close'] / row.get('SMA_200', row['Close'])) - 1
-        
-        # 3. FIXED spy_trend - Market regime detection
-        spy_trend = 1  # Default
-        if self.market_data is not None and date is not None:
-            try:
-                if date in self.market_data.index:
-                    spy_row = self.market_data.loc[date]
-                    if not pd.isna(spy_row.get('Close')) and not pd.isna(spy_row.get('SMA_200')):
-                        spy_trend = 1 if spy_row['Close'] > spy_row['SMA_200'] else 0
-            except:
-                pass
-        
-        # 4. FIXED rs_rel - Relative strength vs SPY (3-month)
-        rs_rel = 0  # Default
-        if self.market_data is not None and date is not None:
-            try:
-                if date in self.market_data.index:
-                    spy_row = self.market_data.loc[date]
-                    stock_3m_ago = row.get('Close_63d', row['Close'])
-                    spy_3m_ago = spy_row.get('Close_63d', spy_row.get('Close', 1))
-                    
-                    if stock_3m_ago > 0 and spy_3m_ago > 0:
-                        stock_ret_3m = (row['Close'] / stock_3m_ago) - 1
-                        spy_ret_3m = (spy_row['Close'] / spy_3m_ago) - 1
-                        rs_rel = ((1 + stock_ret_3m) / (1 + spy_ret_3m + 0.0001)) - 1
-            except:
-                pass
-        
-        # 5. NEW: Momentum features
-        mom_1m = (row['Close'] / row.get('Close_21d', row['Close'])) - 1 if row.get('Close_21d', 0) > 0 else 0
-        mom_3m = (row['Close'] / row.get('Close_63d', row['Close'])) - 1 if row.get('Close_63d', 0) > 0 else 0
-        mom_6m = (row['Close'] / row.get('Close_126d', row['Close'])) - 1 if row.get('Close_126d', 0) > 0 else 0
-        
-        # 6. NEW: Volatility regime features
-        realized_vol = row.get('Realized_Vol_20d', 0.15)  # Default 15% vol
-        vol_ma = row.get('Vol_MA', 0.15)
-        vol_spike = realized_vol / vol_ma if vol_ma > 0 else 1.0
-        
-        # 7. NEW: Price Action - Distance from 52-week extremes
-        high_52w = row.get('High_252d', row['Close'])
-        low_52w = row.get('Low_252d', row['Close'])
-        dist_from_52w_high = (row['Close'] - high_52w) / high_52w if high_52w > 0 else 0
-        dist_from_52w_low = (row['Close'] - low_52w) / low_52w if low_52w > 0 else 0
-        
-        # 8. PHASE 2A: Market Breadth Features
-        breadth_data = {}
-        if self.breadth_calculator and date:
-            breadth_data = self.breadth_calculator.calculate_daily_breadth(date)
-        
-        # Get VIX level
-        vix_level = 20.0  # Default neutral VIX
-        if self.vix_data is not None and date in self.vix_data.index:
-            vix_level = self.vix_data.loc[date, 'VIX']
-        
-        # Get SPY RSI (market momentum)
-        spy_rsi = 50.0  # Default neutral
-        if self.market_data is not None and date in self.market_data.index:
-            spy_rsi = self.market_data.loc[date].get('RSI', 50.0)
+        Args:
+            rows: One indicator row per candidate (calculate_indicators output)
+            date: Trading date of the rows
         
-        return {
-            # Original features (6)
-            "rsi": row.get('RSI', 50),
-            "vol_ratio": vol_ratio, 
-            "atr_pct": (row.get('ATR', 0) / row['Close']) * 100 if row['Close'] > 0 else 0,
-            "sma50_dist": sma50_dist * 100,
-            "sma200_dist": sma200_dist * 100,
-            "bb_width": row.get('BB_Width', 0.1),
-            
-            # FIXED Phase 1 features (2)
-            "spy_trend": spy_trend,
-            "rs_rel": rs_rel * 100,
-            
-            # NEW Phase 1 features (7)
-            "mom_1m": mom_1m * 100,
-            "mom_3m": mom_3m * 100,
-            "mom_6m": mom_6m * 100,
-            "realized_vol": realized_vol * 100,
-            "vol_spike": min(vol_spike, 3.0),  # Clip at 3x
-            "dist_52w_high": dist_from_52w_high * 100,
-            "dist_52w_low": dist_from_52w_low * 100,
-            
-            # NEW Phase 2A: Market Breadth features (5) → Total: 22 features
-            "pct_above_200sma": breadth_data.get('pct_above_200sma', 50.0),
-            "adv_dec_ratio": min(breadth_data.get('adv_dec_ratio', 1.0), 5.0),  # Clip at 5
-            "new_highs_lows": breadth_data.get('new_highs_lows', 0.0),
-            "spy_rsi_market": spy_rsi,
-            "vix_level": min(vix_level, 80.0),  # Clip VIX at 80
-        }
+        Returns:
+            DataFrame of feature_lib.FEATURE_NAMES, one row per candidate
+        """
+        breadth = self.breadth_calculator.breadth_table() if self.breadth_calculator else None
+        return feature_lib.compute_features(
+            rows, dates=[date] * len(rows), context=self.feature_context, breadth=breadth
+        )
+
+    def _extract_features(self, row, symbol=None, date=None):
+        """Features for a single indicator row, as a dict"""
+        rows = pd.DataFrame([row])
+        if date is None:
+            return feature_lib.compute_features(rows, dates=[pd.NaT]).iloc[0].to_dict()
+        return self.extract_features(rows, date).iloc[0].to_dict()
+
+    def score_features(self, feature_rows: pd.DataFrame) -> np.ndarray:
+        """P(win) per feature row from the loaded model (0.5 without one or on error)"""
+        scores = np.full(len(feature_rows), 0.5)
+        if not self.model:
+            return scores
+        try:
+            X = feature_rows[self.model_features]
+            if self.scaler:
+                X = self.scaler.transform(X)
+            scores = np.asarray(self.model.predict_proba(np.asarray(X)))[:, 1]
+        except Exception as e:
+            logger.debug(f"ML scoring failed: {e}")
+        return scores
 
     def manage_position(self, symbol, row, date):
         trade = self.positions[symbol]
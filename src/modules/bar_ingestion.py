@@ -0,0 +1,196 @@
+"""
+Module: Bar Ingestion
+Columnar conversion of Alpaca bar payloads into typed DataFrames.
+
+Bar fields are written straight into preallocated NumPy arrays instead of
+building one dict per bar. Both wrapped `Bar` objects and the raw API payload
+(`raw_data=True` clients: dicts keyed 't', 'o', 'h', 'l', 'c', 'v') are
+accepted. Output dtypes are fixed: float32 prices, int64 volume and
+datetime64[ns, UTC] timestamps.
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Sequence
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+BAR_COLUMNS = PRICE_COLUMNS + ['Volume']
+LONG_COLUMNS = ['Date', 'Symbol'] + BAR_COLUMNS
+
+PRICE_DTYPE = np.float32
+VOLUME_DTYPE = np.int64
+
+# Bar attribute / raw payload key for each output column
+_BAR_FIELDS = {
+    'Open': ('open', 'o'),
+    'High': ('high', 'h'),
+    'Low': ('low', 'l'),
+    'Close': ('close', 'c'),
+    'Volume': ('volume', 'v'),
+}
+
+
+def _fill_columns(bars: Sequence, arrays: Dict[str, np.ndarray], timestamps: np.ndarray, offset: int):
+    """Write one symbol's bars into the shared arrays starting at `offset`"""
+    n = len(bars)
+    if n == 0:
+        return
+    end = offset + n
+    if isinstance(bars[0], dict):
+        for col, (_, key) in _BAR_FIELDS.items():
+            arrays[col][offset:end] = np.fromiter((b[key] for b in bars), dtype=np.float64, count=n)
+        timestamps[offset:end] = [b['t'] for b in bars]
+    else:
+        for col, (attr, _) in _BAR_FIELDS.items():
+            arrays[col][offset:end] = np.fromiter((getattr(b, attr) for b in bars), dtype=np.float64, count=n)
+        timestamps[offset:end] = [b.timestamp for b in bars]
+
+
+def _allocate(total: int):
+    arrays = {col: np.empty(total, dtype=PRICE_DTYPE) for col in PRICE_COLUMNS}
+    arrays['Volume'] = np.empty(total, dtype=VOLUME_DTYPE)
+    timestamps = np.empty(total, dtype=object)
+    return arrays, timestamps
+
+
+def _to_utc_index(timestamps: np.ndarray) -> pd.DatetimeIndex:
+    index = pd.DatetimeIndex(pd.to_datetime(timestamps, utc=True, format='ISO8601'))
+    return index.as_unit('ns')
+
+
+def bars_to_frame(bars: Sequence) -> pd.DataFrame:
+    """
+    Convert one symbol's bars into a DataFrame indexed by timestamp
+
+    Args:
+        bars: List of Alpaca Bar objects or raw bar dicts
+
+    Returns:
+        DataFrame with Open, High, Low, Close, Volume columns
+    """
+    if not bars:
+        return pd.DataFrame(columns=BAR_COLUMNS, index=pd.DatetimeIndex([], tz='UTC', name='timestamp'))
+
+    arrays, timestamps = _allocate(len(bars))
+    _fill_columns(bars, arrays, timestamps, 0)
+
+    index = _to_utc_index(timestamps)
+    index.name = 'timestamp'
+    return pd.DataFrame(arrays, index=index, columns=BAR_COLUMNS, copy=False)
+
+
+def bars_to_long_frame(payload: Dict[str, Sequence]) -> pd.DataFrame:
+    """
+    Convert a multi-symbol payload (symbol -> bars) into one long-format frame
+
+    Args:
+        payload: Mapping of symbol to its bars, as returned by get_stock_bars
+
+    Returns:
+        DataFrame with Date, Symbol, Open, High, Low, Close, Volume columns
+    """
+    symbols: List[str] = [s for s, bars in payload.items() if bars]
+    counts = np.array([len(payload[s]) for s in symbols], dtype=np.int64)
+    total = int(counts.sum()) if len(counts) else 0
+
+    if total == 0:
+        return empty_long_frame()
+
+    arrays, timestamps = _allocate(total)
+    offset = 0
+    for symbol, n in zip(symbols, counts):
+        _fill_columns(payload[symbol], arrays, timestamps, offset)
+        offset += int(n)
+
+    data = {
+        'Date': _to_utc_index(timestamps),
+        'Symbol': np.repeat(np.array(symbols, dtype=object), counts),
+    }
+    data.update(arrays)
+    return pd.DataFrame(data, columns=LONG_COLUMNS, copy=False)
+
+
+def empty_long_frame() -> pd.DataFrame:
+    """Empty long-format frame with the canonical dtypes"""
+    frame = pd.DataFrame({
+        'Date': pd.DatetimeIndex([], tz='UTC').as_unit('ns'),
+        'Symbol': np.array([], dtype=object),
+    })
+    for col in PRICE_COLUMNS:
+        frame[col] = np.array([], dtype=PRICE_DTYPE)
+    frame['Volume'] = np.array([], dtype=VOLUME_DTYPE)
+    return frame
+
+
+class BarPanel:
+    """
+    Bars for many symbols kept in long layout, with per-symbol views
+
+    The chunks are concatenated once and sorted by (symbol, date). Each column
+    is one contiguous array, so a symbol's bars are a [start, end) slice.
+    `panel[symbol]` builds a DataFrame over slices of those arrays (no copy),
+    indexed by timestamp like `bars_to_frame`. No wide, union-of-dates frame
+    is ever materialized.
+    """
+
+    def __init__(self, long_df: pd.DataFrame):
+        """
+        Args:
+            long_df: Long-format bars (LONG_COLUMNS), in any order
+        """
+        if long_df.empty:
+            long_df = empty_long_frame()
+        dates = pd.DatetimeIndex(long_df['Date'])
+        codes, symbols = pd.factorize(long_df['Symbol'].to_numpy())
+        order = np.lexsort((dates.asi8, codes))
+
+        self._dates = dates[order].rename('timestamp')
+        self._columns = {col: long_df[col].to_numpy()[order] for col in BAR_COLUMNS}
+        sorted_codes = codes[order]
+        bounds = np.searchsorted(sorted_codes, np.arange(len(symbols) + 1))
+        self._ranges: Dict[str, tuple] = {
+            str(symbol): (int(bounds[i]), int(bounds[i + 1])) for i, symbol in enumerate(symbols)
+        }
+
+    @classmethod
+    def from_chunks(cls, frames: List[pd.DataFrame]) -> "BarPanel":
+        """Panel over long-format chunk frames (e.g. BarFetchResult.chunks)"""
+        frames = [f for f in frames if f is not None and not f.empty]
+        if not frames:
+            return cls(empty_long_frame())
+        return cls(pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0])
+
+    @property
+    def empty(self) -> bool:
+        return not self._ranges
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._ranges)
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._ranges
+
+    def __getitem__(self, symbol: str) -> pd.DataFrame:
+        start, end = self._ranges[symbol]
+        data = {col: values[start:end] for col, values in self._columns.items()}
+        return pd.DataFrame(data, index=self._dates[start:end], columns=BAR_COLUMNS, copy=False)
+
+    def get(self, symbol: str, default=None):
+        return self[symbol] if symbol in self._ranges else default
+
+    def items(self):
+        for symbol in self._ranges:
+            yield symbol, self[symbol]
+
+    def to_long(self) -> pd.DataFrame:
+        """Long frame (Date, Symbol, OHLCV) sorted by symbol then date"""
+        counts = [end - start for start, end in self._ranges.values()]
+        data = {
+            'Date': self._dates.rename(None),
+            'Symbol': np.repeat(np.array(self.symbols, dtype=object), counts),
+        }
+        data.update(self._columns)
+        return pd.DataFrame(data, columns=LONG_COLUMNS)
@@ -0,0 +1,334 @@
+"""
+Module: Bar Fetch Scheduler
+Concurrent, rate-limit-aware retrieval of Alpaca daily bars.
+
+Symbols are split into chunks that are requested in parallel from a thread
+pool. Every request first takes tokens from a shared token bucket sized to the
+Alpaca request quota, so the pool never bursts past the account limit. Chunks
+that fail are retried on their own (completed chunks are never refetched):
+429 responses back off exponentially and pause the whole bucket, other errors
+shrink the chunk size and split the failing chunk.
+"""
+import math
+import random
+import threading
+import time
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from alpaca.data.requests import StockBarsRequest
+from alpaca.data.timeframe import TimeFrame
+
+from src.config import settings
+
+logger = logging.getLogger("bar_scheduler")
+
+# Alpaca paginates bar responses at 10k bars per page; each page is a request
+ALPACA_PAGE_SIZE = 10_000
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Naive UTC datetime, so tz-aware and naive bounds can be subtracted"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting request throughput"""
+
+    def __init__(
+        self,
+        rate_per_sec: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            rate_per_sec: Tokens refilled per second
+            capacity: Maximum burst size
+            clock: Monotonic clock (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+        """
+        self.rate = rate_per_sec
+        self.capacity = capacity
+        self._tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = max(0.0, now - self._last)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._last = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Block until `tokens` are available and take them.
+
+        Returns:
+            Seconds spent waiting
+        """
+        tokens = min(tokens, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                else:
+                    delay = (tokens - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for `seconds` (used after a 429)"""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens = 0.0
+            self._paused_until = max(self._paused_until, now + seconds)
+
+
+@dataclass
+class BarFetchResult:
+    """Outcome of a scheduled fetch"""
+    chunks: List[Any] = field(default_factory=list)    # Per-chunk payloads (after transform)
+    failed_symbols: List[str] = field(default_factory=list)
+    requests: int = 0
+    rate_limited: int = 0
+    retries: int = 0
+
+    def merged(self) -> Dict[str, Any]:
+        """Merge dict payloads (symbol -> bars) from every chunk"""
+        merged = {}
+        for payload in self.chunks:
+            merged.update(payload)
+        return merged
+
+
+def is_rate_limit_error(exc: Exception) -> bool:
+    """True if the exception represents an HTTP 429 from Alpaca"""
+    status = getattr(exc, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(exc, 'response', None), 'status_code', None)
+    return status == 429 or 'too many requests' in str(exc).lower()
+
+
+def bars_payload(response) -> Dict[str, Any]:
+    """Return the symbol -> bars mapping from a BarSet or raw-data response"""
+    if hasattr(response, 'data'):
+        return response.data
+    return response or {}
+
+
+class BarFetchScheduler:
+    """
+    Fetch daily bars for many symbols concurrently under a request quota.
+
+    Any object with a `get_stock_bars(StockBarsRequest)` method can be used as
+    the client, which keeps the scheduler testable against a stub.
+    """
+
+    def __init__(
+        self,
+        client,
+        requests_per_minute: int = settings.ALPACA_REQUESTS_PER_MINUTE,
+        max_workers: int = settings.ALPACA_FETCH_WORKERS,
+        chunk_size: int = 200,
+        min_chunk_size: int = 25,
+        max_chunk_size: int = 400,
+        max_retries: int = 5,
+        backoff_base: float = 2.0,
+        backoff_max: float = 60.0,
+        target_latency: float = 10.0,
+        bucket: Optional[TokenBucket] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            client: Alpaca StockHistoricalDataClient (or compatible stub)
+            requests_per_minute: Account request quota
+            max_workers: Concurrent requests in flight
+            chunk_size: Initial symbols per request
+            min_chunk_size: Floor for adaptive chunk shrinking
+            max_chunk_size: Ceiling for adaptive chunk growth
+            max_retries: Attempts per chunk before its symbols are reported failed
+            backoff_base: First 429 backoff delay in seconds (doubles per attempt)
+            backoff_max: Cap for a single backoff delay
+            target_latency: Chunks slower than this shrink the chunk size
+            bucket: Shared token bucket (defaults to one sized to the quota)
+            sleep: Sleep function (injectable for tests)
+        """
+        self.client = client
+        self.max_workers = max(1, max_workers)
+        self.chunk_size = chunk_size
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max(max_chunk_size, chunk_size)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.target_latency = target_latency
+        self._sleep = sleep
+
+        rate = requests_per_minute / 60.0
+        self.bucket = bucket or TokenBucket(rate, capacity=max(1.0, rate * 5), sleep=sleep)
+        self._size_lock = threading.Lock()
+
+    # ==================== CHUNK SIZING ====================
+
+    def _shrink(self):
+        with self._size_lock:
+            self.chunk_size = max(self.min_chunk_size, self.chunk_size // 2)
+
+    def _grow(self):
+        with self._size_lock:
+            self.chunk_size = min(self.max_chunk_size, int(self.chunk_size * 1.25) + 1)
+
+    def _estimate_pages(self, n_symbols: int, start: datetime, end: Optional[datetime]) -> int:
+        """Requests consumed by one chunk (the SDK follows pagination internally)"""
+        span_days = (_naive_utc(end or datetime.now(timezone.utc)) - _naive_utc(start)).days
+        trading_days = max(1, int(span_days * 252 / 365) + 1)
+        return max(1, math.ceil(n_symbols * trading_days / ALPACA_PAGE_SIZE))
+
+    # ==================== EXECUTION ====================
+
+    def _request_chunk(
+        self,
+        chunk: Tuple[str, ...],
+        start: datetime,
+        end: Optional[datetime],
+        transform: Optional[Callable[[Dict[str, Any]], Any]]
+    ):
+        self.bucket.acquire(self._estimate_pages(len(chunk), start, end))
+        request = StockBarsRequest(
+            symbol_or_symbols=list(chunk),
+            timeframe=TimeFrame.Day,
+            start=start,
+            end=end
+        )
+        began = time.monotonic()
+        payload = bars_payload(self.client.get_stock_bars(request))
+        latency = time.monotonic() - began
+        if transform is not None:
+            payload = transform(payload)
+        return payload, latency
+
+    def _backoff_delay(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2)
+
+    def fetch(
+        self,
+        symbols: List[str],
+        start: datetime,
+        end: Optional[datetime] = None,
+        transform: Optional[Callable[[Dict[str, Any]], Any]] = None
+    ) -> BarFetchResult:
+        """
+        Fetch daily bars for `symbols` between `start` and `end`.
+
+        Args:
+            symbols: Tickers to fetch
+            start: First bar date
+            end: Last bar date (None = latest)
+            transform: Optional function applied to each chunk's
+                symbol -> bars payload inside the worker thread
+
+        Returns:
+            BarFetchResult with one payload per completed chunk
+        """
+        result = BarFetchResult()
+        pending: Deque[Tuple[str, ...]] = deque()
+        remaining = list(dict.fromkeys(symbols))
+        attempts: Dict[Tuple[str, ...], int] = {}
+
+        def next_chunk() -> Optional[Tuple[str, ...]]:
+            if pending:
+                return pending.popleft()
+            if not remaining:
+                return None
+            size = self.chunk_size
+            chunk = tuple(remaining[:size])
+            del remaining[:size]
+            return chunk
+
+        if not symbols:
+            return result
+
+        logger.info(f"Scheduling bar fetch for {len(remaining)} symbols "
+                    f"(chunk={self.chunk_size}, workers={self.max_workers})")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight = {}
+
+            while True:
+                while len(in_flight) < self.max_workers:
+                    chunk = next_chunk()
+                    if chunk is None:
+                        break
+                    future = executor.submit(self._request_chunk, chunk, start, end, transform)
+                    in_flight[future] = chunk
+                    result.requests += 1
+
+                if not in_flight:
+                    break
+
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = in_flight.pop(future)
+                    try:
+                        payload, latency = future.result()
+                    except Exception as e:
+                        attempt = attempts.get(chunk, 0) + 1
+                        if attempt > self.max_retries:
+                            logger.error(f"Giving up on chunk of {len(chunk)} symbols "
+                                         f"({chunk[0]}..{chunk[-1]}): {e}")
+                            result.failed_symbols.extend(chunk)
+                            continue
+
+                        result.retries += 1
+                        if is_rate_limit_error(e):
+                            result.rate_limited += 1
+                            delay = self._backoff_delay(attempt - 1)
+                            logger.warning(f"Rate limited (429). Backing off {delay:.1f}s "
+                                           f"(attempt {attempt}/{self.max_retries})")
+                            self.bucket.pause(delay)
+                            attempts[chunk] = attempt
+                            pending.append(chunk)
+                        else:
+                            logger.warning(f"Chunk of {len(chunk)} symbols failed "
+                                           f"(attempt {attempt}/{self.max_retries}): {e}")
+                            self._shrink()
+                            if len(chunk) > self.min_chunk_size:
+                                mid = len(chunk) // 2
+                                for part in (chunk[:mid], chunk[mid:]):
+                                    attempts[part] = attempt
+                                    pending.append(part)
+                            else:
+                                attempts[chunk] = attempt
+                                pending.append(chunk)
+                        continue
+
+                    result.chunks.append(payload)
+                    if latency > self.target_latency:
+                        self._shrink()
+                    elif len(chunk) >= self.chunk_size:
+                        self._grow()
+
+        if result.failed_symbols:
+            logger.warning(f"Bar fetch incomplete: {len(result.failed_symbols)} symbols failed")
+        logger.info(f"Bar fetch complete: {len(result.chunks)} chunks, {result.requests} requests, "
+                    f"{result.rate_limited} rate-limited")
+        return result
@@ -11,7 +11,6 @@ from datetime import datetime, timedelta
 import requests
 import io
 from io import BytesIO
-import boto3
 import json
 
 # Alpaca Imports
@@ -20,6 +19,14 @@ from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame
 
 from src.modules.stock_screener import FundamentalData, TechnicalData
+from src.modules.bar_scheduler import BarFetchScheduler, bars_payload
+from src.modules.bar_ingestion import bars_to_frame, bars_to_long_frame, BarPanel
+from src.modules.technical_snapshot import build_technical_snapshot, snapshot_to_technical_data
+from src.modules.fundamentals_cache import FundamentalsCache, S3JsonStore, LocalJsonStore
+from src.modules.universe_registry import UniverseRegistry
+from src.modules.data_providers import DataProvider, provider_from_settings
+from src.utils.s3_cache import TieredS3Cache
+from src.utils.aws_utils import get_s3_client
 from src.config.constants import TREND_UP, TREND_DOWN, TREND_NEUTRAL
 from src.config import settings
 
@@ -35,26 +42,66 @@ class DataFetchError(Exception):
 class DataFetcher:
     """Fetch and process market data using Alpaca API"""
     
-    def __init__(self, api_key: Optional[str] = None, secret_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        provider: Optional[DataProvider] = None
+    ):
+        """
+        Args:
+            api_key: Alpaca API key (default: settings)
+            secret_key: Alpaca secret key (default: settings)
+            provider: Data provider replacing the live services (default:
+                selected by settings.DATA_PROVIDER; None = live)
+        """
         self.market_index = "QQQ"
         
         # Initialize Alpaca Client
         self.api_key = api_key or settings.get_alpaca_api_key()
         self.secret_key = secret_key or settings.get_alpaca_secret_key()
         
-        self.s3_client = boto3.client('s3')
+        self.s3_client = get_s3_client()
+        # Memory/disk tiers are process-wide, so warm invocations skip re-downloads
+        self.s3_cache = TieredS3Cache(self.s3_client)
         
-        if not self.api_key or not self.secret_key:
+        self.provider = provider if provider is not None else provider_from_settings()
+        if self.provider is not None:
+            logger.info(f"Using '{self.provider.name}' data provider")
+            self.client = self.provider.bars_client()
+        elif not self.api_key or not self.secret_key:
             logger.warning("Alpaca API credentials not found. Data fetching will fail.")
             self.client = None
         else:
             try:
-                self.client = StockHistoricalDataClient(self.api_key, self.secret_key)
+                # Raw payloads skip per-bar model objects; bar_ingestion reads them column-wise
+                self.client = StockHistoricalDataClient(self.api_key, self.secret_key, raw_data=True)
             except Exception as e:
                 logger.error(f"Failed to initialize Alpaca Client: {e}")
                 self.client = None
         
+        # Concurrent, quota-aware chunk fetching for multi-symbol requests
+        self.scheduler = BarFetchScheduler(self.client) if self.client else None
+        
+        # Bars loaded by the last technical snapshot, reused for per-symbol histories
+        self.bar_cache: Optional[BarPanel] = None
+        self._bar_cache_days = 0
+        
         self._load_sector_cache()
+        
+        # Sector/fundamentals lookups: LRU -> persisted store -> concurrent yfinance refresh
+        if self.provider is not None:
+            self.fundamentals = FundamentalsCache(store=None, loader=self.provider.fundamentals)
+        else:
+            store = LocalJsonStore() if settings.FUNDAMENTALS_CACHE_STORE == "local" else S3JsonStore(self.s3_client)
+            self.fundamentals = FundamentalsCache(store=store)
+        self.fundamentals.seed('sector', self.sector_cache)
+        
+        # Dated index membership snapshots (scraped at most once per TTL)
+        if self.provider is not None:
+            self.universe = UniverseRegistry(self, s3_client=None, local_dir=self.provider.state_dir / "universe")
+        else:
+            self.universe = UniverseRegistry(self, s3_client=self.s3_client)
 
     def fetch_market_data(self, tickers: List[str], days: int = 400, use_cache: bool = True) -> pd.DataFrame:
         """
@@ -62,13 +109,15 @@ class DataFetcher:
         Returns a DataFrame with MultiIndex (Symbol, Date) or similar structure.
         """
         full_df = pd.DataFrame()
+        # The shared S3 history cache only ever holds live data
+        live = self.provider is None
+        use_cache = use_cache and live
         
         # 1. Try Load from S3
         if use_cache:
             try:
                 logger.info(f"Checking S3 cache: s3://{S3_BUCKET}/{CACHE_KEY}")
-                response = self.s3_client.get_object(Bucket=S3_BUCKET, Key=CACHE_KEY)
-                full_df = pd.read_parquet(BytesIO(response['Body'].read()))
+                full_df = self.s3_cache.get_parquet(S3_BUCKET, CACHE_KEY)
                 logger.info(f"Loaded Cached Data: {full_df.shape}")
             except Exception as e:
                 logger.info(f"Cache miss or error (will fetch full history): {e}")
@@ -108,30 +157,13 @@ class DataFetcher:
                 # Note: fetch_bars handles chunking internally for symbols? SDK does, but safe to chunk
                 logger.info(f"Fetching from Alpaca starting {start_date}...")
                 
-                # Use bulk fetch logic
-                # We reuse fetch_bulk_history but force start date
-                chunk_size = 200
-                new_dfs = []
-                
-                for i in range(0, len(tickers), chunk_size):
-                    chunk = tickers[i:i + chunk_size]
-                    req = StockBarsRequest(
-                        symbol_or_symbols=chunk,
-                        timeframe=TimeFrame.Day,
-                        start=start_date
-                    )
-                    bars = self.client.get_stock_bars(req)
-                    
-                    for symbol, symbol_bars in bars.data.items():
-                        df = self._alpaca_bars_to_df(symbol_bars)
-                        if not df.empty:
-                            df['Symbol'] = symbol # Explicit Column
-                            df.reset_index(inplace=True) # Date becomes column
-                            df.rename(columns={'timestamp': 'Date'}, inplace=True)
-                            new_dfs.append(df)
+                # Chunks run concurrently under the Alpaca request quota and
+                # arrive as long-format frames (Date, Symbol, OHLCV)
+                result = self.scheduler.fetch(tickers, start=start_date, transform=bars_to_long_frame)
+                new_dfs = [df for df in result.chunks if not df.empty]
                             
                 if new_dfs:
-                    new_data = pd.concat(new_dfs)
+                    new_data = pd.concat(new_dfs, ignore_index=True)
                     logger.info(f"Fetched {len(new_data)} new rows.")
                     
                     # 4. Merge
@@ -148,13 +180,14 @@ class DataFetcher:
                         full_df = new_data
                     
                     # 5. Update Cache
-                    try:
-                        out_buffer = BytesIO()
-                        full_df.to_parquet(out_buffer, index=False)
-                        self.s3_client.put_object(Bucket=S3_BUCKET, Key=CACHE_KEY, Body=out_buffer.getvalue())
-                        logger.info("Updated S3 Cache.")
-                    except Exception as e:
-                        logger.error(f"Failed to update cache: {e}")
+                    if live:
+                        try:
+                            out_buffer = BytesIO()
+                            full_df.to_parquet(out_buffer, index=False)
+                            self.s3_cache.put_bytes(S3_BUCKET, CACHE_KEY, out_buffer.getvalue())
+                            logger.info("Updated S3 Cache.")
+                        except Exception as e:
+                            logger.error(f"Failed to update cache: {e}")
                         
             except Exception as e:
                 logger.error(f"Error fetching incremental data: {e}")
@@ -183,6 +216,8 @@ class DataFetcher:
     
     def fetch_sp500_tickers(self) -> List[str]:
         """Fetch list of S&P 500 tickers from Wikipedia"""
+        if self.provider is not None:
+            return self.provider.index_members('sp500')
         try:
             logger.info("Fetching S&P 500 tickers...")
             url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
@@ -204,6 +239,8 @@ class DataFetcher:
 
     def fetch_nasdaq100_tickers(self) -> List[str]:
         """Fetch list of NASDAQ 100 tickers"""
+        if self.provider is not None:
+            return self.provider.index_members('nasdaq100')
         try:
             logger.info("Fetching NASDAQ 100 tickers...")
             url = "https://en.wikipedia.org/wiki/Nasdaq-100"
@@ -231,28 +268,21 @@ class DataFetcher:
     def fetch_key_etfs(self) -> List[str]:
         return ['SPY', 'QQQ', 'IWM', 'DIA', 'XLF', 'XLE', 'XLK', 'XLV', 'XLI', 'XLP', 'XLY', 'XLU', 'XLB', 'XLC', 'XLRE', 'SMH', 'IGV', 'XBI', 'KRE', 'ARKK', 'GBTC', 'GLD', 'SLV', 'TLT']
 
-    def fetch_full_universe(self) -> List[str]:
+    def fetch_full_universe(self, force_refresh: bool = False) -> List[str]:
+        """Full universe (S&P 500 + NASDAQ 100 + key ETFs) from the cached universe registry"""
         logger.info("Fetching full stock universe...")
-        sp500 = self.fetch_sp500_tickers()
-        nasdaq = self.fetch_nasdaq100_tickers()
-        etfs = self.fetch_key_etfs()
-        combined = list(set(sp500 + nasdaq + etfs))
-        
-        # Filter out problematic tickers
-        excluded = ['BF-B', 'BRK-B']
-        combined = [t for t in combined if t not in excluded]
-        
-        combined.sort()
+        combined = self.universe.latest(force_refresh=force_refresh).symbols()
         logger.info(f"Full Universe: {len(combined)} unique symbols")
         return combined
 
     def fetch_batch_data(self, tickers: List[str]) -> Dict[str, Tuple[Optional[FundamentalData], Optional[TechnicalData]]]:
         """
         Fetch data for multiple stocks using Optimized S3 Cache + Incremental Fetch
+        
+        The loaded bars stay in `bar_cache`, so later fetch_price_history(ies)
+        calls for these symbols need no further requests.
         """
         results = {}
-        rocs = []
-        valid_tickers = []
         
         if not self.client:
             logger.error("Alpaca Client not initialized.")
@@ -261,46 +291,17 @@ class DataFetcher:
         logger.info(f"Starting Optimized Batch Fetch for {len(tickers)} tickers...")
         
         try:
-            # 1. Fetch Aggregated Data
-            all_data = self.fetch_market_data(tickers, days=400, use_cache=True)
-            
-            if all_data.empty:
-                logger.warning("No data returned from fetch_market_data")
+            # 1. Technicals + RS rating for every symbol in one vectorized pass
+            snapshot = self.fetch_technical_snapshot(tickers)
+            if snapshot.empty:
                 return {}
-                
-            # 2. Process per ticker
-            # Group by Symbol
-            grouped = all_data.groupby('Symbol')
             
-            for symbol, group in grouped:
+            # 2. Fundamentals per ticker (stale/missing sectors refreshed in one batch)
+            self.fundamentals.get_many(list(snapshot.index))
+            for symbol, tech_data in snapshot_to_technical_data(snapshot).items():
                 try:
-                    # Convert to Format expected by _process_technical_data
-                    # Needs Index=Date (Datetime)
-                    df = group.set_index('Date').sort_index()
-                    # Rename columns to match expected: Open, High, Low, Close, Volume
-                    # Already CamelCase from _alpaca_bars_to_df conversion if it came from there?
-                    # fetch_market_data normalizes to CamelCase? No it relied on _alpaca_bars_to_df which does CamelCase.
-                    # But if loaded from Parquet, columns are preserved.
-                    # Let's ensure columns are correct.
-                    
-                    if len(df) < 130: continue
-                    
-                    # Technicals
-                    tech_data = self._process_technical_data(symbol, df)
-                    if not tech_data: continue
-                    
-                    # Rate of Change
-                    current_price = tech_data.current_price
-                    price_12m_ago = df['Close'].iloc[-250] if len(df) >= 250 else df['Close'].iloc[0]
-                    roc_12m = ((current_price - price_12m_ago) / price_12m_ago) * 100
-                    rocs.append(roc_12m)
-                    valid_tickers.append(symbol)
-                    
-                    # Fundamentals
                     fund_data = self._process_fundamental_data(symbol, {})
-                    
                     results[symbol] = (fund_data, tech_data)
-                    
                 except Exception as e:
                     logger.debug(f"Error processing {symbol}: {e}")
                     continue
@@ -308,25 +309,63 @@ class DataFetcher:
         except Exception as e:
             logger.error(f"Batch fetch failed: {e}")
             return {}
-
-        # RS Rating Calculation
-        rs_scores = {}
-        if rocs:
-             roc_series = pd.Series(rocs, index=valid_tickers)
-             pct_ranks = roc_series.rank(pct=True) * 99
-             rs_scores = pct_ranks.to_dict()
-        
-        for ticker, (fund, tech) in results.items():
-            if ticker in rs_scores:
-                tech.rs_rating = rs_scores[ticker]
                 
         return results
 
+    def fetch_technical_snapshot(self, tickers: List[str], days: int = 400) -> pd.DataFrame:
+        """
+        Latest technical indicators for many symbols as a columnar table
+        
+        Returns:
+            DataFrame indexed by Symbol (see technical_snapshot.SNAPSHOT_COLUMNS)
+        """
+        all_data = self.fetch_market_data(tickers, days=days, use_cache=True)
+        self._cache_bars(all_data, days)
+        
+        if all_data.empty:
+            logger.warning("No data returned from fetch_market_data")
+            return build_technical_snapshot(all_data)
+            
+        snapshot = build_technical_snapshot(all_data)
+        logger.info(f"Technical snapshot built for {len(snapshot)} symbols")
+        return snapshot
+
+    # ==================== BAR CACHE ====================
+
+    def _cache_bars(self, data: pd.DataFrame, days: int):
+        """Keep the long-format bars behind a snapshot for later history lookups"""
+        try:
+            self.bar_cache = BarPanel(data) if not data.empty else None
+            self._bar_cache_days = days if self.bar_cache is not None else 0
+        except Exception as e:
+            logger.warning(f"Could not cache snapshot bars: {e}")
+            self.bar_cache, self._bar_cache_days = None, 0
+
+    def cached_history(self, symbol: str, days: int = 400) -> Optional[pd.DataFrame]:
+        """
+        History for `symbol` from the bars loaded by fetch_batch_data /
+        fetch_technical_snapshot, in the fetch_price_history layout
+
+        Returns:
+            DataFrame, or None if the cache doesn't hold the symbol or covers
+            fewer than `days` days
+        """
+        if self.bar_cache is None or days > self._bar_cache_days or symbol not in self.bar_cache:
+            return None
+        df = self.bar_cache[symbol]
+        cutoff = pd.Timestamp.now(tz='UTC') - timedelta(days=days)
+        df = df[df.index >= cutoff].rename(columns=str.lower)
+        return df if not df.empty else None
+
     def fetch_price_history(self, symbol: str, days: int = 400) -> pd.DataFrame:
         """
         Fetch historical price data as DataFrame (Date, Open, High, Low, Close, Volume)
         Used by MarketAnalyzer for custom calculations.
         """
+        cached = self.cached_history(symbol, days)
+        if cached is not None:
+            return cached
+        
         if not self.client:
             logger.error("Alpaca Client not initialized.")
             return pd.DataFrame()
@@ -337,12 +376,12 @@ class DataFetcher:
                 timeframe=TimeFrame.Day,
                 start=datetime.now() - timedelta(days=days)
             )
-            bars = self.client.get_stock_bars(request_params)
+            bars = bars_payload(self.client.get_stock_bars(request_params))
             
-            if symbol not in bars.data:
+            if symbol not in bars:
                 return pd.DataFrame()
                 
-            df = self._alpaca_bars_to_df(bars.data[symbol])
+            df = self._alpaca_bars_to_df(bars[symbol])
             
             # Ensure Lowercase columns if expected by Analyzer
             df.columns = [c.lower() for c in df.columns]
@@ -352,53 +391,59 @@ class DataFetcher:
             logger.error(f"Error fetching history for {symbol}: {e}")
             raise DataFetchError(f"Failed to fetch history for {symbol}: {e}")
 
-    def fetch_bulk_history(self, tickers: List[str], period: str = "1y") -> pd.DataFrame:
+    def fetch_price_histories(self, symbols: List[str], days: int = 400) -> Dict[str, pd.DataFrame]:
         """
-        Fetch historical data for multiple stickers and return a MultiIndex DataFrame.
+        Fetch price histories for several symbols in scheduled multi-symbol requests.
+        Returns symbol -> DataFrame with the same lowercase layout as fetch_price_history.
+        Symbols held by the bar cache are served from memory.
         """
+        histories = {}
+        missing = []
+        for symbol in symbols:
+            cached = self.cached_history(symbol, days)
+            if cached is not None:
+                histories[symbol] = cached
+            else:
+                missing.append(symbol)
+        if histories:
+            logger.info(f"Served {len(histories)}/{len(symbols)} histories from the bar cache")
+        if not missing:
+            return histories
+        
         if not self.client:
             logger.error("Alpaca Client not initialized.")
-            return pd.DataFrame()
+            return histories
+        
+        result = self.scheduler.fetch(missing, start=datetime.now() - timedelta(days=days),
+                                      transform=bars_to_long_frame)
+        
+        for symbol, df in self._split_long_frame(result.chunks).items():
+            df.columns = [c.lower() for c in df.columns]
+            histories[symbol] = df
+        return histories
+
+    def fetch_bulk_history(self, tickers: List[str], period: str = "1y") -> BarPanel:
+        """
+        Fetch historical data for multiple tickers.
+
+        Returns:
+            BarPanel: `panel[ticker]` is that ticker's OHLCV frame, and
+            `panel.to_long()` is the long (Date, Symbol, ...) layout. An empty
+            panel is returned if nothing could be fetched.
+        """
+        if not self.client:
+            logger.error("Alpaca Client not initialized.")
+            return BarPanel.from_chunks([])
 
         days = 400
         if period == "2y": days = 730
         
         start_date = datetime.now() - timedelta(days=days)
         
-        all_dfs = {}
-        chunk_size = 200
-        
         logger.info(f"Fetching bulk history for {len(tickers)} tickers...")
         
-        for i in range(0, len(tickers), chunk_size):
-            chunk = tickers[i:i + chunk_size]
-            try:
-                request_params = StockBarsRequest(
-                    symbol_or_symbols=chunk,
-                    timeframe=TimeFrame.Day,
-                    start=start_date
-                )
-                bars = self.client.get_stock_bars(request_params)
-                
-                for symbol, symbol_bars in bars.data.items():
-                    df = self._alpaca_bars_to_df(symbol_bars)
-                    if not df.empty:
-                        all_dfs[symbol] = df
-                        
-            except Exception as e:
-                logger.error(f"Error fetching chunk {i}: {e}")
-                continue
-                
-        if not all_dfs:
-            return pd.DataFrame()
-            
-        try:
-             # keys=tickers ensure top level index is the Ticker
-            multi_df = pd.concat(all_dfs.values(), axis=1, keys=all_dfs.keys())
-            return multi_df
-        except Exception as e:
-            logger.error(f"Error concatenating bulk data: {e}")
-            raise DataFetchError(f"Failed to concatenate bulk data: {e}")
+        result = self.scheduler.fetch(tickers, start=start_date, transform=bars_to_long_frame)
+        return BarPanel.from_chunks(result.chunks)
 
     def get_fundamental_data(self, symbol: str) -> Optional[FundamentalData]:
         """Fetch fundamental data (Placeholder for Alpaca transition)"""
@@ -414,12 +459,12 @@ class DataFetcher:
                 timeframe=TimeFrame.Day,
                 start=datetime.now() - timedelta(days=400)
             )
-            bars = self.client.get_stock_bars(request_params)
+            bars = bars_payload(self.client.get_stock_bars(request_params))
             
-            if symbol not in bars.data:
+            if symbol not in bars:
                 return None, None
                 
-            df = self._alpaca_bars_to_df(bars.data[symbol])
+            df = self._alpaca_bars_to_df(bars[symbol])
             
             tech_data = self._process_technical_data(symbol, df)
             fund_data = self._process_fundamental_data(symbol, {})
@@ -431,61 +476,30 @@ class DataFetcher:
             return None, None
     
     def _alpaca_bars_to_df(self, bars: List) -> pd.DataFrame:
-        """Convert Alpaca Bar objects to DataFrame compatible with technical analysis"""
-        data = [
-            {
-                'timestamp': b.timestamp,
-                'Open': b.open,
-                'High': b.high,
-                'Low': b.low,
-                'Close': b.close,
-                'Volume': b.volume
-            }
-            for b in bars
-        ]
-        df = pd.DataFrame(data)
-        df.set_index('timestamp', inplace=True)
-        return df
+        """Convert Alpaca bars (objects or raw dicts) to DataFrame compatible with technical analysis"""
+        return bars_to_frame(bars)
+
+    def _split_long_frame(self, frames: List[pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """Split long-format chunk frames into per-symbol frames indexed by timestamp"""
+        return dict(BarPanel.from_chunks(frames).items())
 
     
     def _load_sector_cache(self):
-        """Load static sector map from S3"""
+        """Load static sector map from S3 (or the data provider)"""
+        if self.provider is not None:
+            self.sector_cache = self.provider.sectors()
+            return
         try:
             key = "min_data/sectors.json"
-            response = self.s3_client.get_object(Bucket=S3_BUCKET, Key=key)
-            content = response['Body'].read().decode('utf-8')
-            self.sector_cache = json.loads(content)
+            self.sector_cache = self.s3_cache.get_json(S3_BUCKET, key)
             logger.info(f"Loaded {len(self.sector_cache)} sectors from S3 cache.")
         except Exception as e:
             logger.error(f"Failed to load static sector cache from S3 (Key: {key}): {e}")
             self.sector_cache = {}
 
     def _process_fundamental_data(self, symbol: str, info: Dict) -> FundamentalData:
-        """Fetch Fundamentals using S3 Cache then yfinance fallback"""
-        sector = 'N/A'
-        
-        # 1. Try S3 Cache
-        if hasattr(self, 'sector_cache') and symbol in self.sector_cache:
-            sector = self.sector_cache[symbol]
-        
-        # 2. Try yfinance (with session fix)
-        if sector == 'N/A' or not sector: 
-            try:
-                # Use yfinance for Sector (Lightweight)
-                import yfinance as yf
-                import requests
-    
-                session = requests.Session()
-                session.headers.update({
-             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                })
-    
-                ticker = yf.Ticker(symbol, session=session)
-                # Use fast_info if available or info
-                sector = ticker.info.get('sector', 'N/A')
-            except Exception as e:
-                logger.warning(f"Sector fetch failed for {symbol}: {e}")
-                pass
+        """Build FundamentalData using the cached sector lookup (sectors.json seed, then yfinance)"""
+        sector = self.fundamentals.get(symbol)['sector'] or 'N/A'
             
         return FundamentalData(
             symbol=symbol,
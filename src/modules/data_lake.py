@@ -0,0 +1,453 @@
+"""
+Module: Data Lake
+Typed Parquet storage and bulk loading for daily price history.
+
+Each symbol is stored as `lake/daily/{symbol}.parquet` (zstd compressed) with
+a fixed schema: `Date` as timestamp[ns], float32 OHLC, int64 Volume and
+float32 corporate-action columns. Reads use pyarrow directly, project to the
+requested columns, and push date bounds down to the row groups. All I/O goes
+through the S3Manager of the lake's client: `read()` streams one object into
+Arrow with read_arrow(), and `load()` fetches many symbols with get_many() and
+decodes them on its worker threads (pyarrow releases the GIL).
+
+`lake/manifest.json` (LakeManifest) holds per-symbol metadata: date range, row
+count, size, schema version, checksum and liquidity. Writers keep it current,
+and readers use it to choose symbols without listing the bucket.
+
+The legacy `historical_data/{symbol}.csv` objects are still read as a
+fallback until `scripts/data/migrate_lake_to_parquet.py` has converted them.
+"""
+import hashlib
+import json
+import logging
+import threading
+from io import BytesIO
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.config import settings
+from src.utils.aws_utils import s3_manager_for
+
+logger = logging.getLogger("data_lake")
+
+LAKE_PREFIX = "lake/daily/"
+MANIFEST_KEY = "lake/manifest.json"
+CSV_PREFIX = "historical_data/"
+LAKE_SCHEMA_VERSION = 1
+LIQUIDITY_WINDOW = 50   # Bars averaged for the manifest's liquidity stats
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+LAKE_SCHEMA = pa.schema(
+    [
+        pa.field('Date', pa.timestamp('ns')),
+        pa.field('Open', pa.float32()),
+        pa.field('High', pa.float32()),
+        pa.field('Low', pa.float32()),
+        pa.field('Close', pa.float32()),
+        pa.field('Volume', pa.int64()),
+        pa.field('Dividends', pa.float32()),
+        pa.field('Stock Splits', pa.float32()),
+    ],
+    metadata={b'lake_schema_version': str(LAKE_SCHEMA_VERSION).encode()}
+)
+LAKE_COLUMNS = [f.name for f in LAKE_SCHEMA if f.name != 'Date']
+
+
+def _naive_dates(index) -> pd.DatetimeIndex:
+    """Exchange-local, tz-naive dates (yfinance CSVs can carry mixed UTC offsets)"""
+    try:
+        parsed = pd.DatetimeIndex(pd.to_datetime(index))
+    except (ValueError, TypeError):
+        parsed = pd.DatetimeIndex(pd.to_datetime(index, utc=True)).tz_convert('America/New_York')
+    if parsed.tz is not None:
+        parsed = parsed.tz_localize(None)
+    return parsed.as_unit('ns')
+
+
+def normalize_history(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Coerce a daily history frame (yfinance/CSV layout) to the lake schema
+
+    Returns:
+        Frame with a naive DatetimeIndex named 'Date' and LAKE_COLUMNS
+    """
+    df = df.copy()
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    if 'Date' in df.columns:
+        df = df.set_index('Date')
+
+    df.index = _naive_dates(df.index)
+    df.index.name = 'Date'
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+
+    out = pd.DataFrame(index=df.index)
+    for col in LAKE_COLUMNS:
+        values = df[col] if col in df.columns else pd.Series(0, index=df.index)
+        if col == 'Volume':
+            out[col] = pd.to_numeric(values, errors='coerce').fillna(0).round().astype(np.int64)
+        else:
+            out[col] = pd.to_numeric(values, errors='coerce').astype(np.float32)
+    return out
+
+
+def frame_to_parquet_bytes(df: pd.DataFrame) -> bytes:
+    """Serialize a normalized history frame with the lake schema"""
+    table = pa.Table.from_pandas(df.reset_index(), schema=LAKE_SCHEMA, preserve_index=False)
+    buffer = BytesIO()
+    pq.write_table(table, buffer, compression='zstd')
+    return buffer.getvalue()
+
+
+def parquet_bytes_to_frame(
+    body: bytes,
+    columns: Optional[List[str]] = None,
+    start=None,
+    end=None
+) -> pd.DataFrame:
+    """Decode a lake object, projecting `columns` and filtering by date"""
+    read_columns, filters = _parquet_selection(columns, start, end)
+    table = pq.read_table(BytesIO(body), columns=read_columns, filters=filters)
+    return table.to_pandas().set_index('Date')
+
+
+def _parquet_selection(columns: Optional[List[str]], start, end):
+    """pyarrow (columns, filters) for a lake read"""
+    read_columns = None if columns is None else ['Date'] + [c for c in columns if c != 'Date']
+    filters = []
+    if start is not None:
+        filters.append(('Date', '>=', pd.Timestamp(start).to_datetime64()))
+    if end is not None:
+        filters.append(('Date', '<=', pd.Timestamp(end).to_datetime64()))
+    return read_columns, filters or None
+
+
+def csv_bytes_to_frame(
+    body: bytes,
+    columns: Optional[List[str]] = None,
+    start=None,
+    end=None
+) -> pd.DataFrame:
+    """Decode a legacy CSV object into the lake schema, projecting and filtering like Parquet reads"""
+    df = normalize_history(pd.read_csv(BytesIO(body), index_col=0, parse_dates=True))
+    if start is not None:
+        df = df[df.index >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df.index <= pd.Timestamp(end)]
+    return df if columns is None else df[[c for c in columns if c != 'Date']]
+
+
+def frame_checksum(df: pd.DataFrame) -> str:
+    """Content hash of a normalized history frame (index + values)"""
+    hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return hashlib.sha256(hashed.tobytes()).hexdigest()
+
+
+def history_stats(df: pd.DataFrame, liquidity_window: int = LIQUIDITY_WINDOW) -> Dict:
+    """Manifest metadata describing a normalized history frame"""
+    tail = df.iloc[-liquidity_window:]
+    close = tail['Close'].to_numpy(dtype=np.float64)
+    volume = tail['Volume'].to_numpy(dtype=np.float64)
+    return {
+        'first_date': df.index[0].strftime('%Y-%m-%d'),
+        'last_date': df.index[-1].strftime('%Y-%m-%d'),
+        'rows': len(df),
+        'checksum': frame_checksum(df),
+        'last_close': round(float(close[-1]), 4),
+        'avg_volume': round(float(np.nanmean(volume)), 1),
+        'avg_dollar_volume': round(float(np.nanmean(close * volume)), 1),
+    }
+
+
+class LakeManifest:
+    """
+    Per-symbol index of the lake, stored as one JSON object
+
+    Writers (`DataLake.write`, the updater, the migration) record an entry for
+    every object they store, so readers can select symbols by history length,
+    date coverage or liquidity without listing or downloading anything.
+
+    Entry fields:
+        first_date, last_date   "YYYY-MM-DD" range of stored bars
+        rows, bytes             Bar count and Parquet object size
+        schema_version          LAKE_SCHEMA_VERSION the object was written with
+        checksum                frame_checksum of the stored history
+        last_close, avg_volume, avg_dollar_volume
+                                Liquidity over the last LIQUIDITY_WINDOW bars
+        checked_at              Last date the updater checked the symbol
+    """
+
+    def __init__(self, s3_client, bucket: str = settings.S3_BUCKET, key: str = MANIFEST_KEY):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> "LakeManifest":
+        try:
+            obj = self.s3_client.get_object(Bucket=self.bucket, Key=self.key)
+            self.entries = json.loads(obj['Body'].read().decode('utf-8'))
+        except self.s3_client.exceptions.NoSuchKey:
+            logger.info(f"No lake manifest at s3://{self.bucket}/{self.key}; starting empty")
+            self.entries = {}
+        return self
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def symbols(self) -> List[str]:
+        return sorted(self.entries)
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self.entries.get(symbol)
+            return dict(entry) if entry else None
+
+    def update(self, symbol: str, **fields):
+        with self._lock:
+            self.entries.setdefault(symbol, {}).update(fields)
+
+    def record(self, symbol: str, df: pd.DataFrame, nbytes: Optional[int] = None, **fields):
+        """Replace a symbol's metadata from its full stored (normalized) history"""
+        entry = history_stats(df)
+        entry.update(bytes=nbytes, schema_version=LAKE_SCHEMA_VERSION, **fields)
+        self.update(symbol, **entry)
+
+    def select(
+        self,
+        min_rows: int = 0,
+        start=None,
+        end=None,
+        min_avg_dollar_volume: Optional[float] = None,
+        min_price: Optional[float] = None
+    ) -> List[str]:
+        """
+        Symbols whose stored history satisfies every given constraint
+
+        Args:
+            min_rows: Minimum bar count
+            start: History must begin on or before this date
+            end: History must extend to this date or later
+            min_avg_dollar_volume: Minimum recent average Close * Volume
+            min_price: Minimum last close
+
+        Returns:
+            Sorted symbol list
+        """
+        start = None if start is None else pd.Timestamp(start).strftime('%Y-%m-%d')
+        end = None if end is None else pd.Timestamp(end).strftime('%Y-%m-%d')
+        selected = []
+        with self._lock:
+            for symbol, entry in self.entries.items():
+                if entry.get('rows', 0) < min_rows:
+                    continue
+                if start is not None and entry.get('first_date', '9999') > start:
+                    continue
+                if end is not None and entry.get('last_date', '') < end:
+                    continue
+                if min_avg_dollar_volume is not None and entry.get('avg_dollar_volume', 0) < min_avg_dollar_volume:
+                    continue
+                if min_price is not None and entry.get('last_close', 0) < min_price:
+                    continue
+                selected.append(symbol)
+        return sorted(selected)
+
+    def save(self):
+        with self._lock:
+            body = json.dumps(self.entries, sort_keys=True)
+        self.s3_client.put_object(Bucket=self.bucket, Key=self.key, Body=body, ContentType='application/json')
+
+
+class DataLake:
+    """Read and write the typed Parquet price lake in S3"""
+
+    def __init__(
+        self,
+        s3_client=None,
+        bucket: str = settings.S3_BUCKET,
+        prefix: str = LAKE_PREFIX,
+        max_workers: int = 16,
+        csv_fallback: bool = True,
+        manifest: Optional[LakeManifest] = None
+    ):
+        """
+        Args:
+            s3_client: boto3 S3 client (default: the shared pooled client)
+            bucket: Lake bucket
+            prefix: Key prefix of the Parquet objects
+            max_workers: Concurrent downloads in load()
+            csv_fallback: Read legacy CSV objects for symbols not yet migrated
+            manifest: Loaded manifest; write() records into it and load()
+                prefilters with it (the caller saves it)
+        """
+        self.bucket = bucket
+        self.prefix = prefix
+        self.max_workers = max(1, max_workers)
+        self.csv_fallback = csv_fallback
+        self.s3 = s3_manager_for(s3_client)
+        self.s3_client = self.s3.s3_client
+        self.manifest = manifest
+
+    def open_manifest(self) -> LakeManifest:
+        """Load (once) and attach the lake's manifest"""
+        if self.manifest is None:
+            self.manifest = LakeManifest(self.s3_client, bucket=self.bucket).load()
+        return self.manifest
+
+    def key(self, symbol: str) -> str:
+        return f"{self.prefix}{symbol}.parquet"
+
+    # ==================== WRITE ====================
+
+    def write(self, symbol: str, df: pd.DataFrame, **manifest_fields) -> int:
+        """
+        Store a symbol's full history (and record it in the attached manifest)
+
+        Args:
+            symbol: Ticker
+            df: Full history in yfinance/CSV layout
+            **manifest_fields: Extra fields stored on the manifest entry
+
+        Returns:
+            Bytes written
+        """
+        df = normalize_history(df)
+        body = frame_to_parquet_bytes(df)
+        self.s3_client.put_object(Bucket=self.bucket, Key=self.key(symbol), Body=body)
+        if self.manifest is not None:
+            self.manifest.record(symbol, df, nbytes=len(body), **manifest_fields)
+        return len(body)
+
+    # ==================== READ ====================
+
+    def csv_key(self, symbol: str) -> str:
+        return f"{CSV_PREFIX}{symbol}.csv"
+
+    def _read_csv(self, symbol: str, columns: Optional[List[str]], start, end) -> pd.DataFrame:
+        return csv_bytes_to_frame(self.s3.get_bytes(self.bucket, self.csv_key(symbol)), columns, start, end)
+
+    def read_parquet(self, symbol: str, columns: Optional[List[str]] = None, start=None, end=None) -> pd.DataFrame:
+        """One symbol's Parquet object (raises NoSuchKey if it is not in the lake)"""
+        read_columns, filters = _parquet_selection(columns, start, end)
+        table = self.s3.read_arrow(self.bucket, self.key(symbol), columns=read_columns, filters=filters)
+        return table.to_pandas().set_index('Date')
+
+    def read(
+        self,
+        symbol: str,
+        columns: Optional[List[str]] = None,
+        start=None,
+        end=None
+    ) -> pd.DataFrame:
+        """
+        Load one symbol
+
+        Args:
+            symbol: Ticker
+            columns: Columns to load (default: all); Date is always the index
+            start: First date to include
+            end: Last date to include
+
+        Returns:
+            DataFrame indexed by Date (empty if the symbol is not in the lake)
+        """
+        try:
+            return self.read_parquet(symbol, columns, start, end)
+        except self.s3_client.exceptions.NoSuchKey:
+            if not self.csv_fallback:
+                return pd.DataFrame()
+        except Exception as e:
+            logger.debug(f"Lake read failed for {symbol}: {e}")
+            return pd.DataFrame()
+
+        try:
+            return self._read_csv(symbol, columns, start, end)
+        except Exception as e:
+            logger.debug(f"No lake data for {symbol}: {e}")
+            return pd.DataFrame()
+
+    def load(
+        self,
+        symbols: Iterable[str],
+        columns: Optional[List[str]] = None,
+        start=None,
+        end=None,
+        min_rows: int = 0
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Load many symbols in parallel
+
+        With a manifest attached, symbols it knows to hold fewer than
+        `min_rows` bars or no bars inside [start, end] are skipped before
+        anything is downloaded.
+
+        Args:
+            symbols: Tickers
+            columns: Columns to load (default: all)
+            start: First date to include
+            end: Last date to include
+            min_rows: Minimum bars in the full stored history
+
+        Returns:
+            Dict of symbol -> DataFrame (symbols without data are omitted)
+        """
+        symbols = list(dict.fromkeys(symbols))
+        requested = len(symbols)
+        if self.manifest is not None:
+            symbols = [s for s in symbols if self.may_have_data(s, start, end, min_rows)]
+            if len(symbols) < requested:
+                logger.info(f"Manifest prefilter skipped {requested - len(symbols)} symbols")
+
+        keys = {self.key(s): s for s in symbols}
+        frames = self.s3.get_many(self.bucket, keys, max_workers=self.max_workers,
+                                  decoder=lambda body: parquet_bytes_to_frame(body, columns, start, end))
+        found = {keys[key]: df for key, df in frames.items()}
+        if self.csv_fallback and len(found) < len(symbols):
+            csv_keys = {self.csv_key(s): s for s in symbols if s not in found}
+            frames = self.s3.get_many(self.bucket, csv_keys, max_workers=self.max_workers,
+                                      decoder=lambda body: csv_bytes_to_frame(body, columns, start, end))
+            found.update({csv_keys[key]: df for key, df in frames.items()})
+        data = {s: found[s] for s in symbols if s in found and not found[s].empty}
+        if min_rows and start is None and end is None:
+            data = {s: df for s, df in data.items() if len(df) >= min_rows}
+        logger.info(f"Loaded {len(data)}/{requested} symbols from the lake")
+        return data
+
+    def may_have_data(self, symbol: str, start, end, min_rows: int) -> bool:
+        """Manifest check; symbols missing from the manifest are always read"""
+        entry = self.manifest.get(symbol)
+        if not entry or 'rows' not in entry:
+            return True
+        if entry['rows'] < min_rows:
+            return False
+        if start is not None and entry['last_date'] < pd.Timestamp(start).strftime('%Y-%m-%d'):
+            return False
+        if end is not None and entry['first_date'] > pd.Timestamp(end).strftime('%Y-%m-%d'):
+            return False
+        return True
+
+    def list_symbols(self, include_csv: bool = True) -> List[str]:
+        """Symbols present in the lake (and, optionally, legacy CSVs)"""
+        prefixes = [(self.prefix, '.parquet')]
+        if include_csv and self.csv_fallback:
+            prefixes.append((CSV_PREFIX, '.csv'))
+
+        symbols = set()
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for prefix, suffix in prefixes:
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+                for obj in page.get('Contents', []):
+                    name = obj['Key'][len(prefix):]
+                    if name.endswith(suffix):
+                        symbols.add(name[:-len(suffix)])
+        return sorted(symbols)
@@ -0,0 +1,333 @@
+"""
+Module: Data Providers
+Pluggable sources of market data for DataFetcher and MarketAnalyzer.
+
+By default DataFetcher talks to the live services: Alpaca for bars, S3 for
+sectors and VIX, Wikipedia for index membership and yfinance for
+fundamentals. A `DataProvider` replaces all of them at once.
+
+`ReplayProvider` serves data recorded to a local directory, so handlers and
+benchmarks run end-to-end without network. Its bars client has the same
+`get_stock_bars` call and raw payload shape as the Alpaca client. It can also
+simulate per-request latency and a request quota, raising 429-style errors
+that BarFetchScheduler backs off from.
+
+Replay directory layout:
+    bars/<SYMBOL>.parquet | .csv    Daily OHLCV indexed by Date
+    universe/<index>.json           Ticker list per index (sp500, nasdaq100)
+    sectors.json                    {symbol: sector}
+    vix.json                        {"price": float}
+    fundamentals.json               {symbol: {field: value}} (optional)
+    meta.json                       {"recorded_at": "YYYY-MM-DD"}
+    state/                          Scratch space written during replay
+
+Callers ask for "the last N days", so recorded bars are rebased by default:
+served timestamps move forward by whole weeks from `recorded_at` to today
+(weekdays are preserved), and request windows move back by the same offset.
+"""
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from src.config import settings
+
+logger = logging.getLogger("data_providers")
+
+EXCHANGE_TZ = 'America/New_York'
+
+
+class DataProvider(ABC):
+    """Everything DataFetcher needs from the outside world"""
+
+    name = "provider"
+
+    @abstractmethod
+    def bars_client(self):
+        """Client exposing get_stock_bars(StockBarsRequest) like the Alpaca client"""
+
+    @abstractmethod
+    def index_members(self, index: str) -> List[str]:
+        """Constituents of an index ('sp500', 'nasdaq100')"""
+
+    @abstractmethod
+    def sectors(self) -> Dict[str, str]:
+        """Static symbol -> sector map"""
+
+    @abstractmethod
+    def vix(self) -> Dict[str, Any]:
+        """Latest VIX reading, {"price": float}"""
+
+    @abstractmethod
+    def fundamentals(self, symbol: str) -> Dict[str, Any]:
+        """Fundamentals fields for FundamentalsCache; raises LookupError on a miss"""
+
+    @property
+    def state_dir(self) -> Path:
+        """Writable directory for provider-scoped state (universe snapshots, ...)"""
+        return settings.DATA_DIR
+
+
+class ReplayRateLimitError(Exception):
+    """Simulated HTTP 429 from the replay bars client"""
+    status_code = 429
+
+
+class ReplayBarsClient:
+    """Alpaca-compatible bars client serving recorded history"""
+
+    def __init__(
+        self,
+        provider: "ReplayProvider",
+        latency: float = 0.0,
+        requests_per_minute: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            provider: Source of the recorded bars
+            latency: Seconds added to every request
+            requests_per_minute: Simulated quota; excess requests raise
+                ReplayRateLimitError (0 = unlimited)
+            clock: Monotonic clock (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+        """
+        self.provider = provider
+        self.latency = latency
+        self.requests_per_minute = requests_per_minute
+        self._clock = clock
+        self._sleep = sleep
+        self._recent: deque = deque()
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'rate_limited': 0, 'bars': 0}
+
+    def _admit(self):
+        if not self.requests_per_minute:
+            return
+        with self._lock:
+            now = self._clock()
+            while self._recent and now - self._recent[0] >= 60.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.requests_per_minute:
+                self.stats['rate_limited'] += 1
+                raise ReplayRateLimitError("429 Too Many Requests (replay quota)")
+            self._recent.append(now)
+
+    def get_stock_bars(self, request) -> Dict[str, List[Dict]]:
+        """Raw payload {symbol: [{'t', 'o', 'h', 'l', 'c', 'v'}, ...]}"""
+        self._admit()
+        if self.latency:
+            self._sleep(self.latency)
+
+        symbols = request.symbol_or_symbols
+        symbols = [symbols] if isinstance(symbols, str) else list(symbols)
+        payload = {}
+        for symbol in symbols:
+            bars = self.provider.raw_bars(symbol, request.start, request.end)
+            if bars:
+                payload[symbol] = bars
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['bars'] += sum(len(b) for b in payload.values())
+        return payload
+
+
+def _as_utc(value) -> Optional[pd.Timestamp]:
+    if value is None:
+        return None
+    ts = pd.Timestamp(value)
+    return ts.tz_localize(EXCHANGE_TZ).tz_convert('UTC') if ts.tz is None else ts.tz_convert('UTC')
+
+
+class ReplayProvider(DataProvider):
+    """Serve recorded bars, universe, sectors, VIX and fundamentals from disk"""
+
+    name = "replay"
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        latency: float = 0.0,
+        requests_per_minute: int = 0,
+        rebase: bool = True,
+        today: Optional[pd.Timestamp] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            root: Replay directory (default: settings.REPLAY_DATA_DIR)
+            latency: Simulated seconds per bars request
+            requests_per_minute: Simulated bars quota (0 = unlimited)
+            rebase: Shift recorded bars so the recording date becomes today
+            today: Date the recording is rebased to (default: now)
+            clock: Monotonic clock for the quota (injectable for tests)
+            sleep: Sleep used for latency (injectable for tests)
+        """
+        self.root = Path(root or settings.REPLAY_DATA_DIR)
+        if not self.root.exists():
+            raise FileNotFoundError(f"Replay directory not found: {self.root}")
+        self.offset = pd.Timedelta(0)
+        recorded_at = self._json("meta.json", {}).get('recorded_at')
+        if rebase and recorded_at:
+            today = pd.Timestamp(today if today is not None else pd.Timestamp.now()).normalize()
+            weeks = max(0, (today - pd.Timestamp(recorded_at)).days // 7)
+            self.offset = pd.Timedelta(weeks=weeks)
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._frames_lock = threading.Lock()
+        self._client = ReplayBarsClient(self, latency, requests_per_minute, clock, sleep)
+
+    @property
+    def state_dir(self) -> Path:
+        return self.root / "state"
+
+    def _json(self, name: str, default):
+        path = self.root / name
+        if not path.exists():
+            return default
+        with open(path) as f:
+            return json.load(f)
+
+    # ==================== BARS ====================
+
+    def history(self, symbol: str) -> pd.DataFrame:
+        """Recorded daily history (UTC timestamps at the exchange-local midnight)"""
+        with self._frames_lock:
+            if symbol in self._frames:
+                return self._frames[symbol]
+
+        df = pd.DataFrame()
+        for suffix, reader in (('.parquet', pd.read_parquet),
+                               ('.csv', lambda p: pd.read_csv(p, index_col=0, parse_dates=True))):
+            path = self.root / "bars" / f"{symbol}{suffix}"
+            if path.exists():
+                df = reader(path)
+                break
+        if not df.empty:
+            if 'Date' in df.columns:
+                df = df.set_index('Date')
+            index = pd.DatetimeIndex(df.index)
+            index = index.tz_localize(EXCHANGE_TZ) if index.tz is None else index
+            df.index = index.tz_convert('UTC')
+            df = df.sort_index()
+
+        with self._frames_lock:
+            self._frames[symbol] = df
+        return df
+
+    def raw_bars(self, symbol: str, start=None, end=None) -> List[Dict]:
+        df = self.history(symbol)
+        if df.empty:
+            return []
+        start, end = _as_utc(start), _as_utc(end)
+        if start is not None:
+            df = df[df.index >= start - self.offset]
+        if end is not None:
+            df = df[df.index <= end - self.offset]
+        if df.empty:
+            return []
+        records = pd.DataFrame({
+            't': (df.index + self.offset).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'o': df['Open'].to_numpy(), 'h': df['High'].to_numpy(),
+            'l': df['Low'].to_numpy(), 'c': df['Close'].to_numpy(),
+            'v': df['Volume'].to_numpy(),
+        })
+        return records.to_dict('records')
+
+    def bars_client(self) -> ReplayBarsClient:
+        return self._client
+
+    # ==================== REFERENCE DATA ====================
+
+    def index_members(self, index: str) -> List[str]:
+        return list(self._json(f"universe/{index}.json", []))
+
+    def sectors(self) -> Dict[str, str]:
+        return self._json("sectors.json", {})
+
+    def vix(self) -> Dict[str, Any]:
+        return self._json("vix.json", {})
+
+    def fundamentals(self, symbol: str) -> Dict[str, Any]:
+        values = self._json("fundamentals.json", {}).get(symbol)
+        if not values or not values.get('sector'):
+            sector = self.sectors().get(symbol)
+            if not sector:
+                raise LookupError(f"No recorded fundamentals for {symbol}")
+            values = {'sector': sector}
+        return values
+
+
+def record_replay(
+    root: Path,
+    histories: Dict[str, pd.DataFrame],
+    universe: Optional[Dict[str, Iterable[str]]] = None,
+    sectors: Optional[Dict[str, str]] = None,
+    vix: Optional[Dict[str, Any]] = None,
+    fundamentals: Optional[Dict[str, Dict[str, Any]]] = None,
+    recorded_at=None
+) -> Path:
+    """
+    Write a replay directory
+
+    Args:
+        root: Output directory
+        histories: Symbol -> daily OHLCV frame indexed by date
+        universe: Index name -> tickers
+        sectors: Symbol -> sector
+        vix: Latest VIX reading
+        fundamentals: Symbol -> fundamentals fields
+        recorded_at: Date the data represents (default: last recorded bar)
+
+    Returns:
+        The replay root
+    """
+    root = Path(root)
+    (root / "bars").mkdir(parents=True, exist_ok=True)
+    last_bar = None
+    for symbol, df in histories.items():
+        if df is None or df.empty:
+            continue
+        out = df[[c for c in ['Open', 'High', 'Low', 'Close', 'Volume'] if c in df.columns]].copy()
+        index = pd.DatetimeIndex(out.index)
+        if index.tz is not None:
+            index = index.tz_convert(EXCHANGE_TZ).tz_localize(None)
+        out.index = index.normalize().rename('Date')
+        out.to_parquet(root / "bars" / f"{symbol}.parquet")
+        last_bar = out.index[-1] if last_bar is None else max(last_bar, out.index[-1])
+
+    def dump(name, data):
+        if data is not None:
+            path = root / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(data, f, indent=1, default=str)
+
+    for index, tickers in (universe or {}).items():
+        dump(f"universe/{index}.json", list(tickers))
+    dump("sectors.json", sectors)
+    dump("vix.json", vix)
+    dump("fundamentals.json", fundamentals)
+    recorded_at = recorded_at if recorded_at is not None else last_bar
+    if recorded_at is not None:
+        dump("meta.json", {'recorded_at': pd.Timestamp(recorded_at).strftime('%Y-%m-%d')})
+    logger.info(f"Recorded replay data for {len(histories)} symbols to {root}")
+    return root
+
+
+def provider_from_settings() -> Optional[DataProvider]:
+    """Provider selected by DATA_PROVIDER (None = the live services)"""
+    if settings.DATA_PROVIDER == "replay":
+        return ReplayProvider(
+            settings.REPLAY_DATA_DIR,
+            latency=settings.REPLAY_LATENCY_MS / 1000.0,
+            requests_per_minute=settings.REPLAY_REQUESTS_PER_MINUTE
+        )
+    return None
@@ -0,0 +1,515 @@
+"""
+Module: Features
+Shared ML feature library for training, backtests and live inference.
+
+Indicators and features are computed column-wise over a long bar table (one
+row per symbol and date, sorted by symbol then date), so a whole universe is
+a handful of grouped rolling windows instead of a pandas pass per symbol.
+The Backtester (training data and backtest scoring), the trainers and the
+screener Lambda all use these definitions.
+
+FEATURE_SCHEMA_VERSION identifies the feature definitions below. Bump it
+whenever a formula changes; trained models record the version they were
+fitted on and the screener refuses to score a model from another schema.
+"""
+import logging
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("features")
+
+FEATURE_SCHEMA_VERSION = 2
+
+# Original Phase 1 set, used by the Lambda trainer's model
+BASE_FEATURES = [
+    'rsi', 'vol_ratio', 'atr_pct', 'sma50_dist', 'sma200_dist', 'bb_width', 'spy_trend', 'rs_rel',
+]
+# Full set in model column order (Backtester training data)
+FEATURE_NAMES = BASE_FEATURES + [
+    'mom_1m', 'mom_3m', 'mom_6m', 'realized_vol', 'vol_spike', 'dist_52w_high', 'dist_52w_low',
+    'pct_above_200sma', 'adv_dec_ratio', 'new_highs_lows', 'spy_rsi_market', 'vix_level',
+]
+BREADTH_FEATURES = ['pct_above_200sma', 'adv_dec_ratio', 'new_highs_lows']
+
+INDICATOR_COLUMNS = [
+    'SMA_50', 'SMA_200', 'SMA_10', 'EMA_21', 'RSI', 'ATR',
+    'BB_Mid', 'BB_Std', 'BB_Up', 'BB_Low', 'BB_Width', 'Volume_MA20',
+    'Close_21d', 'Close_63d', 'Close_126d', 'Close_prev',
+    'Realized_Vol_20d', 'Vol_MA', 'High_252d', 'Low_252d',
+]
+
+MIN_BREADTH_STOCKS = 50  # Fewer valid stocks on a date -> neutral breadth
+DEFAULT_BREADTH = {
+    'pct_above_200sma': 50.0,
+    'pct_at_52w_high': 5.0,
+    'adv_dec_ratio': 1.0,
+    'new_highs_lows': 0.0,
+}
+DEFAULT_VIX = 20.0
+DEFAULT_SPY_RSI = 50.0
+
+BarsLike = Union[pd.DataFrame, Mapping[str, pd.DataFrame]]
+
+
+# ==================== INDICATORS ====================
+
+class _Windows:
+    """Rolling/shift helpers that stay within each symbol's rows"""
+
+    def __init__(self, keys: Optional[np.ndarray] = None):
+        self.keys = keys
+
+    def _by(self, s: pd.Series):
+        return s if self.keys is None else s.groupby(self.keys, sort=False)
+
+    def rolling(self, s: pd.Series, window: int, how: str) -> np.ndarray:
+        return getattr(self._by(s).rolling(window), how)().to_numpy()
+
+    def ewm_mean(self, s: pd.Series, span: int) -> np.ndarray:
+        return self._by(s).ewm(span=span, adjust=False).mean().to_numpy()
+
+    def shift(self, s: pd.Series, periods: int = 1) -> np.ndarray:
+        return self._by(s).shift(periods).to_numpy()
+
+
+def add_indicators(df: pd.DataFrame, by: Optional[str] = None) -> pd.DataFrame:
+    """
+    Add the indicator columns the features (and StockSelector) read
+
+    Args:
+        df: OHLCV frame with capitalized columns. Either one symbol's history
+            in date order, or a long table sorted by `by` then date.
+        by: Grouping column for a long table (e.g. 'Symbol'); windows never
+            cross from one symbol into the next
+
+    Returns:
+        Copy of df with INDICATOR_COLUMNS added
+    """
+    df = df.copy()
+    w = _Windows(df[by].to_numpy() if by is not None else None)
+    # Positional index so grouped results line up with the rows
+    index = df.index
+    df = df.reset_index(drop=True) if by is not None else df
+    close, high, low = df['Close'], df['High'], df['Low']
+
+    df['SMA_50'] = w.rolling(close, 50, 'mean')
+    df['SMA_200'] = w.rolling(close, 200, 'mean')
+    df['SMA_10'] = w.rolling(close, 10, 'mean')
+    df['EMA_21'] = w.ewm_mean(close, 21)
+
+    prev_close = pd.Series(w.shift(close), index=df.index)
+    delta = close - prev_close
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = w.rolling(gain, 14, 'mean') / w.rolling(loss, 14, 'mean')
+        df['RSI'] = 100 - (100 / (1 + rs))
+
+    true_range = pd.concat([
+        high - low, (high - prev_close).abs(), (low - prev_close).abs()
+    ], axis=1).max(axis=1)
+    df['ATR'] = w.rolling(true_range, 14, 'mean')
+
+    df['BB_Mid'] = w.rolling(close, 20, 'mean')
+    df['BB_Std'] = w.rolling(close, 20, 'std')
+    df['BB_Up'] = df['BB_Mid'] + (2 * df['BB_Std'])
+    df['BB_Low'] = df['BB_Mid'] - (2 * df['BB_Std'])
+    df['BB_Width'] = (df['BB_Up'] - df['BB_Low']) / df['BB_Mid']
+    df['Volume_MA20'] = w.rolling(df['Volume'], 20, 'mean')
+
+    # Historical closes for momentum / relative strength
+    df['Close_21d'] = w.shift(close, 21)
+    df['Close_63d'] = w.shift(close, 63)
+    df['Close_126d'] = w.shift(close, 126)
+    df['Close_prev'] = prev_close.to_numpy()
+
+    # Annualized realized volatility and its 20-day average
+    returns = close / prev_close - 1
+    df['Realized_Vol_20d'] = w.rolling(returns, 20, 'std') * np.sqrt(252)
+    df['Vol_MA'] = w.rolling(df['Realized_Vol_20d'], 20, 'mean')
+
+    # 52-week extremes
+    df['High_252d'] = w.rolling(high, 252, 'max')
+    df['Low_252d'] = w.rolling(low, 252, 'min')
+
+    if by is not None:
+        df.index = index
+    return df
+
+
+def to_long(bars: BarsLike) -> pd.DataFrame:
+    """
+    Long bar table (Date, Symbol, OHLCV) sorted by symbol then date
+
+    Args:
+        bars: BarPanel, a long frame with Date/Symbol columns, or a mapping of
+              symbol -> OHLCV frame indexed by date (any column case)
+    """
+    if hasattr(bars, 'to_long'):
+        long_df = bars.to_long()
+    elif isinstance(bars, pd.DataFrame):
+        long_df = bars
+    else:
+        frames = []
+        for symbol, df in bars.items():
+            if df is None or df.empty:
+                continue
+            df = _capitalize(df)
+            frame = df.reset_index(drop=True)
+            frame.insert(0, 'Symbol', symbol)
+            frame.insert(0, 'Date', df.index)
+            frames.append(frame)
+        long_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['Date', 'Symbol'])
+    long_df = _capitalize(long_df)
+    return long_df.sort_values(['Symbol', 'Date'], kind='stable', ignore_index=True)
+
+
+def _capitalize(df: pd.DataFrame) -> pd.DataFrame:
+    """Map lowercase bar columns (fetch_price_history layout) to OHLCV names"""
+    names = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}
+    names = {c: names[c] for c in df.columns if c in names and names[c] not in df.columns}
+    return df.rename(columns=names) if names else df
+
+
+def _trading_day(dates) -> pd.DatetimeIndex:
+    """Bar timestamps as naive midnight dates, so tz-aware bars and SPY align"""
+    dates = pd.DatetimeIndex(dates)
+    if dates.tz is not None:
+        dates = dates.tz_convert('America/New_York').tz_localize(None)
+    return dates.normalize()
+
+
+# ==================== MARKET CONTEXT ====================
+
+def market_context(market_df: Optional[pd.DataFrame], vix_df: Optional[pd.DataFrame] = None,
+                   calendar: Optional[pd.DatetimeIndex] = None) -> pd.DataFrame:
+    """
+    Per-date SPY and VIX inputs, indexed like market_df (or `calendar`)
+
+    Columns: spy_close, spy_sma200, spy_close_63d, spy_rsi, vix_level.
+    SMA_200/Close_63d/RSI are taken from market_df when present (as set by
+    Backtester.set_market_data) and computed otherwise. With a calendar, the
+    SPY inputs are forward-filled onto it, as Backtester.run_backtest
+    reindexes its market data. Dates missing from vix_df get DEFAULT_VIX.
+    """
+    if market_df is None or market_df.empty:
+        return pd.DataFrame(columns=['spy_close', 'spy_sma200', 'spy_close_63d', 'spy_rsi', 'vix_level'])
+    market = _capitalize(market_df)
+    close = market['Close']
+    if 'RSI' in market.columns:
+        rsi = market['RSI']
+    else:
+        delta = close.diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        rsi = 100 - (100 / (1 + gain / loss))
+
+    context = pd.DataFrame({
+        'spy_close': close,
+        'spy_sma200': market['SMA_200'] if 'SMA_200' in market.columns else close.rolling(200).mean(),
+        'spy_close_63d': market['Close_63d'] if 'Close_63d' in market.columns else close.shift(63),
+        'spy_rsi': rsi,
+    }, index=market.index)
+    if calendar is not None:
+        context = context.reindex(calendar, method='ffill')
+
+    vix = np.full(len(context), DEFAULT_VIX)
+    if vix_df is not None and not vix_df.empty and 'VIX' in vix_df.columns:
+        pos = vix_df.index.get_indexer(context.index)
+        found = pos >= 0
+        vix[found] = vix_df['VIX'].to_numpy(dtype=np.float64)[pos[found]]
+    context['vix_level'] = vix
+    return context
+
+
+def breadth_counts(universe: BarsLike) -> pd.DataFrame:
+    """
+    Per-date stock counts behind breadth_table, indexed by date
+
+    Counts from disjoint parts of a universe can be summed
+    (pd.concat(parts).groupby(level=0).sum()) and passed to
+    breadth_from_counts, so breadth never needs the whole universe in memory.
+
+    Args:
+        universe: Indicator frames per symbol, or a long indicator table
+
+    Returns:
+        DataFrame with total, above, at_high, at_low and advancing
+    """
+    if isinstance(universe, pd.DataFrame):
+        rows = universe
+    else:
+        parts = []
+        for df in universe.values():
+            if df is None or df.empty or 'SMA_200' not in df.columns:
+                continue
+            parts.append(pd.DataFrame({
+                'Date': df.index,
+                'Close': df['Close'].to_numpy(),
+                'SMA_200': df['SMA_200'].to_numpy(),
+                'Close_prev': (df['Close_prev'] if 'Close_prev' in df.columns else df['Close']).to_numpy(),
+                'High_252d': (df['High_252d'] if 'High_252d' in df.columns else df['High']).to_numpy(),
+                'Low_252d': (df['Low_252d'] if 'Low_252d' in df.columns else df['Low']).to_numpy(),
+            }))
+        rows = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(
+            columns=['Date', 'Close', 'SMA_200', 'Close_prev', 'High_252d', 'Low_252d'])
+
+    rows = rows[rows['Close'].notna() & rows['SMA_200'].notna()]
+    close = rows['Close'].to_numpy(dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        counts = pd.DataFrame({
+            'total': 1,
+            'above': close > rows['SMA_200'].to_numpy(dtype=np.float64),
+            'at_high': close >= rows['High_252d'].to_numpy(dtype=np.float64) * 0.98,
+            'at_low': close <= rows['Low_252d'].to_numpy(dtype=np.float64) * 1.02,
+            'advancing': close > rows['Close_prev'].to_numpy(dtype=np.float64),
+        }, index=pd.DatetimeIndex(rows['Date'], name='Date'))
+    return counts.groupby(level=0).sum()
+
+
+def breadth_from_counts(counts: pd.DataFrame) -> pd.DataFrame:
+    """Breadth metrics from breadth_counts (see breadth_table)"""
+    total = counts['total'].to_numpy()
+    declining = total - counts['advancing'].to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        metrics = {
+            'pct_above_200sma': (counts['above'].to_numpy() / total * 100, 2),
+            'pct_at_52w_high': (counts['at_high'].to_numpy() / total * 100, 2),
+            'adv_dec_ratio': (counts['advancing'].to_numpy() / np.maximum(declining, 1), 3),
+            'new_highs_lows': ((counts['at_high'].to_numpy() - counts['at_low'].to_numpy()) / total * 100, 2),
+        }
+    enough = total >= MIN_BREADTH_STOCKS
+    table = pd.DataFrame(index=pd.DatetimeIndex(counts.index, name='Date'))
+    for name, (values, digits) in metrics.items():
+        # Python round, as the per-date calculator used
+        rounded = [round(v, digits) for v in values.tolist()]
+        table[name] = np.where(enough, rounded, DEFAULT_BREADTH[name])
+    return table
+
+
+def breadth_table(universe: BarsLike) -> pd.DataFrame:
+    """
+    Daily market breadth across a universe, indexed by date
+
+    Vectorized form of MarketBreadthCalculator.calculate_daily_breadth: a
+    stock counts on a date when its Close and SMA_200 are present, and dates
+    with fewer than MIN_BREADTH_STOCKS such stocks get DEFAULT_BREADTH.
+
+    Args:
+        universe: Indicator frames per symbol, or a long indicator table
+
+    Returns:
+        DataFrame with pct_above_200sma, pct_at_52w_high, adv_dec_ratio and
+        new_highs_lows
+    """
+    return breadth_from_counts(breadth_counts(universe))
+
+
+# ==================== FEATURES ====================
+
+class _Inputs:
+    """Column access for one batch of (symbol, date) rows plus their context"""
+
+    def __init__(self, rows: pd.DataFrame, dates: pd.DatetimeIndex,
+                 context: Optional[pd.DataFrame], breadth: Optional[pd.DataFrame]):
+        self.rows = rows
+        self.n = len(rows)
+        self.close = self.col('Close')
+        self.context, self.has_context = self._align(context, dates)
+        self.breadth, self.has_breadth = self._align(breadth, dates)
+
+    def _align(self, table: Optional[pd.DataFrame], dates: pd.DatetimeIndex):
+        if table is None or table.empty:
+            return None, np.zeros(self.n, dtype=bool)
+        pos = table.index.get_indexer(dates)
+        found = pos >= 0
+        return table.iloc[np.where(found, pos, 0)], found
+
+    def col(self, name: str, default=None) -> np.ndarray:
+        """Row column as float64; a missing column falls back to `default`"""
+        if name in self.rows.columns:
+            return self.rows[name].to_numpy(dtype=np.float64)
+        if default is None:
+            raise KeyError(name)
+        if isinstance(default, np.ndarray):
+            return default
+        return np.full(self.n, float(default))
+
+    def ctx(self, name: str) -> np.ndarray:
+        if self.context is None:
+            return np.full(self.n, np.nan)
+        return np.where(self.has_context, self.context[name].to_numpy(dtype=np.float64), np.nan)
+
+    def breadth_col(self, name: str) -> np.ndarray:
+        if self.breadth is None:
+            return np.full(self.n, DEFAULT_BREADTH[name])
+        return np.where(self.has_breadth, self.breadth[name].to_numpy(dtype=np.float64), DEFAULT_BREADTH[name])
+
+
+def _ratio_if_positive(num: np.ndarray, den: np.ndarray, otherwise: float) -> np.ndarray:
+    """num / den where den > 0 (NaN den counts as not positive)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(den > 0, num / den, otherwise)
+
+
+def _momentum(x: _Inputs, column: str) -> np.ndarray:
+    past = x.col(column, x.close)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(past > 0, x.close / past - 1, 0) * 100
+
+
+def _distance(x: _Inputs, column: str) -> np.ndarray:
+    level = x.col(column, x.close)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(level > 0, (x.close - level) / level, 0) * 100
+
+
+def _spy_trend(x: _Inputs) -> np.ndarray:
+    spy, sma = x.ctx('spy_close'), x.ctx('spy_sma200')
+    known = ~np.isnan(spy) & ~np.isnan(sma)
+    return np.where(known, (spy > sma).astype(np.float64), 1.0)
+
+
+def _rs_rel(x: _Inputs) -> np.ndarray:
+    """3-month return relative to SPY: (1 + r_stock) / (1 + r_spy) - 1"""
+    stock_3m_ago = x.col('Close_63d', x.close)
+    spy = x.ctx('spy_close')
+    spy_3m_ago = x.ctx('spy_close_63d')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        valid = x.has_context & (stock_3m_ago > 0) & (spy_3m_ago > 0)
+        stock_ret = x.close / stock_3m_ago - 1
+        spy_ret = spy / spy_3m_ago - 1
+        rs = ((1 + stock_ret) / (1 + spy_ret + 0.0001)) - 1
+    return np.where(valid, rs, 0) * 100
+
+
+def _vol_ratio(x: _Inputs) -> np.ndarray:
+    return np.minimum(_ratio_if_positive(x.col('Volume'), x.col('Volume_MA20', 1.0), 0.0), 5.0)
+
+
+def _vol_spike(x: _Inputs) -> np.ndarray:
+    realized = x.col('Realized_Vol_20d', 0.15)
+    return np.minimum(_ratio_if_positive(realized, x.col('Vol_MA', 0.15), 1.0), 3.0)
+
+
+def _sma_dist(x: _Inputs, column: str) -> np.ndarray:
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (x.close / x.col(column, x.close) - 1) * 100
+
+
+def _spy_rsi(x: _Inputs) -> np.ndarray:
+    return np.where(x.has_context, x.ctx('spy_rsi'), DEFAULT_SPY_RSI)
+
+
+def _vix(x: _Inputs) -> np.ndarray:
+    return np.minimum(np.where(x.has_context, x.ctx('vix_level'), DEFAULT_VIX), 80.0)
+
+
+FEATURES: Dict[str, Callable[[_Inputs], np.ndarray]] = {
+    'rsi': lambda x: x.col('RSI', 50.0),
+    'vol_ratio': _vol_ratio,
+    'atr_pct': lambda x: _ratio_if_positive(x.col('ATR', 0.0), x.close, 0.0) * 100,
+    'sma50_dist': lambda x: _sma_dist(x, 'SMA_50'),
+    'sma200_dist': lambda x: _sma_dist(x, 'SMA_200'),
+    'bb_width': lambda x: x.col('BB_Width', 0.1),
+    'spy_trend': _spy_trend,
+    'rs_rel': _rs_rel,
+    'mom_1m': lambda x: _momentum(x, 'Close_21d'),
+    'mom_3m': lambda x: _momentum(x, 'Close_63d'),
+    'mom_6m': lambda x: _momentum(x, 'Close_126d'),
+    'realized_vol': lambda x: x.col('Realized_Vol_20d', 0.15) * 100,
+    'vol_spike': _vol_spike,
+    'dist_52w_high': lambda x: _distance(x, 'High_252d'),
+    'dist_52w_low': lambda x: _distance(x, 'Low_252d'),
+    'pct_above_200sma': lambda x: x.breadth_col('pct_above_200sma'),
+    'adv_dec_ratio': lambda x: np.minimum(x.breadth_col('adv_dec_ratio'), 5.0),
+    'new_highs_lows': lambda x: x.breadth_col('new_highs_lows'),
+    'spy_rsi_market': _spy_rsi,
+    'vix_level': _vix,
+}
+
+
+def _check_names(features: Optional[Sequence[str]]) -> List[str]:
+    names = list(features) if features is not None else list(FEATURE_NAMES)
+    unknown = [f for f in names if f not in FEATURES]
+    if unknown:
+        raise ValueError(f"Unknown features (schema v{FEATURE_SCHEMA_VERSION}): {unknown}")
+    return names
+
+
+def compute_features(rows: pd.DataFrame, dates=None, context: Optional[pd.DataFrame] = None,
+                     breadth: Optional[pd.DataFrame] = None,
+                     features: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Compute a feature subset for a batch of indicator rows
+
+    Args:
+        rows: Indicator rows (add_indicators output), one per (symbol, date)
+        dates: Date of each row (default: rows['Date'] if present, else the index)
+        context: market_context() table; rows whose date is missing get the
+                 neutral defaults (spy_trend 1, rs_rel 0, RSI 50, VIX 20)
+        breadth: breadth_table() table (None -> DEFAULT_BREADTH)
+        features: Feature names to compute (default: FEATURE_NAMES)
+
+    Returns:
+        float64 DataFrame indexed like rows, one column per requested feature
+
+    Raises:
+        ValueError: For a name not in this schema
+    """
+    names = _check_names(features)
+    if dates is None:
+        dates = rows['Date'] if 'Date' in rows.columns else rows.index
+    x = _Inputs(rows, pd.DatetimeIndex(dates), context, breadth)
+    return pd.DataFrame({name: FEATURES[name](x) for name in names}, index=rows.index, columns=names)
+
+
+def latest_features(bars: BarsLike, market_df: Optional[pd.DataFrame] = None,
+                    features: Optional[Sequence[str]] = None, symbols: Optional[Iterable[str]] = None,
+                    universe: Optional[BarsLike] = None, vix_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Features on each symbol's most recent bar (live inference)
+
+    Args:
+        bars: Histories to score (BarPanel, long frame or symbol -> frame)
+        market_df: SPY history
+        features: Feature names (default: FEATURE_NAMES)
+        symbols: Restrict the output to these symbols
+        universe: Bars for breadth features (default: `bars`); only used when
+                  a breadth feature is requested
+        vix_df: VIX history with a 'VIX' column (missing -> DEFAULT_VIX)
+
+    Returns:
+        DataFrame indexed by symbol, one column per requested feature
+    """
+    names = _check_names(features)
+    long_df = to_long(bars)
+    if symbols is not None:
+        wanted = set(symbols)
+        long_df = long_df[long_df['Symbol'].isin(wanted)]
+    if long_df.empty:
+        return pd.DataFrame(columns=names, index=pd.Index([], name='Symbol'))
+    long_df = long_df.assign(Date=_trading_day(long_df['Date']))
+    ind = add_indicators(long_df, by='Symbol')
+    last = ind.groupby('Symbol', sort=False).tail(1).set_index('Symbol')
+
+    context = None
+    if market_df is not None and not market_df.empty:
+        market = _capitalize(market_df)
+        market = market.set_axis(_trading_day(market.index))
+        vix = vix_df.set_axis(_trading_day(vix_df.index)) if vix_df is not None and not vix_df.empty else None
+        context = market_context(market, vix)
+
+    breadth = None
+    if any(f in BREADTH_FEATURES for f in names):
+        if universe is None and symbols is None:
+            breadth_ind = ind
+        else:
+            breadth_long = to_long(universe if universe is not None else bars)
+            breadth_long = breadth_long.assign(Date=_trading_day(breadth_long['Date']))
+            breadth_ind = add_indicators(breadth_long, by='Symbol')
+        breadth = breadth_table(breadth_ind)
+
+    return compute_features(last, dates=last['Date'], context=context, breadth=breadth, features=names)
@@ -0,0 +1,332 @@
+"""
+Module: Fundamentals Cache
+TTL-cached, batched lookup of sector and fundamental fields.
+
+Lookups go through three layers:
+    1. In-memory LRU of recently used symbols
+    2. A persisted JSON store (S3 object or local file) shared across runs
+    3. The loader (yfinance `Ticker.info`), called concurrently for every
+       symbol whose requested fields are missing or expired
+
+Every field carries its own fetch timestamp and TTL, so slow-moving fields
+such as sector are only refetched monthly while ratios refresh daily. Failed
+lookups are negative-cached: a symbol that could not be resolved is not
+retried until NEGATIVE_TTL has passed.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.config import settings
+
+logger = logging.getLogger("fundamentals_cache")
+
+DAY = 24 * 60 * 60
+
+# Field name -> yfinance info key
+INFO_FIELDS = {
+    'sector': 'sector',
+    'industry': 'industry',
+    'eps_growth': 'earningsGrowth',
+    'sales_growth': 'revenueGrowth',
+    'profit_margin': 'profitMargins',
+    'roe': 'returnOnEquity',
+    'debt_to_equity': 'debtToEquity',
+    'dividend_yield': 'dividendYield',
+    'current_ratio': 'currentRatio',
+}
+
+# Seconds before a cached field is considered stale
+FIELD_TTLS = {
+    'sector': 30 * DAY,
+    'industry': 30 * DAY,
+    'eps_growth': DAY,
+    'sales_growth': DAY,
+    'profit_margin': DAY,
+    'roe': DAY,
+    'debt_to_equity': DAY,
+    'dividend_yield': DAY,
+    'current_ratio': DAY,
+}
+
+NEGATIVE_TTL = DAY
+DEFAULT_FIELDS = ('sector',)
+STORE_KEY = "min_data/fundamentals_cache.json"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _shared_session():
+    """One HTTP session reused by every yfinance lookup"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            _session = requests.Session()
+            _session.headers.update({
+                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+            })
+        return _session
+
+
+def yfinance_loader(symbol: str) -> Dict[str, Any]:
+    """
+    Fetch cacheable fields for one symbol from yfinance
+
+    Raises:
+        LookupError: If yfinance returned no sector (treated as a miss)
+    """
+    import yfinance as yf
+
+    info = yf.Ticker(symbol, session=_shared_session()).info or {}
+    values = {field: info.get(key) for field, key in INFO_FIELDS.items()}
+    if not values['sector']:
+        raise LookupError(f"No sector returned for {symbol}")
+    return values
+
+
+class S3JsonStore:
+    """Persist the cache as a single JSON object in S3"""
+
+    def __init__(self, s3_client, bucket: str = settings.S3_BUCKET, key: str = STORE_KEY):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+
+    def load(self) -> Dict[str, Any]:
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=self.key)
+            return json.loads(response['Body'].read().decode('utf-8'))
+        except Exception as e:
+            logger.info(f"Fundamentals cache not loaded from s3://{self.bucket}/{self.key}: {e}")
+            return {}
+
+    def save(self, data: Dict[str, Any]):
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket,
+                Key=self.key,
+                Body=json.dumps(data),
+                ContentType='application/json'
+            )
+        except Exception as e:
+            logger.error(f"Failed to save fundamentals cache to s3://{self.bucket}/{self.key}: {e}")
+
+
+class LocalJsonStore:
+    """Persist the cache as a JSON file"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or settings.DATA_DIR / "fundamentals_cache.json")
+
+    def load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def save(self, data: Dict[str, Any]):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix('.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(data, f)
+            tmp.replace(self.path)
+        except Exception as e:
+            logger.error(f"Failed to save fundamentals cache to {self.path}: {e}")
+
+
+class FundamentalsCache:
+    """
+    Per-symbol field cache with LRU memory tier, persisted store and
+    concurrent batched refresh.
+
+    Entry layout (also the persisted JSON layout):
+        {"fields": {name: {"value": ..., "fetched_at": epoch}}, "failed_at": epoch | None}
+    """
+
+    def __init__(
+        self,
+        store=None,
+        loader: Callable[[str], Dict[str, Any]] = yfinance_loader,
+        max_entries: int = 5000,
+        max_workers: int = 8,
+        field_ttls: Optional[Dict[str, float]] = None,
+        negative_ttl: float = NEGATIVE_TTL,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            store: Object with load() -> dict and save(dict) (None = memory only)
+            loader: Function returning field values for a symbol; raises on a miss
+            max_entries: LRU capacity of the memory tier
+            max_workers: Concurrent loader calls during a refresh
+            field_ttls: Per-field TTL overrides in seconds
+            negative_ttl: Seconds a failed lookup is remembered
+            clock: Epoch clock (injectable for tests)
+        """
+        self.store = store
+        self.loader = loader
+        self.max_entries = max_entries
+        self.max_workers = max(1, max_workers)
+        self.field_ttls = {**FIELD_TTLS, **(field_ttls or {})}
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self._persisted: Optional[Dict[str, Dict]] = None
+        self._seeds: List = []
+        self._lock = threading.RLock()
+        self.stats = {'hits': 0, 'misses': 0, 'negative_hits': 0, 'loads': 0, 'failures': 0}
+
+    # ==================== TIERS ====================
+
+    def _persisted_entries(self) -> Dict[str, Dict]:
+        if self._persisted is None:
+            self._persisted = self.store.load() if self.store else {}
+            self._apply_seeds()
+            logger.info(f"Loaded {len(self._persisted)} cached fundamentals entries")
+        return self._persisted
+
+    def _lookup(self, symbol: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._memory.get(symbol)
+            if entry is not None:
+                self._memory.move_to_end(symbol)
+                return entry
+            entry = self._persisted_entries().get(symbol)
+            if entry is not None:
+                self._remember(symbol, entry)
+            return entry
+
+    def _remember(self, symbol: str, entry: Dict):
+        self._memory[symbol] = entry
+        self._memory.move_to_end(symbol)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _store_entry(self, symbol: str, entry: Dict):
+        with self._lock:
+            self._remember(symbol, entry)
+            self._persisted_entries()[symbol] = entry
+
+    # ==================== FRESHNESS ====================
+
+    def _is_fresh(self, entry: Optional[Dict], fields: Iterable[str], now: float) -> bool:
+        if entry is None:
+            return False
+        cached = entry.get('fields', {})
+        for name in fields:
+            item = cached.get(name)
+            if item is None or now - item['fetched_at'] > self.field_ttls.get(name, DAY):
+                return False
+        return True
+
+    def _is_negative(self, entry: Optional[Dict], now: float) -> bool:
+        failed_at = entry.get('failed_at') if entry else None
+        return failed_at is not None and now - failed_at < self.negative_ttl
+
+    # ==================== PUBLIC API ====================
+
+    def seed(self, field: str, values: Dict[str, Any]):
+        """
+        Add values from a static map (e.g. sectors.json) for symbols that
+        have no cached value for `field`; they age out like fetched values.
+        Applied when the persisted store is first loaded.
+        """
+        with self._lock:
+            self._seeds.append((field, values, self._clock()))
+            if self._persisted is not None:
+                self._apply_seeds()
+
+    def _apply_seeds(self):
+        for field, values, seeded_at in self._seeds:
+            for symbol, value in values.items():
+                if not value or value == 'N/A':
+                    continue
+                entry = self._persisted.get(symbol) or {'fields': {}, 'failed_at': None}
+                if field not in entry['fields']:
+                    entry['fields'][field] = {'value': value, 'fetched_at': seeded_at}
+                    self._persisted[symbol] = entry
+        self._seeds = []
+
+    def get(self, symbol: str, fields: Iterable[str] = DEFAULT_FIELDS) -> Dict[str, Any]:
+        """Field values for one symbol (missing fields are None)"""
+        return self.get_many([symbol], fields)[symbol]
+
+    def get_many(self, symbols: List[str], fields: Iterable[str] = DEFAULT_FIELDS) -> Dict[str, Dict[str, Any]]:
+        """
+        Field values for many symbols, refreshing stale entries concurrently
+
+        Args:
+            symbols: Tickers to resolve
+            fields: Field names required by the caller
+
+        Returns:
+            Dict mapping each symbol to {field: value or None}
+        """
+        fields = tuple(fields)
+        now = self._clock()
+        stale = []
+        for symbol in dict.fromkeys(symbols):
+            entry = self._lookup(symbol)
+            if self._is_fresh(entry, fields, now):
+                self.stats['hits'] += 1
+            elif self._is_negative(entry, now):
+                self.stats['negative_hits'] += 1
+            else:
+                self.stats['misses'] += 1
+                stale.append(symbol)
+
+        if stale:
+            self._refresh(stale)
+
+        results = {}
+        for symbol in symbols:
+            cached = (self._lookup(symbol) or {}).get('fields', {})
+            results[symbol] = {name: cached.get(name, {}).get('value') for name in fields}
+        return results
+
+    def _load_one(self, symbol: str):
+        try:
+            return symbol, self.loader(symbol), None
+        except Exception as e:
+            return symbol, None, e
+
+    def _refresh(self, symbols: List[str]):
+        logger.info(f"Refreshing fundamentals for {len(symbols)} symbols")
+        workers = min(self.max_workers, len(symbols))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(self._load_one, symbols))
+
+        now = self._clock()
+        for symbol, values, error in outcomes:
+            entry = self._lookup(symbol) or {'fields': {}, 'failed_at': None}
+            entry = {'fields': dict(entry.get('fields', {})), 'failed_at': entry.get('failed_at')}
+            if error is not None:
+                logger.debug(f"Fundamentals lookup failed for {symbol}: {error}")
+                self.stats['failures'] += 1
+                entry['failed_at'] = now
+            else:
+                self.stats['loads'] += 1
+                entry['failed_at'] = None
+                for name, value in values.items():
+                    entry['fields'][name] = {'value': value, 'fetched_at': now}
+            self._store_entry(symbol, entry)
+
+        self.flush()
+
+    def flush(self):
+        """Write the persisted tier back to the store"""
+        if self.store is None or self._persisted is None:
+            return
+        with self._lock:
+            snapshot = dict(self._persisted)
+        self.store.save(snapshot)
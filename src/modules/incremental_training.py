@@ -0,0 +1,164 @@
+"""
+Module: Incremental Training
+Warm-start updates for the weekly ML trainer.
+
+Between full rebuilds the trainer only sees trades that closed since the last
+run. The forest grows `trees_per_update` trees fitted on those rows
+(RandomForest warm_start), so the weekly cost follows the size of the new
+batch, not the length of the history.
+
+The scaler the trees were trained against stays frozen, because rescaling
+would move every existing split threshold. Instead a second, running
+StandardScaler is updated with partial_fit on each batch. When its mean or
+variance wanders too far from the frozen scaler, the feature distribution
+has drifted and the next run rebuilds from scratch. Rebuilds also happen on
+a fixed schedule, when the forest reaches `max_trees`, or when the feature
+set changes.
+"""
+import copy
+import logging
+import warnings
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.preprocessing import StandardScaler
+
+logger = logging.getLogger("incremental_training")
+
+
+@dataclass
+class TrainerState:
+    """Bookkeeping persisted next to the model between runs"""
+    features: List[str] = field(default_factory=list)
+    feature_schema: int = 0
+    last_full_rebuild: Optional[str] = None   # ISO date
+    exit_watermark: Optional[str] = None      # Latest exit_date already trained on
+    n_samples: int = 0
+    updates: int = 0
+    model_version: Optional[str] = None       # Registry version this state belongs to
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TrainerState":
+        known = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
+        return cls(**known)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class UpdatePolicy:
+    """When to stop warm-starting and rebuild"""
+    trees_per_update: int = 10
+    max_trees: int = 300
+    rebuild_days: int = 91            # Scheduled full rebuild (about quarterly)
+    max_mean_shift: float = 0.25      # Running vs frozen mean, in frozen std units
+    max_var_ratio: float = 2.0        # Running/frozen variance outside [1/r, r]
+    min_new_samples: int = 20         # Smaller batches are carried to the next run
+
+
+def drift_score(frozen: StandardScaler, running: StandardScaler) -> Tuple[float, float]:
+    """
+    Largest standardized mean shift and variance ratio across features
+
+    Returns:
+        (max |mean_run - mean_frozen| / std_frozen, max(var ratio, 1 / var ratio))
+    """
+    scale = np.where(frozen.scale_ > 0, frozen.scale_, 1.0)
+    shift = np.abs(running.mean_ - frozen.mean_) / scale
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = running.var_ / np.where(frozen.var_ > 0, frozen.var_, 1.0)
+        ratio = np.where(ratio > 0, np.maximum(ratio, 1 / ratio), 1.0)
+    return float(np.nanmax(shift)), float(np.nanmax(ratio))
+
+
+def rebuild_reason(
+    state: Optional[TrainerState],
+    pipeline: Optional[dict],
+    features: List[str],
+    feature_schema: int,
+    today: pd.Timestamp,
+    policy: UpdatePolicy
+) -> Optional[str]:
+    """
+    Why the next run must be a full rebuild, or None when a warm start is fine
+    """
+    if state is None or pipeline is None or state.last_full_rebuild is None or state.exit_watermark is None:
+        return "no previous model"
+    if list(pipeline.get('features', [])) != list(features) or state.feature_schema != feature_schema:
+        return "feature set changed"
+    model = pipeline['model']
+    if not getattr(model, 'warm_start', False) or not hasattr(model, 'estimators_'):
+        return "model does not support warm start"
+    if (today - pd.Timestamp(state.last_full_rebuild)).days >= policy.rebuild_days:
+        return "scheduled rebuild"
+    if len(model.estimators_) + policy.trees_per_update > policy.max_trees:
+        return "tree budget reached"
+    running = pipeline.get('running_scaler')
+    if running is not None:
+        shift, ratio = drift_score(pipeline['scaler'], running)
+        if shift > policy.max_mean_shift or ratio > policy.max_var_ratio:
+            return f"feature drift (mean shift {shift:.2f}, variance ratio {ratio:.2f})"
+    return None
+
+
+def _fit(model, X, y):
+    with warnings.catch_warnings():
+        # class_weight='balanced' is meant per batch here
+        warnings.filterwarnings("ignore", message=".*warm_start.*", category=UserWarning)
+        model.fit(X, y)
+
+
+def fit_full(model, X: np.ndarray, y: np.ndarray) -> dict:
+    """
+    Fit a fresh model and scaler; the running scaler starts from the same data
+
+    Args:
+        model: Unfitted warm-start-capable estimator (cloned, not modified)
+        X: Training features
+        y: Training outcome
+
+    Returns:
+        Pipeline dict with model, scaler and running_scaler
+    """
+    scaler = StandardScaler().fit(X)
+    model = clone(model).set_params(warm_start=True)
+    _fit(model, scaler.transform(X), y)
+    running = StandardScaler().partial_fit(X)
+    return {"model": model, "scaler": scaler, "running_scaler": running}
+
+
+def warm_update(pipeline: dict, X_new: np.ndarray, y_new: np.ndarray, trees: int) -> dict:
+    """
+    Grow the forest on new rows only; the frozen scaler is applied, the running one updated
+
+    Args:
+        pipeline: Previous pipeline dict (updated in place)
+        X_new: Newly closed trades
+        y_new: Their outcomes
+        trees: Trees to add
+
+    Returns:
+        The updated pipeline dict
+    """
+    model = pipeline['model']
+    if len(np.unique(y_new)) < 2:
+        logger.info("New batch has a single class; keeping existing trees")
+    else:
+        model.set_params(n_estimators=len(model.estimators_) + trees)
+        _fit(model, pipeline['scaler'].transform(X_new), y_new)
+    running = pipeline.get('running_scaler')
+    if running is None:
+        running = copy.deepcopy(pipeline['scaler'])
+    pipeline['running_scaler'] = running.partial_fit(X_new)
+    return pipeline
+
+
+def new_samples(df: pd.DataFrame, state: TrainerState) -> pd.DataFrame:
+    """Rows whose trade closed after the state's exit watermark"""
+    if state.exit_watermark is None:
+        return df
+    return df[df['exit_date'] > pd.Timestamp(state.exit_watermark)]
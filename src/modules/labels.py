@@ -0,0 +1,343 @@
+"""
+Module: Labels
+Vectorized ML training labels: entry events and their trade outcomes.
+
+Replaces running a single-symbol Backtester per symbol. Over a whole panel:
+    1. Focus list: the StockSelector criteria (liquidity, regime-dependent
+       trend, relative strength vs SPY) are evaluated on the Backtester's
+       rotation days and held until the next one: every Monday, and every
+       fifth trading day from the start date while the list is empty (so a
+       week whose Monday is a holiday keeps the previous week's list).
+    2. Entry events: focus-list days with Close > EMA_21.
+    3. Outcomes: resolve_exits() steps every open event forward one bar at a
+       time with Backtester.manage_position's stops (fixed/ATR initial stop,
+       trailing stop, take-profit), in NumPy across all events at once.
+
+Features come from the shared feature library, with breadth over the whole
+panel (single-symbol backtests only ever saw the neutral defaults).
+
+Unlike the per-symbol backtest, every qualifying day is an event: there is
+no one-position-per-symbol constraint and no portfolio exposure exits.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.modules import features as feature_lib
+
+logger = logging.getLogger("labels")
+
+# StockSelector thresholds
+MIN_DOLLAR_VOLUME = 5_000_000
+MIN_RS_SCORE = {'A': 0.0, 'B': 0.05}
+WIN_THRESHOLD = 0.02  # Outcome 1 if the trade returned more than 2%
+
+EXIT_REASONS = ['', 'Stop Loss', 'Trailing Stop', 'Take Profit']
+STOP_LOSS, TRAILING_STOP, TAKE_PROFIT = 1, 2, 3
+
+
+@dataclass
+class ExitRule:
+    """Exit parameters, defaulting to the Backtester's"""
+    stop_loss_pct: float = 0.05
+    trailing_stop_pct: float = 0.15
+    take_profit_target: float = 10.0
+    atr_stop_multiple: float = 1.5
+
+    @classmethod
+    def from_backtester(cls, bt) -> "ExitRule":
+        return cls(bt.stop_loss_pct, bt.trailing_stop_pct, bt.take_profit_target)
+
+
+# ==================== EXIT KERNEL ====================
+
+def resolve_exits(
+    entry_rows: np.ndarray,
+    end_rows: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    atr: np.ndarray,
+    rule: Optional[ExitRule] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Walk entries forward until their stop or target is hit
+
+    Per bar, exactly as Backtester.manage_position: the high-water mark takes
+    the bar's High, the initial stop is the lower of the fixed % stop and
+    entry - 1.5 * ATR (that bar's ATR), the effective stop is the higher of
+    initial and trailing, and Low below it exits at the stop price.
+
+    Args:
+        entry_rows: Row of each entry bar in the column arrays
+        end_rows: Exclusive end row of each entry's symbol
+        high, low, close, atr: Column arrays for the whole panel
+        rule: Exit parameters (default: ExitRule())
+
+    Returns:
+        (exit_rows, exit_prices, reasons); exit_rows is -1 and the reason 0
+        for entries still open at the end of their history
+    """
+    rule = rule or ExitRule()
+    n = len(entry_rows)
+    exit_rows = np.full(n, -1, dtype=np.int64)
+    exit_prices = np.full(n, np.nan)
+    reasons = np.zeros(n, dtype=np.int8)
+
+    entry = close[entry_rows].astype(np.float64)
+    fixed_stop = entry * (1 - rule.stop_loss_pct)
+    target = entry * (1 + rule.take_profit_target)
+    highest = entry.copy()
+
+    active = np.arange(n)
+    rows = np.asarray(entry_rows, dtype=np.int64).copy()
+    while active.size:
+        rows[active] += 1
+        active = active[rows[active] < end_rows[active]]
+        if not active.size:
+            break
+        r = rows[active]
+        highest[active] = np.fmax(highest[active], high[r])
+
+        with np.errstate(invalid='ignore'):
+            a = atr[r]
+            initial = np.where(a > 0, np.minimum(fixed_stop[active], entry[active] - rule.atr_stop_multiple * a),
+                               fixed_stop[active])
+            trailing = highest[active] * (1 - rule.trailing_stop_pct)
+            stop = np.maximum(initial, trailing)
+            stopped = low[r] < stop
+            took_profit = ~stopped & (high[r] > target[active])
+
+        hit = active[stopped]
+        exit_rows[hit] = r[stopped]
+        exit_prices[hit] = stop[stopped]
+        reasons[hit] = np.where(trailing[stopped] > initial[stopped], TRAILING_STOP, STOP_LOSS)
+
+        hit = active[took_profit]
+        exit_rows[hit] = r[took_profit]
+        exit_prices[hit] = target[hit]
+        reasons[hit] = TAKE_PROFIT
+
+        active = active[~(stopped | took_profit)]
+    return exit_rows, exit_prices, reasons
+
+
+# ==================== ENTRY EVENTS ====================
+
+def market_regime(market_df: pd.DataFrame, calendar: Optional[pd.DatetimeIndex] = None) -> pd.Series:
+    """
+    Backtester market regime ('A', 'B' or 'C') per date
+
+    C when SPY is below its 21 EMA, A when above its 10 SMA, 21 EMA and
+    200 SMA, B otherwise. A day without a SPY close keeps the previous
+    regime (initially C).
+    """
+    close = market_df['Close']
+    sma10 = close.rolling(10).mean()
+    ema21 = close.ewm(span=21).mean()
+    sma200 = close.rolling(200).mean()
+    if calendar is not None:
+        close, sma10, ema21, sma200 = (s.reindex(calendar, method='ffill') for s in (close, sma10, ema21, sma200))
+
+    with np.errstate(invalid='ignore'):
+        c, s10, e21, s200 = (s.to_numpy(dtype=np.float64) for s in (close, sma10, ema21, sma200))
+        regime = np.where(c < e21, 'C', np.where((c > s10) & (c > e21) & (c > s200), 'A', 'B')).astype(object)
+    regime[np.isnan(c)] = None
+    return pd.Series(regime, index=close.index).ffill().fillna('C')
+
+
+def rotation_days(calendar: pd.DatetimeIndex, n_selected: pd.Series, start=None) -> pd.Series:
+    """
+    Focus-list rotation date of each calendar date, by the Backtester's rule
+
+    From `start`, the list is re-selected on Mondays, and on every fifth
+    trading day (counted from `start`) while the current list is empty.
+    Dates before `start` are their own rotation day.
+
+    Args:
+        calendar: Trading dates
+        n_selected: Symbols passing the selector criteria per date
+            (focus_candidates summed over the universe)
+        start: First backtest date (default: the first calendar date)
+
+    Returns:
+        Series of rotation dates indexed by calendar date
+    """
+    counts = n_selected.reindex(calendar, fill_value=0).to_numpy()
+    rotation = calendar.to_numpy().copy()
+    first = 0 if start is None else int(calendar.searchsorted(pd.Timestamp(start)))
+    current, empty = None, True
+    for i, k in enumerate(range(first, len(calendar))):
+        if calendar[k].weekday() == 0 or (empty and i % 5 == 0):
+            current, empty = rotation[k], counts[k] == 0
+        rotation[k] = current
+    return pd.Series(rotation, index=calendar)
+
+
+def focus_candidates(ind: pd.DataFrame, regime: pd.Series, market_ret_3m: pd.Series) -> np.ndarray:
+    """
+    Rows of a long indicator table that pass the StockSelector criteria
+
+    Args:
+        ind: add_indicators(..., by='Symbol') output in (Symbol, Date) order
+        regime: market_regime over the calendar
+        market_ret_3m: SPY 3-month return per calendar date (0 when unknown)
+
+    Returns:
+        Boolean mask over the rows
+    """
+    dates = pd.DatetimeIndex(ind['Date'])
+    close = ind['Close'].to_numpy(dtype=np.float64)
+    sma50 = ind['SMA_50'].to_numpy(dtype=np.float64)
+    sma200 = ind['SMA_200'].to_numpy(dtype=np.float64)
+    # StockSelector's 21 EMA is the default (adjusted) ewm
+    ema21_sel = ind.groupby('Symbol', sort=False)['Close'].ewm(span=21).mean().to_numpy(dtype=np.float64)
+    reg = regime.reindex(dates).to_numpy()
+    mkt = market_ret_3m.reindex(dates).fillna(0.0).to_numpy()
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        liquid = close * ind['Volume_MA20'].to_numpy(dtype=np.float64) >= MIN_DOLLAR_VOLUME
+        trend_a = (close > sma50) & (sma50 > sma200)
+        trend_b = (close > ema21_sel) & (ema21_sel > sma50) & (sma50 > sma200)
+        rs_score = close / ind['Close_63d'].to_numpy(dtype=np.float64) - 1 - mkt
+        return liquid & ~np.isnan(sma200) & np.where(
+            reg == 'A', trend_a & (rs_score > MIN_RS_SCORE['A']),
+            np.where(reg == 'B', trend_b & (rs_score > MIN_RS_SCORE['B']), False))
+
+
+def entry_events(ind: pd.DataFrame, regime: pd.Series, market_ret_3m: pd.Series,
+                 rotation: pd.Series) -> np.ndarray:
+    """
+    Rows of a long indicator table that are entry events
+
+    Args:
+        ind: add_indicators(..., by='Symbol') output in (Symbol, Date) order
+        regime: market_regime over the calendar
+        market_ret_3m: SPY 3-month return per calendar date (0 when unknown)
+        rotation: Rotation date of each calendar date (rotation_days)
+
+    Returns:
+        Positional row numbers of the events
+    """
+    dates = pd.DatetimeIndex(ind['Date'])
+    close = ind['Close'].to_numpy(dtype=np.float64)
+    selected = focus_candidates(ind, regime, market_ret_3m)
+
+    # The list is decided on its rotation day and held until the next one
+    day = rotation.reindex(dates).to_numpy()
+    decision = selected & (dates.to_numpy() == day)
+    in_focus = pd.Series(decision).groupby([ind['Symbol'].to_numpy(), day]).transform('max').to_numpy()
+
+    with np.errstate(invalid='ignore'):
+        triggered = close > ind['EMA_21'].to_numpy(dtype=np.float64)
+    return np.flatnonzero(in_focus & triggered)
+
+
+# ==================== GENERATOR ====================
+
+def _chunks(source, symbols: List[str], size: int) -> Iterator[Dict[str, pd.DataFrame]]:
+    for i in range(0, len(symbols), size):
+        part = symbols[i:i + size]
+        if hasattr(source, 'frame'):  # UniversePanel
+            yield {s: source.frame(s) for s in part}
+        else:
+            yield {s: source[s] for s in part}
+
+
+def _calendar(source, symbols: List[str]) -> pd.DatetimeIndex:
+    """Union of all trading dates (the Backtester's all_dates)"""
+    if hasattr(source, 'dates'):  # UniversePanel
+        return source.dates()
+    return pd.DatetimeIndex(np.unique(np.concatenate([source[s].index.values for s in symbols])))
+
+
+def generate_labels(
+    source,
+    market_df: pd.DataFrame,
+    vix_df: Optional[pd.DataFrame] = None,
+    symbols: Optional[Iterable[str]] = None,
+    start_date: str = "2006-01-01",
+    rule: Optional[ExitRule] = None,
+    chunk_size: int = 500,
+    min_rows: int = 51
+) -> pd.DataFrame:
+    """
+    Features and outcomes for every entry event in a universe
+
+    Args:
+        source: UniversePanel or mapping of symbol -> OHLCV frame
+        market_df: SPY history (OHLCV)
+        vix_df: VIX history with a 'VIX' column
+        symbols: Symbols to label (default: all in source)
+        start_date: First entry date
+        rule: Exit parameters (default: the Backtester's)
+        chunk_size: Symbols processed per pass (bounds memory)
+        min_rows: Skip shorter histories (the Backtester only adds
+                  indicators above 50 bars)
+
+    Returns:
+        One row per resolved event: FEATURE_NAMES, outcome, entry_date,
+        symbol, exit_date, return_pct and exit_reason. Events still open at
+        the end of their history are dropped.
+    """
+    symbols = list(symbols if symbols is not None else (source.symbols if hasattr(source, 'symbols') else source))
+    lengths = {s: (source.length(s) if hasattr(source, 'length') else len(source[s])) for s in symbols}
+    symbols = [s for s in symbols if lengths[s] >= min_rows]
+    if not symbols:
+        return pd.DataFrame(columns=feature_lib.FEATURE_NAMES + ['outcome', 'entry_date'])
+
+    calendar = _calendar(source, symbols)
+    context = feature_lib.market_context(market_df, vix_df, calendar=calendar)
+    regime = market_regime(market_df, calendar)
+    spy_close = market_df['Close'].reindex(calendar, method='ffill')
+    market_ret_3m = (spy_close / spy_close.shift(63) - 1).fillna(0.0)
+    start = pd.Timestamp(start_date)
+
+    # Pass 1: breadth and selector passes over the whole universe, accumulated
+    # chunk by chunk (rotation days depend on whether any symbol qualified)
+    counts, n_selected = [], []
+    for frames in _chunks(source, symbols, chunk_size):
+        ind = feature_lib.add_indicators(feature_lib.to_long(frames), by='Symbol')
+        counts.append(feature_lib.breadth_counts(ind))
+        n_selected.append(pd.Series(focus_candidates(ind, regime, market_ret_3m)).groupby(ind['Date'].to_numpy()).sum())
+    counts = pd.concat(counts)
+    breadth = feature_lib.breadth_from_counts(counts.groupby(level=0).sum())
+    rotation = rotation_days(calendar, pd.concat(n_selected).groupby(level=0).sum(), start)
+
+    # Pass 2: events, exits and features
+    parts = []
+    for frames in _chunks(source, symbols, chunk_size):
+        ind = feature_lib.add_indicators(feature_lib.to_long(frames), by='Symbol')
+        rows = entry_events(ind, regime, market_ret_3m, rotation)
+        rows = rows[ind['Date'].to_numpy()[rows] >= start.to_datetime64()]
+        if not len(rows):
+            continue
+
+        codes, _ = pd.factorize(ind['Symbol'])
+        ends = np.searchsorted(codes, codes[rows], side='right')
+        exit_rows, exit_prices, reasons = resolve_exits(
+            rows, ends,
+            ind['High'].to_numpy(dtype=np.float64), ind['Low'].to_numpy(dtype=np.float64),
+            ind['Close'].to_numpy(dtype=np.float64), ind['ATR'].to_numpy(dtype=np.float64), rule
+        )
+        closed = exit_rows >= 0
+        rows, exit_rows, exit_prices, reasons = rows[closed], exit_rows[closed], exit_prices[closed], reasons[closed]
+
+        events = ind.iloc[rows]
+        part = feature_lib.compute_features(events, dates=events['Date'], context=context, breadth=breadth)
+        return_pct = exit_prices / events['Close'].to_numpy(dtype=np.float64) - 1
+        part['outcome'] = (return_pct > WIN_THRESHOLD).astype(int)
+        part['entry_date'] = events['Date'].to_numpy().astype('datetime64[ns]')
+        part['symbol'] = events['Symbol'].to_numpy()
+        part['exit_date'] = ind['Date'].to_numpy()[exit_rows].astype('datetime64[ns]')
+        part['return_pct'] = return_pct
+        part['exit_reason'] = np.asarray(EXIT_REASONS, dtype=object)[reasons]
+        parts.append(part)
+        logger.info(f"Labeled {len(part)} events from {len(frames)} symbols")
+
+    if not parts:
+        return pd.DataFrame(columns=feature_lib.FEATURE_NAMES + ['outcome', 'entry_date'])
+    return pd.concat(parts, ignore_index=True)
@@ -0,0 +1,204 @@
+"""
+Module: Lake Stream
+Asyncio bulk loader that yields (symbol, frame) pairs as they become ready.
+
+An event loop keeps up to `fetch_concurrency` S3 downloads in flight on the
+shared pooled client. Each body is decoded as soon as it arrives, so network
+time and decode time overlap. Symbols are yielded in completion order, and
+callers can start work (e.g. indicators) before the last download finishes.
+
+Decoding is split by cost:
+    Parquet   pyarrow releases the GIL, so it is decoded on the I/O threads
+    CSV       legacy objects; pandas parsing holds the GIL, so they go to a
+              process pool
+
+No async S3 client is needed. The boto3 calls block only their executor
+thread, never the event loop.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from src.modules.data_lake import DataLake, csv_bytes_to_frame
+
+logger = logging.getLogger("lake_stream")
+
+_DONE = object()
+
+
+class LakeStreamLoader:
+    """Stream many lake symbols with overlapped download and decode"""
+
+    def __init__(
+        self,
+        lake: DataLake,
+        fetch_concurrency: int = 32,
+        decode_workers: Optional[int] = None
+    ):
+        """
+        Args:
+            lake: Source lake (its client, bucket and attached manifest are used)
+            fetch_concurrency: Downloads in flight at once
+            decode_workers: Processes for CSV decoding (default: CPU count;
+                0 decodes CSV on the I/O threads)
+        """
+        self.lake = lake
+        self.fetch_concurrency = max(1, fetch_concurrency)
+        self.decode_workers = (os.cpu_count() or 1) if decode_workers is None else max(0, decode_workers)
+
+    # ==================== PER-SYMBOL ====================
+
+    def _download(self, symbol: str, columns, start, end) -> Tuple[str, object]:
+        """
+        Runs on an I/O thread.
+
+        Returns:
+            ('frame', DataFrame) for Parquet objects, ('csv', bytes) for legacy
+            objects still to be decoded, or ('missing', None)
+        """
+        missing = self.lake.s3_client.exceptions.NoSuchKey
+        try:
+            return 'frame', self.lake.read_parquet(symbol, columns, start, end)
+        except missing:
+            if not self.lake.csv_fallback:
+                return 'missing', None
+        try:
+            return 'csv', self.lake.s3.get_bytes(self.lake.bucket, self.lake.csv_key(symbol))
+        except missing:
+            return 'missing', None
+
+    async def _load_one(
+        self,
+        symbol: str,
+        columns,
+        start,
+        end,
+        limit: asyncio.Semaphore,
+        io_pool: Executor,
+        decode_pool: Executor
+    ) -> Tuple[str, pd.DataFrame]:
+        loop = asyncio.get_running_loop()
+        try:
+            async with limit:
+                kind, payload = await loop.run_in_executor(io_pool, self._download, symbol, columns, start, end)
+            if kind == 'csv':
+                payload = await loop.run_in_executor(decode_pool, csv_bytes_to_frame, payload, columns, start, end)
+            elif kind == 'missing':
+                payload = pd.DataFrame()
+            return symbol, payload
+        except Exception as e:
+            logger.debug(f"Lake stream failed for {symbol}: {e}")
+            return symbol, pd.DataFrame()
+
+    # ==================== STREAMING ====================
+
+    def _candidates(self, symbols: Iterable[str], start, end, min_rows: int) -> List[str]:
+        symbols = list(dict.fromkeys(symbols))
+        if self.lake.manifest is None:
+            return symbols
+        return [s for s in symbols if self.lake.may_have_data(s, start, end, min_rows)]
+
+    async def stream(
+        self,
+        symbols: Iterable[str],
+        columns: Optional[List[str]] = None,
+        start=None,
+        end=None,
+        min_rows: int = 0
+    ) -> AsyncIterator[Tuple[str, pd.DataFrame]]:
+        """
+        Yield (symbol, frame) pairs in completion order
+
+        Arguments match DataLake.load(); symbols without data (or with fewer
+        than `min_rows` bars when no date bounds are given) are not yielded.
+        """
+        symbols = self._candidates(symbols, start, end, min_rows)
+        limit = asyncio.Semaphore(self.fetch_concurrency)
+        io_pool = ThreadPoolExecutor(max_workers=self.fetch_concurrency)
+        decode_pool = io_pool
+        if self.decode_workers > 0:
+            # Spawned workers: forking a process that runs an event loop thread is unsafe
+            decode_pool = ProcessPoolExecutor(max_workers=self.decode_workers, mp_context=multiprocessing.get_context('spawn'))
+        row_floor = min_rows if start is None and end is None else 0
+        tasks = [
+            asyncio.ensure_future(self._load_one(s, columns, start, end, limit, io_pool, decode_pool))
+            for s in symbols
+        ]
+        loaded = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                symbol, df = await next_done
+                if df.empty or len(df) < row_floor:
+                    continue
+                loaded += 1
+                yield symbol, df
+        finally:
+            for task in tasks:
+                task.cancel()
+            io_pool.shutdown(wait=False, cancel_futures=True)
+            if decode_pool is not io_pool:
+                decode_pool.shutdown(wait=False, cancel_futures=True)
+            logger.info(f"Streamed {loaded}/{len(symbols)} symbols from the lake")
+
+    def iter_frames(
+        self,
+        symbols: Iterable[str],
+        columns: Optional[List[str]] = None,
+        start=None,
+        end=None,
+        min_rows: int = 0,
+        buffer: int = 64
+    ) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Synchronous view of stream(): the event loop runs on a background
+        thread, and at most `buffer` ready frames wait for the consumer
+        """
+        ready: queue.Queue = queue.Queue(maxsize=max(1, buffer))
+        stop = threading.Event()
+
+        def offer(item) -> bool:
+            # Never block for good: the consumer may have stopped reading
+            while not stop.is_set():
+                try:
+                    ready.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        async def produce():
+            async for item in self.stream(symbols, columns, start, end, min_rows):
+                if not offer(item):
+                    break
+
+        def run():
+            try:
+                asyncio.run(produce())
+                offer(_DONE)
+            except BaseException as e:
+                offer(e)
+
+        thread = threading.Thread(target=run, name="lake-stream", daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = ready.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            thread.join()
+
+    def load(self, symbols: Iterable[str], **kwargs) -> dict:
+        """Collect the whole stream into a dict (drop-in for DataLake.load)"""
+        return dict(self.iter_frames(symbols, **kwargs))
@@ -0,0 +1,205 @@
+"""
+Module: Lake Updater
+Incremental daily refresh of the Parquet price lake.
+
+The lake manifest records each symbol's last bar date, row count and checksum.
+A symbol whose last bar is older than the previous business day is stale. For
+a stale symbol only the bars from a short overlap window onward are
+downloaded. The overlap bars are compared with the stored ones. If they match,
+the new bars are appended. If the provider has re-adjusted history (a split,
+or a dividend under auto-adjusted prices) the overlap no longer matches, and
+only then is the full history downloaded again and rewritten. Symbols are
+processed concurrently.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.modules.data_lake import DataLake, LakeManifest, frame_checksum, normalize_history
+
+logger = logging.getLogger("lake_updater")
+
+FULL_HISTORY_PERIOD = "20y"
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+
+def yfinance_history_loader(symbol: str, start: Optional[pd.Timestamp]) -> pd.DataFrame:
+    """Daily bars from `start` (inclusive), or the full history when start is None"""
+    import yfinance as yf
+    ticker = yf.Ticker(symbol)
+    if start is None:
+        return ticker.history(period=FULL_HISTORY_PERIOD)
+    return ticker.history(start=start.strftime('%Y-%m-%d'))
+
+
+@dataclass
+class UpdateReport:
+    """Symbols grouped by what the updater did with them"""
+    created: List[str] = field(default_factory=list)
+    appended: List[str] = field(default_factory=list)
+    rewritten: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    current: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+
+    def add(self, outcome: str, symbol: str):
+        getattr(self, outcome).append(symbol)
+
+    def summary(self) -> Dict[str, int]:
+        return {name: len(getattr(self, name)) for name in self.__dataclass_fields__}
+
+
+class LakeUpdater:
+    """Bring lake symbols up to date, fetching only missing bars"""
+
+    def __init__(
+        self,
+        lake: DataLake,
+        loader: Callable[[str, Optional[pd.Timestamp]], pd.DataFrame] = yfinance_history_loader,
+        max_workers: int = 8,
+        overlap: int = 5,
+        tolerance: float = 1e-4,
+        checkpoint_every: int = 250,
+        clock: Callable[[], datetime] = datetime.now
+    ):
+        """
+        Args:
+            lake: Target lake; its manifest is loaded if not attached, kept
+                current by lake.write() and saved by run()
+            loader: (symbol, start or None for full history) -> yfinance-layout frame
+            max_workers: Symbols processed concurrently
+            overlap: Stored bars re-downloaded to detect adjusted history
+            tolerance: Relative price difference treated as a change
+            checkpoint_every: Save the manifest after this many symbols
+            clock: Current time (injectable for tests)
+        """
+        self.lake = lake
+        self.manifest: LakeManifest = lake.open_manifest()
+        self.loader = loader
+        self.max_workers = max(1, max_workers)
+        self.overlap = max(1, overlap)
+        self.tolerance = tolerance
+        self.checkpoint_every = checkpoint_every
+        self._clock = clock
+
+    # ==================== STALENESS ====================
+
+    def _today(self) -> pd.Timestamp:
+        return pd.Timestamp(self._clock().date())
+
+    def is_stale(self, symbol: str) -> bool:
+        """True if the symbol may have bars the lake does not hold yet"""
+        entry = self.manifest.get(symbol)
+        if not entry or 'last_date' not in entry:
+            return True
+        today = self._today()
+        if entry.get('checked_at') == today.strftime('%Y-%m-%d'):
+            return False
+        expected = today - pd.offsets.BDay(1)
+        return pd.Timestamp(entry['last_date']) < expected
+
+    # ==================== PER-SYMBOL UPDATE ====================
+
+    def _fetch(self, symbol: str, start: Optional[pd.Timestamp]) -> pd.DataFrame:
+        df = self.loader(symbol, start)
+        if df is None or df.empty:
+            return pd.DataFrame()
+        return normalize_history(df)
+
+    def _history_changed(self, stored: pd.DataFrame, fresh: pd.DataFrame) -> bool:
+        """Compare prices on the dates both frames hold"""
+        common = stored.index.intersection(fresh.index)
+        if common.empty:
+            return True
+        old = stored.loc[common, PRICE_COLUMNS].to_numpy(dtype=np.float64)
+        new = fresh.loc[common, PRICE_COLUMNS].to_numpy(dtype=np.float64)
+        return not np.allclose(old, new, rtol=self.tolerance, atol=0, equal_nan=True)
+
+    def _rewrite(self, symbol: str, checked_at: str) -> str:
+        full = self._fetch(symbol, None)
+        if full.empty:
+            raise ValueError("provider returned no history")
+        self.lake.write(symbol, full, checked_at=checked_at)
+        return 'rewritten'
+
+    def update_symbol(self, symbol: str) -> str:
+        """
+        Refresh one symbol
+
+        Returns:
+            Outcome: 'created', 'appended', 'rewritten', 'unchanged' or 'current'
+        """
+        if not self.is_stale(symbol):
+            return 'current'
+
+        checked_at = self._today().strftime('%Y-%m-%d')
+        stored = self.lake.read(symbol)
+        if stored.empty:
+            full = self._fetch(symbol, None)
+            if full.empty:
+                raise ValueError("provider returned no history")
+            self.lake.write(symbol, full, checked_at=checked_at)
+            return 'created'
+
+        entry = self.manifest.get(symbol) or {}
+        if 'checksum' not in entry:
+            self.manifest.record(symbol, stored)   # Object predates the manifest
+        elif entry['checksum'] != frame_checksum(stored):
+            logger.warning(f"{symbol}: stored history does not match the manifest checksum")
+
+        start = stored.index[-min(self.overlap, len(stored))]
+        fresh = self._fetch(symbol, start)
+        if fresh.empty:
+            self.manifest.update(symbol, checked_at=checked_at)
+            return 'unchanged'
+
+        new_rows = fresh[fresh.index > stored.index[-1]]
+        if self._history_changed(stored, fresh) or (new_rows['Stock Splits'] > 0).any():
+            logger.info(f"{symbol}: history was adjusted, rewriting")
+            return self._rewrite(symbol, checked_at)
+
+        if new_rows.empty:
+            self.manifest.update(symbol, checked_at=checked_at)
+            return 'unchanged'
+
+        self.lake.write(symbol, pd.concat([stored, new_rows]), checked_at=checked_at)
+        return 'appended'
+
+    # ==================== BATCH ====================
+
+    def run(self, symbols: Iterable[str]) -> UpdateReport:
+        """
+        Update many symbols concurrently, checkpointing the manifest as it goes
+
+        Returns:
+            UpdateReport of what happened to each symbol
+        """
+        symbols = list(dict.fromkeys(symbols))
+        stale = [s for s in symbols if self.is_stale(s)]
+        stale_set = set(stale)
+        report = UpdateReport(current=[s for s in symbols if s not in stale_set])
+        logger.info(f"{len(stale)}/{len(symbols)} symbols are stale")
+
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.update_symbol, s): s for s in stale}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    report.add(future.result(), symbol)
+                except Exception as e:
+                    logger.error(f"Failed to update {symbol}: {e}")
+                    report.add('failed', symbol)
+                done += 1
+                if self.checkpoint_every and done % self.checkpoint_every == 0:
+                    self.manifest.save()
+                    logger.info(f"Updated {done}/{len(stale)}...")
+
+        self.manifest.save()
+        logger.info(f"Lake update complete: {report.summary()}")
+        return report
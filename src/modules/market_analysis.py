@@ -18,6 +18,7 @@ import json
 import requests
 
 from src.modules.data_fetcher import DataFetcher
+from src.modules.data_providers import DataProvider
 
 
 from src.config.settings import (
@@ -360,24 +361,27 @@ class MarketAnalyzer:
         """Analyze VIX volatility index"""
         try:
             import os
-            import boto3
             import json
             import yfinance as yf
             import requests
             from src.config import settings
+            from src.utils.s3_cache import TieredS3Cache
+            from src.utils.aws_utils import get_s3_client
             
             # Setup Cache Dir for yfinance (writeable)
             os.environ["YFINANCE_CACHE_DIR"] = "/tmp"
 
-            # 1. Try S3 Cache first (Most Robust)
+            # 1. Try S3 Cache first (Most Robust); an offline provider replaces it
+            provider = getattr(self.data_fetcher, 'provider', None)
             try:
-                s3 = boto3.client('s3')
-                # Use bucket from env or settings
-                bucket = os.getenv("S3_BUCKET", settings.S3_BUCKET)
-                key = "min_data/vix_latest.json"
-                response = s3.get_object(Bucket=bucket, Key=key)
-                content = response['Body'].read().decode('utf-8')
-                vix_data = json.loads(content)
+                if isinstance(provider, DataProvider):
+                    vix_data = provider.vix()
+                else:
+                    s3 = get_s3_client()
+                    # Use bucket from env or settings
+                    bucket = os.getenv("S3_BUCKET", settings.S3_BUCKET)
+                    key = "min_data/vix_latest.json"
+                    vix_data = TieredS3Cache(s3).get_json(bucket, key)
                 current_vix = vix_data.get('price', 0.0)
                 logger.info(f"Loaded VIX from S3 Cache: {current_vix}")
                 
@@ -400,6 +404,9 @@ class MarketAnalyzer:
             except Exception as e:
                 logger.warning(f"S3 VIX Cache load failed: {e}")
             
+            if isinstance(provider, DataProvider):
+                return {"current_vix": 0.0, "status": "Unknown", "fear_level": "Unknown", "explanation": "Data unavailable."}
+            
             # 2. Use yfinance for VIX (NO Session, let YF handle it)
             # YF recent versions manage their own sessions better or reject requests.Session
             vix = yf.Ticker("^VIX")
@@ -471,8 +478,8 @@ class MarketAnalyzer:
         - New Highs / New Lows (based on 52-week range)
         """
         try:
-            # 1. Get Universe
-            tickers = self.data_fetcher.fetch_sp500_tickers()
+            # 1. Get Universe (cached registry snapshot, no per-run scrape)
+            tickers = self.data_fetcher.universe.symbols(['sp500'])
             if not tickers:
                 logger.warning("Could not fetch tickers for breadth analysis.")
                 return self._get_fallback_breadth()
@@ -486,11 +493,7 @@ class MarketAnalyzer:
                 return self._get_fallback_breadth()
             
             # 3. Calculate Metrics
-            # Accessing MultiIndex columns: data[('Close', 'AAPL')] or data['Close']['AAPL']
-            # yfinance bulk download structure:
-            # Columns: (PriceType, Ticker) -> e.g. ('Close', 'AAPL')
-            # If group_by='ticker', then (Ticker, PriceType) -> e.g. ('AAPL', 'Close')
-            # We used group_by='ticker' in updated data_fetcher
+            # data is a BarPanel: data[ticker] is a zero-copy view of that ticker's bars
             
             stocks_above_50 = 0
             stocks_above_200 = 0
@@ -500,7 +503,7 @@ class MarketAnalyzer:
             
             for ticker in tickers:
                 try:
-                    if ticker not in data.columns:
+                    if ticker not in data:
                         continue
                         
                     df_ticker = data[ticker]
@@ -7,6 +7,8 @@ import numpy as np
 from typing import Dict, Optional
 import logging
 
+from src.modules.features import DEFAULT_BREADTH, breadth_table
+
 logger = logging.getLogger(__name__)
 
 class MarketBreadthCalculator:
@@ -23,7 +25,7 @@ class MarketBreadthCalculator:
             stock_universe: Dict mapping symbol -> DataFrame with OHLCV + indicators
         """
         self.universe = stock_universe
-        self.cache = {}  # Cache breadth by date
+        self.table = None  # Breadth for every date, built on first use
         logger.info(f"Initialized MarketBreadthCalculator with {len(stock_universe)} stocks")
         
     def calculate_daily_breadth(self, date: pd.Timestamp) -> dict:
@@ -36,87 +38,29 @@ class MarketBreadthCalculator:
         - adv_dec_ratio: Advancing stocks / Declining stocks
         - new_highs_lows: (52W highs - 52W lows) / total stocks
         """
-        # Check cache
-        date_key = date.strftime('%Y-%m-%d')
-        if date_key in self.cache:
-            return self.cache[date_key]
-        
-        stocks_data = []
-        
-        for symbol, df in self.universe.items():
-            if date not in df.index:
-                continue
-                
-            try:
-                row = df.loc[date]
-                
-                # Skip if missing critical data
-                if pd.isna(row.get('Close')) or pd.isna(row.get('SMA_200')):
-                    continue
-                
-                stocks_data.append({
-                    'close': row['Close'],
-                    'prev_close': row.get('Close_prev', row['Close']),
-                    'high_252d': row.get('High_252d', row['High']),
-                    'low_252d': row.get('Low_252d', row['Low']),
-                    'sma_200': row.get('SMA_200', row['Close'])
-                })
-            except Exception as e:
-                continue
-        
-        if len(stocks_data) < 50:  # Need minimum sample size
-            result = self._default_breadth()
-        else:
-            result = self._calculate_metrics(stocks_data)
-        
-        # Cache result
-        self.cache[date_key] = result
-        return result
+        table = self.breadth_table()
+        if date not in table.index:
+            return self._default_breadth()
+        return table.loc[date].to_dict()
     
-    def _calculate_metrics(self, stocks_data: list) -> dict:
-        """Calculate actual breadth metrics from stock data"""
-        total = len(stocks_data)
-        
-        # 1. % Above 200-day SMA
-        above_200sma = sum(1 for s in stocks_data if s['close'] > s['sma_200'])
-        pct_above_200sma = (above_200sma / total) * 100
-        
-        # 2. % At 52-week high (within 2%)
-        at_52w_high = sum(1 for s in stocks_data 
-                         if s['close'] >= s['high_252d'] * 0.98)
-        pct_at_52w_high = (at_52w_high / total) * 100
-        
-        # 3. % At 52-week low (within 2%)
-        at_52w_low = sum(1 for s in stocks_data 
-                        if s['close'] <= s['low_252d'] * 1.02)
-        
-        # 4. Advance/Decline Ratio
-        advancing = sum(1 for s in stocks_data if s['close'] > s['prev_close'])
-        declining = total - advancing
-        adv_dec_ratio = advancing / max(declining, 1)
-        
-        # 5. New Highs - New Lows (normalized)
-        new_highs_lows = (at_52w_high - at_52w_low) / total * 100
+    def breadth_table(self) -> pd.DataFrame:
+        """
+        Breadth for every date in the universe (see features.breadth_table).
         
-        return {
-            'pct_above_200sma': round(pct_above_200sma, 2),
-            'pct_at_52w_high': round(pct_at_52w_high, 2),
-            'adv_dec_ratio': round(adv_dec_ratio, 3),
-            'new_highs_lows': round(new_highs_lows, 2),
-        }
+        Built once from the universe as it is on first use, so frames
+        replaced with indicator versions after construction are picked up.
+        """
+        if self.table is None:
+            self.table = breadth_table(self.universe)
+        return self.table
     
     def _default_breadth(self) -> dict:
         """Return neutral/default breadth values"""
-        return {
-            'pct_above_200sma': 50.0,
-            'pct_at_52w_high': 5.0,
-            'adv_dec_ratio': 1.0,
-            'new_highs_lows': 0.0,
-        }
+        return dict(DEFAULT_BREADTH)
     
     def clear_cache(self):
         """Clear the breadth cache (useful for backtesting)"""
-        self.cache = {}
+        self.table = None
 
 
 def fetch_vix_data(start_date='2006-01-01', end_date='2025-12-31') -> pd.DataFrame:
@@ -0,0 +1,194 @@
+"""
+Module: ML Scores
+Batch inference over the whole universe and the per-day score table.
+
+`score_universe()` builds the latest-bar features for every symbol with the
+shared feature library and scores them with a single predict_proba call.
+The result is stored once per day in the data lake:
+
+    lake/ml_scores/date=YYYY-MM-DD/scores.parquet
+        date (date32), symbol (string), probability (float32), model_version (string)
+
+Consumers (screener, position sizer, reports) look probabilities up in the
+table instead of computing features and running the model themselves.
+Reads go through the tiered S3 cache, so repeated lookups in a warm
+container cost at most a conditional GET. A lookup falls back to the most
+recent table within `max_age_days` (weekends and holidays have none).
+"""
+import logging
+from datetime import date as date_type, datetime, timedelta
+from io import BytesIO
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from botocore.exceptions import ClientError
+
+from src.config import settings
+from src.modules import features as feature_lib
+from src.utils.s3_cache import TieredS3Cache, _is_missing
+
+logger = logging.getLogger("ml_scores")
+
+SCORES_FILE = "scores.parquet"
+SCORE_SCHEMA_VERSION = 1
+DEFAULT_MAX_AGE_DAYS = 4   # Covers a long weekend
+
+SCORE_SCHEMA = pa.schema(
+    [
+        pa.field('date', pa.date32()),
+        pa.field('symbol', pa.string()),
+        pa.field('probability', pa.float32()),
+        pa.field('model_version', pa.string()),
+    ],
+    metadata={b'score_schema_version': str(SCORE_SCHEMA_VERSION).encode()}
+)
+
+
+def _as_date(value) -> date_type:
+    if value is None:
+        return datetime.utcnow().date()
+    return pd.Timestamp(value).date()
+
+
+def score_universe(
+    model,
+    bars,
+    market_df: Optional[pd.DataFrame] = None,
+    features: Optional[Sequence[str]] = None,
+    scaler=None,
+    vix_df: Optional[pd.DataFrame] = None,
+    symbols: Optional[Iterable[str]] = None
+) -> pd.Series:
+    """
+    P(Win) on the latest bar of every symbol, in one batch
+
+    Args:
+        model: Classifier with predict_proba (sklearn or CompiledEnsemble)
+        bars: Universe histories (BarPanel, long frame or symbol -> frame);
+              also the breadth universe
+        market_df: SPY history
+        features: Model input columns (default: feature_lib.BASE_FEATURES)
+        scaler: Fitted scaler applied before the model, if any
+        vix_df: VIX history with a 'VIX' column
+        symbols: Restrict scoring to these symbols
+
+    Returns:
+        Series of float32 probabilities indexed by symbol
+    """
+    features = list(features or feature_lib.BASE_FEATURES)
+    X = feature_lib.latest_features(bars, market_df, features=features, symbols=symbols,
+                                    universe=bars, vix_df=vix_df)
+    if X.empty:
+        return pd.Series(dtype=np.float32, name='probability', index=pd.Index([], name='symbol'))
+    X = X.fillna(0.0)  # NaN safe (short histories)
+    X_pred = scaler.transform(X) if scaler is not None else X
+    probs = model.predict_proba(X_pred)[:, 1].astype(np.float32)
+    logger.info(f"Scored {len(X)} symbols in one batch")
+    return pd.Series(probs, index=pd.Index(X.index, name='symbol'), name='probability')
+
+
+class ScoreStore:
+    """Per-day ML score tables in the S3 data lake"""
+
+    def __init__(
+        self,
+        s3_client=None,
+        bucket: str = settings.S3_BUCKET,
+        prefix: str = settings.ML_SCORES_PREFIX,
+        cache: Optional[TieredS3Cache] = None
+    ):
+        """
+        Args:
+            s3_client: boto3 S3 client (default: the shared pooled client)
+            bucket: Lake bucket
+            prefix: Key prefix of the score tables
+            cache: Cache used for reads and write-through (default: tiered S3 cache)
+        """
+        if s3_client is None:
+            from src.utils.aws_utils import get_s3_client
+            s3_client = get_s3_client()
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.cache = cache or TieredS3Cache(s3_client)
+
+    def key(self, day=None) -> str:
+        return f"{self.prefix}date={_as_date(day).isoformat()}/{SCORES_FILE}"
+
+    def write(self, scores: pd.Series, model_version: str, day=None) -> str:
+        """
+        Store a day's scores (replacing any earlier table for that day)
+
+        Args:
+            scores: Probabilities indexed by symbol (see score_universe())
+            model_version: Registry version that produced them
+            day: Score date (default: today, UTC)
+
+        Returns:
+            The S3 key written
+        """
+        day = _as_date(day)
+        table = pa.Table.from_pandas(pd.DataFrame({
+            'date': [day] * len(scores),
+            'symbol': scores.index.astype(str),
+            'probability': scores.to_numpy(dtype=np.float32),
+            'model_version': model_version,
+        }), schema=SCORE_SCHEMA, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **SCORE_SCHEMA.metadata,
+            b'feature_schema': str(feature_lib.FEATURE_SCHEMA_VERSION).encode(),
+        })
+        buffer = BytesIO()
+        pq.write_table(table, buffer, compression='zstd')
+        key = self.key(day)
+        self.cache.put_bytes(self.bucket, key, buffer.getvalue())
+        logger.info(f"Wrote {len(scores)} scores (model {model_version}) to s3://{self.bucket}/{key}")
+        return key
+
+    def read(self, day=None) -> Optional[pd.DataFrame]:
+        """A day's score table indexed by symbol, or None if it was not written"""
+        try:
+            df = self.cache.get_parquet(self.bucket, self.key(day))
+        except ClientError as e:
+            if _is_missing(e):
+                return None
+            raise
+        return df.set_index('symbol')
+
+    def latest(self, day=None, max_age_days: int = DEFAULT_MAX_AGE_DAYS) -> Optional[pd.DataFrame]:
+        """The table for `day` or the most recent one up to `max_age_days` before it"""
+        day = _as_date(day)
+        for age in range(max_age_days + 1):
+            df = self.read(day - timedelta(days=age))
+            if df is not None:
+                return df
+        return None
+
+    def lookup(
+        self,
+        symbols: Iterable[str],
+        day=None,
+        max_age_days: int = DEFAULT_MAX_AGE_DAYS
+    ) -> Dict[str, dict]:
+        """
+        Scores for `symbols` from the latest table (see latest())
+
+        Returns:
+            dict: symbol -> {'probability', 'model_version', 'date'}; symbols
+            not in the table are omitted
+        """
+        df = self.latest(day, max_age_days)
+        if df is None:
+            return {}
+        found = df.reindex([s for s in dict.fromkeys(symbols) if s in df.index])
+        return {
+            symbol: {
+                'probability': float(row.probability),
+                'model_version': row.model_version,
+                'date': pd.Timestamp(row.date).date().isoformat(),
+            }
+            for symbol, row in found.iterrows()
+        }
@@ -0,0 +1,325 @@
+"""
+Module: Model Registry
+Immutable, versioned model artifacts with an atomically promoted pointer.
+
+Layout (S3 prefix or local directory):
+    <root>/<name>/versions/<version>/pipeline.joblib
+    <root>/<name>/versions/<version>/model.npy, model.json   (compiled export, if any)
+    <root>/<name>/versions/<version>/manifest.json
+    <root>/<name>/current.json
+
+A version is written once: artifacts first, manifest.json last (a version
+without a manifest is incomplete and never promoted). The manifest records
+a SHA-256 per file. Promotion is a single write of current.json, which is
+atomic both as an S3 PUT and as a local os.replace.
+
+Consumers read current.json through the tiered S3 cache (a conditional GET
+at most every few minutes) and download a version only when the pointer
+moves to one not yet in the local cache. Cached files are checked against
+the manifest hashes before use.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from botocore.exceptions import ClientError
+
+from src.config import settings
+from src.utils.s3_cache import TieredS3Cache, _is_missing
+
+logger = logging.getLogger("model_registry")
+
+DEFAULT_MODEL_NAME = "breakout_classifier"
+DEFAULT_CACHE_DIR = Path(tempfile.gettempdir()) / "model_registry"
+PIPELINE_FILE = "pipeline.joblib"
+COMPILED_BASE = "model"  # model.npy + model.json
+MANIFEST_FILE = "manifest.json"
+POINTER_FILE = "current.json"
+
+# Loaded pipelines per (registry location, version); versions never change
+_PIPELINES: Dict[Tuple[str, str], dict] = {}
+_PIPELINES_LOCK = threading.Lock()
+
+
+def sha256_file(path: Union[str, Path]) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """Versioned model store on S3 (bucket given) or a local directory"""
+
+    def __init__(
+        self,
+        name: str = DEFAULT_MODEL_NAME,
+        bucket: Optional[str] = None,
+        prefix: str = settings.MODEL_REGISTRY_PREFIX,
+        root: Optional[Union[str, Path]] = None,
+        s3_client=None,
+        cache_dir: Optional[Path] = None,
+        pointer_cache: Optional[TieredS3Cache] = None
+    ):
+        """
+        Args:
+            name: Model name (one registry namespace per model)
+            bucket: S3 bucket; None uses the local directory `root`
+            prefix: S3 key prefix of all registries
+            root: Local registry directory (default settings.MODEL_REGISTRY_DIR)
+            s3_client: boto3 S3 client (default: the shared pooled client)
+            cache_dir: Local artifact cache for S3 registries (default /tmp/model_registry)
+            pointer_cache: Cache used for current.json reads (default: tiered S3 cache)
+        """
+        self.name = name
+        self.bucket = bucket
+        if bucket:
+            from src.utils.aws_utils import get_s3_client
+            self.s3_client = s3_client or get_s3_client()
+            self.base = f"{prefix.rstrip('/')}/{name}/"
+            self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR) / bucket / name
+            self.pointer_cache = pointer_cache or TieredS3Cache(self.s3_client)
+        else:
+            self.s3_client = None
+            self.base = str(Path(root or settings.MODEL_REGISTRY_DIR) / name) + os.sep
+            self.cache_dir = None
+            self.pointer_cache = None
+
+    @property
+    def location(self) -> str:
+        return f"s3://{self.bucket}/{self.base}" if self.bucket else self.base
+
+    # ==================== STORAGE ====================
+
+    def _version_key(self, version: str, filename: str = "") -> str:
+        return f"{self.base}versions/{version}/{filename}"
+
+    def _read(self, key: str) -> Optional[bytes]:
+        if self.bucket:
+            try:
+                return self.s3_client.get_object(Bucket=self.bucket, Key=key)['Body'].read()
+            except ClientError as e:
+                if _is_missing(e):
+                    return None
+                raise
+        try:
+            return Path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, body: bytes):
+        if self.bucket:
+            self.s3_client.put_object(Bucket=self.bucket, Key=key, Body=body)
+            return
+        path = Path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
+
+    def _upload(self, key: str, path: Path):
+        if self.bucket:
+            self.s3_client.upload_file(str(path), self.bucket, key)
+        else:
+            Path(key).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(path, key)
+
+    # ==================== READ ====================
+
+    def current(self) -> Optional[dict]:
+        """The current pointer ({'version', 'promoted_at', 'previous'}) or None"""
+        key = self.base + POINTER_FILE
+        if not self.bucket:
+            body = self._read(key)
+            return json.loads(body) if body else None
+        try:
+            return self.pointer_cache.get_json(self.bucket, key)
+        except ClientError as e:
+            if _is_missing(e):
+                return None
+            raise
+
+    def current_version(self) -> Optional[str]:
+        pointer = self.current()
+        return pointer.get('version') if pointer else None
+
+    def manifest(self, version: str) -> dict:
+        body = self._read(self._version_key(version, MANIFEST_FILE))
+        if body is None:
+            raise KeyError(f"Model version {version} not found in {self.location}")
+        return json.loads(body)
+
+    def versions(self) -> List[str]:
+        """Complete (manifest written) versions, oldest first"""
+        if self.bucket:
+            found = []
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=self.base + "versions/"):
+                found.extend(obj['Key'].split('/')[-2] for obj in page.get('Contents', [])
+                             if obj['Key'].endswith('/' + MANIFEST_FILE))
+            return sorted(found)
+        root = Path(self.base) / "versions"
+        return sorted(p.parent.name for p in root.glob(f"*/{MANIFEST_FILE}"))
+
+    def fetch(self, version: Optional[str] = None) -> Tuple[Path, dict]:
+        """
+        Local directory holding a version's artifacts, downloading only missing
+        or corrupt files (verified against the manifest hashes)
+
+        Args:
+            version: Version to fetch (default: current)
+
+        Returns:
+            (directory, manifest)
+        """
+        version = version or self.current_version()
+        if version is None:
+            raise KeyError(f"No current model in {self.location}")
+        manifest = self.manifest(version)
+        if not self.bucket:
+            return Path(self._version_key(version)), manifest
+
+        target = self.cache_dir / version
+        target.mkdir(parents=True, exist_ok=True)
+        for filename, info in manifest['files'].items():
+            path = target / filename
+            if path.exists() and path.stat().st_size == info['size'] and sha256_file(path) == info['sha256']:
+                continue
+            tmp = path.with_name(path.name + ".tmp")
+            self.s3_client.download_file(self.bucket, self._version_key(version, filename), str(tmp))
+            if sha256_file(tmp) != info['sha256']:
+                tmp.unlink()
+                raise ValueError(f"Hash mismatch for {filename} in model version {version}")
+            os.replace(tmp, path)
+            logger.info(f"Fetched {filename} ({info['size']} bytes) for model version {version}")
+        return target, manifest
+
+    def load_pipeline(self, version: Optional[str] = None) -> Tuple[dict, str]:
+        """
+        The joblib pipeline of a version (default: current), memoized per version
+
+        The memoized pipeline is shared; callers that modify it must copy it first.
+
+        Returns:
+            (pipeline, version)
+        """
+        import joblib
+
+        version = version or self.current_version()
+        if version is None:
+            raise KeyError(f"No current model in {self.location}")
+        cache_key = (self.location, version)
+        with _PIPELINES_LOCK:
+            if cache_key in _PIPELINES:
+                return _PIPELINES[cache_key], version
+        directory, _ = self.fetch(version)
+        pipeline = joblib.load(directory / PIPELINE_FILE)
+        with _PIPELINES_LOCK:
+            _PIPELINES[cache_key] = pipeline
+        return pipeline, version
+
+    # ==================== WRITE ====================
+
+    def publish(self, files: Dict[str, Union[str, Path]], metadata: Optional[dict] = None) -> str:
+        """
+        Store artifacts as a new immutable version (not promoted)
+
+        Args:
+            files: Artifact name in the version -> local file
+            metadata: Stored in the manifest (features, metrics, ...)
+
+        Returns:
+            The new version id (UTC timestamp + content hash)
+        """
+        hashes = {name: sha256_file(path) for name, path in files.items()}
+        content = hashlib.sha256(json.dumps(sorted(hashes.items())).encode()).hexdigest()
+        created = datetime.now(timezone.utc)
+        version = f"{created:%Y%m%dT%H%M%S}Z-{content[:12]}"
+        if self._read(self._version_key(version, MANIFEST_FILE)) is not None:
+            raise ValueError(f"Model version {version} already exists")
+
+        for name, path in files.items():
+            self._upload(self._version_key(version, name), Path(path))
+        manifest = {
+            'name': self.name,
+            'version': version,
+            'created_at': created.isoformat(),
+            'content_hash': content,
+            'files': {name: {'sha256': hashes[name], 'size': os.path.getsize(path)} for name, path in files.items()},
+            'metadata': metadata or {},
+        }
+        # Written last: a manifest marks the version complete
+        self._write(self._version_key(version, MANIFEST_FILE), json.dumps(manifest, indent=2).encode())
+        logger.info(f"Published model version {version} to {self.location}")
+        return version
+
+    def publish_pipeline(
+        self,
+        pipeline: dict,
+        metadata: Optional[dict] = None,
+        compile: bool = True,
+        train_end=None
+    ) -> str:
+        """
+        Publish a {'model', 'scaler', 'features', 'feature_schema'} pipeline,
+        plus its compiled NumPy export when the model supports it
+
+        Args:
+            pipeline: The pipeline dict
+            metadata: Stored in the manifest
+            compile: Also store the compiled NumPy export
+            train_end: Training cutoff (date or ISO string): no trade entered
+                after it was trained on. Recorded as metadata['train_end'] so
+                later models can be compared on rows this one never saw.
+        """
+        import joblib
+        from src.modules.tree_inference import export_pipeline
+
+        metadata = {
+            'model': pipeline['model'].__class__.__name__,
+            'features': list(pipeline.get('features') or []),
+            'feature_schema': pipeline.get('feature_schema'),
+            'train_end': train_end.isoformat() if hasattr(train_end, 'isoformat') else train_end,
+            **(metadata or {}),
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            files = {PIPELINE_FILE: Path(tmp) / PIPELINE_FILE}
+            joblib.dump(pipeline, files[PIPELINE_FILE])
+            if compile:
+                try:
+                    nodes_path, meta_path = export_pipeline(
+                        Path(tmp) / COMPILED_BASE, pipeline['model'], pipeline.get('scaler'),
+                        pipeline.get('features'), pipeline.get('feature_schema')
+                    )
+                    files[nodes_path.name] = nodes_path
+                    files[meta_path.name] = meta_path
+                except ValueError as e:
+                    # e.g. an XGBoost member; consumers fall back to the joblib pipeline
+                    logger.info(f"No compiled export: {e}")
+            return self.publish(files, metadata)
+
+    def promote(self, version: str) -> dict:
+        """
+        Make `version` current with one pointer write
+
+        Returns:
+            The new pointer
+        """
+        self.manifest(version)  # Must exist and be complete
+        previous = self.current()
+        pointer = {
+            'version': version,
+            'promoted_at': datetime.now(timezone.utc).isoformat(),
+            'previous': previous.get('version') if previous else None,
+        }
+        self._write(self.base + POINTER_FILE, json.dumps(pointer).encode())
+        logger.info(f"Promoted model version {version} in {self.location}")
+        return pointer
@@ -0,0 +1,287 @@
+"""
+Module: Model Search
+Time-series-aware hyperparameter search for the breakout classifier.
+
+Folds are walk-forward over entry_date and purged: a training row is only
+used if its trade closed (exit_date) before the test block opens, and rows
+entered within `embargo_days` of the test block are dropped as well. Each
+fold's scaler is fit on its own training rows.
+
+The search is successive halving over the estimator count: every candidate
+is scored at a small budget, the best 1/eta advance to an eta-times larger
+budget, and the last rung is always scored at `max_resource`. The
+objective is pooled precision at the strategy's confidence threshold
+(P(win) > 0.55), the same number train_model.py reports.
+
+Fold matrices are scaled once and written as float32 .npy files; candidate
+fits run on a spawned process pool and open them memory-mapped, so no
+matrix is pickled per task.
+"""
+import hashlib
+import itertools
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+logger = logging.getLogger("model_search")
+
+TARGET_THRESHOLD = 0.55  # Strategy trades only P(win) above this
+ESTIMATORS = {
+    "RandomForest": RandomForestClassifier,
+    "GradientBoosting": GradientBoostingClassifier,
+}
+# Fixed settings per estimator; the search space varies the rest
+BASE_PARAMS = {
+    "RandomForest": {"class_weight": "balanced", "random_state": 42},
+    "GradientBoosting": {"random_state": 42},
+}
+DEFAULT_SPACE = {
+    "RandomForest": {"max_depth": [4, 5, 7], "min_samples_leaf": [1, 20, 50]},
+    "GradientBoosting": {"learning_rate": [0.03, 0.05, 0.1], "max_depth": [2, 3]},
+}
+
+
+@dataclass(frozen=True)
+class Candidate:
+    """One estimator configuration (n_estimators is the search budget)"""
+    estimator: str
+    params: Tuple[Tuple[str, object], ...]
+
+    @property
+    def name(self) -> str:
+        return f"{self.estimator}(" + ", ".join(f"{k}={v}" for k, v in self.params) + ")"
+
+    def build(self, n_estimators: int):
+        params = {**BASE_PARAMS.get(self.estimator, {}), **dict(self.params)}
+        return ESTIMATORS[self.estimator](n_estimators=n_estimators, **params)
+
+
+def candidates_from_space(space: Optional[Dict[str, Dict[str, list]]] = None) -> List[Candidate]:
+    """Expand {estimator: {param: values}} into the full grid of Candidates"""
+    out = []
+    for estimator, grid in (space or DEFAULT_SPACE).items():
+        if estimator not in ESTIMATORS:
+            raise ValueError(f"Unknown estimator: {estimator}")
+        keys = sorted(grid)
+        for values in itertools.product(*(grid[k] for k in keys)):
+            out.append(Candidate(estimator, tuple(zip(keys, values))))
+    return out
+
+
+# ==================== FOLDS ====================
+
+def purged_folds(
+    entry_dates,
+    exit_dates=None,
+    n_splits: int = 5,
+    embargo_days: int = 5,
+    min_train: int = 50
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Walk-forward (train, test) row indices over entry_date
+
+    Unique entry dates are cut into n_splits + 1 contiguous blocks; fold k
+    tests on block k + 1 and trains on earlier rows that are closed before
+    the block starts (purge) and entered at least `embargo_days` before it.
+
+    Args:
+        entry_dates: Entry date per row
+        exit_dates: Exit date per row (default: entry date, i.e. no purge)
+        n_splits: Number of folds
+        embargo_days: Calendar days between training entries and the test block
+        min_train: Folds with fewer training rows are skipped
+
+    Returns:
+        List of (train_idx, test_idx) arrays
+    """
+    entry = pd.to_datetime(pd.Series(entry_dates)).to_numpy(dtype='datetime64[ns]')
+    exit_ = entry if exit_dates is None else pd.to_datetime(pd.Series(exit_dates)).to_numpy(dtype='datetime64[ns]')
+    # Open trades (no exit) never close before any test block
+    exit_ = np.where(np.isnat(exit_), np.datetime64('2262-01-01', 'ns'), exit_)
+
+    blocks = np.array_split(np.unique(entry), n_splits + 1)
+    embargo = np.timedelta64(embargo_days, 'D')
+    folds = []
+    for block, next_block in zip(blocks[1:], blocks[2:] + [None]):
+        if len(block) == 0:
+            continue
+        test_start = block[0]
+        test_end = next_block[0] if next_block is not None and len(next_block) else None
+        test_mask = entry >= test_start
+        if test_end is not None:
+            test_mask &= entry < test_end
+        train_mask = (exit_ < test_start) & (entry < test_start - embargo)
+        train_idx, test_idx = np.flatnonzero(train_mask), np.flatnonzero(test_mask)
+        if len(train_idx) >= min_train and len(test_idx):
+            folds.append((train_idx, test_idx))
+    return folds
+
+
+def precision_at(y_true, y_prob, threshold: float = TARGET_THRESHOLD) -> Tuple[int, int]:
+    """(selected, wins) among rows with y_prob > threshold"""
+    selected = np.asarray(y_prob) > threshold
+    return int(selected.sum()), int(np.asarray(y_true)[selected].sum())
+
+
+class FoldCache:
+    """
+    Scaled fold matrices on disk, shared with worker processes
+
+    Files are keyed by a hash of the data and the fold indices, so a cache
+    directory can be reused across searches on the same dataset.
+    """
+
+    def __init__(self, X: np.ndarray, y: np.ndarray, folds, cache_dir: Optional[Path] = None):
+        self._owned = cache_dir is None
+        self.root = Path(cache_dir) if cache_dir is not None else Path(tempfile.mkdtemp(prefix="model_search_"))
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        y = np.ascontiguousarray(y, dtype=np.int8)
+        digest = hashlib.sha1(X.tobytes())
+        digest.update(y.tobytes())
+        for train_idx, test_idx in folds:
+            digest.update(train_idx.tobytes())
+            digest.update(test_idx.tobytes())
+        self.dir = self.root / digest.hexdigest()[:16]
+        self.n_folds = len(folds)
+        if not (self.dir / "done").exists():
+            self._write(X, y, folds)
+        else:
+            logger.info(f"Reusing cached folds in {self.dir}")
+
+    def _write(self, X, y, folds):
+        tmp = self.dir.with_name(self.dir.name + ".building")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        for k, (train_idx, test_idx) in enumerate(folds):
+            scaler = StandardScaler().fit(X[train_idx])
+            np.save(tmp / f"{k}_X_train.npy", scaler.transform(X[train_idx]).astype(np.float32))
+            np.save(tmp / f"{k}_X_test.npy", scaler.transform(X[test_idx]).astype(np.float32))
+            np.save(tmp / f"{k}_y_train.npy", y[train_idx])
+            np.save(tmp / f"{k}_y_test.npy", y[test_idx])
+        (tmp / "done").touch()
+        shutil.rmtree(self.dir, ignore_errors=True)
+        tmp.rename(self.dir)
+
+    def close(self):
+        if self._owned:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+
+def _score_task(fold_dir: str, fold: int, candidate: Candidate, n_estimators: int, threshold: float) -> Tuple[int, int]:
+    """Fit one candidate on one cached fold (runs in a worker process)"""
+    load = lambda name: np.load(os.path.join(fold_dir, f"{fold}_{name}.npy"), mmap_mode='r')
+    model = candidate.build(n_estimators)
+    model.fit(load("X_train"), load("y_train"))
+    y_prob = model.predict_proba(load("X_test"))[:, 1]
+    return precision_at(load("y_test"), y_prob, threshold)
+
+
+# ==================== SEARCH ====================
+
+@dataclass
+class SearchResult:
+    """Outcome of a search: the winner and every (candidate, budget) score"""
+    best: Candidate
+    best_resource: int
+    best_score: float
+    leaderboard: pd.DataFrame = field(repr=False)
+
+
+def successive_halving(
+    X,
+    y,
+    entry_dates,
+    exit_dates=None,
+    candidates: Optional[List[Candidate]] = None,
+    n_splits: int = 5,
+    embargo_days: int = 5,
+    min_resource: int = 25,
+    max_resource: int = 200,
+    eta: int = 2,
+    threshold: float = TARGET_THRESHOLD,
+    min_coverage: float = 0.01,
+    n_jobs: Optional[int] = None,
+    cache_dir: Optional[Path] = None
+) -> SearchResult:
+    """
+    Successive-halving search scored by pooled precision at `threshold`
+
+    Args:
+        X: Feature matrix (rows aligned with y / entry_dates)
+        y: Binary outcome
+        entry_dates: Entry date per row
+        exit_dates: Exit date per row, used to purge overlapping labels
+        candidates: Configurations to try (default: DEFAULT_SPACE grid)
+        n_splits: Walk-forward folds
+        embargo_days: See purged_folds()
+        min_resource: n_estimators at the first rung
+        max_resource: n_estimators cap
+        eta: Keep the best 1/eta candidates per rung and multiply the budget by eta
+        threshold: Probability cut used by the strategy
+        min_coverage: A candidate selecting fewer than this fraction of test
+            rows scores 0 (a handful of lucky picks is not precision)
+        n_jobs: Worker processes (default: CPU count; 0 fits in-process)
+        cache_dir: Keep scaled fold matrices here between searches
+
+    Returns:
+        SearchResult
+    """
+    candidates = list(candidates or candidates_from_space())
+    if not candidates:
+        raise ValueError("No candidates to search")
+    folds = purged_folds(entry_dates, exit_dates, n_splits=n_splits, embargo_days=embargo_days)
+    if not folds:
+        raise ValueError("Not enough history for any purged fold")
+    n_test = sum(len(test_idx) for _, test_idx in folds)
+    logger.info(f"Searching {len(candidates)} candidates over {len(folds)} purged folds ({n_test} test rows)")
+
+    cache = FoldCache(np.asarray(X), np.asarray(y), folds, cache_dir)
+    n_jobs = (os.cpu_count() or 1) if n_jobs is None else max(0, n_jobs)
+    pool = None
+    if n_jobs > 0:
+        pool = ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context('spawn'))
+    rows = []
+    try:
+        alive, resource = candidates, min_resource
+        while True:
+            tasks = [(c, k) for c in alive for k in range(cache.n_folds)]
+            args = [(str(cache.dir), k, c, resource, threshold) for c, k in tasks]
+            results = pool.map(_score_task, *zip(*args)) if pool else itertools.starmap(_score_task, args)
+
+            totals = {c: [0, 0] for c in alive}
+            for (c, _), (selected, wins) in zip(tasks, results):
+                totals[c][0] += selected
+                totals[c][1] += wins
+            scores = {}
+            for c, (selected, wins) in totals.items():
+                coverage = selected / n_test
+                scores[c] = wins / selected if selected and coverage >= min_coverage else 0.0
+                rows.append({"candidate": c.name, "n_estimators": resource, "precision": scores[c],
+                             "coverage": coverage, "selected": selected})
+
+            ranked = sorted(alive, key=lambda c: scores[c], reverse=True)
+            logger.info(f"Rung n_estimators={resource}: best {ranked[0].name} precision {scores[ranked[0]]:.1%}")
+            if resource >= max_resource:
+                best = ranked[0]
+                break
+            alive = ranked[:max(1, len(ranked) // eta)]
+            # A lone survivor goes straight to the full budget
+            resource = max_resource if len(alive) == 1 else min(resource * eta, max_resource)
+    finally:
+        if pool:
+            pool.shutdown()
+        cache.close()
+
+    leaderboard = pd.DataFrame(rows).sort_values(["n_estimators", "precision"], ascending=False, ignore_index=True)
+    return SearchResult(best=best, best_resource=resource, best_score=scores[best], leaderboard=leaderboard)
@@ -68,6 +68,34 @@ class ScreenerScore:
         return f"{self.symbol}: Grade {self.grade} ({self.total_score:.1f}/6.0)"
 
 
+FUNDAMENTAL_COLUMNS = ['eps_growth', 'sales_growth', 'profit_margin', 'roe', 'debt_to_equity', 'current_ratio']
+TECHNICAL_COLUMNS = [
+    'price_52w_high', 'current_price', 'rs_rating', 'avg_volume_20d', 'avg_volume_50d',
+    'volume_trend', 'price_trend', 'ma_50_distance', 'ma_200_distance'
+]
+
+
+def records_to_frame(records: List, columns: List[str]) -> pd.DataFrame:
+    """
+    Columnar table from FundamentalData / TechnicalData objects
+
+    Args:
+        records: Dataclass instances (None entries give all-NaN rows)
+        columns: Fields to extract
+
+    Returns:
+        DataFrame with one row per record, in input order
+    """
+    return pd.DataFrame(
+        [[getattr(r, c) for c in columns] if r is not None else [np.nan] * len(columns) for r in records],
+        columns=columns
+    )
+
+
+def _grade(total_score: np.ndarray) -> np.ndarray:
+    return np.select([total_score >= 5.0, total_score >= 4.0, total_score >= 3.0], ["A", "B", "C"], "F")
+
+
 class CANSLIMScreener:
     """
     CANSLIM stock screener
@@ -437,6 +465,78 @@ class CANSLIMScreener:
         
         return total, breakdowns
     
+    # ==================== VECTORIZED SCREENING ====================
+    
+    def score_fundamentals_frame(self, fund: pd.DataFrame) -> np.ndarray:
+        """
+        calculate_fundamental_score for every row of a FUNDAMENTAL_COLUMNS table
+        
+        Sub-scores are added in the same order as the scalar methods, so the
+        results are bitwise identical.
+        """
+        col = lambda name: fund[name].to_numpy(dtype=np.float64)
+        eps, sales, margin = col('eps_growth'), col('sales_growth'), col('profit_margin')
+        roe, debt, current = col('roe'), col('debt_to_equity'), col('current_ratio')
+        
+        earnings = np.select([eps >= 50, eps >= 25, eps >= 15], [1.0, 0.75, 0.5], 0.0)
+        sales_score = (np.select([sales >= 25, sales >= 15], [0.75, 0.5], 0.0)
+                       + np.select([margin >= 15, margin >= 10], [0.25, 0.15], 0.0))
+        health = (np.select([roe >= 25, roe >= 15, roe >= 10], [0.5, 0.3, 0.1], 0.0)
+                  + np.select([debt < 0.5, debt < 1.0, debt >= 2.0], [0.25, 0.15, -0.25], 0.0)
+                  + np.select([current >= 1.5, current >= 1.0], [0.25, 0.1], 0.0))
+        return np.minimum(earnings + sales_score + health, 3.0)
+    
+    def score_technicals_frame(self, tech: pd.DataFrame) -> np.ndarray:
+        """calculate_technical_score for every row of a TECHNICAL_COLUMNS table"""
+        col = lambda name: tech[name].to_numpy(dtype=np.float64)
+        high, price, rs = col('price_52w_high'), col('current_price'), col('rs_rating')
+        avg20, avg50 = col('avg_volume_20d'), col('avg_volume_50d')
+        ma50, ma200 = col('ma_50_distance'), col('ma_200_distance')
+        price_trend = tech['price_trend'].to_numpy()
+        volume_trend = tech['volume_trend'].to_numpy()
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distance = (high - price) / price * 100
+            volume_ratio = np.where(avg20 > 0, avg50 / avg20, np.nan)
+        
+        price_action = (np.select([distance <= 5, distance <= 15, distance <= 25], [0.75, 0.5, 0.25], 0.0)
+                        + np.select([price_trend == TREND_UP, price_trend == TREND_DOWN], [0.5, -0.25], 0.0))
+        strength = np.select([rs >= 85, rs >= 70, rs >= 50], [0.75, 0.5, 0.25], 0.0)
+        volume = (np.select([volume_trend == TREND_UP, volume_trend == TREND_DOWN], [0.5, -0.25], 0.0)
+                  + np.select([volume_ratio >= 1.2, volume_ratio >= 1.0], [0.5, 0.25], 0.0))
+        averages = (np.select([(ma50 > 0) & (ma50 <= 5), (ma50 > 0) & (ma50 <= 15), ma50 < -10], [0.35, 0.25, -0.2], 0.0)
+                    + np.select([ma200 > 0, ma200 < -15], [0.4, -0.3], 0.0))
+        return np.minimum(price_action + strength + volume + averages, 3.0)
+    
+    def score_frame(self, fund: pd.DataFrame, tech: pd.DataFrame) -> pd.DataFrame:
+        """
+        Score many stocks at once (same scores and grades as screen_stock)
+        
+        Args:
+            fund: Table with FUNDAMENTAL_COLUMNS
+            tech: Table with TECHNICAL_COLUMNS, row-aligned with `fund`
+        
+        Returns:
+            DataFrame on `tech`'s index with fundamental_score,
+            technical_score, total_score and grade columns
+        """
+        fund_score = self.score_fundamentals_frame(fund)
+        tech_score = self.score_technicals_frame(tech)
+        total_score = fund_score + tech_score
+        return pd.DataFrame({
+            'fundamental_score': fund_score,
+            'technical_score': tech_score,
+            'total_score': total_score,
+            'grade': _grade(total_score),
+        }, index=tech.index)
+    
+    def explain(self, fund_data: FundamentalData, tech_data: TechnicalData) -> Dict:
+        """Score breakdown for one stock, as stored in ScreenerScore.breakdown"""
+        return {
+            'fundamental': self.calculate_fundamental_score(fund_data)[1],
+            'technical': self.calculate_technical_score(tech_data)[1]
+        }
+    
     # ==================== OVERALL SCREENING ====================
     
     def screen_stock(
@@ -498,26 +598,39 @@ class CANSLIMScreener:
     def batch_screen(
         self,
         stocks: List[Tuple[FundamentalData, TechnicalData]],
-        market_environment: str = "A"
+        market_environment: str = "A",
+        include_breakdown: bool = False
     ) -> List[ScreenerScore]:
         """
-        Screen multiple stocks
+        Screen multiple stocks with the vectorized scorer
         
         Args:
             stocks: List of (FundamentalData, TechnicalData) tuples
             market_environment: Market environment
+            include_breakdown: Also build per-stock breakdowns (otherwise
+                left empty; use explain() for the final picks)
         
         Returns:
             List of ScreenerScore objects
         """
         logger.info(f"Batch screening {len(stocks)} stocks")
+        if not stocks:
+            return []
+        
+        fund = records_to_frame([f for f, _ in stocks], FUNDAMENTAL_COLUMNS)
+        tech = records_to_frame([t for _, t in stocks], TECHNICAL_COLUMNS)
+        scores = self.score_frame(fund, tech)
         
         results = []
-        for fund_data, tech_data in stocks:
-            score = self.screen_stock(
-                fund_data, tech_data, market_environment
-            )
-            results.append(score)
+        for (fund_data, tech_data), row in zip(stocks, scores.itertuples(index=False)):
+            results.append(ScreenerScore(
+                symbol=fund_data.symbol,
+                fundamental_score=float(row.fundamental_score),
+                technical_score=float(row.technical_score),
+                total_score=float(row.total_score),
+                grade=row.grade,
+                breakdown=self.explain(fund_data, tech_data) if include_breakdown else {}
+            ))
         
         return results
     
@@ -0,0 +1,140 @@
+"""
+Module: Technical Snapshot
+Vectorized per-symbol technical indicators over a long-format bar frame.
+
+Computes the `TechnicalData` fields for every symbol in one pass with
+grouped reductions instead of a per-symbol Python loop. Trailing windows are
+selected by each row's position from the end of its symbol's history
+(`cumcount(ascending=False)`), so only the latest value of every indicator
+is ever computed. The result is a columnar table indexed by symbol;
+`TechnicalData` objects are only built for callers that ask for them.
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional
+
+from src.modules.stock_screener import TechnicalData
+from src.config.constants import TREND_UP, TREND_DOWN, TREND_NEUTRAL
+
+MIN_HISTORY = 130       # Bars required before a symbol is scored
+ROC_LOOKBACK = 250      # Trading days in the 12-month rate of change
+
+SNAPSHOT_COLUMNS = [
+    'current_price', 'price_52w_high', 'price_52w_low', 'days_from_52w_high',
+    'avg_volume_20d', 'avg_volume_50d', 'ma_50', 'ma_200', 'volume_trend',
+    'price_trend', 'ma_50_distance', 'ma_200_distance', 'roc_12m', 'rs_rating'
+]
+
+
+def _tail_mean(values: pd.Series, pos: pd.Series, symbols: pd.Series, window: int, full: bool) -> pd.Series:
+    """
+    Mean of each symbol's last `window` values.
+
+    With `full=True` symbols with fewer than `window` rows get NaN (matching
+    `rolling(window).mean().iloc[-1]`); otherwise the shorter tail is used
+    (matching `tail(window).mean()`).
+    """
+    grouped = values.where(pos < window).groupby(symbols, sort=False)
+    mean = grouped.mean()
+    if full:
+        mean = mean.where(grouped.count() >= window)
+    return mean
+
+
+def build_technical_snapshot(data: pd.DataFrame, min_history: int = MIN_HISTORY) -> pd.DataFrame:
+    """
+    Compute the latest technical indicators for every symbol
+
+    Args:
+        data: Long-format bars with Date, Symbol, Close and Volume columns
+        min_history: Symbols with fewer bars are dropped
+
+    Returns:
+        DataFrame indexed by Symbol with SNAPSHOT_COLUMNS; rs_rating is the
+        12-month ROC percentile rank (0-99) across the returned symbols
+    """
+    if data.empty:
+        return pd.DataFrame(columns=SNAPSHOT_COLUMNS, index=pd.Index([], name='Symbol'))
+
+    df = data[['Symbol', 'Date', 'Close', 'Volume']].sort_values(['Symbol', 'Date'], kind='mergesort')
+    df = df[df.groupby('Symbol', sort=False)['Close'].transform('size') >= min_history]
+    if df.empty:
+        return pd.DataFrame(columns=SNAPSHOT_COLUMNS, index=pd.Index([], name='Symbol'))
+    df = df.reset_index(drop=True)
+
+    symbols = df['Symbol']
+    close = df['Close'].astype(np.float64)
+    volume = df['Volume'].astype(np.float64)
+    grouped = close.groupby(symbols, sort=False)
+    pos = grouped.cumcount(ascending=False)
+    size = grouped.transform('size')
+
+    last = pos == 0
+    snap = pd.DataFrame(index=pd.Index(symbols[last].values, name='Symbol'))
+    snap['current_price'] = close[last].values
+    last_volume = volume[last].values
+    last_date = df.loc[last, 'Date'].values
+
+    snap['price_52w_high'] = grouped.max()
+    snap['price_52w_low'] = grouped.min()
+    high_date = df.loc[grouped.idxmax().loc[snap.index].values, 'Date'].values
+    snap['days_from_52w_high'] = pd.to_timedelta(last_date - high_date).days.astype(int)
+
+    snap['avg_volume_20d'] = _tail_mean(volume, pos, symbols, 20, full=False)
+    snap['avg_volume_50d'] = _tail_mean(volume, pos, symbols, 50, full=False)
+    snap['ma_50'] = _tail_mean(close, pos, symbols, 50, full=True)
+    snap['ma_200'] = _tail_mean(close, pos, symbols, 200, full=True)
+
+    price, ma_50, ma_200 = snap['current_price'], snap['ma_50'], snap['ma_200']
+    avg_vol_50d = snap['avg_volume_50d'].values
+    snap['volume_trend'] = np.select(
+        [last_volume > avg_vol_50d, last_volume < avg_vol_50d * 0.8],
+        [TREND_UP, TREND_DOWN], default=TREND_NEUTRAL
+    )
+    snap['price_trend'] = np.select(
+        [(price > ma_50) & (ma_50 > ma_200), (price < ma_50) & (ma_50 < ma_200)],
+        [TREND_UP, TREND_DOWN], default=TREND_NEUTRAL
+    )
+    snap['ma_50_distance'] = ((price - ma_50) / ma_50 * 100).fillna(0.0)
+    snap['ma_200_distance'] = ((price - ma_200) / ma_200 * 100).fillna(0.0)
+
+    # 12m ROC anchors on the bar 250 sessions back, or the first bar if shorter
+    anchor = pos == np.minimum(size, ROC_LOOKBACK) - 1
+    price_12m_ago = pd.Series(close[anchor].values, index=symbols[anchor].values)
+    snap['roc_12m'] = (price - price_12m_ago) / price_12m_ago * 100
+    snap['rs_rating'] = snap['roc_12m'].rank(pct=True) * 99
+
+    return snap[SNAPSHOT_COLUMNS]
+
+
+def snapshot_to_technical_data(snapshot: pd.DataFrame, symbols: Optional[Iterable[str]] = None) -> Dict[str, TechnicalData]:
+    """
+    Materialize TechnicalData objects from a snapshot table
+
+    Args:
+        snapshot: Output of build_technical_snapshot
+        symbols: Restrict to these symbols (default: all rows)
+
+    Returns:
+        Dict mapping symbol to TechnicalData
+    """
+    if symbols is not None:
+        snapshot = snapshot.loc[snapshot.index.intersection(list(symbols))]
+
+    return {
+        row.Index: TechnicalData(
+            symbol=row.Index,
+            price_52w_high=float(row.price_52w_high),
+            current_price=float(row.current_price),
+            price_52w_low=float(row.price_52w_low),
+            days_from_52w_high=int(row.days_from_52w_high),
+            rs_rating=float(row.rs_rating),
+            avg_volume_20d=float(row.avg_volume_20d),
+            avg_volume_50d=float(row.avg_volume_50d),
+            volume_trend=row.volume_trend,
+            price_trend=row.price_trend,
+            ma_50_distance=float(row.ma_50_distance),
+            ma_200_distance=float(row.ma_200_distance)
+        )
+        for row in snapshot.itertuples()
+    }
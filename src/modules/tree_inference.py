@@ -0,0 +1,295 @@
+"""
+Module: Tree Inference
+Pure-NumPy inference for the breakout classifier's tree ensembles.
+
+`export_pipeline` compiles a fitted model and its StandardScaler into two
+files:
+    <name>.npy    One float64 node table for every tree, with columns
+                  feature, threshold, left, right, value and missing_left.
+                  Child indices are global rows; leaves have left == -1.
+    <name>.json   Features, scaler statistics and the estimator groups
+                  (tree ranges, voting weights, GBM learning rate and init)
+
+`CompiledEnsemble` loads the node table with np.load(mmap_mode='r') and
+evaluates every tree in one vectorized walk, with no sklearn import.
+Supported models are RandomForest/ExtraTrees and DecisionTree classifiers,
+binary GradientBoostingClassifier, and a soft VotingClassifier over those.
+
+Probabilities match sklearn's predict_proba: inputs are cast to float32 as
+the sklearn trees do, and per-tree contributions are accumulated in
+sklearn's order.
+"""
+import json
+import logging
+import math
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger("tree_inference")
+
+FORMAT_VERSION = 1
+NODE_COLUMNS = ['feature', 'threshold', 'left', 'right', 'value', 'missing_left']
+FEATURE, THRESHOLD, LEFT, RIGHT, VALUE, MISSING_LEFT = range(len(NODE_COLUMNS))
+
+
+# ==================== EXPORT ====================
+
+def _tree_nodes(tree, offset: int, leaf_values: np.ndarray) -> np.ndarray:
+    """Node rows for one sklearn `tree_`, with child indices shifted by `offset`"""
+    n = tree.node_count
+    nodes = np.zeros((n, len(NODE_COLUMNS)), dtype=np.float64)
+    left = tree.children_left.astype(np.int64)
+    right = tree.children_right.astype(np.int64)
+    is_leaf = left < 0
+    nodes[:, FEATURE] = np.where(is_leaf, 0, tree.feature)
+    nodes[:, THRESHOLD] = tree.threshold
+    nodes[:, LEFT] = np.where(is_leaf, -1, left + offset)
+    nodes[:, RIGHT] = np.where(is_leaf, -1, right + offset)
+    nodes[:, VALUE] = leaf_values
+    missing = getattr(tree, 'missing_go_to_left', None)
+    if missing is not None:
+        nodes[:, MISSING_LEFT] = missing
+    return nodes
+
+
+def _classifier_leaf_values(tree) -> np.ndarray:
+    """P(class 1) at every node, normalized as DecisionTreeClassifier.predict_proba does"""
+    value = tree.value[:, 0, :]
+    if value.shape[1] != 2:
+        raise ValueError("Only binary classifiers can be compiled")
+    normalizer = value.sum(axis=1)
+    normalizer[normalizer == 0.0] = 1.0
+    return value[:, 1] / normalizer
+
+
+def _gbm_init_raw(model) -> float:
+    init = model.init_
+    if isinstance(init, str) and init == 'zero':
+        return 0.0
+    if getattr(init, 'strategy', None) != 'prior':
+        raise ValueError("Only GradientBoosting with the default prior init can be compiled")
+    return float(model._raw_predict_init(np.zeros((1, model.n_features_in_)))[0, 0])
+
+
+def _compile_estimator(model, trees: List[np.ndarray], offset: int) -> Tuple[Dict, int]:
+    """Append a model's trees to `trees` and return its group description"""
+    if hasattr(model, 'learning_rate') and hasattr(model, 'init_'):
+        stages = np.asarray(model.estimators_)
+        if stages.ndim != 2 or stages.shape[1] != 1:
+            raise ValueError("Only binary GradientBoostingClassifier can be compiled")
+        roots = []
+        for est in stages[:, 0]:
+            roots.append(offset)
+            tree = est.tree_
+            trees.append(_tree_nodes(tree, offset, tree.value[:, 0, 0]))
+            offset += tree.node_count
+        group = {'kind': 'gbm', 'roots': roots, 'learning_rate': float(model.learning_rate),
+                 'init': _gbm_init_raw(model)}
+        return group, offset
+
+    estimators = getattr(model, 'estimators_', None)
+    if estimators is None and hasattr(model, 'tree_'):
+        estimators = [model]
+    if estimators is None:
+        raise ValueError(f"Cannot compile {type(model).__name__}")
+    roots = []
+    for est in estimators:
+        tree = getattr(est, 'tree_', None)
+        if tree is None:
+            raise ValueError(f"Cannot compile {type(est).__name__} inside {type(model).__name__}")
+        roots.append(offset)
+        trees.append(_tree_nodes(tree, offset, _classifier_leaf_values(tree)))
+        offset += tree.node_count
+    return {'kind': 'forest', 'roots': roots}, offset
+
+
+def compile_pipeline(model, scaler=None, features: Optional[Sequence[str]] = None,
+                     feature_schema: Optional[int] = None) -> Tuple[np.ndarray, Dict]:
+    """
+    Compile a fitted model (and optional StandardScaler) into a node table
+
+    Args:
+        model: Fitted tree classifier, GBM or soft VotingClassifier
+        scaler: Fitted StandardScaler applied before the model (or None)
+        features: Feature names in model input order
+        feature_schema: features.FEATURE_SCHEMA_VERSION the model was trained on
+
+    Returns:
+        (nodes, meta) as written by export_pipeline
+
+    Raises:
+        ValueError: If the model (or a voting member) is not supported
+    """
+    trees: List[np.ndarray] = []
+    offset = 0
+    if hasattr(model, 'voting'):
+        if model.voting != 'soft':
+            raise ValueError("Only soft VotingClassifier can be compiled")
+        groups = []
+        for est in model.estimators_:
+            group, offset = _compile_estimator(est, trees, offset)
+            groups.append(group)
+        weights = getattr(model, '_weights_not_none', model.weights)
+        combine = {'kind': 'voting', 'weights': None if weights is None else [float(w) for w in weights]}
+    else:
+        group, offset = _compile_estimator(model, trees, offset)
+        groups = [group]
+        combine = {'kind': 'single', 'weights': None}
+
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'model': type(model).__name__,
+        'n_features': int(model.n_features_in_),
+        'features': list(features) if features is not None else None,
+        'feature_schema': feature_schema,
+        'scaler': None,
+        'groups': groups,
+        'combine': combine,
+    }
+    if scaler is not None:
+        mean = getattr(scaler, 'mean_', None) if getattr(scaler, 'with_mean', True) else None
+        scale = getattr(scaler, 'scale_', None) if getattr(scaler, 'with_std', True) else None
+        meta['scaler'] = {
+            'mean': None if mean is None else [float(v) for v in mean],
+            'scale': None if scale is None else [float(v) for v in scale],
+        }
+    return np.concatenate(trees), meta
+
+
+def export_pipeline(path: Union[str, Path], model, scaler=None, features: Optional[Sequence[str]] = None,
+                    feature_schema: Optional[int] = None) -> Tuple[Path, Path]:
+    """
+    Write <path>.npy and <path>.json for CompiledEnsemble.load
+
+    Args:
+        path: Output path without suffix (a suffix, e.g. '.joblib', is replaced)
+
+    Returns:
+        (nodes_path, meta_path)
+    """
+    nodes, meta = compile_pipeline(model, scaler, features, feature_schema)
+    base = Path(path).with_suffix('')
+    nodes_path, meta_path = base.with_suffix('.npy'), base.with_suffix('.json')
+    np.save(nodes_path, nodes)
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+    logger.info(f"Compiled {meta['model']} ({len(nodes)} nodes) to {nodes_path}")
+    return nodes_path, meta_path
+
+
+# ==================== INFERENCE ====================
+
+def _expit(raw: np.ndarray) -> np.ndarray:
+    """Logistic function via libm exp, bit-identical to scipy.special.expit
+    (NumPy's vectorized exp can differ in the last ulp)"""
+    return np.fromiter(
+        (1.0 / (1.0 + (math.exp(-v) if -v < 709.0 else math.inf)) for v in raw.tolist()),
+        dtype=np.float64, count=len(raw)
+    )
+
+
+class CompiledScaler:
+    """StandardScaler.transform from stored mean/scale"""
+
+    def __init__(self, mean: Optional[Sequence[float]], scale: Optional[Sequence[float]]):
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float64)
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float64)
+
+    def transform(self, X) -> np.ndarray:
+        X = np.array(X, dtype=np.float64)
+        if self.mean is not None:
+            X -= self.mean
+        if self.scale is not None:
+            X /= self.scale
+        return X
+
+
+class CompiledEnsemble:
+    """Vectorized predict_proba over an exported node table"""
+
+    def __init__(self, nodes: np.ndarray, meta: Dict):
+        """
+        Args:
+            nodes: Node table (may be a read-only memory map)
+            meta: Metadata written by export_pipeline
+        """
+        if meta.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled model format: {meta.get('format_version')}")
+        self.meta = meta
+        self.features = meta.get('features')
+        self.n_features = meta['n_features']
+        scaler = meta.get('scaler')
+        self.scaler = CompiledScaler(scaler['mean'], scaler['scale']) if scaler else None
+
+        self._feature = nodes[:, FEATURE].astype(np.intp)
+        self._threshold = nodes[:, THRESHOLD]
+        self._left = nodes[:, LEFT].astype(np.intp)
+        self._right = nodes[:, RIGHT].astype(np.intp)
+        self._value = nodes[:, VALUE]
+        self._missing_left = nodes[:, MISSING_LEFT] != 0
+        self._roots = np.array([r for g in meta['groups'] for r in g['roots']], dtype=np.intp)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True) -> "CompiledEnsemble":
+        """Load <path>.npy / <path>.json written by export_pipeline"""
+        base = Path(path).with_suffix('')
+        with open(base.with_suffix('.json')) as f:
+            meta = json.load(f)
+        nodes = np.load(base.with_suffix('.npy'), mmap_mode='r' if mmap else None)
+        return cls(nodes, meta)
+
+    def _leaf_values(self, X: np.ndarray) -> np.ndarray:
+        """Leaf value reached in every tree, shape (n_samples, n_trees)"""
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self._roots, (len(X), len(self._roots))).copy()
+        while True:
+            internal = self._left[node] >= 0
+            if not internal.any():
+                break
+            x = X[rows, self._feature[node]]
+            go_left = np.where(np.isnan(x), self._missing_left[node], x <= self._threshold[node])
+            node = np.where(internal, np.where(go_left, self._left[node], self._right[node]), node)
+        return self._value[node]
+
+    def predict_proba(self, X) -> np.ndarray:
+        """
+        Class probabilities, shape (n_samples, 2)
+
+        Args:
+            X: Model inputs (already scaled, like the sklearn model's input)
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+        # sklearn trees compare float32 inputs against float64 thresholds
+        values = self._leaf_values(X.astype(np.float32))
+
+        group_probas = []
+        column = 0
+        for group in self.meta['groups']:
+            n_trees = len(group['roots'])
+            if group['kind'] == 'gbm':
+                raw = np.full(len(X), group['init'])
+                for t in range(column, column + n_trees):
+                    raw += group['learning_rate'] * values[:, t]
+                p1 = _expit(raw)
+            else:
+                total = np.zeros(len(X))
+                for t in range(column, column + n_trees):
+                    total += values[:, t]
+                p1 = total / n_trees
+            group_probas.append(p1)
+            column += n_trees
+
+        if self.meta['combine']['kind'] == 'voting':
+            p1 = np.average(np.stack(group_probas), axis=0, weights=self.meta['combine']['weights'])
+        else:
+            p1 = group_probas[0]
+        return np.column_stack([1.0 - p1, p1])
+
+    def predict(self, X, threshold: float = 0.5) -> np.ndarray:
+        return (self.predict_proba(X)[:, 1] > threshold).astype(int)
@@ -0,0 +1,167 @@
+"""
+Module: Universe Panel
+Memory-mapped, read-only price panel shared by multiprocessing workers.
+
+The universe is written once to a directory of `.npy` column files: all
+symbols are stacked row-wise, and `meta.json` maps each symbol to its
+[start, end) row range. Workers open the files with `np.load(mmap_mode='r')`,
+so every process reads the same OS page cache. Resident memory stays flat as
+the worker count grows, and nothing is pickled or re-downloaded per task.
+`frame()` returns DataFrames whose columns are views into the mapping.
+
+Layout:
+    <path>/meta.json            columns, dtypes, symbol -> [start, end)
+    <path>/Date.npy             datetime64[ns]
+    <path>/<column>.npy         one file per column
+    <path>/extras/<name>/       auxiliary frames (e.g. VIX) in the same layout
+"""
+import json
+import logging
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("universe_panel")
+
+META_FILE = "meta.json"
+DATE_FILE = "Date.npy"
+
+
+def _column_file(column: str) -> str:
+    return column.replace(' ', '_').replace('/', '_') + ".npy"
+
+
+def _naive_ns(index) -> np.ndarray:
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.as_unit('ns').values
+
+
+def build_panel(
+    path,
+    frames: Dict[str, pd.DataFrame],
+    columns: Optional[List[str]] = None,
+    extras: Optional[Dict[str, pd.DataFrame]] = None
+) -> "UniversePanel":
+    """
+    Write frames to a memory-mappable panel directory (replacing any existing one)
+
+    Args:
+        path: Output directory
+        frames: Symbol -> DataFrame with a DatetimeIndex
+        columns: Columns to store (default: columns of the first frame)
+        extras: Named auxiliary frames stored alongside (own columns and dates)
+
+    Returns:
+        The opened panel
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + ".building")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    frames = {s: df for s, df in frames.items() if df is not None and not df.empty}
+    if columns is None:
+        columns = list(next(iter(frames.values())).columns) if frames else []
+
+    symbols, offset = {}, 0
+    for symbol, df in frames.items():
+        symbols[symbol] = [offset, offset + len(df)]
+        offset += len(df)
+
+    dates = np.empty(offset, dtype='datetime64[ns]')
+    for symbol, df in frames.items():
+        start, end = symbols[symbol]
+        dates[start:end] = _naive_ns(df.index)
+    np.save(tmp / DATE_FILE, dates)
+
+    dtypes = {}
+    for col in columns:
+        dtype = np.result_type(*[df[col].dtype for df in frames.values()]) if frames else np.float64
+        values = np.empty(offset, dtype=dtype)
+        for symbol, df in frames.items():
+            start, end = symbols[symbol]
+            values[start:end] = df[col].to_numpy()
+        np.save(tmp / _column_file(col), values)
+        dtypes[col] = str(np.dtype(dtype))
+
+    with open(tmp / META_FILE, 'w') as f:
+        json.dump({'columns': columns, 'dtypes': dtypes, 'symbols': symbols, 'rows': offset}, f)
+
+    for name, df in (extras or {}).items():
+        build_panel(tmp / "extras" / name, {name: df})
+
+    shutil.rmtree(path, ignore_errors=True)
+    tmp.rename(path)
+    logger.info(f"Built universe panel at {path}: {len(symbols)} symbols, {offset} rows")
+    return UniversePanel(path)
+
+
+class UniversePanel:
+    """Read-only view over a panel directory written by build_panel"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / META_FILE) as f:
+            meta = json.load(f)
+        self.columns: List[str] = meta['columns']
+        self.rows: int = meta['rows']
+        self._ranges: Dict[str, List[int]] = meta['symbols']
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def _array(self, name: str) -> np.ndarray:
+        if name not in self._arrays:
+            filename = DATE_FILE if name == 'Date' else _column_file(name)
+            self._arrays[name] = np.load(self.path / filename, mmap_mode='r')
+        return self._arrays[name]
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._ranges)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._ranges
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def length(self, symbol: str) -> int:
+        start, end = self._ranges[symbol]
+        return end - start
+
+    def dates(self) -> pd.DatetimeIndex:
+        """Sorted union of every symbol's dates"""
+        return pd.DatetimeIndex(np.unique(self._array('Date')), name='Date')
+
+    def frame(self, symbol: str, columns: Optional[Iterable[str]] = None, copy: bool = False) -> pd.DataFrame:
+        """
+        One symbol's history as a DataFrame indexed by Date
+
+        Args:
+            symbol: Ticker
+            columns: Subset of columns (default: all)
+            copy: Materialize private arrays instead of read-only views
+
+        Returns:
+            DataFrame (empty if the symbol is not in the panel)
+        """
+        if symbol not in self._ranges:
+            return pd.DataFrame()
+        start, end = self._ranges[symbol]
+        index = pd.DatetimeIndex(self._array('Date')[start:end].view(np.ndarray), name='Date')
+        data = {}
+        for col in (columns or self.columns):
+            values = self._array(col)[start:end]
+            data[col] = np.array(values) if copy else values.view(np.ndarray)
+        return pd.DataFrame(data, index=index, copy=False)
+
+    def extra(self, name: str) -> pd.DataFrame:
+        """Auxiliary frame stored with build_panel(extras=...)"""
+        path = self.path / "extras" / name
+        if not (path / META_FILE).exists():
+            return pd.DataFrame()
+        return UniversePanel(path).frame(name)
@@ -0,0 +1,265 @@
+"""
+Module: Universe Registry
+Cached, dated index membership snapshots (S&P 500, Nasdaq-100, key ETFs).
+
+Scraping Wikipedia happens at most once per TTL. Every successful scrape is
+stored as a dated snapshot (`universe/snapshots/YYYY-MM-DD.json`) in S3 and
+mirrored to a local directory, together with the symbols added and removed
+since the previous snapshot. If a refresh fails, the newest stored snapshot is
+served instead (offline fallback).
+
+Because the snapshots are dated, `members_as_of` can reconstruct the universe
+on any date since tracking began, so backtests do not have to use today's
+survivors.
+"""
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.config import settings
+
+logger = logging.getLogger("universe_registry")
+
+SNAPSHOT_PREFIX = "universe/snapshots/"
+INDEXES = ('sp500', 'nasdaq100', 'etfs')
+EXCLUDED_TICKERS = ['BF-B', 'BRK-B']   # Problematic share-class tickers
+
+
+class UniverseUnavailableError(Exception):
+    """No fresh scrape and no stored snapshot to fall back on"""
+    pass
+
+
+@dataclass
+class UniverseSnapshot:
+    """Index membership on one date"""
+    as_of: str                                          # YYYY-MM-DD
+    fetched_at: str                                     # ISO timestamp of the scrape
+    members: Dict[str, List[str]] = field(default_factory=dict)
+    added: List[str] = field(default_factory=list)      # vs previous snapshot
+    removed: List[str] = field(default_factory=list)
+
+    def symbols(self, indexes: Optional[Iterable[str]] = None) -> List[str]:
+        """Sorted union of the given indexes (default: all), minus exclusions"""
+        combined = set()
+        for name in (indexes or self.members.keys()):
+            combined.update(self.members.get(name, []))
+        return sorted(t for t in combined if t not in EXCLUDED_TICKERS)
+
+    def to_dict(self) -> Dict:
+        return {
+            'as_of': self.as_of,
+            'fetched_at': self.fetched_at,
+            'members': self.members,
+            'added': self.added,
+            'removed': self.removed,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "UniverseSnapshot":
+        return cls(
+            as_of=data['as_of'],
+            fetched_at=data['fetched_at'],
+            members={k: list(v) for k, v in data.get('members', {}).items()},
+            added=list(data.get('added', [])),
+            removed=list(data.get('removed', [])),
+        )
+
+
+class UniverseRegistry:
+    """Serve index membership from dated snapshots, refreshing on TTL expiry"""
+
+    def __init__(
+        self,
+        fetcher,
+        s3_client=None,
+        bucket: str = settings.S3_BUCKET,
+        local_dir: Optional[Path] = None,
+        ttl_hours: float = settings.UNIVERSE_TTL_HOURS,
+        clock: Callable[[], datetime] = datetime.now
+    ):
+        """
+        Args:
+            fetcher: Object providing fetch_sp500_tickers, fetch_nasdaq100_tickers
+                and fetch_key_etfs (the live scrapers, usually DataFetcher)
+            s3_client: boto3 S3 client for the shared snapshot store (None = local only)
+            bucket: S3 bucket holding the snapshots
+            local_dir: Local mirror used when S3 is unavailable
+            ttl_hours: Age after which the latest snapshot is re-scraped
+            clock: Current-time function (injectable for tests)
+        """
+        self.fetcher = fetcher
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.local_dir = Path(local_dir or settings.DATA_DIR / "universe")
+        self.ttl = timedelta(hours=ttl_hours)
+        self._clock = clock
+        self._latest: Optional[UniverseSnapshot] = None
+        self._snapshot_cache: Dict[str, UniverseSnapshot] = {}
+
+    # ==================== STORAGE ====================
+
+    def _key(self, as_of: str) -> str:
+        return f"{SNAPSHOT_PREFIX}{as_of}.json"
+
+    def _list_dates(self) -> List[str]:
+        """All snapshot dates available in S3 or the local mirror"""
+        dates = set()
+        if self.s3_client is not None:
+            try:
+                paginator = self.s3_client.get_paginator('list_objects_v2')
+                for page in paginator.paginate(Bucket=self.bucket, Prefix=SNAPSHOT_PREFIX):
+                    for obj in page.get('Contents', []):
+                        name = obj['Key'][len(SNAPSHOT_PREFIX):]
+                        if name.endswith('.json'):
+                            dates.add(name[:-5])
+            except Exception as e:
+                logger.warning(f"Could not list universe snapshots in S3: {e}")
+        local = self.local_dir / "snapshots"
+        if local.exists():
+            dates.update(p.stem for p in local.glob("*.json"))
+        return sorted(dates)
+
+    def _read(self, as_of: str) -> Optional[UniverseSnapshot]:
+        if as_of in self._snapshot_cache:
+            return self._snapshot_cache[as_of]
+
+        data = None
+        if self.s3_client is not None:
+            try:
+                response = self.s3_client.get_object(Bucket=self.bucket, Key=self._key(as_of))
+                data = json.loads(response['Body'].read().decode('utf-8'))
+            except Exception as e:
+                logger.debug(f"Universe snapshot {as_of} not in S3: {e}")
+        if data is None:
+            path = self.local_dir / "snapshots" / f"{as_of}.json"
+            if path.exists():
+                with open(path) as f:
+                    data = json.load(f)
+        if data is None:
+            return None
+
+        snapshot = UniverseSnapshot.from_dict(data)
+        self._snapshot_cache[as_of] = snapshot
+        return snapshot
+
+    def _write(self, snapshot: UniverseSnapshot):
+        body = json.dumps(snapshot.to_dict())
+        try:
+            path = self.local_dir / "snapshots" / f"{snapshot.as_of}.json"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(body)
+        except Exception as e:
+            logger.warning(f"Could not write local universe snapshot: {e}")
+        if self.s3_client is not None:
+            try:
+                self.s3_client.put_object(
+                    Bucket=self.bucket,
+                    Key=self._key(snapshot.as_of),
+                    Body=body,
+                    ContentType='application/json'
+                )
+            except Exception as e:
+                logger.warning(f"Could not upload universe snapshot to S3: {e}")
+        self._snapshot_cache[snapshot.as_of] = snapshot
+
+    def _stored_latest(self) -> Optional[UniverseSnapshot]:
+        dates = self._list_dates()
+        return self._read(dates[-1]) if dates else None
+
+    # ==================== REFRESH ====================
+
+    def _scrape(self) -> Dict[str, List[str]]:
+        return {
+            'sp500': sorted(self.fetcher.fetch_sp500_tickers()),
+            'nasdaq100': sorted(self.fetcher.fetch_nasdaq100_tickers()),
+            'etfs': sorted(self.fetcher.fetch_key_etfs()),
+        }
+
+    def _is_fresh(self, snapshot: UniverseSnapshot) -> bool:
+        fetched_at = datetime.fromisoformat(snapshot.fetched_at)
+        return self._clock() - fetched_at < self.ttl
+
+    def refresh(self) -> UniverseSnapshot:
+        """Scrape membership now and store it as today's snapshot"""
+        previous = self._latest or self._stored_latest()
+        members = self._scrape()
+        now = self._clock()
+
+        current = UniverseSnapshot(as_of=now.date().isoformat(), fetched_at=now.isoformat(), members=members)
+        if previous is not None:
+            # Diff against the previous *day*, so same-day refreshes keep the day's changes
+            base = previous
+            if previous.as_of == current.as_of:
+                earlier = [d for d in self._list_dates() if d < current.as_of]
+                base = self._read(earlier[-1]) if earlier else None
+            if base is not None:
+                before, after = set(base.symbols()), set(current.symbols())
+                current.added = sorted(after - before)
+                current.removed = sorted(before - after)
+
+        self._write(current)
+        self._latest = current
+        logger.info(f"Universe snapshot {current.as_of}: {len(current.symbols())} symbols "
+                    f"(+{len(current.added)} / -{len(current.removed)})")
+        return current
+
+    def latest(self, force_refresh: bool = False) -> UniverseSnapshot:
+        """
+        Newest membership snapshot, re-scraped when older than the TTL
+
+        Raises:
+            UniverseUnavailableError: If scraping fails and nothing is stored
+        """
+        if not force_refresh:
+            snapshot = self._latest or self._stored_latest()
+            if snapshot is not None and self._is_fresh(snapshot):
+                self._latest = snapshot
+                return snapshot
+
+        try:
+            return self.refresh()
+        except Exception as e:
+            fallback = self._latest or self._stored_latest()
+            if fallback is None:
+                raise UniverseUnavailableError(f"Universe refresh failed and no snapshot is stored: {e}")
+            logger.warning(f"Universe refresh failed ({e}); using snapshot from {fallback.as_of}")
+            self._latest = fallback
+            return fallback
+
+    # ==================== QUERIES ====================
+
+    def symbols(self, indexes: Optional[Iterable[str]] = None) -> List[str]:
+        """Current members of the given indexes (default: all)"""
+        return self.latest().symbols(indexes)
+
+    def snapshot_as_of(self, as_of) -> Optional[UniverseSnapshot]:
+        """Newest snapshot taken on or before `as_of` (date, datetime or YYYY-MM-DD)"""
+        target = as_of if isinstance(as_of, str) else as_of.strftime('%Y-%m-%d')
+        dates = [d for d in self._list_dates() if d <= target]
+        return self._read(dates[-1]) if dates else None
+
+    def members_as_of(self, as_of, indexes: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Universe as it stood on `as_of`, for survivorship-free backtests.
+
+        Returns an empty list for dates before the first snapshot.
+        """
+        snapshot = self.snapshot_as_of(as_of)
+        return snapshot.symbols(indexes) if snapshot else []
+
+    def changes_since(self, since) -> Dict[str, List[str]]:
+        """
+        Symbols added to / removed from the universe since `since`
+
+        Returns:
+            {'added': [...], 'removed': [...]} relative to the snapshot in
+            effect on `since` (everything counts as added if there is none)
+        """
+        current = set(self.symbols())
+        base = self.snapshot_as_of(since)
+        before = set(base.symbols()) if base else set()
+        return {'added': sorted(current - before), 'removed': sorted(before - current)}
@@ -3,26 +3,213 @@ AWS utilities for interacting with AWS services
 """
 import boto3
 import json
-from typing import Dict, Any, Optional
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Iterable, List, Optional
 from datetime import datetime
 import logging
+from botocore.config import Config
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_POOL_SIZE = 32       # HTTP connections kept open per client
+DEFAULT_MAX_ATTEMPTS = int(os.getenv("AWS_MAX_ATTEMPTS", "5"))  # Per request, including the first try
+DEFAULT_RETRY_MODE = "standard"
+
 
 class S3Manager:
-    """Manage S3 bucket operations"""
+    """
+    Shared S3 I/O layer: one configured client, bounded-concurrency batch
+    operations and request metrics.
+
+    The client's connection pool is sized for `max_workers`, and retries use
+    botocore's standard mode (exponential backoff with jitter, throttling
+    aware). Every request made through `s3_client` is counted via botocore
+    event hooks, including requests from code that takes the client directly
+    (DataLake, TieredS3Cache, ...): request/error counts, bytes in and out,
+    and latency.
+
+    Use `get_s3_manager()` for the process-wide instance, or
+    `s3_manager_for()` to wrap a client a caller was given.
+    """
     
-    def __init__(self, region: str = "us-east-1"):
+    def __init__(
+        self,
+        region: str = "us-east-1",
+        s3_client=None,
+        max_workers: int = 16,
+        max_pool_connections: int = DEFAULT_POOL_SIZE,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_mode: str = DEFAULT_RETRY_MODE,
+        instrument: bool = True
+    ):
         """
         Initialize S3 Manager
         
         Args:
             region: AWS region
+            s3_client: Existing client to wrap (default: a new pooled client)
+            max_workers: Default concurrency of get_many
+            max_pool_connections: HTTP connection pool size
+            max_attempts: Attempts per request (retry policy)
+            retry_mode: botocore retry mode ('standard' or 'adaptive')
+            instrument: Count the client's requests (see stats)
         """
-        self.s3_client = boto3.client('s3', region_name=region)
         self.region = region
-        logger.info(f"Initialized S3Manager for region: {region}")
+        self.max_workers = max(1, max_workers)
+        self.s3_client = s3_client or boto3.client(
+            's3',
+            region_name=region,
+            config=Config(
+                max_pool_connections=max(max_pool_connections, self.max_workers),
+                retries={'max_attempts': max_attempts, 'mode': retry_mode}
+            )
+        )
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+        if instrument:
+            events = self.s3_client.meta.events
+            events.register('provide-client-params.s3', self._before_call)
+            events.register('after-call.s3', self._after_call)
+            events.register('after-call-error.s3', self._after_call_error)
+            logger.info(f"Initialized S3Manager for region: {region}")
+
+    # ==================== METRICS ====================
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats = {
+                'requests': 0, 'errors': 0, 'bytes_in': 0, 'bytes_out': 0,
+                'latency_total': 0.0, 'latency_max': 0.0, 'operations': {}
+            }
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the request counters (latencies in seconds)"""
+        with self._stats_lock:
+            snapshot = dict(self._stats, operations=dict(self._stats['operations']))
+        requests = snapshot['requests']
+        snapshot['latency_avg'] = snapshot['latency_total'] / requests if requests else 0.0
+        return snapshot
+
+    def _before_call(self, params, model, context, **kwargs):
+        context['s3manager_started'] = time.perf_counter()
+        context['s3manager_operation'] = model.name
+        body = params.get('Body')
+        if isinstance(body, (bytes, bytearray, memoryview, str)):
+            context['s3manager_bytes_out'] = len(body)
+
+    def _record(self, context, failed: bool, bytes_in: int = 0):
+        started = context.get('s3manager_started')
+        latency = time.perf_counter() - started if started is not None else 0.0
+        with self._stats_lock:
+            stats = self._stats
+            stats['requests'] += 1
+            stats['errors'] += int(failed)
+            stats['bytes_in'] += bytes_in
+            stats['bytes_out'] += context.get('s3manager_bytes_out', 0)
+            stats['latency_total'] += latency
+            stats['latency_max'] = max(stats['latency_max'], latency)
+            operation = context.get('s3manager_operation', 'unknown')
+            stats['operations'][operation] = stats['operations'].get(operation, 0) + 1
+
+    def _after_call(self, http_response, parsed, model, context, **kwargs):
+        failed = http_response is not None and http_response.status_code >= 400
+        bytes_in = parsed.get('ContentLength', 0) if model.name == 'GetObject' and not failed else 0
+        self._record(context, failed, bytes_in or 0)
+
+    def _after_call_error(self, exception, context, **kwargs):
+        self._record(context, failed=True)
+
+    # ==================== SINGLE OBJECTS ====================
+
+    def get_bytes(self, bucket: str, key: str) -> bytes:
+        """Object body (raises on missing objects)"""
+        return self.s3_client.get_object(Bucket=bucket, Key=key)['Body'].read()
+
+    def put_bytes(self, bucket: str, key: str, body, **kwargs) -> Dict:
+        """Upload a body; extra kwargs go to put_object (ContentType, ...)"""
+        return self.s3_client.put_object(Bucket=bucket, Key=key, Body=body, **kwargs)
+
+    def read_buffer(self, bucket: str, key: str):
+        """
+        Object body as a pyarrow Buffer, read straight into one preallocated
+        block (no intermediate bytes objects)
+        """
+        import pyarrow as pa
+        response = self.s3_client.get_object(Bucket=bucket, Key=key)
+        body = response['Body']
+        size = response['ContentLength']
+        block = bytearray(size)
+        view = memoryview(block)
+        filled = 0
+        while filled < size:
+            n = body.readinto(view[filled:])
+            if not n:
+                raise IOError(f"s3://{bucket}/{key}: stream ended after {filled}/{size} bytes")
+            filled += n
+        return pa.py_buffer(block)
+
+    def read_arrow(
+        self,
+        bucket: str,
+        key: str,
+        columns: Optional[List[str]] = None,
+        filters=None
+    ):
+        """
+        Parquet object as a pyarrow Table
+
+        Args:
+            columns: Columns to decode (default: all)
+            filters: pyarrow.parquet filters, pushed down to row groups
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        buffer = self.read_buffer(bucket, key)
+        return pq.read_table(pa.BufferReader(buffer), columns=columns, filters=filters)
+
+    # ==================== BATCH ====================
+
+    def get_many(
+        self,
+        bucket: str,
+        keys: Iterable[str],
+        decoder: Optional[Callable[[bytes], Any]] = None,
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch many objects concurrently
+
+        Args:
+            bucket: S3 bucket name
+            keys: Object keys
+            decoder: Applied to each body on the worker thread (default: raw bytes)
+            max_workers: Concurrency bound (default: self.max_workers)
+
+        Returns:
+            Dict of key -> body or decoded value; missing or failed keys are omitted
+        """
+        keys = list(dict.fromkeys(keys))
+
+        def fetch(key):
+            try:
+                body = self.get_bytes(bucket, key)
+                return key, decoder(body) if decoder else body
+            except self.s3_client.exceptions.NoSuchKey:
+                return key, None
+            except Exception as e:
+                logger.warning(f"Failed to get s3://{bucket}/{key}: {e}")
+                return key, None
+
+        workers = min(max_workers or self.max_workers, max(1, len(keys)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = dict(executor.map(fetch, keys))
+        return {key: value for key, value in results.items() if value is not None}
+
+    # ==================== JSON ====================
     
     def upload_json(
         self, 
@@ -76,6 +263,42 @@ class S3Manager:
             return None
 
 
+_SHARED: Dict[str, S3Manager] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def get_s3_manager(region: Optional[str] = None) -> S3Manager:
+    """Process-wide S3Manager (one client and connection pool per region)"""
+    if region is None:
+        from src.config import settings
+        region = settings.AWS_REGION
+    with _SHARED_LOCK:
+        if region not in _SHARED:
+            _SHARED[region] = S3Manager(region=region)
+        return _SHARED[region]
+
+
+def s3_manager_for(s3_client=None) -> S3Manager:
+    """
+    S3Manager for an existing client (default: the process-wide one)
+
+    Clients not created by get_s3_manager() get a lightweight wrapper that
+    does not register metric hooks, so wrapping one repeatedly costs nothing.
+    """
+    if s3_client is None:
+        return get_s3_manager()
+    with _SHARED_LOCK:
+        for manager in _SHARED.values():
+            if manager.s3_client is s3_client:
+                return manager
+    return S3Manager(region=s3_client.meta.region_name, s3_client=s3_client, instrument=False)
+
+
+def get_s3_client(region: Optional[str] = None):
+    """The shared, pooled S3 client"""
+    return get_s3_manager(region).s3_client
+
+
 class SESManager:
     """Manage SES email operations"""
     
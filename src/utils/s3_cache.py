@@ -0,0 +1,217 @@
+"""
+Multi-tier read-through cache for S3 objects
+
+Tiers, fastest first:
+    1. Process memory (module level, so it survives across warm Lambda
+       invocations and across DataFetcher/MarketAnalyzer instances)
+    2. Local disk under /tmp, with the object's ETag/Last-Modified kept in a
+       sidecar file
+    3. S3, the source of truth
+
+A cached copy is reused without any S3 call for `revalidate_after` seconds.
+After that it is revalidated with a conditional GET (If-None-Match), which
+costs a round trip but no download when the object is unchanged. If S3 is
+unreachable, the cached copy is served stale rather than failing.
+"""
+import json
+import logging
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(tempfile.gettempdir()) / "s3_cache"
+DEFAULT_REVALIDATE_AFTER = 300.0   # Seconds a copy is trusted without asking S3
+
+
+@dataclass
+class _Entry:
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    validated_at: float
+    decoded: Dict[str, Any] = field(default_factory=dict)
+
+
+# Memory tier shared by every TieredS3Cache in the process
+_MEMORY: Dict[Tuple[str, str], _Entry] = {}
+_MEMORY_LOCK = threading.Lock()
+
+
+def _is_not_modified(error: ClientError) -> bool:
+    code = str(error.response.get('Error', {}).get('Code', ''))
+    status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+    return code in ('304', 'NotModified') or status == 304
+
+
+def _is_missing(error: ClientError) -> bool:
+    code = str(error.response.get('Error', {}).get('Code', ''))
+    return code in ('NoSuchKey', '404', 'NotFound')
+
+
+class TieredS3Cache:
+    """Read-through memory -> disk -> S3 cache with ETag revalidation"""
+
+    def __init__(
+        self,
+        s3_client,
+        cache_dir: Optional[Path] = None,
+        revalidate_after: float = DEFAULT_REVALIDATE_AFTER,
+        memory: Optional[Dict[Tuple[str, str], _Entry]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            s3_client: boto3 S3 client
+            cache_dir: Disk tier location (default /tmp/s3_cache)
+            revalidate_after: Seconds before a cached copy is revalidated
+            memory: Memory tier dict (default: the process-wide tier)
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.s3_client = s3_client
+        self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+        self.revalidate_after = revalidate_after
+        self._memory = _MEMORY if memory is None else memory
+        self._clock = clock
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'not_modified': 0, 'downloads': 0, 'stale': 0}
+
+    # ==================== DISK TIER ====================
+
+    def _path(self, bucket: str, key: str) -> Path:
+        return self.cache_dir / bucket / key
+
+    def _read_disk(self, bucket: str, key: str) -> Optional[_Entry]:
+        path = self._path(bucket, key)
+        meta_path = path.with_name(path.name + ".meta.json")
+        try:
+            meta = json.loads(meta_path.read_text())
+            body = path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        # Disk copies are always revalidated before first use in this process
+        return _Entry(body=body, etag=meta.get('etag'), last_modified=meta.get('last_modified'),
+                      validated_at=float('-inf'))
+
+    def _write_disk(self, bucket: str, key: str, entry: _Entry):
+        path = self._path(bucket, key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_bytes(entry.body)
+            tmp.replace(path)
+            meta = {'etag': entry.etag, 'last_modified': entry.last_modified}
+            path.with_name(path.name + ".meta.json").write_text(json.dumps(meta))
+        except OSError as e:
+            logger.warning(f"Could not write disk cache for s3://{bucket}/{key}: {e}")
+
+    # ==================== LOOKUP ====================
+
+    def _fetch(self, bucket: str, key: str, cached: Optional[_Entry]) -> _Entry:
+        params = {'Bucket': bucket, 'Key': key}
+        if cached is not None and cached.etag:
+            params['IfNoneMatch'] = cached.etag
+        try:
+            response = self.s3_client.get_object(**params)
+        except ClientError as e:
+            if cached is not None and _is_not_modified(e):
+                self.stats['not_modified'] += 1
+                cached.validated_at = self._clock()
+                return cached
+            if cached is not None and not _is_missing(e):
+                logger.warning(f"S3 revalidation failed for s3://{bucket}/{key}, serving cached copy: {e}")
+                self.stats['stale'] += 1
+                return cached
+            raise
+        except Exception as e:
+            if cached is None:
+                raise
+            logger.warning(f"S3 unreachable for s3://{bucket}/{key}, serving cached copy: {e}")
+            self.stats['stale'] += 1
+            return cached
+
+        self.stats['downloads'] += 1
+        last_modified = response.get('LastModified')
+        entry = _Entry(
+            body=response['Body'].read(),
+            etag=response.get('ETag'),
+            last_modified=last_modified.isoformat() if hasattr(last_modified, 'isoformat') else last_modified,
+            validated_at=self._clock()
+        )
+        self._write_disk(bucket, key, entry)
+        return entry
+
+    def _entry(self, bucket: str, key: str) -> _Entry:
+        with _MEMORY_LOCK:
+            cached = self._memory.get((bucket, key))
+        if cached is not None and self._clock() - cached.validated_at < self.revalidate_after:
+            self.stats['memory_hits'] += 1
+            return cached
+
+        if cached is None:
+            cached = self._read_disk(bucket, key)
+            if cached is not None:
+                self.stats['disk_hits'] += 1
+
+        entry = self._fetch(bucket, key, cached)
+        with _MEMORY_LOCK:
+            self._memory[(bucket, key)] = entry
+        return entry
+
+    def get_bytes(self, bucket: str, key: str) -> bytes:
+        """Object body from the fastest valid tier"""
+        return self._entry(bucket, key).body
+
+    def get_decoded(self, bucket: str, key: str, name: str, decoder: Callable[[bytes], Any]) -> Any:
+        """
+        Decoded object, memoized per object version.
+
+        Args:
+            name: Identifies the decoder (an object may be decoded several ways)
+            decoder: Function turning the raw bytes into the returned value
+        """
+        entry = self._entry(bucket, key)
+        if name not in entry.decoded:
+            entry.decoded[name] = decoder(entry.body)
+        return entry.decoded[name]
+
+    def get_path(self, bucket: str, key: str) -> Path:
+        """
+        Local file holding the current object version, for readers that
+        memory-map instead of decoding bytes (e.g. np.load(mmap_mode='r'))
+        """
+        entry = self._entry(bucket, key)
+        path = self._path(bucket, key)
+        if not path.exists():
+            self._write_disk(bucket, key, entry)
+        return path
+
+    def get_json(self, bucket: str, key: str) -> Any:
+        return self.get_decoded(bucket, key, 'json', lambda body: json.loads(body.decode('utf-8')))
+
+    def get_parquet(self, bucket: str, key: str):
+        """DataFrame from a Parquet object (a shallow copy callers may modify)"""
+        import pandas as pd
+        df = self.get_decoded(bucket, key, 'parquet', lambda body: pd.read_parquet(BytesIO(body)))
+        return df.copy(deep=False)
+
+    # ==================== WRITE-THROUGH ====================
+
+    def put_bytes(self, bucket: str, key: str, body: bytes, **kwargs):
+        """Upload to S3 and refresh the local tiers with the new version"""
+        response = self.s3_client.put_object(Bucket=bucket, Key=key, Body=body, **kwargs)
+        entry = _Entry(body=body, etag=response.get('ETag'), last_modified=None, validated_at=self._clock())
+        self._write_disk(bucket, key, entry)
+        with _MEMORY_LOCK:
+            self._memory[(bucket, key)] = entry
+
+    def invalidate(self, bucket: str, key: str):
+        """Drop the memory copy so the next read revalidates against S3"""
+        with _MEMORY_LOCK:
+            self._memory.pop((bucket, key), None)
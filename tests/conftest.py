@@ -5,6 +5,38 @@ from datetime import datetime, timedelta
 from src.modules.stock_screener import FundamentalData, TechnicalData
 from src.config.constants import TREND_UP, TREND_DOWN, TREND_NEUTRAL
 
+def make_ohlcv(n=300, start=None, end='2024-06-28', seed=0, drift=0.0005, volatility=0.02,
+               base=100.0, tz=None, actions=False):
+    """
+    Random-walk daily bars on business days, indexed by 'Date'
+
+    Args:
+        n: Number of bars
+        start: First bar date (overrides `end`)
+        end: Last bar date
+        seed: RNG seed
+        drift: Mean daily return
+        volatility: Standard deviation of the daily return
+        base: Price level the walk starts from
+        tz: Index timezone (default: naive)
+        actions: Add zero 'Dividends' / 'Stock Splits' columns (yfinance layout)
+    """
+    rng = np.random.default_rng(seed)
+    close = base * np.cumprod(1 + rng.normal(drift, volatility, n))
+    dates = pd.bdate_range(start=start, periods=n, tz=tz) if start is not None \
+        else pd.bdate_range(end=end, periods=n, tz=tz)
+    df = pd.DataFrame({
+        'Open': close,
+        'High': close * (1 + rng.uniform(0, 0.03, n)),
+        'Low': close * (1 - rng.uniform(0, 0.03, n)),
+        'Close': close,
+        'Volume': rng.integers(100_000, 1_000_000, n).astype(float),
+    }, index=pd.DatetimeIndex(dates, name='Date').as_unit('ns'))
+    if actions:
+        df['Dividends'] = 0.0
+        df['Stock Splits'] = 0.0
+    return df
+
 @pytest.fixture
 def mock_price_history():
     """Create a sample 1-year price history DataFrame"""
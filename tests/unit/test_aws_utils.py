@@ -0,0 +1,71 @@
+import pytest
+import json
+import boto3
+import pandas as pd
+from io import BytesIO
+from moto import mock_aws
+from src.utils.aws_utils import S3Manager, get_s3_manager, s3_manager_for
+
+BUCKET = "s3-manager-test-bucket"
+
+
+@pytest.fixture
+def manager():
+    with mock_aws():
+        manager = S3Manager(region='us-east-1', max_workers=4)
+        manager.s3_client.create_bucket(Bucket=BUCKET)
+        manager.reset_stats()
+        yield manager
+
+
+class TestS3Manager:
+
+    def test_get_many(self, manager):
+        items = {f"batch/{i}.json": json.dumps({'i': i}).encode() for i in range(10)}
+        for key, body in items.items():
+            manager.put_bytes(BUCKET, key, body, ContentType='application/json')
+
+        keys = list(items) + ["batch/missing.json"]
+        result = manager.get_many(BUCKET, keys, decoder=lambda body: json.loads(body)['i'])
+        assert result == {f"batch/{i}.json": i for i in range(10)}
+
+    def test_read_arrow_projects_and_filters(self, manager):
+        buf = BytesIO()
+        pd.DataFrame({'Symbol': ['A', 'B', 'C'], 'Close': [1.0, 2.0, 3.0], 'Volume': [1, 2, 3]}) \
+            .to_parquet(buf, index=False)
+        manager.put_bytes(BUCKET, "panel.parquet", buf.getvalue())
+
+        df = manager.read_arrow(BUCKET, "panel.parquet", columns=['Symbol', 'Close'],
+                                filters=[('Close', '>=', 2.0)]).to_pandas()
+        assert list(df.columns) == ['Symbol', 'Close']
+        assert df['Symbol'].tolist() == ['B', 'C']
+
+    def test_counters_cover_direct_client_use(self, manager):
+        manager.put_bytes(BUCKET, "a.bin", b"x" * 100)
+        manager.s3_client.get_object(Bucket=BUCKET, Key="a.bin")['Body'].read()
+        with pytest.raises(manager.s3_client.exceptions.NoSuchKey):
+            manager.get_bytes(BUCKET, "missing.bin")
+
+        stats = manager.stats
+        assert stats['requests'] == 3
+        assert stats['errors'] == 1
+        assert stats['bytes_out'] == 100
+        assert stats['bytes_in'] == 100
+        assert stats['operations'] == {'PutObject': 1, 'GetObject': 2}
+        assert stats['latency_max'] >= stats['latency_avg'] > 0
+
+    def test_wraps_existing_client(self, manager):
+        client = boto3.client('s3', region_name='us-east-1')
+        wrapped = S3Manager(s3_client=client)
+        assert wrapped.s3_client is client
+        assert wrapped.download_json(BUCKET, "nope.json") is None
+        assert wrapped.stats['errors'] == 1
+
+    def test_manager_for_caller_supplied_client(self, manager):
+        client = boto3.client('s3', region_name='us-east-1')
+        wrapped = s3_manager_for(client)
+        assert wrapped.s3_client is client
+        wrapped.put_bytes(BUCKET, "a.bin", b"x")
+        assert wrapped.get_bytes(BUCKET, "a.bin") == b"x"
+        assert wrapped.stats['requests'] == 0       # No hooks on clients it does not own
+        assert s3_manager_for(get_s3_manager().s3_client) is get_s3_manager()
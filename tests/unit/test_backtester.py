@@ -35,6 +35,15 @@ class TestBacktester:
         assert bt.model is not None
         assert bt.scaler is not None
 
+    @patch('src.modules.model_registry.ModelRegistry')
+    def test_records_registry_model_version(self, mock_registry):
+        mock_registry.return_value.current.return_value = {'version': 'v1'}
+        mock_registry.return_value.load_pipeline.return_value = ({'model': MagicMock(), 'scaler': None}, 'v1')
+
+        bt = Backtester()
+        assert bt.model is not None
+        assert bt.model_version == 'v1'
+
     def test_calculate_indicators(self, mock_price_data):
         bt = Backtester()
         df = bt.calculate_indicators(mock_price_data)
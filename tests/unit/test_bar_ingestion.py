@@ -0,0 +1,79 @@
+import pytest
+import numpy as np
+import pandas as pd
+from types import SimpleNamespace
+from src.modules.bar_ingestion import bars_to_frame, bars_to_long_frame, BarPanel, LONG_COLUMNS
+
+
+def raw_bar(day, price, volume=1000):
+    return {'t': f"2024-01-{day:02d}T05:00:00Z", 'o': price, 'h': price + 1,
+            'l': price - 1, 'c': price + 0.5, 'v': volume, 'n': 10, 'vw': price}
+
+
+def obj_bar(day, price, volume=1000):
+    return SimpleNamespace(timestamp=pd.Timestamp(f"2024-01-{day:02d} 05:00", tz='UTC'),
+                           open=price, high=price + 1, low=price - 1, close=price + 0.5,
+                           volume=float(volume))
+
+
+class TestBarIngestion:
+
+    def test_raw_and_object_bars_match(self):
+        raw = bars_to_frame([raw_bar(d, 100 + d) for d in range(2, 6)])
+        objs = bars_to_frame([obj_bar(d, 100 + d) for d in range(2, 6)])
+
+        pd.testing.assert_frame_equal(raw, objs)
+        assert raw['Close'].iloc[0] == pytest.approx(102.5)
+        assert raw.index.name == 'timestamp'
+
+    def test_fixed_dtypes(self):
+        df = bars_to_frame([raw_bar(2, 10.0, volume=12345)])
+
+        assert df['Open'].dtype == np.float32
+        assert df['Volume'].dtype == np.int64
+        assert str(df.index.dtype) == 'datetime64[ns, UTC]'
+
+    def test_long_frame_for_chunk(self):
+        payload = {
+            'AAPL': [raw_bar(d, 150) for d in range(2, 5)],
+            'MSFT': [raw_bar(d, 300) for d in range(2, 4)],
+            'EMPTY': [],
+        }
+        df = bars_to_long_frame(payload)
+
+        assert list(df.columns) == LONG_COLUMNS
+        assert len(df) == 5
+        assert df['Symbol'].tolist() == ['AAPL'] * 3 + ['MSFT'] * 2
+        assert df.loc[df['Symbol'] == 'MSFT', 'Close'].iloc[0] == pytest.approx(300.5)
+        assert str(df['Date'].dtype) == 'datetime64[ns, UTC]'
+
+    def test_empty_payload(self):
+        df = bars_to_long_frame({})
+        assert df.empty
+        assert list(df.columns) == LONG_COLUMNS
+
+    def test_panel_views_across_chunks(self):
+        # MSFT spans two chunks, with the later dates arriving first
+        chunks = [
+            bars_to_long_frame({'MSFT': [raw_bar(d, 300) for d in range(5, 7)], 'AAPL': [raw_bar(2, 150)]}),
+            bars_to_long_frame({'MSFT': [raw_bar(d, 300) for d in range(2, 5)]}),
+            bars_to_long_frame({}),
+        ]
+        panel = BarPanel.from_chunks(chunks)
+
+        assert sorted(panel.symbols) == ['AAPL', 'MSFT']
+        assert 'TSLA' not in panel and panel.get('TSLA') is None
+        msft = panel['MSFT']
+        expected = bars_to_frame([raw_bar(d, 300) for d in range(2, 7)])
+        pd.testing.assert_frame_equal(msft, expected)
+        assert np.shares_memory(msft['Close'].to_numpy(), panel['MSFT']['Close'].to_numpy())
+
+        long_df = panel.to_long()
+        assert list(long_df.columns) == LONG_COLUMNS
+        assert len(long_df) == 6
+        assert long_df.groupby('Symbol')['Date'].is_monotonic_increasing.all()
+
+    def test_empty_panel(self):
+        panel = BarPanel.from_chunks([])
+        assert panel.empty
+        assert panel.to_long().empty
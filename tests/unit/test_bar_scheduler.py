@@ -0,0 +1,132 @@
+import pytest
+import threading
+import pandas as pd
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from src.modules.bar_scheduler import BarFetchScheduler, TokenBucket, is_rate_limit_error
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class StubClient:
+    """Offline stand-in for StockHistoricalDataClient"""
+
+    def __init__(self, fail_first=None, fail_symbols=None):
+        self.calls = []
+        self.fail_first = fail_first
+        self.fail_symbols = set(fail_symbols or [])
+        self._lock = threading.Lock()
+
+    def get_stock_bars(self, request):
+        symbols = tuple(request.symbol_or_symbols)
+        with self._lock:
+            self.calls.append(symbols)
+            if self.fail_first is not None:
+                exc, self.fail_first = self.fail_first, None
+                raise exc
+        if self.fail_symbols & set(symbols):
+            raise ValueError("upstream timeout")
+        return SimpleNamespace(data={s: [f"bar-{s}"] for s in symbols})
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestTokenBucket:
+
+    def test_acquire_waits_for_refill(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate_per_sec=2.0, capacity=2.0, clock=clock, sleep=clock.sleep)
+
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == 0
+        waited = bucket.acquire()
+        assert waited == pytest.approx(0.5)
+
+    def test_pause_blocks_until_expiry(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate_per_sec=10.0, capacity=10.0, clock=clock, sleep=clock.sleep)
+
+        bucket.pause(3.0)
+        bucket.acquire()
+        assert clock.now >= 3.0
+
+
+class TestBarFetchScheduler:
+
+    @pytest.fixture
+    def symbols(self):
+        return [f"S{i:03d}" for i in range(100)]
+
+    def make_scheduler(self, client, **kwargs):
+        clock = FakeClock()
+        bucket = TokenBucket(rate_per_sec=1000.0, capacity=1000.0, clock=clock, sleep=clock.sleep)
+        params = dict(max_workers=4, chunk_size=20, min_chunk_size=5, bucket=bucket, sleep=clock.sleep)
+        params.update(kwargs)
+        return BarFetchScheduler(client, **params)
+
+    def test_fetches_all_symbols_in_chunks(self, symbols):
+        client = StubClient()
+        scheduler = self.make_scheduler(client)
+
+        result = scheduler.fetch(symbols, start=datetime.now() - timedelta(days=30))
+
+        assert sorted(result.merged()) == symbols
+        assert not result.failed_symbols
+        assert all(len(c) <= scheduler.max_chunk_size for c in client.calls)
+
+    def test_rate_limit_retries_only_failed_chunk(self, symbols):
+        client = StubClient(fail_first=RateLimitError("429 Too Many Requests"))
+        scheduler = self.make_scheduler(client, max_workers=1)
+
+        result = scheduler.fetch(symbols, start=datetime.now() - timedelta(days=30))
+
+        assert sorted(result.merged()) == symbols
+        assert result.rate_limited == 1
+        # Every symbol requested once, plus the one retried chunk
+        requested = [s for call in client.calls for s in call]
+        assert len(requested) == len(symbols) + len(client.calls[0])
+
+    def test_errors_split_chunks_and_report_failures(self, symbols):
+        client = StubClient(fail_symbols=["S042"])
+        scheduler = self.make_scheduler(client, max_retries=3)
+
+        result = scheduler.fetch(symbols, start=datetime.now() - timedelta(days=30))
+
+        # The bad chunk is halved down to min_chunk_size; everything else completes
+        assert "S042" in result.failed_symbols
+        assert len(result.failed_symbols) == scheduler.min_chunk_size
+        assert len(result.merged()) == len(symbols) - scheduler.min_chunk_size
+        assert scheduler.chunk_size < 20
+
+    def test_tz_aware_start(self, symbols):
+        # DataFetcher passes the cache's last UTC bar date + 1 day
+        client = StubClient()
+        scheduler = self.make_scheduler(client)
+
+        result = scheduler.fetch(symbols, start=pd.Timestamp.now(tz='UTC') - timedelta(days=30))
+
+        assert sorted(result.merged()) == symbols
+        assert not result.failed_symbols
+        assert client.calls
+
+    def test_transform_applied_per_chunk(self, symbols):
+        scheduler = self.make_scheduler(StubClient())
+
+        result = scheduler.fetch(symbols[:10], start=datetime.now() - timedelta(days=5), transform=len)
+
+        assert sum(result.chunks) == 10
+
+    def test_is_rate_limit_error(self):
+        assert is_rate_limit_error(RateLimitError("x"))
+        assert not is_rate_limit_error(ValueError("boom"))
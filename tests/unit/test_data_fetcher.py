@@ -1,6 +1,8 @@
 import pytest
 import pandas as pd
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
+from src.modules.bar_scheduler import BarFetchScheduler, TokenBucket
 from src.modules.data_fetcher import DataFetcher
 from datetime import datetime
 
@@ -85,3 +87,53 @@ class TestDataFetcher:
         assert not df.empty
         assert 'close' in df.columns # Should be lowercase
         assert df['close'].iloc[0] == 105
+
+    def test_histories_reuse_snapshot_bars(self, fetcher):
+        dates = pd.date_range(end=pd.Timestamp.now(tz='UTC').normalize(), periods=300, freq='B')
+        long_df = pd.concat([
+            pd.DataFrame({'Date': dates, 'Symbol': sym, 'Open': 10.0, 'High': 11.0,
+                          'Low': 9.0, 'Close': 10.0 + i, 'Volume': 1000.0})
+            for i, sym in enumerate(['AAPL', 'SPY'])
+        ], ignore_index=True)
+        fetcher.scheduler = MagicMock()
+        fetcher.scheduler.fetch.return_value = MagicMock(chunks=[])
+
+        with patch.object(fetcher, 'fetch_market_data', return_value=long_df):
+            fetcher.fetch_technical_snapshot(['AAPL', 'SPY'], days=400)
+
+        histories = fetcher.fetch_price_histories(['AAPL', 'SPY', 'MSFT'], days=100)
+        assert sorted(histories) == ['AAPL', 'SPY']
+        assert list(histories['SPY'].columns) == ['open', 'high', 'low', 'close', 'volume']
+        assert histories['SPY']['close'].iloc[-1] == 11.0
+        assert histories['AAPL'].index.min() >= pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=100)
+        # Only the uncached symbol is requested
+        assert fetcher.scheduler.fetch.call_args[0][0] == ['MSFT']
+
+        assert fetcher.fetch_price_history('AAPL', days=100)['close'].iloc[-1] == 10.0
+        fetcher.client.get_stock_bars.assert_not_called()
+        # Longer windows than the snapshot loaded still go to the API
+        assert fetcher.cached_history('AAPL', days=500) is None
+
+    def test_stale_cache_fetches_increment(self, fetcher):
+        today = pd.Timestamp.now(tz='UTC').normalize()
+        stale_dates = pd.date_range(end=today - pd.Timedelta(days=10), periods=30, freq='B')
+        stale = pd.DataFrame({'Date': stale_dates, 'Symbol': 'AAPL', 'Open': 10.0, 'High': 11.0,
+                              'Low': 9.0, 'Close': 10.0, 'Volume': 1000})
+        fresh_day = today - pd.Timedelta(days=2)
+        fresh_bar = {'t': fresh_day.isoformat(), 'o': 12.0, 'h': 13.0, 'l': 11.0, 'c': 12.5, 'v': 2000}
+
+        fetcher.s3_cache = MagicMock()
+        fetcher.s3_cache.get_parquet.return_value = stale
+        client = MagicMock()
+        client.get_stock_bars.return_value = SimpleNamespace(data={'AAPL': [fresh_bar]})
+        fetcher.scheduler = BarFetchScheduler(client, max_workers=1, max_retries=0,
+                                              bucket=TokenBucket(1000.0, 1000.0))
+
+        df = fetcher.fetch_market_data(['AAPL'], days=60)
+
+        # The tz-aware incremental start reaches Alpaca instead of failing every chunk
+        client.get_stock_bars.assert_called_once()
+        assert client.get_stock_bars.call_args[0][0].start.date() == (stale_dates[-1] + pd.Timedelta(days=1)).date()
+        assert df['Date'].max() == fresh_day
+        assert df.loc[df['Date'] == fresh_day, 'Close'].iloc[0] == 12.5
+        fetcher.s3_cache.put_bytes.assert_called_once()
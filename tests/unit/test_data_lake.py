@@ -0,0 +1,104 @@
+import pytest
+import boto3
+import numpy as np
+import pandas as pd
+from io import StringIO
+from moto import mock_aws
+from src.modules.data_lake import DataLake, LakeManifest, OHLCV_COLUMNS, LAKE_SCHEMA_VERSION
+from tests.conftest import make_ohlcv
+
+BUCKET = "lake-test-bucket"
+
+
+def make_history(n=300, start='2020-01-02'):
+    # tz-aware, as yfinance returns it
+    return make_ohlcv(n, start=start, tz='America/New_York', actions=True)
+
+
+@pytest.fixture
+def lake():
+    with mock_aws():
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket=BUCKET)
+        yield DataLake(s3_client=s3, bucket=BUCKET, max_workers=4)
+
+
+class TestDataLake:
+
+    def test_round_trip_is_typed(self, lake):
+        history = make_history()
+        lake.write('AAPL', history)
+        df = lake.read('AAPL')
+
+        assert len(df) == 300
+        assert df.index.name == 'Date'
+        assert df.index.tz is None
+        assert df.index[0] == pd.Timestamp('2020-01-02')
+        assert df['Close'].dtype == np.float32
+        assert df['Volume'].dtype == np.int64
+        assert df['Close'].iloc[-1] == pytest.approx(history['Close'].iloc[-1])
+
+    def test_projection_and_date_pushdown(self, lake):
+        lake.write('MSFT', make_history())
+        df = lake.read('MSFT', columns=['Close'], start='2020-03-02', end='2020-03-31')
+
+        assert list(df.columns) == ['Close']
+        assert df.index.min() == pd.Timestamp('2020-03-02')
+        assert df.index.max() == pd.Timestamp('2020-03-31')
+
+    def test_csv_fallback_and_listing(self, lake):
+        buf = StringIO()
+        make_history(50).to_csv(buf)
+        lake.s3_client.put_object(Bucket=BUCKET, Key="historical_data/OLD.csv", Body=buf.getvalue())
+        lake.write('NEW', make_history(60))
+
+        assert lake.list_symbols() == ['NEW', 'OLD']
+        old = lake.read('OLD', columns=OHLCV_COLUMNS)
+        assert list(old.columns) == OHLCV_COLUMNS
+        assert old['Open'].dtype == np.float32
+        assert len(old) == 50
+
+    def test_parallel_load_skips_missing(self, lake):
+        for sym in ['A', 'B', 'C']:
+            lake.write(sym, make_history(20))
+
+        data = lake.load(['A', 'B', 'C', 'MISSING'], columns=['Close', 'Volume'])
+        assert sorted(data) == ['A', 'B', 'C']
+        assert all(list(df.columns) == ['Close', 'Volume'] for df in data.values())
+
+
+class TestLakeManifest:
+
+    def test_writes_maintain_rich_entries(self, lake):
+        lake.open_manifest()
+        history = make_history()
+        nbytes = lake.write('AAPL', history)
+        lake.manifest.save()
+
+        entry = LakeManifest(lake.s3_client, bucket=BUCKET).load().get('AAPL')
+        assert entry['first_date'] == '2020-01-02'
+        assert entry['last_date'] == lake.read('AAPL').index[-1].strftime('%Y-%m-%d')
+        assert entry['rows'] == 300
+        assert entry['bytes'] == nbytes
+        assert entry['schema_version'] == LAKE_SCHEMA_VERSION
+        assert entry['last_close'] == pytest.approx(history['Close'].iloc[-1])
+        recent = history.iloc[-50:]
+        assert entry['avg_dollar_volume'] == pytest.approx((recent['Close'] * recent['Volume']).mean(), rel=1e-5)
+
+    def test_load_prefilters_without_downloading(self, lake):
+        manifest = lake.open_manifest()
+        lake.write('LONG', make_history(300))
+        lake.write('SHORT', make_history(100))
+        lake.write('OLD', make_history(300, start='2005-01-03'))
+
+        reads = []
+        original = lake.s3.get_bytes
+        lake.s3.get_bytes = lambda bucket, key: reads.append(key) or original(bucket, key)
+
+        data = lake.load(['LONG', 'SHORT', 'OLD', 'UNKNOWN'], min_rows=250, start='2020-06-01')
+        assert sorted(data) == ['LONG']
+        assert sorted(reads) == [lake.csv_key('UNKNOWN'), lake.key('LONG'), lake.key('UNKNOWN')]   # Unknown symbols are still tried
+
+        assert manifest.select(min_rows=250) == ['LONG', 'OLD']
+        assert manifest.select(start='2010-01-01') == ['OLD']
+        assert manifest.select(min_avg_dollar_volume=1e9) == []
@@ -0,0 +1,76 @@
+import pytest
+import pandas as pd
+from datetime import datetime, timedelta
+from alpaca.data.requests import StockBarsRequest
+from alpaca.data.timeframe import TimeFrame
+from src.modules.bar_scheduler import is_rate_limit_error
+from src.modules.data_fetcher import DataFetcher
+from src.modules.data_providers import ReplayProvider, ReplayRateLimitError, record_replay
+from src.modules.market_analysis import MarketAnalyzer
+from tests.conftest import make_ohlcv
+
+SYMBOLS = ['AAA', 'BBB', 'CCC', 'QQQ', 'SPY']
+
+
+@pytest.fixture
+def replay_dir(tmp_path):
+    histories = {s: make_ohlcv(seed=i, drift=0.0005 * (i + 1), volatility=0.01) for i, s in enumerate(SYMBOLS)}
+    return record_replay(
+        tmp_path / "replay",
+        histories,
+        universe={'sp500': ['AAA', 'BBB'], 'nasdaq100': ['BBB', 'CCC']},
+        sectors={'AAA': 'Technology', 'BBB': 'Energy', 'CCC': 'Utilities'},
+        vix={'price': 24.5}
+    )
+
+
+def bars_request(symbols, days=30):
+    return StockBarsRequest(symbol_or_symbols=symbols, timeframe=TimeFrame.Day,
+                            start=datetime.now() - timedelta(days=days))
+
+
+class TestReplayProvider:
+
+    def test_bars_are_rebased_to_today(self, replay_dir):
+        provider = ReplayProvider(replay_dir)
+        payload = provider.bars_client().get_stock_bars(bars_request(['AAA', 'MISSING']))
+
+        assert list(payload) == ['AAA']
+        last = pd.Timestamp(payload['AAA'][-1]['t'])
+        assert (pd.Timestamp.now(tz='UTC') - last).days < 7
+        assert last.dayofweek == pd.Timestamp('2024-06-28').dayofweek
+        assert payload['AAA'][-1]['c'] == pytest.approx(make_ohlcv(seed=0, drift=0.0005, volatility=0.01)['Close'].iloc[-1])
+
+    def test_simulated_quota_raises_rate_limit_errors(self, replay_dir):
+        now = [0.0]
+        provider = ReplayProvider(replay_dir, requests_per_minute=2, clock=lambda: now[0])
+        client = provider.bars_client()
+
+        client.get_stock_bars(bars_request('AAA'))
+        client.get_stock_bars(bars_request('BBB'))
+        with pytest.raises(ReplayRateLimitError) as exc:
+            client.get_stock_bars(bars_request('CCC'))
+        assert is_rate_limit_error(exc.value)
+
+        now[0] = 61.0
+        assert 'CCC' in client.get_stock_bars(bars_request('CCC'))
+        assert client.stats['requests'] == 3
+        assert client.stats['rate_limited'] == 1
+
+    def test_fetcher_runs_offline(self, replay_dir):
+        fetcher = DataFetcher(api_key="unused", secret_key="unused", provider=ReplayProvider(replay_dir))
+
+        assert fetcher.fetch_sp500_tickers() == ['AAA', 'BBB']
+        universe = fetcher.fetch_full_universe()
+        assert {'AAA', 'BBB', 'CCC', 'SPY'} <= set(universe)
+        assert (replay_dir / "state" / "universe").exists()
+
+        results = fetcher.fetch_batch_data(['AAA', 'BBB', 'CCC'])
+        assert sorted(results) == ['AAA', 'BBB', 'CCC']
+        fund, tech = results['BBB']
+        assert fund.sector == 'Energy'
+        assert tech.current_price > 0
+
+        vix = MarketAnalyzer(data_fetcher=fetcher).analyze_vix()
+        assert vix['current_vix'] == 24.5
+        assert vix['status'] == 'Elevated'
@@ -0,0 +1,81 @@
+import json
+import pytest
+import numpy as np
+import pandas as pd
+from src.modules import features as feature_lib
+from src.modules.feature_selection import (
+    importance_table, load_feature_set, select_features, write_feature_set
+)
+
+
+def make_dataset(n=900, seed=0):
+    rng = np.random.default_rng(seed)
+    features = ['rsi', 'vol_ratio', 'atr_pct', 'mom_1m']
+    X = rng.normal(size=(n, len(features))).astype(np.float32)
+    # Only rsi and vol_ratio carry signal
+    y = (X[:, 0] + 0.5 * X[:, 1] + 0.5 * rng.normal(size=n) > 0).astype(int)
+    entry = pd.Series(pd.bdate_range('2012-01-02', periods=n))
+    return X, y, entry, entry + pd.Timedelta(days=7), features
+
+
+class TestImportance:
+
+    def test_signal_features_rank_first_and_results_are_cached(self, tmp_path):
+        X, y, entry, exit_, features = make_dataset()
+        kwargs = dict(exit_dates=exit_, n_estimators=30, n_splits=3, n_repeats=3, cache_dir=tmp_path)
+
+        table = importance_table(X, y, entry, features, n_jobs=2, **kwargs)
+        assert table.index[:2].tolist() == ['rsi', 'vol_ratio']
+        assert (table.loc[['rsi', 'vol_ratio'], 'drop_mean'] > 0).all()
+        assert select_features(table, top_k=3)[:2] == ['rsi', 'vol_ratio']
+
+        cached = list(tmp_path.iterdir())
+        assert len(cached) == 1
+        again = importance_table(X, y, entry, features, n_jobs=1, **kwargs)
+        pd.testing.assert_frame_equal(again, table, check_exact=False)
+
+        # A different model config is a different cache entry
+        importance_table(X, y, entry, features, n_jobs=1, **{**kwargs, 'n_estimators': 20, 'n_repeats': 1})
+        assert len(list(tmp_path.iterdir())) == 2
+
+    def test_select_drops_noise(self):
+        table = pd.DataFrame({
+            'perm_mean': [0.05, 0.002, 0.0, -0.01],
+            'perm_std': [0.01, 0.004, 0.01, 0.01],
+            'drop_mean': [0.03, -0.001, 0.0, -0.02],
+            'drop_std': [0.01, 0.01, 0.01, 0.01],
+        }, index=pd.Index(['a', 'b', 'c', 'd'], name='feature'))
+        assert select_features(table) == ['a']
+
+
+class TestFeatureSets:
+
+    def test_write_and_load_current(self, tmp_path):
+        table = pd.DataFrame({'perm_mean': [0.1]}, index=pd.Index(['rsi'], name='feature'))
+        first = write_feature_set(['rsi'], table, tmp_path)
+        second = write_feature_set(['rsi', 'atr_pct'], table, tmp_path)
+
+        assert load_feature_set(tmp_path)['version'] == second['version']
+        assert load_feature_set(tmp_path)['features'] == ['rsi', 'atr_pct']
+        assert json.loads((tmp_path / f"{first['version']}.json").read_text())['features'] == ['rsi']
+        assert load_feature_set(tmp_path / "missing") is None
+
+    def test_too_few_features_keep_current_set(self, tmp_path):
+        table = pd.DataFrame({'perm_mean': [-0.01], 'perm_std': [0.01], 'drop_mean': [0.0], 'drop_std': [0.0]},
+                             index=pd.Index(['rsi'], name='feature'))
+        current = write_feature_set(['rsi', 'atr_pct'], table, tmp_path)
+        with pytest.raises(ValueError):
+            write_feature_set(select_features(table), table, tmp_path)
+        with pytest.raises(ValueError):
+            write_feature_set(['rsi'], table, tmp_path, min_features=2)
+
+        assert load_feature_set(tmp_path)['version'] == current['version']
+        assert len(list(tmp_path.glob("*.json"))) == 2   # <version>.json + current.json
+
+    def test_rejects_other_schema(self, tmp_path):
+        table = pd.DataFrame({'perm_mean': [0.1]}, index=pd.Index(['rsi'], name='feature'))
+        feature_set = write_feature_set(['rsi'], table, tmp_path)
+        stale = {**feature_set, 'feature_schema': feature_lib.FEATURE_SCHEMA_VERSION - 1}
+        (tmp_path / "current.json").write_text(json.dumps(stale))
+        with pytest.raises(ValueError):
+            load_feature_set(tmp_path)
@@ -0,0 +1,118 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.modules import features as feature_lib
+from src.modules.backtester import Backtester
+from src.modules.market_breadth import MarketBreadthCalculator
+from tests.conftest import make_ohlcv
+
+
+@pytest.fixture(scope="module")
+def universe():
+    return {f"S{i}": make_ohlcv(150 + 7 * i, seed=i) for i in range(60)}
+
+
+class TestIndicators:
+
+    def test_long_table_matches_per_symbol(self, universe):
+        ind = feature_lib.add_indicators(feature_lib.to_long(universe), by='Symbol')
+
+        for symbol, df in list(universe.items())[::7]:
+            expected = feature_lib.add_indicators(df)
+            actual = ind[ind['Symbol'] == symbol].set_index('Date')
+            for col in feature_lib.INDICATOR_COLUMNS:
+                np.testing.assert_array_equal(actual[col].to_numpy(), expected[col].to_numpy())
+
+    def test_breadth_table_counts_valid_stocks(self, universe):
+        data = {s: feature_lib.add_indicators(df) for s, df in universe.items()}
+        table = feature_lib.breadth_table(data)
+        date = table.index[-1]
+
+        rows = [df.loc[date] for df in data.values() if date in df.index and not pd.isna(df.loc[date, 'SMA_200'])]
+        assert len(rows) >= feature_lib.MIN_BREADTH_STOCKS
+        above = sum(r['Close'] > r['SMA_200'] for r in rows)
+        assert table.loc[date, 'pct_above_200sma'] == round(above / len(rows) * 100, 2)
+
+        # Early dates have too few stocks with a 200-day SMA
+        assert table.iloc[0]['pct_above_200sma'] == feature_lib.DEFAULT_BREADTH['pct_above_200sma']
+        assert MarketBreadthCalculator(data).calculate_daily_breadth(date) == table.loc[date].to_dict()
+
+
+class TestComputeFeatures:
+
+    def test_row_formulas_and_defaults(self):
+        row = pd.DataFrame([{
+            'Close': 110.0, 'Volume': 9e6, 'Volume_MA20': 1e6, 'SMA_50': 100.0, 'SMA_200': np.nan,
+            'RSI': 61.0, 'ATR': 2.2, 'BB_Width': 0.2, 'Close_21d': 100.0, 'Close_63d': 88.0,
+            'Close_126d': np.nan, 'Realized_Vol_20d': 0.3, 'Vol_MA': 0.05,
+            'High_252d': 121.0, 'Low_252d': 55.0,
+        }])
+        out = feature_lib.compute_features(row, dates=[pd.Timestamp('2024-01-02')]).iloc[0]
+
+        assert out['vol_ratio'] == 5.0                       # clipped
+        assert out['sma50_dist'] == pytest.approx(10.0)
+        assert np.isnan(out['sma200_dist'])
+        assert out['atr_pct'] == pytest.approx(2.0)
+        assert out['mom_3m'] == pytest.approx(25.0)
+        assert out['mom_6m'] == 0.0                          # no 6-month close
+        assert out['vol_spike'] == 3.0                       # clipped
+        assert out['dist_52w_high'] == pytest.approx(-100 / 11)
+        # No market context -> neutral values
+        assert (out['spy_trend'], out['rs_rel'], out['spy_rsi_market'], out['vix_level']) == (1.0, 0.0, 50.0, 20.0)
+        assert out['pct_above_200sma'] == 50.0
+
+    def test_market_context(self):
+        spy = make_ohlcv(300, seed=99)
+        dates = spy.index[[-1, -250]]
+        vix = pd.DataFrame({'VIX': [95.0]}, index=dates[:1])
+        rows = pd.DataFrame({'Close': [100.0, 100.0], 'Close_63d': [80.0, 80.0]})
+        context = feature_lib.market_context(spy, vix)
+
+        out = feature_lib.compute_features(rows, dates=dates, context=context,
+                                           features=['spy_trend', 'rs_rel', 'vix_level'])
+
+        spy_ret = spy['Close'].iloc[-1] / spy['Close'].iloc[-64] - 1
+        assert out['rs_rel'].iloc[0] == pytest.approx((1.25 / (1 + spy_ret + 0.0001) - 1) * 100)
+        assert out['rs_rel'].iloc[1] == 0.0                  # SPY has no 3-month history yet
+        assert out['spy_trend'].iloc[1] == 1.0               # SMA_200 not formed yet
+        assert out['vix_level'].tolist() == [80.0, 20.0]
+        assert list(out.columns) == ['spy_trend', 'rs_rel', 'vix_level']
+
+    def test_unknown_feature_rejected(self):
+        with pytest.raises(ValueError):
+            feature_lib.compute_features(pd.DataFrame({'Close': [1.0]}), features=['rsi', 'nope'])
+
+    def test_backtester_uses_library(self, universe):
+        bt = Backtester()
+        bt.set_market_data(universe['S59'])
+        data = {s: bt.calculate_indicators(df) for s, df in universe.items()}
+        bt.set_breadth_data(data)
+        date = data['S10'].index[-1]
+
+        single = bt._extract_features(data['S10'].loc[date], 'S10', date)
+        batch = bt.extract_features(pd.DataFrame([data['S10'].loc[date], data['S20'].loc[date]]), date)
+
+        assert list(batch.columns) == feature_lib.FEATURE_NAMES
+        assert single == batch.iloc[0].to_dict()
+        assert batch['pct_above_200sma'].iloc[0] == bt.breadth_calculator.calculate_daily_breadth(date)['pct_above_200sma']
+
+
+class TestLatestFeatures:
+
+    def test_live_histories_match_backtest_rows(self, universe):
+        # fetch_price_history layout: lowercase columns, tz-aware bar timestamps
+        def live(df):
+            df = df.rename(columns=str.lower)
+            return df.set_axis(df.index.tz_localize('UTC') + pd.Timedelta(hours=4))
+
+        histories = {s: live(universe[s]) for s in ['S3', 'S40']}
+        spy = universe['S59']
+        out = feature_lib.latest_features(histories, live(spy), features=feature_lib.BASE_FEATURES)
+
+        context = feature_lib.market_context(spy)
+        for symbol in histories:
+            ind = feature_lib.add_indicators(universe[symbol])
+            expected = feature_lib.compute_features(ind.iloc[[-1]], context=context,
+                                                    features=feature_lib.BASE_FEATURES)
+            np.testing.assert_array_equal(out.loc[symbol].to_numpy(), expected.iloc[0].to_numpy())
+        assert list(out.columns) == feature_lib.BASE_FEATURES
@@ -0,0 +1,97 @@
+import pytest
+import threading
+from src.modules.fundamentals_cache import FundamentalsCache, LocalJsonStore, DAY
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubLoader:
+    def __init__(self, missing=()):
+        self.calls = []
+        self.missing = set(missing)
+        self._lock = threading.Lock()
+
+    def __call__(self, symbol):
+        with self._lock:
+            self.calls.append(symbol)
+        if symbol in self.missing:
+            raise LookupError(symbol)
+        return {'sector': f"Sector-{symbol}", 'roe': 12.5}
+
+
+class TestFundamentalsCache:
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    def make_cache(self, loader, clock, store=None, **kwargs):
+        return FundamentalsCache(store=store, loader=loader, clock=clock, max_workers=4, **kwargs)
+
+    def test_batch_refresh_then_memory_hits(self, clock):
+        loader = StubLoader()
+        cache = self.make_cache(loader, clock)
+
+        result = cache.get_many(['AAPL', 'MSFT', 'AAPL'])
+        assert result['MSFT']['sector'] == 'Sector-MSFT'
+        assert sorted(loader.calls) == ['AAPL', 'MSFT']
+
+        cache.get('AAPL')
+        assert len(loader.calls) == 2
+        assert cache.stats['hits'] == 1
+
+    def test_per_field_ttls(self, clock):
+        loader = StubLoader()
+        cache = self.make_cache(loader, clock)
+        cache.get('AAPL', fields=('sector', 'roe'))
+
+        clock.now += 2 * DAY
+        # Sector is still fresh (30d), roe has expired (1d)
+        assert cache.get('AAPL')['sector'] == 'Sector-AAPL'
+        assert len(loader.calls) == 1
+        assert cache.get('AAPL', fields=('roe',))['roe'] == 12.5
+        assert len(loader.calls) == 2
+
+    def test_negative_cache_expires(self, clock):
+        loader = StubLoader(missing=['ZZZZ'])
+        cache = self.make_cache(loader, clock)
+
+        assert cache.get('ZZZZ')['sector'] is None
+        assert cache.get('ZZZZ')['sector'] is None
+        assert loader.calls == ['ZZZZ']
+        assert cache.stats['negative_hits'] == 1
+
+        clock.now += DAY + 1
+        cache.get('ZZZZ')
+        assert loader.calls == ['ZZZZ', 'ZZZZ']
+
+    def test_persisted_store_shared_across_instances(self, clock, tmp_path):
+        store = LocalJsonStore(tmp_path / "fundamentals.json")
+        self.make_cache(StubLoader(missing=['BAD']), clock, store=store).get_many(['AAPL', 'BAD'])
+
+        loader = StubLoader()
+        cache = self.make_cache(loader, clock, store=store)
+        assert cache.get('AAPL')['sector'] == 'Sector-AAPL'
+        assert cache.get('BAD')['sector'] is None
+        assert loader.calls == []
+
+    def test_seed_and_lru_eviction(self, clock):
+        loader = StubLoader()
+        cache = self.make_cache(loader, clock, max_entries=2)
+        cache.seed('sector', {'AAPL': 'Technology', 'XOM': 'N/A'})
+
+        assert cache.get('AAPL')['sector'] == 'Technology'
+        assert loader.calls == []
+
+        cache.get_many(['MSFT', 'XOM'])
+        assert sorted(loader.calls) == ['MSFT', 'XOM']
+        assert len(cache._memory) == 2
+        # Evicted from memory but still served from the persisted tier
+        assert cache.get('AAPL')['sector'] == 'Technology'
+        assert sorted(loader.calls) == ['MSFT', 'XOM']
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from src.modules.incremental_training import (
+    TrainerState, UpdatePolicy, drift_score, fit_full, new_samples, rebuild_reason, warm_update
+)
+
+FEATURES = ['a', 'b', 'c']
+TODAY = pd.Timestamp('2024-06-28')
+
+
+def make_batch(n, seed, shift=0.0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(loc=shift, size=(n, len(FEATURES)))
+    y = (X[:, 0] - shift + rng.normal(scale=0.5, size=n) > 0).astype(int)
+    return X, y
+
+
+def make_pipeline():
+    X, y = make_batch(500, seed=0)
+    pipeline = fit_full(RandomForestClassifier(n_estimators=20, max_depth=4, random_state=0), X, y)
+    pipeline.update({'features': FEATURES, 'feature_schema': 2})
+    state = TrainerState(features=FEATURES, feature_schema=2, last_full_rebuild='2024-06-01',
+                         exit_watermark='2024-06-21', n_samples=500)
+    return pipeline, state
+
+
+class TestWarmUpdate:
+
+    def test_adds_trees_and_keeps_scaler_frozen(self):
+        pipeline, _ = make_pipeline()
+        old_trees = list(pipeline['model'].estimators_)
+        frozen_mean = pipeline['scaler'].mean_.copy()
+
+        X_new, y_new = make_batch(100, seed=1)
+        warm_update(pipeline, X_new, y_new, trees=5)
+
+        assert len(pipeline['model'].estimators_) == 25
+        assert pipeline['model'].estimators_[:20] == old_trees
+        np.testing.assert_array_equal(pipeline['scaler'].mean_, frozen_mean)
+        assert pipeline['running_scaler'].n_samples_seen_ == 600
+
+    def test_single_class_batch_only_updates_stats(self):
+        pipeline, _ = make_pipeline()
+        X_new, _ = make_batch(30, seed=2)
+        warm_update(pipeline, X_new, np.ones(30, dtype=int), trees=5)
+
+        assert len(pipeline['model'].estimators_) == 20
+        assert pipeline['running_scaler'].n_samples_seen_ == 530
+
+
+class TestRebuildReason:
+
+    def test_warm_start_allowed(self):
+        pipeline, state = make_pipeline()
+        assert rebuild_reason(state, pipeline, FEATURES, 2, TODAY, UpdatePolicy()) is None
+
+    def test_triggers(self):
+        pipeline, state = make_pipeline()
+        policy = UpdatePolicy()
+
+        assert rebuild_reason(None, None, FEATURES, 2, TODAY, policy) == "no previous model"
+        assert rebuild_reason(state, pipeline, FEATURES + ['d'], 2, TODAY, policy) == "feature set changed"
+        assert rebuild_reason(state, pipeline, FEATURES, 3, TODAY, policy) == "feature set changed"
+        later = TODAY + pd.Timedelta(days=policy.rebuild_days)
+        assert rebuild_reason(state, pipeline, FEATURES, 2, later, policy) == "scheduled rebuild"
+        assert rebuild_reason(state, pipeline, FEATURES, 2, TODAY, UpdatePolicy(max_trees=25)) == "tree budget reached"
+
+    def test_drift_detected_from_running_stats(self):
+        pipeline, state = make_pipeline()
+        X_new, y_new = make_batch(500, seed=3, shift=1.5)
+        warm_update(pipeline, X_new, y_new, trees=5)
+
+        shift, _ = drift_score(pipeline['scaler'], pipeline['running_scaler'])
+        assert shift > 0.5
+        assert rebuild_reason(state, pipeline, FEATURES, 2, TODAY, UpdatePolicy()).startswith("feature drift")
+
+    def test_new_samples_after_watermark(self):
+        _, state = make_pipeline()
+        df = pd.DataFrame({'exit_date': pd.to_datetime(['2024-06-20', '2024-06-21', '2024-06-24'])})
+        assert new_samples(df, state)['exit_date'].tolist() == [pd.Timestamp('2024-06-24')]
+        assert TrainerState.from_dict({**state.to_dict(), 'unknown': 1}) == state
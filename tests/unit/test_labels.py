@@ -0,0 +1,116 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.modules import features as feature_lib
+from src.modules.backtester import Backtester
+from src.modules.labels import (
+    EXIT_REASONS, entry_events, focus_candidates, generate_labels, market_regime, resolve_exits, rotation_days
+)
+from src.modules.stock_selector import StockSelector
+from src.modules.universe_panel import build_panel
+from tests.conftest import make_ohlcv
+
+
+@pytest.fixture(scope="module")
+def universe():
+    # Fewer symbols than the selector's top-N cut, so its ranking never binds
+    return {f"S{i}": make_ohlcv(400 + 60 * i, seed=i, base=50, drift=0.0008) for i in range(8)}
+
+
+@pytest.fixture(scope="module")
+def holiday_universe(universe):
+    # Every third Monday is a market holiday
+    mondays = universe['S7'].index[universe['S7'].index.weekday == 0]
+    holidays = mondays[::3]
+    return {s: df.drop(df.index.intersection(holidays)) for s, df in universe.items()}
+
+
+def backtester_focus(universe, spy, calendar, regime, start):
+    """Focus list per day, rotated as in Backtester.run_backtest"""
+    selector = StockSelector()
+    market = spy.reindex(calendar, method='ffill')
+    focus, lists = [], {}
+    for i, day in enumerate(calendar[calendar >= start]):
+        if day.weekday() == 0 or (not focus and i % 5 == 0):
+            focus = selector.get_weekly_focus_list(universe, market, day, regime.loc[day])
+        lists[day] = focus
+    return lists
+
+
+class TestExitKernel:
+
+    def test_matches_manage_position(self, universe):
+        df = feature_lib.add_indicators(universe['S3'])
+        entries = np.arange(200, len(df) - 1, 9)
+        exit_rows, exit_prices, reasons = resolve_exits(
+            entries, np.full(len(entries), len(df)),
+            df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy(), df['ATR'].to_numpy()
+        )
+
+        bt = Backtester()
+        for j, exit_row, exit_price, reason in zip(entries, exit_rows, exit_prices, reasons):
+            bt.positions, bt.trades, bt.capital = {}, [], 1e6
+            bt.enter_position('S3', df.index[j], 1.0, df['Close'].iloc[j])
+            k = j + 1
+            while 'S3' in bt.positions and k < len(df):
+                bt.manage_position('S3', df.iloc[k], df.index[k])
+                k += 1
+            if bt.trades:
+                assert (exit_row, exit_price) == (k - 1, bt.trades[0].exit_price)
+                assert EXIT_REASONS[reason] == bt.trades[0].exit_reason
+            else:
+                assert exit_row == -1
+
+
+class TestEntryEvents:
+
+    def assert_matches_backtester(self, universe):
+        spy = universe['S0']
+        calendar = pd.DatetimeIndex(np.unique(np.concatenate([f.index.values for f in universe.values()])))
+        start = calendar[-150]
+        regime = market_regime(spy, calendar)
+        spy_close = spy['Close'].reindex(calendar, method='ffill')
+        market_ret = (spy_close / spy_close.shift(63) - 1).fillna(0.0)
+
+        ind = feature_lib.add_indicators(feature_lib.to_long(universe), by='Symbol')
+        n_selected = pd.Series(focus_candidates(ind, regime, market_ret)).groupby(ind['Date'].to_numpy()).sum()
+        rotation = rotation_days(calendar, n_selected, start)
+        events = set(map(tuple, ind.iloc[entry_events(ind, regime, market_ret, rotation)][['Symbol', 'Date']].values.tolist()))
+
+        frames = {s: feature_lib.add_indicators(f) for s, f in universe.items()}
+        for day, focus in backtester_focus(universe, spy, calendar, regime, start).items():
+            for symbol, df in frames.items():
+                if day not in df.index:
+                    continue
+                expected = symbol in focus and df.loc[day, 'Close'] > df.loc[day, 'EMA_21']
+                assert ((symbol, day) in events) == expected
+        return rotation[rotation.index >= start]
+
+    def test_matches_backtester_rotation(self, universe):
+        rotation = self.assert_matches_backtester(universe)
+        assert (rotation.index == rotation.values).sum() >= 25
+
+    def test_holiday_mondays_keep_previous_list(self, holiday_universe):
+        rotation = self.assert_matches_backtester(holiday_universe)
+        # Some holiday week runs on the previous week's list (not re-selected on Tuesday)
+        tuesdays = rotation[(rotation.index.weekday == 1)]
+        after_holiday = tuesdays[[(d - pd.Timedelta(days=1)) not in rotation.index for d in tuesdays.index]]
+        assert len(after_holiday) > 0
+        assert (after_holiday.values < after_holiday.index.values).any()
+
+
+class TestGenerateLabels:
+
+    def test_panel_and_frames_agree(self, universe, tmp_path):
+        spy = universe['S0']
+        labels = generate_labels(universe, spy, start_date='2021-01-01', chunk_size=3)
+        panel = build_panel(tmp_path / "panel", universe)
+        from_panel = generate_labels(panel, spy, start_date='2021-01-01', chunk_size=5)
+
+        assert len(labels) > 0
+        pd.testing.assert_frame_equal(labels, from_panel)
+        assert list(labels.columns[:len(feature_lib.FEATURE_NAMES)]) == feature_lib.FEATURE_NAMES
+        assert (labels['entry_date'] >= pd.Timestamp('2021-01-01')).all()
+        assert (labels['exit_date'] > labels['entry_date']).all()
+        assert (labels['outcome'] == (labels['return_pct'] > 0.02)).all()
+        assert set(labels['exit_reason']) <= {'Stop Loss', 'Trailing Stop', 'Take Profit'}
@@ -0,0 +1,105 @@
+import pytest
+import boto3
+import pandas as pd
+from datetime import datetime
+from moto import mock_aws
+from src.modules.data_lake import DataLake, LakeManifest, frame_checksum
+from src.modules.lake_updater import LakeUpdater
+from tests.conftest import make_ohlcv
+
+BUCKET = "lake-test-bucket"
+
+
+def make_history(end='2024-06-14', n=60):
+    return make_ohlcv(n, end=end, actions=True)
+
+
+class Provider:
+    """Stub loader serving slices of a per-symbol 'true' history"""
+
+    def __init__(self, histories):
+        self.histories = histories
+        self.calls = []
+
+    def __call__(self, symbol, start):
+        self.calls.append((symbol, start))
+        df = self.histories[symbol]
+        return df if start is None else df[df.index >= start]
+
+
+@pytest.fixture
+def s3():
+    with mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+class TestLakeUpdater:
+
+    def make_updater(self, s3, provider, today='2024-06-18'):
+        lake = DataLake(s3_client=s3, bucket=BUCKET, max_workers=2)
+        return LakeUpdater(lake, loader=provider, max_workers=2,
+                           clock=lambda: datetime.fromisoformat(today))
+
+    def seed(self, s3, provider, symbol, end):
+        """Store the provider's history up to `end` and record it in the manifest"""
+        updater = self.make_updater(s3, Provider({symbol: provider.histories[symbol][:end]}), today=end)
+        assert updater.run([symbol]).created == [symbol]
+
+    def test_appends_only_missing_bars(self, s3):
+        provider = Provider({'AAPL': make_history()})
+        self.seed(s3, provider, 'AAPL', '2024-06-10')
+
+        updater = self.make_updater(s3, provider)
+        report = updater.run(['AAPL'])
+
+        assert report.appended == ['AAPL']
+        assert provider.calls == [('AAPL', pd.Timestamp('2024-06-04'))]   # 5-bar overlap only
+        stored = updater.lake.read('AAPL')
+        assert stored.index[-1] == pd.Timestamp('2024-06-14')
+        assert len(stored) == 60
+
+        reloaded = LakeManifest(s3, bucket=BUCKET).load().get('AAPL')
+        assert reloaded['last_date'] == '2024-06-14'
+        assert reloaded['rows'] == 60
+        assert reloaded['checksum'] == frame_checksum(stored)
+
+    def test_adjusted_overlap_triggers_full_rewrite(self, s3):
+        history = make_history()
+        provider = Provider({'NVDA': history})
+        self.seed(s3, provider, 'NVDA', '2024-06-10')
+
+        # 10:1 split on 2024-06-11: the provider back-adjusts all earlier prices
+        adjusted = history.copy()
+        adjusted[['Open', 'High', 'Low', 'Close']] /= 10
+        adjusted.loc['2024-06-11', 'Stock Splits'] = 10.0
+        provider.histories['NVDA'] = adjusted
+
+        updater = self.make_updater(s3, provider)
+        report = updater.run(['NVDA'])
+
+        assert report.rewritten == ['NVDA']
+        assert provider.calls[-1] == ('NVDA', None)
+        stored = updater.lake.read('NVDA')
+        assert stored['Close'].iloc[0] == pytest.approx(history['Close'].iloc[0] / 10)
+        assert len(stored) == 60
+
+    def test_current_symbols_are_not_fetched(self, s3):
+        provider = Provider({'MSFT': make_history()})
+        self.seed(s3, provider, 'MSFT', '2024-06-14')
+
+        updater = self.make_updater(s3, provider, today='2024-06-17')
+        report = updater.run(['MSFT'])
+
+        assert report.current == ['MSFT']
+        assert provider.calls == []
+
+    def test_failures_are_reported_and_others_continue(self, s3):
+        provider = Provider({'AAPL': make_history()})
+        updater = self.make_updater(s3, provider)
+        report = updater.run(['AAPL', 'GONE'])
+
+        assert report.created == ['AAPL']
+        assert report.failed == ['GONE']
+        assert LakeManifest(s3, bucket=BUCKET).load().get('GONE') is None
@@ -1,5 +1,7 @@
 import pytest
+import numpy as np
 import pandas as pd
+from src.modules.bar_ingestion import BarPanel
 from unittest.mock import MagicMock
 from src.modules.market_analysis import MarketAnalyzer
 from src.config.constants import TREND_UP, TREND_DOWN, TREND_NEUTRAL
@@ -64,7 +66,7 @@ class TestMarketAnalyzer:
     def test_analyze_market_environment_integration(self, analyzer, mock_fetcher, mock_price_history):
         # Mock Data Fetcher Returns
         mock_fetcher.fetch_price_history.return_value = mock_price_history
-        mock_fetcher.fetch_sp500_tickers.return_value = ['AAPL']
+        mock_fetcher.universe.symbols.return_value = ['AAPL']
         mock_fetcher.fetch_bulk_history.return_value = pd.DataFrame() # Empty triggers fallback
         
         # Run analysis
@@ -74,3 +76,27 @@ class TestMarketAnalyzer:
         assert len(result['regime']) > 0
         assert result['metrics']['current_price'] > 0
         mock_fetcher.fetch_price_history.assert_called_once()
+
+    def test_breadth_metrics_from_bar_panel(self, analyzer, mock_fetcher):
+        dates = pd.date_range('2023-01-02', periods=260, freq='B', tz='UTC')
+        rows = []
+        for symbol, closes in {
+            'UP': np.linspace(50, 100, 260),
+            'DOWN': np.linspace(100, 50, 260),
+            'SHORT': np.linspace(50, 100, 100),
+        }.items():
+            rows.append(pd.DataFrame({
+                'Date': dates[:len(closes)], 'Symbol': symbol,
+                'Open': closes, 'High': closes, 'Low': closes, 'Close': closes, 'Volume': 1000,
+            }))
+        mock_fetcher.universe.symbols.return_value = ['UP', 'DOWN', 'SHORT', 'MISSING']
+        mock_fetcher.fetch_bulk_history.return_value = BarPanel.from_chunks(rows)
+
+        breadth = analyzer.calculate_breadth_metrics()
+
+        mock_fetcher.universe.symbols.assert_called_once_with(['sp500'])
+        assert breadth['universe_size'] == 2
+        assert breadth['pct_above_50ma'] == 50.0
+        assert breadth['pct_above_200ma'] == 50.0
+        assert breadth['new_highs'] == 1
+        assert breadth['new_lows'] == 1
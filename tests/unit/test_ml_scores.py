@@ -0,0 +1,70 @@
+import boto3
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from io import BytesIO
+from moto import mock_aws
+from sklearn.ensemble import RandomForestClassifier
+from src.modules import features as feature_lib
+from src.modules.ml_scores import SCORE_SCHEMA, ScoreStore, score_universe
+from src.utils.s3_cache import TieredS3Cache
+from tests.conftest import make_ohlcv
+
+BUCKET = "scores-test-bucket"
+FEATURES = ['rsi', 'atr_pct', 'sma50_dist', 'mom_1m']
+
+
+def make_bars(n_symbols=6, n_days=260, seed=0):
+    return {f"S{i}": make_ohlcv(n_days, start='2023-01-02', seed=seed + i) for i in range(n_symbols)}
+
+
+@pytest.fixture
+def store(tmp_path):
+    with mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket=BUCKET)
+        cache = TieredS3Cache(client, cache_dir=tmp_path, revalidate_after=0, memory={})
+        yield ScoreStore(client, bucket=BUCKET, cache=cache)
+
+
+class TestScoreUniverse:
+
+    def test_matches_per_symbol_scoring(self):
+        bars = make_bars()
+        rng = np.random.default_rng(1)
+        model = RandomForestClassifier(n_estimators=10, random_state=0).fit(
+            pd.DataFrame(rng.normal(size=(100, len(FEATURES))), columns=FEATURES), rng.integers(0, 2, 100))
+
+        scores = score_universe(model, bars, features=FEATURES)
+        assert scores.dtype == np.float32
+        assert sorted(scores.index) == sorted(bars)
+
+        X = feature_lib.latest_features(bars, features=FEATURES, symbols=['S3']).fillna(0.0)
+        assert scores['S3'] == pytest.approx(model.predict_proba(X)[0, 1])
+
+
+class TestScoreStore:
+
+    def test_write_read_and_lookup(self, store):
+        scores = pd.Series([0.7, 0.4], index=['AAPL', 'MSFT'], dtype=np.float32)
+        key = store.write(scores, "v1", day='2024-06-28')
+        assert key.endswith("date=2024-06-28/scores.parquet")
+
+        body = store.s3_client.get_object(Bucket=BUCKET, Key=key)['Body'].read()
+        assert pq.read_schema(BytesIO(body)).remove_metadata() == SCORE_SCHEMA.remove_metadata()
+
+        table = store.read('2024-06-28')
+        assert table.loc['AAPL', 'probability'] == pytest.approx(0.7)
+        assert store.lookup(['MSFT', 'NVDA'], day='2024-06-28') == {
+            'MSFT': {'probability': pytest.approx(0.4), 'model_version': 'v1', 'date': '2024-06-28'}
+        }
+
+    def test_lookup_falls_back_to_latest_table(self, store):
+        store.write(pd.Series([0.6], index=['AAPL']), "v1", day='2024-06-28')   # Friday
+        store.write(pd.Series([0.9], index=['AAPL']), "v2", day='2024-06-28')   # Rewritten
+        monday = store.lookup(['AAPL'], day='2024-07-01')
+        assert monday['AAPL']['model_version'] == 'v2'
+        assert monday['AAPL']['date'] == '2024-06-28'
+        assert store.lookup(['AAPL'], day='2024-07-10') == {}
+        assert store.read('2024-07-01') is None
@@ -0,0 +1,99 @@
+import importlib.util
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from io import BytesIO
+from sklearn.ensemble import RandomForestClassifier
+from src.modules.incremental_training import TrainerState, fit_full, warm_update
+
+# 'lambda' is a reserved keyword, so the handler is loaded from its path
+HANDLER_PATH = os.path.join(os.getcwd(), 'aws', 'lambda', 'ml_trainer_handler.py')
+spec = importlib.util.spec_from_file_location("ml_trainer_handler", HANDLER_PATH)
+ml_trainer_handler = importlib.util.module_from_spec(spec)
+sys.modules["ml_trainer_handler"] = ml_trainer_handler
+spec.loader.exec_module(ml_trainer_handler)
+promotion_check = ml_trainer_handler.promotion_check
+
+FEATURES = ['a', 'b']
+CUTOFF = '2023-12-31'
+
+
+def make_rows(n, seed, start):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, len(FEATURES)))
+    df = pd.DataFrame(X, columns=FEATURES)
+    df['outcome'] = (X[:, 0] + rng.normal(scale=0.5, size=n) > 0).astype(int)
+    df['entry_date'] = pd.bdate_range(start, periods=n)
+    return df
+
+
+def served_model():
+    train = make_rows(400, seed=0, start='2022-01-03')
+    pipeline = fit_full(RandomForestClassifier(n_estimators=20, max_depth=3, random_state=0),
+                        train[FEATURES].to_numpy(), train['outcome'].to_numpy())
+    pipeline['features'] = FEATURES
+    return pipeline
+
+
+class TestPromotionCheck:
+
+    def test_no_current_model_or_update_of_it_is_promoted(self):
+        eval_df = make_rows(50, seed=1, start='2024-01-02')
+        assert promotion_check(None, None, None, None, eval_df, np.zeros(50))[0]
+        assert promotion_check("v1", served_model(), CUTOFF, "v1", eval_df, np.zeros(50))[0]
+
+    def test_requires_a_training_cutoff(self):
+        eval_df = make_rows(50, seed=1, start='2024-01-02')
+        promoted, reason = promotion_check("v1", served_model(), None, None, eval_df, np.ones(50))
+        assert not promoted
+        assert "training cutoff" in reason
+
+    def test_compares_only_rows_after_the_cutoff(self):
+        # The candidate is perfect on rows the served model trained on, useless after
+        seen = make_rows(100, seed=2, start='2023-01-02')
+        unseen = make_rows(60, seed=3, start='2024-01-02')
+        eval_df = pd.concat([seen, unseen], ignore_index=True)
+        new_prob = np.concatenate([np.where(seen['outcome'] == 1, 0.9, 0.1), np.full(60, 0.1)])
+
+        promoted, reason = promotion_check("v1", served_model(), CUTOFF, None, eval_df, new_prob)
+        assert not promoted
+        assert "60 unseen rows" in reason
+
+        new_prob[100:] = np.where(unseen['outcome'] == 1, 0.9, 0.1)
+        promoted, reason = promotion_check("v1", served_model(), CUTOFF, None, eval_df, new_prob)
+        assert promoted
+        assert "100.0% beats" in reason
+
+    def test_too_few_unseen_rows(self):
+        eval_df = make_rows(30, seed=4, start='2023-12-04')   # 10 rows after the cutoff
+        promoted, reason = promotion_check("v1", served_model(), CUTOFF, None, eval_df, np.ones(30), min_rows=20)
+        assert not promoted
+        assert reason.startswith("only 10 evaluation rows")
+
+
+class TestLoadPrevious:
+
+    def test_returns_a_private_copy_of_the_memoized_pipeline(self, monkeypatch):
+        memoized = served_model()
+
+        class Registry:
+            bucket = "trainer-bucket"
+
+            def load_pipeline(self, version):
+                return memoized, version
+
+        class S3:
+            def get_object(self, Bucket, Key):
+                return {'Body': BytesIO(json.dumps(TrainerState(model_version="v1").to_dict()).encode())}
+
+        monkeypatch.setattr(ml_trainer_handler, "s3_client", S3())
+        pipeline, state = ml_trainer_handler.load_previous(Registry(), "state.json")
+        assert state.model_version == "v1"
+
+        batch = make_rows(50, seed=5, start='2024-01-02')
+        warm_update(pipeline, batch[FEATURES].to_numpy(), batch['outcome'].to_numpy(), trees=5)
+        assert len(pipeline['model'].estimators_) == 25
+        assert len(memoized['model'].estimators_) == 20
@@ -0,0 +1,103 @@
+import json
+import pytest
+import boto3
+import numpy as np
+from moto import mock_aws
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+from src.modules.model_registry import ModelRegistry, PIPELINE_FILE
+from src.modules.tree_inference import CompiledEnsemble
+from src.utils.s3_cache import TieredS3Cache
+
+BUCKET = "registry-test-bucket"
+
+
+def make_pipeline(seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(200, 3))
+    y = (X[:, 0] > 0).astype(int)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=5, max_depth=3, random_state=seed).fit(scaler.transform(X), y)
+    return {'model': model, 'scaler': scaler, 'features': ['a', 'b', 'c'], 'feature_schema': 2}, X
+
+
+@pytest.fixture
+def s3():
+    with mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+def s3_registry(s3, tmp_path):
+    # Pointer reads always revalidate, so promotions are seen immediately
+    cache = TieredS3Cache(s3, cache_dir=tmp_path / "s3_cache", revalidate_after=0, memory={})
+    return ModelRegistry(bucket=BUCKET, s3_client=s3, cache_dir=tmp_path / "models", pointer_cache=cache)
+
+
+class TestLocalRegistry:
+
+    def test_publish_promote_and_load(self, tmp_path):
+        registry = ModelRegistry(root=tmp_path)
+        assert registry.current() is None
+
+        pipeline, X = make_pipeline()
+        version = registry.publish_pipeline(pipeline, {'holdout_precision': 0.6})
+        assert registry.current() is None          # Publishing does not promote
+        registry.promote(version)
+
+        loaded, loaded_version = registry.load_pipeline()
+        assert loaded_version == version
+        np.testing.assert_array_equal(loaded['model'].predict_proba(X), pipeline['model'].predict_proba(X))
+        manifest = registry.manifest(version)
+        assert set(manifest['files']) == {PIPELINE_FILE, 'model.npy', 'model.json'}
+        assert manifest['metadata']['features'] == ['a', 'b', 'c']
+        assert manifest['metadata']['holdout_precision'] == 0.6
+
+    def test_pointer_tracks_previous_version(self, tmp_path):
+        registry = ModelRegistry(root=tmp_path)
+        first = registry.publish_pipeline(make_pipeline(0)[0])
+        second = registry.publish_pipeline(make_pipeline(1)[0])
+        registry.promote(first)
+        pointer = registry.promote(second)
+
+        assert pointer == {**registry.current(), 'version': second, 'previous': first}
+        assert registry.versions() == sorted([first, second])
+        with pytest.raises(KeyError):
+            registry.promote("20990101T000000Z-missing")
+
+
+class TestS3Registry:
+
+    def test_fetch_downloads_once_and_verifies_hashes(self, s3, tmp_path):
+        registry = s3_registry(s3, tmp_path)
+        pipeline, X = make_pipeline()
+        version = registry.publish_pipeline(pipeline)
+        registry.promote(version)
+
+        directory, manifest = registry.fetch()
+        compiled = CompiledEnsemble(np.load(directory / "model.npy", mmap_mode='r'),
+                                    json.loads((directory / "model.json").read_text()))
+        X_scaled = pipeline['scaler'].transform(X)
+        np.testing.assert_allclose(compiled.predict_proba(X_scaled), pipeline['model'].predict_proba(X_scaled))
+
+        calls = []
+        original = s3.download_file
+        s3.download_file = lambda *args, **kwargs: (calls.append(args[1]), original(*args, **kwargs))
+        registry.fetch(version)
+        assert calls == []                          # Cached and hash-verified
+
+        (directory / PIPELINE_FILE).write_bytes(b"corrupt")
+        registry.fetch(version)
+        assert calls == [f"{registry.base}versions/{version}/{PIPELINE_FILE}"]
+
+    def test_pointer_move_is_picked_up(self, s3, tmp_path):
+        registry = s3_registry(s3, tmp_path)
+        first = registry.publish_pipeline(make_pipeline(0)[0])
+        registry.promote(first)
+        assert registry.load_pipeline()[1] == first
+
+        second = registry.publish_pipeline(make_pipeline(1)[0])
+        registry.promote(second)
+        assert registry.load_pipeline()[1] == second
+        assert registry.current()['previous'] == first
@@ -0,0 +1,75 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.modules.model_search import (
+    Candidate, FoldCache, candidates_from_space, precision_at, purged_folds, successive_halving
+)
+
+
+def make_dataset(n=1200, seed=0):
+    rng = np.random.default_rng(seed)
+    entry = pd.bdate_range('2010-01-04', periods=n // 2).repeat(2)
+    exit_ = entry + pd.to_timedelta(rng.integers(1, 30, n), unit='D')
+    X = rng.normal(size=(n, 4)).astype(np.float32)
+    y = (X[:, 0] + 0.5 * rng.normal(size=n) > 0.3).astype(int)
+    return X, y, pd.Series(entry), pd.Series(exit_)
+
+
+class TestPurgedFolds:
+
+    def test_train_rows_close_before_test_block(self):
+        X, y, entry, exit_ = make_dataset()
+        folds = purged_folds(entry, exit_, n_splits=4, embargo_days=5)
+
+        assert len(folds) == 4
+        for train_idx, test_idx in folds:
+            test_start = entry.iloc[test_idx].min()
+            assert (exit_.iloc[train_idx] < test_start).all()
+            assert (entry.iloc[train_idx] < test_start - pd.Timedelta(days=5)).all()
+            assert not np.intersect1d(train_idx, test_idx).size
+        # Test blocks tile the dates after the first block
+        tested = np.concatenate([t for _, t in folds])
+        assert len(tested) == len(np.unique(tested))
+
+    def test_precision_at_threshold(self):
+        assert precision_at([1, 0, 1, 1], [0.9, 0.6, 0.55, 0.2]) == (2, 1)
+
+
+class TestSuccessiveHalving:
+
+    def test_halving_keeps_best_and_reaches_full_budget(self):
+        X, y, entry, exit_ = make_dataset()
+        space = {"GradientBoosting": {"max_depth": [1, 2], "learning_rate": [0.001, 0.1]}}
+        result = successive_halving(X, y, entry, exit_, candidates=candidates_from_space(space),
+                                    n_splits=3, min_resource=10, max_resource=40, n_jobs=0)
+
+        board = result.leaderboard
+        assert result.best_resource == 40
+        assert sorted(board.groupby('n_estimators').size().to_dict().items()) == [(10, 4), (20, 2), (40, 1)]
+        # learning_rate=0.001 never lifts probabilities past the threshold
+        assert dict(result.best.params)['learning_rate'] == 0.1
+        assert result.best_score == board.loc[0, 'precision'] > 0.5
+
+    def test_process_pool_matches_in_process(self, tmp_path):
+        X, y, entry, exit_ = make_dataset(600)
+        candidates = [Candidate("RandomForest", (("max_depth", 3),)), Candidate("RandomForest", (("max_depth", 5),))]
+        kwargs = dict(candidates=candidates, n_splits=2, min_resource=10, max_resource=20, cache_dir=tmp_path)
+
+        serial = successive_halving(X, y, entry, exit_, n_jobs=0, **kwargs)
+        pooled = successive_halving(X, y, entry, exit_, n_jobs=2, **kwargs)
+        pd.testing.assert_frame_equal(serial.leaderboard, pooled.leaderboard)
+        # Fold matrices were written once and reused
+        assert len([p for p in tmp_path.iterdir()]) == 1
+
+    def test_fold_cache_scales_on_train_rows_only(self, tmp_path):
+        X, y, entry, exit_ = make_dataset(400)
+        folds = purged_folds(entry, exit_, n_splits=2)
+        cache = FoldCache(X, y, folds, tmp_path)
+
+        X_train = np.load(cache.dir / "0_X_train.npy")
+        assert X_train.dtype == np.float32
+        np.testing.assert_allclose(X_train.mean(axis=0), 0, atol=1e-5)
+
+    def test_unknown_estimator_rejected(self):
+        with pytest.raises(ValueError):
+            candidates_from_space({"SVM": {"C": [1.0]}})
@@ -0,0 +1,107 @@
+import pytest
+import json
+import boto3
+import pandas as pd
+from io import BytesIO
+from moto import mock_aws
+from src.utils.s3_cache import TieredS3Cache
+
+BUCKET = "cache-test-bucket"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def s3():
+    with mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+class TestTieredS3Cache:
+
+    def make_cache(self, s3, tmp_path, clock, memory=None):
+        return TieredS3Cache(s3, cache_dir=tmp_path, revalidate_after=60, memory={} if memory is None else memory, clock=clock)
+
+    def test_memory_hit_then_conditional_revalidation(self, s3, tmp_path):
+        s3.put_object(Bucket=BUCKET, Key="min_data/vix_latest.json", Body=json.dumps({'price': 18.5}))
+        clock = Clock()
+        cache = self.make_cache(s3, tmp_path, clock)
+
+        assert cache.get_json(BUCKET, "min_data/vix_latest.json") == {'price': 18.5}
+        assert cache.get_json(BUCKET, "min_data/vix_latest.json") == {'price': 18.5}
+        assert cache.stats['downloads'] == 1
+        assert cache.stats['memory_hits'] == 1
+
+        clock.now += 120
+        cache.get_json(BUCKET, "min_data/vix_latest.json")
+        assert cache.stats['not_modified'] == 1
+        assert cache.stats['downloads'] == 1
+
+        s3.put_object(Bucket=BUCKET, Key="min_data/vix_latest.json", Body=json.dumps({'price': 25.0}))
+        clock.now += 120
+        assert cache.get_json(BUCKET, "min_data/vix_latest.json") == {'price': 25.0}
+        assert cache.stats['downloads'] == 2
+
+    def test_disk_tier_survives_new_process(self, s3, tmp_path):
+        s3.put_object(Bucket=BUCKET, Key="models/model.bin", Body=b"weights")
+        self.make_cache(s3, tmp_path, Clock()).get_bytes(BUCKET, "models/model.bin")
+
+        # Fresh memory tier: the disk copy is revalidated, not re-downloaded
+        cache = self.make_cache(s3, tmp_path, Clock())
+        assert cache.get_bytes(BUCKET, "models/model.bin") == b"weights"
+        assert cache.stats['disk_hits'] == 1
+        assert cache.stats['not_modified'] == 1
+        assert cache.stats['downloads'] == 0
+
+    def test_parquet_copies_and_write_through(self, s3, tmp_path):
+        buf = BytesIO()
+        pd.DataFrame({'Symbol': ['AAPL'], 'Close': [1.0]}).to_parquet(buf, index=False)
+        cache = self.make_cache(s3, tmp_path, Clock())
+        cache.put_bytes(BUCKET, "market_data/universe_history.parquet", buf.getvalue())
+
+        df = cache.get_parquet(BUCKET, "market_data/universe_history.parquet")
+        df['Close'] = 99.0
+        again = cache.get_parquet(BUCKET, "market_data/universe_history.parquet")
+        assert again['Close'].iloc[0] == 1.0
+        assert cache.stats['downloads'] == 0
+
+    def test_serves_stale_when_s3_unreachable(self, s3, tmp_path):
+        s3.put_object(Bucket=BUCKET, Key="min_data/sectors.json", Body=b'{"AAPL": "Technology"}')
+        clock = Clock()
+        memory = {}
+        self.make_cache(s3, tmp_path, clock, memory).get_json(BUCKET, "min_data/sectors.json")
+
+        class DownClient:
+            def get_object(self, **kwargs):
+                raise ConnectionError("no network")
+
+        clock.now += 120
+        cache = self.make_cache(DownClient(), tmp_path, clock, memory)
+        assert cache.get_json(BUCKET, "min_data/sectors.json") == {'AAPL': 'Technology'}
+        assert cache.stats['stale'] == 1
+
+    def test_missing_object_raises(self, s3, tmp_path):
+        with pytest.raises(Exception):
+            self.make_cache(s3, tmp_path, Clock()).get_bytes(BUCKET, "nope.json")
+
+    def test_get_path_points_at_current_version(self, s3, tmp_path):
+        s3.put_object(Bucket=BUCKET, Key="models/nodes.bin", Body=b"v1")
+        clock = Clock()
+        cache = self.make_cache(s3, tmp_path, clock)
+        path = cache.get_path(BUCKET, "models/nodes.bin")
+        assert path.read_bytes() == b"v1"
+
+        path.unlink()
+        assert cache.get_path(BUCKET, "models/nodes.bin").read_bytes() == b"v1"
+
+        s3.put_object(Bucket=BUCKET, Key="models/nodes.bin", Body=b"v2")
+        clock.now += 120
+        assert cache.get_path(BUCKET, "models/nodes.bin").read_bytes() == b"v2"
@@ -1,5 +1,7 @@
 import pytest
-from src.modules.stock_screener import CANSLIMScreener
+import numpy as np
+from src.modules.stock_screener import CANSLIMScreener, FundamentalData, TechnicalData
+from src.config.constants import TREND_UP, TREND_DOWN, TREND_NEUTRAL
 
 class TestStockScreener:
     
@@ -38,3 +40,48 @@ class TestStockScreener:
         # Should be C or D grade
         assert result.grade in ["C", "D", "E"]
         assert result.total_score < 70
+
+    def test_vectorized_scores_match_screen_stock(self, screener):
+        rng = np.random.default_rng(7)
+        # Draw from the rule thresholds themselves so every boundary is hit
+        pick = lambda values, n: rng.choice(np.array(values, dtype=float), n)
+        n = 2000
+        trends = [TREND_UP, TREND_DOWN, TREND_NEUTRAL]
+        stocks = []
+        for i in range(n):
+            fund = FundamentalData(
+                symbol=f"S{i}",
+                eps_growth=pick([0, 14.9, 15, 25, 49.99, 50, 80, np.nan], 1)[0],
+                sales_growth=pick([0, 15, 24.5, 25, 40], 1)[0],
+                profit_margin=pick([0, 10, 14.9, 15, 30], 1)[0],
+                roe=pick([5, 10, 15, 25, 40], 1)[0],
+                debt_to_equity=pick([0.1, 0.5, 0.99, 1.0, 1.5, 2.0, 3.0], 1)[0],
+                dividend_yield=0.0,
+                current_ratio=pick([0.5, 1.0, 1.49, 1.5, 3.0], 1)[0],
+            )
+            price = float(rng.uniform(10, 200))
+            tech = TechnicalData(
+                symbol=f"S{i}",
+                price_52w_high=price * float(pick([1.0, 1.05, 1.1, 1.15, 1.25, 1.4], 1)[0]),
+                current_price=price,
+                price_52w_low=price * 0.5,
+                days_from_52w_high=int(rng.integers(0, 250)),
+                rs_rating=pick([10, 50, 69.9, 70, 85, 99], 1)[0],
+                avg_volume_20d=pick([0, 1e6, 2e6], 1)[0],
+                avg_volume_50d=pick([0.9e6, 1e6, 1.2e6, 2.4e6], 1)[0],
+                volume_trend=trends[i % 3],
+                price_trend=trends[(i // 3) % 3],
+                ma_50_distance=pick([-20, -10, -5, 0, 3, 5, 10, 15, 20], 1)[0],
+                ma_200_distance=pick([-30, -15, -5, 0, 10], 1)[0],
+            )
+            stocks.append((fund, tech))
+
+        batch = screener.batch_screen(stocks)
+        for (fund, tech), fast in zip(stocks, batch):
+            slow = screener.screen_stock(fund, tech)
+            assert (fast.fundamental_score, fast.technical_score, fast.total_score, fast.grade) == \
+                (slow.fundamental_score, slow.technical_score, slow.total_score, slow.grade), fund.symbol
+            assert fast.breakdown == {}
+
+        explained = screener.batch_screen(stocks[:3], include_breakdown=True)
+        assert [r.breakdown for r in explained] == [screener.screen_stock(f, t).breakdown for f, t in stocks[:3]]
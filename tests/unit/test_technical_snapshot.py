@@ -0,0 +1,68 @@
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from src.modules.data_fetcher import DataFetcher
+from src.modules.technical_snapshot import build_technical_snapshot, snapshot_to_technical_data
+
+
+def make_long_frame(lengths, seed=7):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i, n in enumerate(lengths):
+        dates = pd.date_range(end='2024-06-28', periods=n, freq='B', tz='UTC')
+        close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        frames.append(pd.DataFrame({
+            'Date': dates,
+            'Symbol': f"T{i}",
+            'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+            'Volume': rng.integers(1e5, 1e6, n),
+        }))
+    # Interleave rows so the snapshot has to sort
+    return pd.concat(frames, ignore_index=True).sample(frac=1.0, random_state=1)
+
+
+class TestTechnicalSnapshot:
+
+    @pytest.fixture
+    def fetcher(self):
+        with patch('src.modules.data_fetcher.StockHistoricalDataClient'):
+            return DataFetcher(api_key="test", secret_key="test")
+
+    def test_matches_per_symbol_processing(self, fetcher):
+        data = make_long_frame([400, 260, 180, 140, 90])
+        techs = snapshot_to_technical_data(build_technical_snapshot(data))
+
+        # T4 has too little history
+        assert sorted(techs) == ['T0', 'T1', 'T2', 'T3']
+
+        rocs = {}
+        for symbol, group in data.groupby('Symbol'):
+            df = group.set_index('Date').sort_index()
+            if len(df) < 130:
+                continue
+            expected = fetcher._process_technical_data(symbol, df)
+            tech = techs[symbol]
+            for field in ('price_52w_high', 'current_price', 'price_52w_low', 'avg_volume_20d',
+                          'avg_volume_50d', 'ma_50_distance', 'ma_200_distance'):
+                assert getattr(tech, field) == pytest.approx(getattr(expected, field), rel=1e-9)
+            assert tech.days_from_52w_high == expected.days_from_52w_high
+            assert tech.volume_trend == expected.volume_trend
+            assert tech.price_trend == expected.price_trend
+
+            ago = df['Close'].iloc[-250] if len(df) >= 250 else df['Close'].iloc[0]
+            rocs[symbol] = (expected.current_price - ago) / ago * 100
+
+        ranks = pd.Series(rocs).rank(pct=True) * 99
+        for symbol, rank in ranks.items():
+            assert techs[symbol].rs_rating == pytest.approx(rank)
+
+    def test_short_history_has_no_200d_distance(self):
+        snapshot = build_technical_snapshot(make_long_frame([150]))
+        assert snapshot.loc['T0', 'ma_200_distance'] == 0.0
+        assert np.isnan(snapshot.loc['T0', 'ma_200'])
+
+    def test_symbol_subset_and_empty(self):
+        snapshot = build_technical_snapshot(make_long_frame([200, 200]))
+        assert list(snapshot_to_technical_data(snapshot, ['T1', 'XYZ'])) == ['T1']
+        assert build_technical_snapshot(pd.DataFrame()).empty
@@ -0,0 +1,103 @@
+import pytest
+import boto3
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from io import BytesIO
+from moto import mock_aws
+from src.modules import features as feature_lib
+from src.modules.training_data import (
+    load_training_data_s3, read_csv_stream, read_training_data, upload_training_data, write_training_data
+)
+
+BUCKET = "training-test-bucket"
+PREFIX = "ml_data/training/"
+
+
+def make_labels(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    entry = pd.to_datetime('2014-01-02') + pd.to_timedelta(np.sort(rng.integers(0, 365 * 4, n)), unit='D')
+    df = pd.DataFrame(rng.normal(size=(n, len(feature_lib.FEATURE_NAMES))), columns=feature_lib.FEATURE_NAMES)
+    df['outcome'] = rng.integers(0, 2, n)
+    df['entry_date'] = entry.astype('datetime64[ns]')
+    df['symbol'] = [f"S{i % 7}" for i in range(n)]
+    df['exit_date'] = (entry + pd.Timedelta(days=10)).astype('datetime64[ns]')
+    df['return_pct'] = rng.normal(0, 0.05, n)
+    df['exit_reason'] = 'Stop Loss'
+    return df
+
+
+@pytest.fixture
+def s3():
+    with mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+class TestLocalDataset:
+
+    def test_round_trip_typed_and_partitioned(self, tmp_path):
+        df = make_labels()
+        root = write_training_data(df, tmp_path / "training")
+
+        assert sorted(p.name for p in root.iterdir()) == [f"entry_year={y}" for y in range(2014, 2018)]
+        schema = pq.read_schema(root / "entry_year=2015" / "part-0.parquet")
+        assert schema.metadata[b'feature_schema'] == str(feature_lib.FEATURE_SCHEMA_VERSION).encode()
+
+        out = read_training_data(root)
+        assert (out[feature_lib.FEATURE_NAMES].dtypes == np.float32).all()
+        assert out['outcome'].dtype == np.int8
+        np.testing.assert_allclose(out[feature_lib.FEATURE_NAMES].to_numpy(),
+                                   df[feature_lib.FEATURE_NAMES].to_numpy(), rtol=1e-6)
+        assert out['entry_date'].tolist() == df['entry_date'].tolist()
+
+    def test_projection_and_date_range(self, tmp_path):
+        df = make_labels()
+        root = write_training_data(df, tmp_path / "training")
+
+        out = read_training_data(root, features=['rsi', 'vix_level'], start='2015-03-01', end='2016-06-30')
+        expected = df[(df['entry_date'] >= '2015-03-01') & (df['entry_date'] <= '2016-06-30')]
+
+        assert list(out.columns) == ['rsi', 'vix_level', 'outcome', 'entry_date']
+        assert len(out) == len(expected)
+        assert out['entry_date'].tolist() == expected['entry_date'].tolist()
+
+    def test_rewrite_replaces_old_partitions(self, tmp_path):
+        root = write_training_data(make_labels(), tmp_path / "training")
+        recent = make_labels()
+        recent = recent[recent['entry_date'] >= '2017-01-01']
+        write_training_data(recent, root)
+
+        assert [p.name for p in root.iterdir()] == ["entry_year=2017"]
+        assert len(read_training_data(root)) == len(recent)
+
+
+class TestS3Dataset:
+
+    def test_upload_and_streamed_load(self, s3):
+        df = make_labels()
+        upload_training_data(df, s3, BUCKET, PREFIX)
+
+        out = load_training_data_s3(s3, BUCKET, PREFIX, features=feature_lib.BASE_FEATURES,
+                                    columns=['outcome'], start='2016-01-01')
+        expected = df[df['entry_date'] >= '2016-01-01']
+        assert list(out.columns) == feature_lib.BASE_FEATURES + ['outcome']
+        assert len(out) == len(expected)
+        assert (out[feature_lib.BASE_FEATURES].dtypes == np.float32).all()
+
+        # Partitions that disappear from the source are removed
+        upload_training_data(expected, s3, BUCKET, PREFIX)
+        keys = [o['Key'] for o in s3.list_objects_v2(Bucket=BUCKET, Prefix=PREFIX)['Contents']]
+        assert keys == [f"{PREFIX}entry_year=2016/part-0.parquet", f"{PREFIX}entry_year=2017/part-0.parquet"]
+
+    def test_missing_prefix_is_empty(self, s3):
+        assert load_training_data_s3(s3, BUCKET, PREFIX).empty
+
+    def test_legacy_csv_stream(self):
+        df = make_labels(50)
+        body = BytesIO(df.to_csv(index=False).encode())
+
+        out = read_csv_stream(body, ['rsi', 'atr_pct'], columns=['outcome'])
+        assert list(out.columns) == ['rsi', 'atr_pct', 'outcome']
+        assert out['rsi'].dtype == np.float32
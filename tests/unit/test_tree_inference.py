@@ -0,0 +1,67 @@
+import pytest
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, VotingClassifier
+from sklearn.preprocessing import StandardScaler
+from src.modules.tree_inference import CompiledEnsemble, compile_pipeline, export_pipeline
+
+FEATURES = [f"f{i}" for i in range(6)]
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1500, len(FEATURES))) * [1, 5, 0.1, 2, 1, 30]
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(size=len(X)) > 0).astype(int)
+    X_test = rng.normal(size=(400, len(FEATURES))) * [1, 5, 0.1, 2, 1, 30]
+    return X, y, X_test
+
+
+def fitted(model, X, y):
+    scaler = StandardScaler().fit(X)
+    return model.fit(scaler.transform(X), y), scaler
+
+
+class TestCompiledEnsemble:
+
+    @pytest.mark.parametrize("model", [
+        RandomForestClassifier(n_estimators=40, max_depth=8, class_weight='balanced', random_state=0),
+        GradientBoostingClassifier(n_estimators=50, max_depth=3, subsample=0.9, random_state=0),
+        VotingClassifier([
+            ('rf', RandomForestClassifier(n_estimators=20, max_depth=6, random_state=1)),
+            ('gbm', GradientBoostingClassifier(n_estimators=30, learning_rate=0.05, random_state=1)),
+        ], voting='soft', weights=[1.5, 1.0]),
+    ], ids=['rf', 'gbm', 'voting'])
+    def test_probabilities_match_sklearn(self, data, tmp_path, model):
+        X, y, X_test = data
+        model, scaler = fitted(model, X, y)
+        export_pipeline(tmp_path / "model.joblib", model, scaler, FEATURES)
+
+        compiled = CompiledEnsemble.load(tmp_path / "model")
+        assert isinstance(np.load(tmp_path / "model.npy", mmap_mode='r'), np.memmap)
+        assert compiled.features == FEATURES
+
+        expected = model.predict_proba(scaler.transform(X_test))[:, 1]
+        actual = compiled.predict_proba(compiled.scaler.transform(X_test))[:, 1]
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_missing_values_follow_sklearn(self, data):
+        X, y, X_test = data
+        X = X.copy()
+        X[::7, 1] = np.nan
+        model = RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0).fit(X, y)
+        X_test = X_test.copy()
+        X_test[::5, 1] = np.nan
+
+        compiled = CompiledEnsemble(*compile_pipeline(model))
+        np.testing.assert_array_equal(compiled.predict_proba(X_test)[:, 1], model.predict_proba(X_test)[:, 1])
+
+    def test_rejects_wrong_width_and_unsupported_models(self, data):
+        X, y, _ = data
+        model = GradientBoostingClassifier(n_estimators=5, random_state=0).fit(X, y)
+        compiled = CompiledEnsemble(*compile_pipeline(model))
+        with pytest.raises(ValueError):
+            compiled.predict_proba(X[:, :3])
+
+        hard = VotingClassifier([('gbm', GradientBoostingClassifier(n_estimators=5))], voting='hard').fit(X, y)
+        with pytest.raises(ValueError):
+            compile_pipeline(hard)
@@ -0,0 +1,50 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.modules.universe_panel import build_panel, UniversePanel
+from tests.conftest import make_ohlcv
+
+
+def make_frame(n, start, base):
+    return make_ohlcv(n, start=start, base=base)[['Close', 'Volume']].astype({'Close': np.float32, 'Volume': np.int64})
+
+
+class TestUniversePanel:
+
+    @pytest.fixture
+    def frames(self):
+        return {
+            'AAPL': make_frame(30, '2024-01-02', 100),
+            'MSFT': make_frame(12, '2024-02-01', 300),
+            'EMPTY': pd.DataFrame(),
+        }
+
+    def test_round_trip_with_mapped_views(self, frames, tmp_path):
+        build_panel(tmp_path / "panel", frames)
+        panel = UniversePanel(tmp_path / "panel")
+
+        assert panel.symbols == ['AAPL', 'MSFT']
+        assert panel.rows == 42
+        msft = panel.frame('MSFT')
+        pd.testing.assert_frame_equal(msft, frames['MSFT'], check_freq=False)
+        assert msft['Close'].dtype == np.float32
+
+        # Columns are views into the mapping, not copies
+        mapped = panel._array('Close')
+        assert np.shares_memory(msft['Close'].to_numpy(), mapped)
+        assert not np.shares_memory(panel.frame('MSFT', copy=True)['Close'].to_numpy(), mapped)
+        assert panel.frame('NOPE').empty
+
+    def test_column_projection_and_extras(self, frames, tmp_path):
+        vix = pd.DataFrame({'VIX': [14.0, 15.5]}, index=pd.DatetimeIndex(['2024-01-02', '2024-01-03'], name='Date').as_unit('ns'))
+        panel = build_panel(tmp_path / "panel", frames, columns=['Close'], extras={'vix': vix})
+
+        assert list(panel.frame('AAPL').columns) == ['Close']
+        pd.testing.assert_frame_equal(panel.extra('vix'), vix)
+        assert panel.extra('missing').empty
+
+    def test_rebuild_replaces_panel(self, frames, tmp_path):
+        build_panel(tmp_path / "panel", frames)
+        panel = build_panel(tmp_path / "panel", {'TSLA': make_frame(5, '2024-03-01', 200)})
+        assert panel.symbols == ['TSLA']
+        assert not (tmp_path / "panel.building").exists()
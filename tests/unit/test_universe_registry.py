@@ -0,0 +1,90 @@
+import pytest
+from datetime import datetime, timedelta
+from src.modules.universe_registry import UniverseRegistry, UniverseUnavailableError
+
+
+class StubFetcher:
+    """Scraper stand-in whose membership can be changed between runs"""
+
+    def __init__(self, sp500, nasdaq=(), etfs=('SPY',)):
+        self.sp500 = list(sp500)
+        self.nasdaq = list(nasdaq)
+        self.etfs = list(etfs)
+        self.scrapes = 0
+        self.fail = False
+
+    def fetch_sp500_tickers(self):
+        self.scrapes += 1
+        if self.fail:
+            raise ConnectionError("wikipedia unreachable")
+        return self.sp500
+
+    def fetch_nasdaq100_tickers(self):
+        return self.nasdaq
+
+    def fetch_key_etfs(self):
+        return self.etfs
+
+
+class Clock:
+    def __init__(self):
+        self.now = datetime(2024, 3, 1, 9, 0)
+
+    def __call__(self):
+        return self.now
+
+
+class TestUniverseRegistry:
+
+    @pytest.fixture
+    def clock(self):
+        return Clock()
+
+    def make_registry(self, fetcher, clock, tmp_path):
+        return UniverseRegistry(fetcher, s3_client=None, local_dir=tmp_path, ttl_hours=24, clock=clock)
+
+    def test_scrapes_once_per_ttl(self, clock, tmp_path):
+        fetcher = StubFetcher(['AAPL', 'BRK-B', 'MSFT'], nasdaq=['AAPL', 'NVDA'])
+        registry = self.make_registry(fetcher, clock, tmp_path)
+
+        assert registry.symbols() == ['AAPL', 'MSFT', 'NVDA', 'SPY']
+        clock.now += timedelta(hours=12)
+        # A new process reads the stored snapshot instead of scraping
+        assert self.make_registry(fetcher, clock, tmp_path).symbols(['sp500']) == ['AAPL', 'MSFT']
+        assert fetcher.scrapes == 1
+
+        clock.now += timedelta(hours=13)
+        registry.symbols()
+        assert fetcher.scrapes == 2
+
+    def test_adds_drops_and_members_as_of(self, clock, tmp_path):
+        fetcher = StubFetcher(['AAPL', 'XOM'])
+        registry = self.make_registry(fetcher, clock, tmp_path)
+        registry.latest()
+
+        clock.now += timedelta(days=7)
+        fetcher.sp500 = ['AAPL', 'PLTR']
+        snapshot = registry.latest()
+
+        assert snapshot.added == ['PLTR']
+        assert snapshot.removed == ['XOM']
+        assert registry.changes_since('2024-03-02') == {'added': ['PLTR'], 'removed': ['XOM']}
+        assert registry.members_as_of(datetime(2024, 3, 5), ['sp500']) == ['AAPL', 'XOM']
+        assert registry.members_as_of('2024-03-08', ['sp500']) == ['AAPL', 'PLTR']
+        assert registry.members_as_of('2024-01-01') == []
+
+    def test_offline_fallback(self, clock, tmp_path):
+        fetcher = StubFetcher(['AAPL'])
+        self.make_registry(fetcher, clock, tmp_path).latest()
+
+        clock.now += timedelta(days=3)
+        fetcher.fail = True
+        snapshot = self.make_registry(fetcher, clock, tmp_path).latest()
+        assert snapshot.as_of == '2024-03-01'
+        assert snapshot.symbols() == ['AAPL', 'SPY']
+
+    def test_no_snapshot_and_no_network(self, clock, tmp_path):
+        fetcher = StubFetcher(['AAPL'])
+        fetcher.fail = True
+        with pytest.raises(UniverseUnavailableError):
+            self.make_registry(fetcher, clock, tmp_path).latest()